@@ -0,0 +1,72 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the block-wise quantization against the global quantization.
+
+The layer is a normal distributed delta with a few outliers, the error of the
+decoded values, the upload bytes and the peak memory of encoding traced by
+tracemalloc are compared, for example:
+
+    PYTHONPATH=. python benchmarks/block_quantization_benchmark.py \
+        --size=25 --bits=4,8 --outliers=10
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.libs.compression.block_quantization import \
+    BlockQuantization, DEFAULT_BLOCK_SIZE
+from neursafe_fl.python.libs.compression.quantization import \
+    QuantizationCompression
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("size", 25, "Element number of the layer, unit is "
+                     "million.")
+flags.DEFINE_list("bits", ["4", "8"], "Quantization bits.")
+flags.DEFINE_integer("outliers", 10, "The number of outliers in the layer.")
+flags.DEFINE_integer("block_size", DEFAULT_BLOCK_SIZE, "Block size.")
+
+
+def _create_layer(size, outliers):
+    rng = np.random.default_rng(0)
+    layer = rng.normal(0, 1e-3, size=size).astype(np.float32)
+    layer[rng.integers(0, size, outliers)] = 0.1
+    return layer
+
+
+def _upload_bytes(encoded, params):
+    return encoded.nbytes + sum(value.nbytes for value in params.values()
+                                if isinstance(value, np.ndarray))
+
+
+def main(_):
+    layer = _create_layer(FLAGS.size * 10 ** 6, FLAGS.outliers)
+    print("%-6s %-4s %10s %10s %12s %12s %10s" % (
+        "engine", "bits", "encode(s)", "peak(MB)", "bytes(MB)", "rmse",
+        "max error"))
+    for bits in FLAGS.bits:
+        bits = int(bits)
+        engines = {"global": QuantizationCompression(bits),
+                   "block": BlockQuantization(bits, FLAGS.block_size)}
+        for name, compression in engines.items():
+            tracemalloc.start()
+            start = time.perf_counter()
+            encoded, params = compression.encode(layer)
+            spent = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            error = compression.decode(encoded, **params) - layer
+            print("%-6s %-4s %10.3f %10.1f %12.1f %12.3e %10.3e" % (
+                name, bits, spent, peak / 1024 / 1024,
+                _upload_bytes(encoded, params) / 1024 / 1024,
+                np.sqrt(np.mean(np.square(error, dtype=np.float64))),
+                np.abs(error).max()))
+            del encoded, params, error
+
+
+if __name__ == "__main__":
+    app.run(main)
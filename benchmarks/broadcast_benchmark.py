@@ -0,0 +1,141 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark broadcasting one round package to many clients.
+
+Compare sending the task and package by stream_call per client, which reads
+and serializes the package for each client, with sending the package
+serialized once by SerializedMessages. Each mode runs in its own process to
+measure its peak RSS growth, the clients are faked by one gRPC server in another
+process, for example:
+
+    PYTHONPATH=. python benchmarks/broadcast_benchmark.py \
+        --clients=500 --package_mb=2
+"""
+
+import asyncio
+import multiprocessing
+import os
+import resource
+import socket
+import time
+from io import BytesIO
+
+from absl import app, flags
+from grpclib.server import Stream
+
+from neursafe_fl.proto.message_pb2 import Task, Response, Metadata, File
+from neursafe_fl.proto.train_service_grpc import TrainServiceBase, \
+    TrainServiceStub
+from neursafe_fl.python.trans.grpc import GRPCServer
+from neursafe_fl.python.trans.grpc_call import stream_call, \
+    SerializedMessages
+from neursafe_fl.python.trans.grpc_pool import GRPCPool
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("clients", 500, "Client number to broadcast.")
+flags.DEFINE_integer("package_mb", 2, "Size of the round package, unit is MB.")
+
+HOST = "127.0.0.1"
+
+
+class DrainService(TrainServiceBase):
+    """Receive and drop the task."""
+
+    async def Train(self, stream: Stream[Task, Response]):
+        async for _ in stream:
+            pass
+        await stream.send_message(Response(state="success"))
+
+    async def Stop(self, stream: Stream[Metadata, Response]):
+        await stream.recv_message()
+        await stream.send_message(Response(state="success"))
+
+
+def _serve(port):
+    async def serve():
+        server = GRPCServer(HOST, port, [DrainService()])
+        await server.start()
+        await server.wait_closed()
+
+    asyncio.run(serve())
+
+
+def _broadcast(address, mode, clients, package_mb, queue):
+    task = Task(metadata=Metadata(job_name="benchmark", round=1))
+    package_info = File(name="package.zip", compress=True)
+    data = os.urandom(package_mb << 20)
+    asyncio.run(asyncio.sleep(0))  # warm up the event loop.
+
+    async def broadcast():
+        if mode == "serialized":
+            serialized = SerializedMessages(Task, task,
+                                            [(package_info, BytesIO(data))])
+            sends = [stream_call(TrainServiceStub, "Train", Task, address,
+                                 config=serialized)
+                     for _ in range(clients)]
+        else:
+            # each client reads the package by its own file object, as the
+            # round opens the package file for each client.
+            sends = [stream_call(TrainServiceStub, "Train", Task, address,
+                                 config=task,
+                                 file_like_objs=[(package_info, BytesIO(data))])
+                     for _ in range(clients)]
+        await asyncio.gather(*sends)
+        GRPCPool.instance().close_all()
+
+    # the peak rss growth during broadcasting, without the imported modules.
+    rss_start = _peak_rss()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    asyncio.run(broadcast())
+    queue.put((time.perf_counter() - start, time.process_time() - cpu_start,
+               _peak_rss() - rss_start))
+
+
+def _peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _wait_server(port):
+    for _ in range(100):
+        try:
+            socket.create_connection((HOST, port)).close()
+            return
+        except ConnectionRefusedError:
+            time.sleep(0.1)
+
+
+def main(_):
+    context = multiprocessing.get_context("spawn")
+    port = _free_port()
+    server = context.Process(target=_serve, args=(port,), daemon=True)
+    server.start()
+    _wait_server(port)
+
+    print("package: %dMB, clients: %d" % (FLAGS.package_mb, FLAGS.clients))
+    results = {}
+    for mode in ["per_client", "serialized"]:
+        queue = context.Queue()
+        process = context.Process(
+            target=_broadcast, args=("%s:%s" % (HOST, port), mode,
+                                     FLAGS.clients, FLAGS.package_mb, queue))
+        process.start()
+        results[mode] = queue.get()
+        process.join()
+        print("%-10s  time: %.3fs, cpu time: %.3fs, peak rss growth: %.1fMB"
+              % ((mode,) + results[mode]))
+
+    server.terminate()
+    baseline, serialized = results["per_client"], results["serialized"]
+    print("serialized once: cpu time %.2fx less, peak rss %.2fx less"
+          % (baseline[1] / serialized[1], baseline[2] / serialized[2]))
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,69 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the scaling of ParallelWeightAggregator with worker number.
+
+Aggregate the same clients' weights with 1 to max_workers worker processes,
+and compare with the single process WeightAggregator, for example:
+
+    PYTHONPATH=. python benchmarks/parallel_aggregator_benchmark.py \
+        --parameters=100000000 --clients=20 --max_workers=32
+"""
+
+import asyncio
+import time
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.coordinator.aggregator.parallel_weight_aggregator \
+    import ParallelWeightAggregator
+from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
+    WeightAggregator
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("parameters", 20000000, "Parameter number of the model.")
+flags.DEFINE_integer("layers", 100, "Layer number of the model.")
+flags.DEFINE_integer("clients", 20, "Client number of one round.")
+flags.DEFINE_integer("max_workers", 8, "The maximum worker number.")
+
+
+def _create_weights():
+    layer_size = FLAGS.parameters // FLAGS.layers
+    return FlatWeights.flatten(
+        [np.random.random(layer_size).astype(np.float32)
+         for _ in range(FLAGS.layers)])
+
+
+def _run(aggregator, weights):
+    start = time.perf_counter()
+    for index in range(FLAGS.clients):
+        aggregator.accumulate({"weights": weights}, weight=index + 1)
+    asyncio.run(aggregator.aggregate())
+    return time.perf_counter() - start
+
+
+def _worker_nums():
+    num = 1
+    while num < FLAGS.max_workers:
+        yield num
+        num *= 2
+    yield FLAGS.max_workers
+
+
+def main(_):
+    weights = _create_weights()
+    print("model: %.2fMB, clients: %d"
+          % (weights.vector.nbytes / 1024 / 1024, FLAGS.clients))
+
+    baseline = _run(WeightAggregator(), weights)
+    print("WeightAggregator          time: %.3fs" % baseline)
+    for workers in _worker_nums():
+        elapsed = _run(ParallelWeightAggregator(workers=workers), weights)
+        print("ParallelWeightAggregator  workers: %-3d time: %.3fs, "
+              "speedup: %.2f" % (workers, elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    app.run(main)
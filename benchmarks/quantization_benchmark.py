@@ -0,0 +1,92 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark packing the quantized values of one layer.
+
+Compare the legacy packing, which expands every value into one int32 per bit
+and packs 31 bits into int32 with np.matmul, with the byte stream packed by
+shift-and-or in QuantizationCompression. The peak memory is traced by
+tracemalloc, for example:
+
+    PYTHONPATH=. python benchmarks/quantization_benchmark.py \
+        --sizes=1,5,25 --bits=2,4,8
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.libs.compression.quantization import \
+    QuantizationCompression, DEFAULT_TARGET_BITS
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("sizes", ["1", "5", "25"],
+                  "Element numbers of the layer, unit is million.")
+flags.DEFINE_list("bits", ["2", "4", "8"], "Quantization bits.")
+
+
+def _expand_to_binary_form(value, bits):
+    expand_array = np.array([2 ** i for i in range(bits)], dtype=np.int32)
+    return np.reshape(np.mod(np.floor_divide(value, expand_array), 2), [-1])
+
+
+def _pack_binary_form(value, bits):
+    packing_array = np.array([[2 ** i] for i in range(bits)], dtype=np.int32)
+    extra_zeros = np.zeros(np.mod(-value.size, bits), dtype=np.int32)
+    reshaped = np.reshape(np.concatenate([value, extra_zeros]), [-1, bits])
+    return np.matmul(reshaped, packing_array)
+
+
+def _legacy_pack(value, bits):
+    value = _expand_to_binary_form(np.reshape(value, [-1, 1]), bits)
+    return _pack_binary_form(value, DEFAULT_TARGET_BITS).astype(np.int32)
+
+
+def _legacy_unpack(value, bits, shape):
+    value = _expand_to_binary_form(value, DEFAULT_TARGET_BITS)
+    value = value[:np.prod(shape) * bits]
+    return np.reshape(_pack_binary_form(value, bits), shape)
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    spent = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, spent, peak / 1024 / 1024
+
+
+def main(_):
+    print("%-8s %-4s %-8s %12s %12s %14s %14s %10s" % (
+        "size(M)", "bits", "engine", "pack(s)", "unpack(s)", "pack peak(MB)",
+        "unpack peak(MB)", "bytes(MB)"))
+    for size in FLAGS.sizes:
+        for bits in FLAGS.bits:
+            bits = int(bits)
+            compression = QuantizationCompression(bits)
+            value = np.random.randint(0, 2 ** bits, size=int(size) * 10 ** 6,
+                                      dtype=np.int32)
+
+            engines = {
+                "legacy": (lambda v, b=bits: _legacy_pack(v, b),
+                           lambda p, b=bits: _legacy_unpack(p, b,
+                                                            value.shape)),
+                "packbits": (compression.pack_into_int,
+                             lambda p: compression.unpack_into_int(
+                                 p, value.shape))}
+            for name, (pack, unpack) in engines.items():
+                packed, pack_time, pack_peak = _measure(pack, value)
+                unpacked, unpack_time, unpack_peak = _measure(unpack, packed)
+                assert np.array_equal(unpacked, value)
+                print("%-8s %-4s %-8s %12.3f %12.3f %14.1f %14.1f %10.1f" % (
+                    size, bits, name, pack_time, unpack_time, pack_peak,
+                    unpack_peak, packed.nbytes / 1024 / 1024))
+                del packed, unpacked
+
+
+if __name__ == "__main__":
+    app.run(main)
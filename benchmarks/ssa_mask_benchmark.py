@@ -0,0 +1,80 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark generating the mask of secure aggregation on a client.
+
+Compare the legacy mask generation, which allocates the mask of each layer
+and a new random array for each peer, with the fused generation, which
+accumulates the streams of peers chunk by chunk into one flattened buffer.
+The peak memory is traced by tracemalloc, for example:
+
+    PYTHONPATH=. python benchmarks/ssa_mask_benchmark.py \
+        --peers=10,50,200 --layers=1,4,0.5,0.5
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.libs.secure.secure_aggregate.common import \
+    PseudorandomGenerator
+from neursafe_fl.python.libs.secure.secure_aggregate.mask import ADD, \
+    SUBTRACT, generate_mask, mask_size, split_mask
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("peers", ["10", "50", "200"], "Numbers of peers.")
+flags.DEFINE_list("layers", ["1", "4", "0.5", "0.5"],
+                  "Element numbers of the layers, unit is million.")
+
+
+def _legacy_mask(shape, terms):
+    mask = np.zeros(shape)
+    for sign, prg in terms:
+        if sign == ADD:
+            mask = np.add(mask, prg.next_value(shape))
+        else:
+            mask = np.subtract(mask, prg.next_value(shape))
+    return mask
+
+
+def _legacy(shapes, terms):
+    return [_legacy_mask(shape, terms) for shape in shapes]
+
+
+def _fused(shapes, terms):
+    return split_mask(generate_mask(mask_size(shapes), terms), shapes)
+
+
+def _terms(peers):
+    return [(ADD if index % 2 else SUBTRACT, PseudorandomGenerator(index))
+            for index in range(peers)]
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    spent = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, spent, peak / 1024 / 1024
+
+
+def main(_):
+    shapes = [(int(float(size) * 10 ** 6),) for size in FLAGS.layers]
+    print("%-6s %-8s %10s %10s" % ("peers", "engine", "time(s)", "peak(MB)"))
+    for peers in FLAGS.peers:
+        results = {}
+        for name, func in {"legacy": _legacy, "fused": _fused}.items():
+            masks, spent, peak = _measure(func, shapes, _terms(int(peers)))
+            results[name] = masks
+            print("%-6s %-8s %10.3f %10.1f" % (peers, name, spent, peak))
+
+        for legacy, fused in zip(results["legacy"], results["fused"]):
+            assert np.allclose(legacy, fused)
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,152 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Simulate the protocol cost of SSA with the complete and neighbor graph.
+
+Every client of SSA agrees the keys with, and shares its secrets to, all the
+other clients, with neighbor_num set, only to its neighbors. The clients run
+in parallel and do the same work, so one client is simulated, and the
+server's unmask stage is simulated for all the clients, with the real key
+agreements, AES encryption, shamir sharing and mask generation, the network
+is not simulated, the encrypted shares routed by the server are counted.
+For example:
+
+    PYTHONPATH=. python benchmarks/ssa_neighbors_benchmark.py \
+        --clients=50,100,200,500,1000 --drop_rate=0.01
+"""
+
+import math
+import os
+import random
+import time
+
+from absl import app, flags
+from diffiehellman.primes import PRIMES
+
+from neursafe_fl.python.libs.secure.secure_aggregate.aes import \
+    encrypt_with_gcm, decrypt_with_gcm
+from neursafe_fl.python.libs.secure.secure_aggregate.common import \
+    PseudorandomGenerator
+from neursafe_fl.python.libs.secure.secure_aggregate.dh import DiffieHellman
+from neursafe_fl.python.libs.secure.secure_aggregate.mask import ADD, \
+    SUBTRACT, generate_mask
+from neursafe_fl.python.libs.secure.secure_aggregate.neighbors import \
+    graph_seed, neighbor_graph, neighbor_threshold
+from neursafe_fl.python.libs.secure.secure_aggregate.shamir import \
+    recover_secrets, split_secret
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("clients", ["50", "100", "200", "500", "1000"],
+                  "Numbers of clients.")
+flags.DEFINE_float("threshold_ratio", 0.6,
+                   "The threshold of all the clients, ratio of clients.")
+flags.DEFINE_float("drop_rate", 0.01, "The ratio of dropped clients.")
+flags.DEFINE_integer("size", 100000, "Element number of the model.")
+
+HANDLE = "job-1"
+DH_PRIME = PRIMES[14]['prime']
+
+
+def _random_key():
+    # the cost of agreement is the same for any public key in the group, the
+    # pair is used for both the c and s keys.
+    return int.from_bytes(os.urandom(128), "big"), \
+        random.randrange(2, DH_PRIME - 1)
+
+
+def _simulate_client(neighbors, keys, share_threshold):
+    """The work of one client, returns the time and encrypted shares."""
+    diffie_hellman = DiffieHellman()
+    sk = keys["me"][0]
+
+    start = time.perf_counter()
+    b = random.randint(10000000000, 9999999999999999)
+    b_shares = split_secret(b, share_threshold, len(neighbors) + 1)
+    s_sk_shares = split_secret(sk, share_threshold, len(neighbors) + 1)
+    encrypted = []
+    for index, neighbor in enumerate(neighbors):
+        aes_key = diffie_hellman.agree(sk, keys[neighbor][1])
+        msg = "$$".join(["me", neighbor, s_sk_shares[index].hex(),
+                         b_shares[index].hex()])
+        encrypted.append((aes_key, encrypt_with_gcm(aes_key, msg, HANDLE,
+                                                    "me")))
+    share_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    terms = [(ADD if index % 2 else SUBTRACT, PseudorandomGenerator(
+        diffie_hellman.agree(sk, keys[neighbor][1])))
+             for index, neighbor in enumerate(neighbors)]
+    terms.append((ADD, PseudorandomGenerator(b)))
+    generate_mask(FLAGS.size, terms)
+    mask_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for aes_key, data in encrypted:
+        decrypt_with_gcm(aes_key, data, HANDLE, "me")
+    unmask_time = time.perf_counter() - start
+
+    return share_time + mask_time + unmask_time, len(encrypted[0][1])
+
+
+def _simulate_server(graph, keys, share_threshold, drop_clients):
+    """The unmask stage of server, returns the time."""
+    alive_clients = [client_id for client_id in graph
+                     if client_id not in drop_clients]
+    # the cost of recovery not depends on the secrets, all the secrets use
+    # the same shares, not to split thousands of secrets.
+    shares = split_secret(12345, share_threshold, share_threshold)
+    diffie_hellman = DiffieHellman()
+
+    start = time.perf_counter()
+    shares_s = {("b", client_id): shares for client_id in alive_clients}
+    pairs = [(drop_id, alive_id) for drop_id in drop_clients
+             for alive_id in graph[drop_id] if alive_id not in drop_clients]
+    for drop_id in {drop_id for drop_id, _ in pairs}:
+        shares_s[("s_sk", drop_id)] = shares
+    recover_secrets(shares_s, share_threshold)
+
+    terms = [(SUBTRACT, PseudorandomGenerator(client_id))
+             for client_id in range(len(alive_clients))]
+    for drop_id, alive_id in pairs:
+        s_uv = diffie_hellman.agree(keys[drop_id][0], keys[alive_id][1])
+        terms.append((ADD, PseudorandomGenerator(s_uv)))
+    generate_mask(FLAGS.size, terms)
+
+    return time.perf_counter() - start, len(pairs)
+
+
+def main(_):
+    print("%-6s %-10s %-6s %-9s %12s %12s %14s %12s" % (
+        "n", "graph", "k", "threshold", "client(s)", "server(s)",
+        "routed shares", "routed(MB)"))
+    for client_num in FLAGS.clients:
+        client_num = int(client_num)
+        client_ids = ["c%s" % index for index in range(client_num - 1)] \
+            + ["me"]
+        keys = {client_id: _random_key() for client_id in client_ids}
+        threshold = math.ceil(client_num * FLAGS.threshold_ratio)
+        drop_clients = set(random.sample(
+            client_ids[:-1], int(client_num * FLAGS.drop_rate)))
+
+        neighbor_num = 2 * math.ceil(math.log2(client_num))
+        for name, graph_neighbor_num in [("complete", client_num),
+                                         ("neighbors", neighbor_num)]:
+            graph = neighbor_graph(client_ids, graph_neighbor_num,
+                                   graph_seed(HANDLE))
+            share_num = len(graph["me"]) + 1
+            share_threshold = threshold if name == "complete" else \
+                neighbor_threshold(threshold, client_num, share_num)
+
+            client_time, share_bytes = _simulate_client(
+                graph["me"], keys, share_threshold)
+            server_time, _ = _simulate_server(graph, keys, share_threshold,
+                                              drop_clients)
+            routed = client_num * (share_num - 1)
+            print("%-6s %-10s %-6s %-9s %12.2f %12.2f %14s %12.1f" % (
+                client_num, name, share_num - 1, share_threshold,
+                client_time, server_time, routed,
+                routed * share_bytes / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,129 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=protected-access
+"""Benchmark the dropout recovery and unmasking of SSA server.
+
+Compare the inline unmasking, which agrees the s_uv keys of the dropped
+and alive clients and generates the whole mask in the event loop, with the
+unmasking of SSAServer, which agrees the keys by client pairs and
+generates the mask by shards of parameters in a process pool. The event
+loop is probed every millisecond meanwhile, the longest stall is how long
+the gRPC messages and stage timers wait, for example:
+
+    PYTHONPATH=. python benchmarks/ssa_unmask_benchmark.py \
+        --pairs=500 --alive=100 --size=10 --workers=1,2,4
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.libs.secure.secure_aggregate.common import \
+    PseudorandomGenerator
+from neursafe_fl.python.libs.secure.secure_aggregate.dh import DiffieHellman
+from neursafe_fl.python.libs.secure.secure_aggregate.mask import ADD, \
+    SUBTRACT, generate_mask
+from neursafe_fl.python.libs.secure.secure_aggregate.ssa_server import \
+    SSAServer
+from neursafe_fl.python.runtime.weights import FlatWeights
+from neursafe_fl.proto.secure_aggregate_pb2 import PublicKey
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("pairs", 500, "Number of (dropped, alive) pairs.")
+flags.DEFINE_integer("alive", 100, "Number of alive clients.")
+flags.DEFINE_float("size", 10, "Element number of model, unit is million.")
+flags.DEFINE_list("workers", ["1", "2", "4"], "Numbers of unmask workers.")
+
+
+def _inputs():
+    diffie_hellman = DiffieHellman()
+    alive = ["alive-%s" % index for index in range(FLAGS.alive)]
+    drop_num = -(-FLAGS.pairs // FLAGS.alive)
+    s_sk_s = {"drop-%s" % index: diffie_hellman.generate()[0]
+              for index in range(drop_num)}
+    public_keys = {client_id: PublicKey(
+        client_id=client_id, s_pk=str(diffie_hellman.generate()[1]))
+                   for client_id in alive}
+    b_s = [int.from_bytes(os.urandom(8), "big") for _ in alive]
+    return alive, s_sk_s, public_keys, b_s
+
+
+def _inline(alive, s_sk_s, public_keys, b_s, size):
+    diffie_hellman = DiffieHellman()
+    terms = []
+    for alive_id in alive:
+        for drop_id, s_sk in s_sk_s.items():
+            s_uv = diffie_hellman.agree(s_sk, int(public_keys[alive_id].s_pk))
+            terms.append((ADD if drop_id > alive_id else SUBTRACT,
+                          PseudorandomGenerator(s_uv)))
+    terms.extend((SUBTRACT, PseudorandomGenerator(b)) for b in b_s)
+
+    vector = np.zeros(size)
+    return np.add(vector, generate_mask(size, terms))
+
+
+async def _pool(workers, alive, s_sk_s, public_keys, b_s, size):
+    server = SSAServer("benchmark", 1, len(alive), 10,
+                       unmask_workers=workers)
+    server._SSAServer__rpt_masked_result_clients = alive
+    server._SSAServer__public_keys = public_keys
+    server._total_data = FlatWeights.flatten([np.zeros(size)])
+    try:
+        await server._SSAServer__generate_s_uv_masks(s_sk_s)
+        server._SSAServer__generate_b_masks(b_s)
+        return (await server._SSAServer__do_decrypt()).vector
+    finally:
+        server._SSAServer__shutdown_unmask_pool()
+
+
+async def _measure(func, *args):
+    stall = 0
+    running = True
+
+    async def probe():
+        nonlocal stall
+        while running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - start - 0.001)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if asyncio.iscoroutinefunction(func):
+        result = await func(*args)
+    else:
+        result = func(*args)
+    spent = time.perf_counter() - start
+    await asyncio.sleep(0.002)
+    running = False
+    await probe_task
+    return result, spent, stall
+
+
+async def _run():
+    size = int(FLAGS.size * 1e6)
+    inputs = _inputs()
+    print("pairs: %s, alive: %s, size: %s" % (FLAGS.pairs, FLAGS.alive,
+                                              size))
+    print("%-10s %10s %12s" % ("mode", "time(s)", "max stall(s)"))
+
+    expected, spent, stall = await _measure(_inline, *inputs, size)
+    print("%-10s %10.2f %12.3f" % ("inline", spent, stall))
+    for workers in FLAGS.workers:
+        result, spent, stall = await _measure(_pool, int(workers), *inputs,
+                                              size)
+        assert np.allclose(result, expected)
+        print("%-10s %10.2f %12.3f" % ("pool-%s" % workers, spent, stall))
+
+
+def main(_):
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,85 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the subsampling compression.
+
+Compare the legacy masks generated by np.random.choice on the reseeded global
+random state, decoded by placing values into an array full of np.inf, with
+the sampled indexes generated by a local Philox generator. The peak memory is
+traced by tracemalloc, for example:
+
+    PYTHONPATH=. python benchmarks/subsampling_benchmark.py \
+        --sizes=1,10,25 --sampling_rate=0.1
+"""
+
+import time
+import tracemalloc
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.libs.compression.subsampling import \
+    SubsamplingCompression
+
+FLAGS = flags.FLAGS
+flags.DEFINE_list("sizes", ["1", "10", "25"],
+                  "Element numbers of the layer, unit is million.")
+flags.DEFINE_float("sampling_rate", 0.1, "The sampling rate.")
+
+
+def _legacy_encode(value, sampling_rate, seed):
+    np.random.seed(seed=seed)
+    mask = np.random.choice([0, 1], value.shape,
+                            p=[sampling_rate, 1 - sampling_rate])
+    return np.ma.masked_array(value, mask=mask).compressed()
+
+
+def _legacy_decode(masked_value, sampling_rate, shape, seed):
+    np.random.seed(seed=seed)
+    mask = np.random.choice([np.inf, 0.0], shape,
+                            p=[sampling_rate, 1 - sampling_rate]).flatten()
+    np.place(mask, mask == np.inf, masked_value)
+    return np.reshape(mask, shape)
+
+
+def _measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    spent = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, spent, peak / 1024 / 1024
+
+
+def main(_):
+    rate = FLAGS.sampling_rate
+    compression = SubsamplingCompression(rate)
+    print("%-8s %-8s %10s %10s %14s %14s" % (
+        "size(M)", "engine", "encode(s)", "decode(s)", "encode peak(MB)",
+        "decode peak(MB)"))
+    for size in FLAGS.sizes:
+        value = np.random.rand(int(size) * 10 ** 6).astype(np.float32)
+
+        masked, encode_time, encode_peak = _measure(_legacy_encode, value,
+                                                    rate, 12)
+        decoded, decode_time, decode_peak = _measure(
+            _legacy_decode, masked, rate, value.shape, 12)
+        print("%-8s %-8s %10.3f %10.3f %14.1f %14.1f" % (
+            size, "legacy", encode_time, decode_time, encode_peak,
+            decode_peak))
+        del masked, decoded
+
+        (masked, params), encode_time, encode_peak = _measure(
+            compression.encode, value)
+        decoded, decode_time, decode_peak = _measure(
+            lambda: compression.decode(masked, **params))
+        assert np.count_nonzero(decoded) == masked.size
+        print("%-8s %-8s %10.3f %10.3f %14.1f %14.1f" % (
+            size, "philox", encode_time, decode_time, encode_peak,
+            decode_peak))
+        del masked, decoded
+
+
+if __name__ == "__main__":
+    app.run(main)
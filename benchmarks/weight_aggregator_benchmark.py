@@ -0,0 +1,66 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark the in place accumulation of WeightAggregator.
+
+Compare the time and peak memory of aggregating clients' weights with and
+without the in place accumulator, for example:
+
+    PYTHONPATH=. python benchmarks/weight_aggregator_benchmark.py \
+        --layers=100 --layer_size=100000 --clients=50
+"""
+
+import asyncio
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
+    WeightAggregator
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("layers", 100, "Layer number of the model.")
+flags.DEFINE_integer("layer_size", 100000, "Parameter number of each layer.")
+flags.DEFINE_integer("clients", 50, "Client number of one round.")
+flags.DEFINE_enum("layout", "dict", ["dict", "list"],
+                  "dict is pytorch weights layout, list is tensorflow's.")
+
+
+def _create_weights():
+    layers = [np.random.random(FLAGS.layer_size).astype(np.float32)
+              for _ in range(FLAGS.layers)]
+    if FLAGS.layout == "list":
+        return layers
+    return OrderedDict(("layer_%d" % index, layer)
+                       for index, layer in enumerate(layers))
+
+
+def _run(weights, in_place):
+    aggregator = WeightAggregator(in_place=in_place)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for index in range(FLAGS.clients):
+        aggregator.accumulate({"weights": weights}, weight=index + 1)
+    asyncio.run(aggregator.aggregate())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(_):
+    weights = _create_weights()
+    model_mb = FLAGS.layers * FLAGS.layer_size * 4 / 1024 / 1024
+    print("model: %.2fMB, layout: %s, clients: %d"
+          % (model_mb, FLAGS.layout, FLAGS.clients))
+    for in_place in [False, True]:
+        elapsed, peak = _run(weights, in_place)
+        print("in_place=%-5s time: %.3fs, peak memory: %.2fMB"
+              % (in_place, elapsed, peak / 1024 / 1024))
+
+
+if __name__ == "__main__":
+    app.run(main)
@@ -0,0 +1,106 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Benchmark transferring the delta weights in pickle and in weights format.
+
+The update is encoded, read chunk by chunk as stream_call sends it, written
+into the receive buffer as unpackage_stream receives it, and then decoded.
+Each format runs in its own process to measure its peak RSS growth, for
+example:
+
+    PYTHONPATH=. python benchmarks/weights_format_benchmark.py \
+        --size_mb=1024 --layers=100 --runtime=pytorch
+"""
+
+import multiprocessing
+import pickle
+import resource
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+from absl import app, flags
+
+from neursafe_fl.python.trans import weights_format
+from neursafe_fl.python.trans.grpc_call import CHUNK_SIZE
+
+FLAGS = flags.FLAGS
+flags.DEFINE_integer("size_mb", 1024, "Size of the update, unit is MB.")
+flags.DEFINE_integer("layers", 100, "Layer number of the update.")
+flags.DEFINE_enum("runtime", "pytorch", ["pytorch", "tensorflow"],
+                  "pytorch update is OrderedDict of torch.Tensor, tensorflow "
+                  "update is list of ndarray.")
+
+
+def _create_update(size_mb, layers, runtime):
+    size = (size_mb << 20) // 4 // layers
+    arrays = [np.random.rand(size).astype(np.float32) for _ in range(layers)]
+    if runtime == "tensorflow":
+        return arrays
+
+    import torch  # pylint:disable=import-outside-toplevel
+    return OrderedDict(("layer%d.weight" % index, torch.from_numpy(array))
+                       for index, array in enumerate(arrays))
+
+
+def _transfer(payload):
+    received = BytesIO()
+    payload.seek(0)
+    for chunk in iter(lambda: payload.read(CHUNK_SIZE), b""):
+        received.write(chunk)
+    return received
+
+
+def _run(mode, size_mb, layers, runtime, queue):
+    update = _create_update(size_mb, layers, runtime)
+
+    # the peak rss growth during transferring, without the update itself.
+    rss_start = _peak_rss()
+    start = time.perf_counter()
+    if mode == "pickle":
+        payload = BytesIO(pickle.dumps(update))
+    else:
+        payload = weights_format.encode(update)
+    received = _transfer(payload)
+    del payload
+    encoded = time.perf_counter()
+
+    if mode == "pickle":
+        result = pickle.loads(received.getbuffer())
+    else:
+        result = weights_format.decode(received)
+    decoded = time.perf_counter()
+    assert len(result) == layers
+
+    queue.put((encoded - start, decoded - encoded, _peak_rss() - rss_start))
+
+
+def _peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(_):
+    context = multiprocessing.get_context("spawn")
+    print("update: %dMB, layers: %d, runtime: %s"
+          % (FLAGS.size_mb, FLAGS.layers, FLAGS.runtime))
+    results = {}
+    for mode in ["pickle", "weights_format"]:
+        queue = context.Queue()
+        process = context.Process(target=_run, args=(
+            mode, FLAGS.size_mb, FLAGS.layers, FLAGS.runtime, queue))
+        process.start()
+        results[mode] = queue.get()
+        process.join()
+        print("%-14s  encode and send: %.3fs, decode: %.3fs, peak rss "
+              "growth: %.1fMB" % ((mode,) + results[mode]))
+
+    baseline, result = results["pickle"], results["weights_format"]
+    print("weights format: encode %.2fx faster, decode %.2fx faster, peak "
+          "rss %.2fx less" % (baseline[0] / result[0],
+                              baseline[1] / result[1],
+                              baseline[2] / result[2]))
+
+
+if __name__ == "__main__":
+    app.run(main)
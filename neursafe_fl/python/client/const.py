@@ -26,5 +26,8 @@ WORKSPACE_BUCKET = os.getenv("WORKSPACE_BUCKET")
 
 WORKSPACE = os.getenv("WORKSPACE", "/workspace")
 
+# The maximum number of the static bundles of package cached in workspace
+PACKAGE_CACHE_SIZE = int(os.getenv("PACKAGE_CACHE_SIZE", "8"))
+
 # POSIX Storage
 WORKSPACE_PVC = os.getenv("WORKSPACE_PVC")
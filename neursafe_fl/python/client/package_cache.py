@@ -0,0 +1,124 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Cache the static bundles of the package sent from server.
+"""
+
+import os
+import shutil
+import tempfile
+
+from absl import logging
+
+from neursafe_fl.python.utils.file_io import unzip, bundle_digest, \
+    PACKAGE_CACHE_MISS
+import neursafe_fl.python.client.const as const
+
+
+# The bundle is unzipped to a staging directory first, and renamed to the
+# digest when completed, the staging directories are never evicted.
+_STAGING_PREFIX = '.staging_'
+
+
+class PackageCacheMiss(Exception):
+    """The bundles required by the task are not cached.
+    """
+
+
+class PackageCache:
+    """Cache the static bundles(scripts, prepared files) of the package.
+
+    The server sends a bundle only once, the bundle is unzipped to the cache
+    directory named by its digest, and copied into the workspace of each
+    task which requires it, without unzipping again. The least recently used
+    bundles are deleted when the number of bundles exceeds the capacity,
+    except the bundles pinned by the tasks being created.
+
+    Args:
+        cache_dir: the directory to save the unzipped bundles.
+        capacity: the maximum number of cached bundles.
+    """
+
+    def __init__(self, cache_dir, capacity=const.PACKAGE_CACHE_SIZE):
+        self.__cache_dir = cache_dir
+        self.__capacity = capacity
+        self.__pinned = {}
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def pin(self, digests):
+        """Keep the bundles from being evicted until unpinned, the task
+        pins the bundles it requires until they are copied to its
+        workspace."""
+        for digest in digests:
+            self.__pinned[digest] = self.__pinned.get(digest, 0) + 1
+
+    def unpin(self, digests):
+        """Allow the bundles pinned before to be evicted again."""
+        for digest in digests:
+            self.__pinned[digest] -= 1
+            if not self.__pinned[digest]:
+                del self.__pinned[digest]
+
+    def add(self, files):
+        """Unzip the bundles in files to the cache.
+
+        Args:
+            files: [(file_info, file_like_obj),], the files sent from server.
+        Returns:
+            The files which are not bundles.
+        """
+        others = []
+        for file_info, file_like_obj in files:
+            digest = bundle_digest(file_info.name)
+            if digest is None:
+                others.append((file_info, file_like_obj))
+            elif not os.path.exists(self.__path(digest)):
+                tmp_dir = tempfile.mkdtemp(prefix=_STAGING_PREFIX,
+                                           dir=self.__cache_dir)
+                unzip(file_like_obj, tmp_dir)
+                os.rename(tmp_dir, self.__path(digest))
+                logging.info("Cache bundle %s", digest)
+
+        self.__evict()
+        return others
+
+    def assert_cached(self, digests):
+        """Raise PackageCacheMiss if any bundle is not cached, the server
+        will send the bundles again."""
+        missing = [digest for digest in digests
+                   if not os.path.exists(self.__path(digest))]
+        if missing:
+            raise PackageCacheMiss("%s: %s" % (PACKAGE_CACHE_MISS, missing))
+
+    def link(self, digests, workspace):
+        """Copy the files of the bundles into the task workspace.
+
+        The files are copied rather than hard linked, a task modifying its
+        scripts or prepared files must not corrupt the cached bundle shared
+        with the other tasks."""
+        for digest in digests:
+            bundle_dir = self.__path(digest)
+            for dirpath, _, filenames in os.walk(bundle_dir):
+                target_dir = os.path.join(
+                    workspace, os.path.relpath(dirpath, bundle_dir))
+                os.makedirs(target_dir, exist_ok=True)
+                for filename in filenames:
+                    source = os.path.join(dirpath, filename)
+                    shutil.copy2(source, os.path.join(target_dir, filename))
+            # the modify time is used to evict the least recently used.
+            os.utime(bundle_dir)
+
+    def __path(self, digest):
+        return os.path.join(self.__cache_dir, digest)
+
+    def __evict(self):
+        bundle_dirs = sorted(
+            (os.path.join(self.__cache_dir, name)
+             for name in os.listdir(self.__cache_dir)
+             if not name.startswith(_STAGING_PREFIX)),
+            key=os.path.getmtime, reverse=True)
+        for bundle_dir in bundle_dirs[self.__capacity:]:
+            if os.path.basename(bundle_dir) in self.__pinned:
+                continue
+            shutil.rmtree(bundle_dir, ignore_errors=True)
+            logging.info("Evict cached bundle %s", bundle_dir)
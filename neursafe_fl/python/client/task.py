@@ -150,7 +150,9 @@ class Task:
                 grpc_metadata=self.grpc_metadata,
                 ready_timer_interval=task_timeout,
                 server_aggregate_interval=int(
-                    algorithm_parameters['aggregate_timeout']))
+                    algorithm_parameters['aggregate_timeout']),
+                neighbor_num=int(algorithm_parameters['neighbor_num'])
+                if 'neighbor_num' in algorithm_parameters else None)
             self._ssa_client.initialize()
 
     def __gen_worker_id(self, worker_index):
@@ -10,6 +10,7 @@ import time
 
 from absl import logging
 
+from neursafe_fl.python.client.package_cache import PackageCache
 from neursafe_fl.python.client.task import create_task, TaskType
 from neursafe_fl.python.client.task_dao import create_task_dao
 from neursafe_fl.python.client.validation import ParameterError
@@ -17,6 +18,7 @@ from neursafe_fl.python.resource_manager.rm import ResourceManager
 
 
 _RUNNING_TASK_WORKSPACE_SUFFIX = '_running'
+_PACKAGE_CACHE_DIR = 'package_cache'
 
 
 def is_finished_task_workspace_name(basename):
@@ -48,6 +50,9 @@ class TaskManager:
             self.__client_config["platform"])
         self.__resource_manager.start()
 
+        self.__package_cache = PackageCache(os.path.join(
+            client_config['workspace'], _PACKAGE_CACHE_DIR))
+
     def create(self, task_type, task_info, files, grpc_metadata):
         """Create training or evaluation task and execute them.
 
@@ -61,7 +66,15 @@ class TaskManager:
         self.__assert_task_not_exist(task_type, task_info)
         self.__merge_resource_setting(task_info.spec.resource)
 
-        self.__create(task_type, task_info, files, grpc_metadata)
+        bundles = task_info.spec.bundles
+        self.__package_cache.pin(bundles)
+        try:
+            files = self.__package_cache.add(files)
+            self.__package_cache.assert_cached(bundles)
+
+            self.__create(task_type, task_info, files, grpc_metadata)
+        finally:
+            self.__package_cache.unpin(bundles)
 
     def stop(self, task_type, task_metadata):
         """Stop task.
@@ -115,6 +128,7 @@ class TaskManager:
     def __create(self, task_type, task_info, files, grpc_metadata):
         task_id = self.__gen_task_id(task_type, task_info)
         workspace = self.__create_task_workspace(task_id)
+        self.__package_cache.link(task_info.spec.bundles, workspace)
         logging.info('create task:%s, task path:%s', task_id, workspace)
 
         resource_spec = self.__resource_manager.request(
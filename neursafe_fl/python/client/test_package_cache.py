@@ -0,0 +1,106 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""Package Cache UnitTest."""
+import os
+import shutil
+import tempfile
+import unittest
+
+from neursafe_fl.proto.message_pb2 import File
+from neursafe_fl.python.client.package_cache import PackageCache, \
+    PackageCacheMiss
+from neursafe_fl.python.utils.file_io import zip_files, bundle_file_name
+
+
+class TestPackageCache(unittest.TestCase):
+    """Test class."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = PackageCache(os.path.join(self.root, "cache"),
+                                  capacity=2)
+        script = os.path.join(self.root, "train.py")
+        with open(script, "w") as file:
+            file.write("print('train')")
+        self.bundle = (File(name=bundle_file_name("digest1"), compress=True),
+                       zip_files([("scripts/mnist/train.py", script)]))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_should_link_cached_bundle_into_workspace(self):
+        package = (File(name="package.zip", compress=True), None)
+        others = self.cache.add([package, self.bundle])
+        self.assertEqual(others, [package])
+
+        for index in range(2):
+            workspace = os.path.join(self.root, "task%s" % index)
+            os.mkdir(workspace)
+            self.cache.assert_cached(["digest1"])
+            self.cache.link(["digest1"], workspace)
+            with open(os.path.join(workspace, "scripts", "mnist",
+                                   "train.py")) as file:
+                self.assertEqual(file.read(), "print('train')")
+
+    def test_should_not_modify_cache_when_task_modifies_workspace(self):
+        self.cache.add([self.bundle])
+        workspace = os.path.join(self.root, "task")
+        os.mkdir(workspace)
+        self.cache.link(["digest1"], workspace)
+        with open(os.path.join(workspace, "scripts", "mnist",
+                               "train.py"), "w") as file:
+            file.write("print('modified')")
+
+        with open(os.path.join(self.root, "cache", "digest1", "scripts",
+                               "mnist", "train.py")) as file:
+            self.assertEqual(file.read(), "print('train')")
+
+    def test_should_raise_cache_miss_when_bundle_not_cached(self):
+        with self.assertRaises(PackageCacheMiss):
+            self.cache.assert_cached(["digest1"])
+
+    def test_should_evict_least_recently_used_bundle(self):
+        for digest in ["digest1", "digest2", "digest3"]:
+            self.bundle[0].name = bundle_file_name(digest)
+            self.cache.add([self.bundle])
+            # make the modify time of bundles different.
+            os.utime(os.path.join(self.root, "cache", digest),
+                     (0, {"digest1": 1, "digest2": 2, "digest3": 3}[digest]))
+
+        self.cache.add([])
+        self.cache.assert_cached(["digest2", "digest3"])
+        with self.assertRaises(PackageCacheMiss):
+            self.cache.assert_cached(["digest1"])
+
+    def test_should_not_evict_pinned_bundle(self):
+        self.cache.pin(["digest1"])
+        for digest in ["digest1", "digest2", "digest3"]:
+            self.bundle[0].name = bundle_file_name(digest)
+            self.cache.add([self.bundle])
+            os.utime(os.path.join(self.root, "cache", digest),
+                     (0, {"digest1": 1, "digest2": 2, "digest3": 3}[digest]))
+
+        self.cache.add([])
+        self.cache.assert_cached(["digest1", "digest2", "digest3"])
+
+        self.cache.unpin(["digest1"])
+        self.cache.add([])
+        with self.assertRaises(PackageCacheMiss):
+            self.cache.assert_cached(["digest1"])
+
+    def test_should_not_evict_staging_bundle(self):
+        staging_dir = tempfile.mkdtemp(prefix=".staging_",
+                                       dir=os.path.join(self.root, "cache"))
+        os.utime(staging_dir, (0, 0))
+        for digest in ["digest1", "digest2"]:
+            self.bundle[0].name = bundle_file_name(digest)
+            self.cache.add([self.bundle])
+
+        self.assertTrue(os.path.exists(staging_dir))
+        self.cache.assert_cached(["digest1", "digest2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,7 @@ _INIT_WEIGHTS_FILE_NAME = 'init_weights'
 _TRAINED_MODEL_FILE_NAME = 'trained_model'
 _TRAINED_WEIGHTS_FILE_NAME = 'trained_weights'
 _DELTA_WEIGHT_FILE_NAME = 'delta_weights'
+_RESIDUAL_DIR_NAME = 'residual'
 
 _SUFFIX_MAP = {
     'tensorflow': '.h5',
@@ -77,6 +78,25 @@ def get_trained_model_file_name(runtime, workspace):
                         _TRAINED_MODEL_FILE_NAME + _SUFFIX_MAP[runtime])
 
 
+def get_residual_file_name(workspace, job_name):
+    """Get the compression residual file name of job.
+
+    Different from the other files, the residual is kept across rounds, it is
+    saved in the client workspace which contains the task workspaces, shared
+    by the tasks of the job.
+
+    Args:
+        workspace: Task's workspace.
+        job_name: The job's name.
+
+    Return:
+        The residual file path.
+    """
+    client_workspace = os.path.dirname(os.path.normpath(workspace))
+    return os.path.join(client_workspace, _RESIDUAL_DIR_NAME,
+                        job_name + '.npy')
+
+
 def load_init_weights(model, runtime, workspace):
     """Load init weights into model and cache init weights.
 
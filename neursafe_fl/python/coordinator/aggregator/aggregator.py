@@ -6,6 +6,8 @@
 
 import abc
 
+DEFAULT_AGGREGATOR = "weight_aggregator"
+
 
 class Aggregator:
     """Base Aggregator Class
@@ -21,6 +23,12 @@ class Aggregator:
     this class and implement two abstract functions below.
     """
 
+    @property
+    def support_sparse(self):
+        """Whether the weights to accumulate could have sparse layers(SPARSE),
+        decoded from the compressed weights without densifying."""
+        return False
+
     @abc.abstractmethod
     def accumulate(self, data, weight=None):
         """Accumulate data, such as metrics, weights."""
@@ -44,8 +52,24 @@ def aggregator_factory(aggregator_name):
 
     Finally, config the name 'average_aggregator' in the config file.
     """
-    import_path = 'fl.python.coordinator.aggregator.%s' % aggregator_name
+    import_path = 'neursafe_fl.python.coordinator.aggregator.%s' \
+        % aggregator_name
     words = [word.capitalize() for word in aggregator_name.split("_")]
     class_name = "".join(words)
     aggregator = __import__(import_path, fromlist=True)
     return getattr(aggregator, class_name)
+
+
+def create_aggregator(config=None, **kwargs):
+    """Create aggregator according to the aggregator config.
+
+    Args:
+        config: the aggregator config, a dict has 'name' and 'params', the
+                params are passed to the aggregator. If not set, create the
+                default aggregator.
+        kwargs: the other arguments of the aggregator, such as ssa_server.
+    """
+    config = config or {}
+    aggregator_class = aggregator_factory(config.get("name",
+                                                     DEFAULT_AGGREGATOR))
+    return aggregator_class(**kwargs, **config.get("params", {}))
@@ -0,0 +1,235 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Weight mean aggregator, accumulate weights by multiple processes."""
+
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
+    WeightAggregator
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+DEFAULT_SLOT_NUM = 2
+SHARD_ALIGNMENT = 64
+
+# The shared buffers attached in worker process.
+_WORKER_BUFFERS = {}
+
+
+def _attach_buffers(names, size, dtype):
+    """Initializer of worker process, attach the shared buffers."""
+    memories = [shared_memory.SharedMemory(name=name) for name in names]
+    arrays = [np.ndarray((size,), dtype=dtype, buffer=memory.buf)
+              for memory in memories]
+    _WORKER_BUFFERS.update({"memories": memories,
+                            "accumulated": arrays[0],
+                            "slots": arrays[1:],
+                            "scratch": None})
+
+
+def _reduce_shard(slot, start, end, weight):
+    """Fold slot[start:end] * weight into the accumulated shard."""
+    accumulated = _WORKER_BUFFERS["accumulated"][start:end]
+    value = _WORKER_BUFFERS["slots"][slot][start:end]
+    if weight == 1:
+        np.add(accumulated, value, out=accumulated)
+        return
+
+    scratch = _WORKER_BUFFERS["scratch"]
+    if scratch is None or scratch.size < end - start:
+        scratch = np.empty(end - start, dtype=accumulated.dtype)
+        _WORKER_BUFFERS["scratch"] = scratch
+    np.multiply(value, weight, out=scratch[:end - start])
+    np.add(accumulated, scratch[:end - start], out=accumulated)
+
+
+def _divide_shard(start, end, total_weight):
+    """Divide the accumulated shard by total weight."""
+    accumulated = _WORKER_BUFFERS["accumulated"][start:end]
+    np.true_divide(accumulated, total_weight, out=accumulated)
+
+
+def _release(memories):
+    for memory in memories:
+        memory.unlink()
+        try:
+            memory.close()
+        except BufferError:
+            # still viewed by arrays, closed when they are released.
+            pass
+
+
+class _SharedBuffers:  # pylint: disable=too-few-public-methods
+    """The accumulated vector and the input slots in shared memory, the
+    memory is released by release or when the object is collected."""
+
+    def __init__(self, size, dtype, slot_num):
+        memories = [shared_memory.SharedMemory(
+            create=True, size=max(size * dtype.itemsize, 1))
+            for _ in range(1 + slot_num)]
+        self.__finalizer = weakref.finalize(self, _release, memories)
+        self.names = [memory.name for memory in memories]
+
+        arrays = [np.ndarray((size,), dtype=dtype, buffer=memory.buf)
+                  for memory in memories]
+        self.accumulated, self.slots = arrays[0], arrays[1:]
+        self.accumulated.fill(0)
+
+    def release(self):
+        """Release the shared memory."""
+        self.__finalizer()
+
+
+def _split_shards(size, shard_num):
+    bounds = np.linspace(0, size, shard_num + 1).astype(np.int64)
+    bounds[1:-1] = bounds[1:-1] // SHARD_ALIGNMENT * SHARD_ALIGNMENT
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1],
+                                                         bounds[1:])
+            if end > start]
+
+
+class ParallelWeightsAccumulator:
+    """Accumulate weighted weights by multiple processes in shared memory.
+
+    The parameters of all the layers are flattened into one vector, which is
+    split into shards, one worker process reduces one shard. The accumulated
+    vector and the input slots of updates are in shared memory, an update is
+    copied into a free slot, then all the workers fold their shards of the
+    slot into the accumulated vector in parallel. With more than one slot,
+    copying the next update overlaps the reducing of the previous one.
+
+    The updates of one shard are reduced one by one in its own process, so
+    the shards need no lock.
+
+    Args:
+        workers: the number of worker processes, default is cpu count.
+        slot_num: the number of input slots.
+    """
+
+    def __init__(self, workers=None, slot_num=DEFAULT_SLOT_NUM):
+        self.__workers = workers or os.cpu_count()
+        self.__slot_num = slot_num
+
+        self.__table = None
+        self.__buffers = None
+        self.__slot_futures = []
+        self.__next_slot = 0
+        # (pool, start, end), one worker process per shard.
+        self.__shards = []
+
+    @property
+    def buffers(self):
+        """The accumulated(not averaged) vector."""
+        if self.__buffers is None:
+            return None
+        return self.__buffers.accumulated
+
+    @property
+    def peak_nbytes(self):
+        """The shared memory used by the accumulator, unit is byte."""
+        if self.__buffers is None:
+            return 0
+        return self.__buffers.accumulated.nbytes * (1 + self.__slot_num)
+
+    def add(self, weights, weight=1):
+        """Fold weights * weight into the accumulated vector.
+
+        Args:
+            weights: model weights, list, OrderedDict or FlatWeights format.
+            weight: the weight value of this weights.
+        """
+        if self.__table is None:
+            self.__initialize(weights)
+
+        slot = self.__next_slot
+        self.__next_slot = (slot + 1) % self.__slot_num
+        wait(self.__slot_futures[slot])
+
+        self.__copy_into(weights, self.__buffers.slots[slot])
+        self.__slot_futures[slot] = [
+            pool.submit(_reduce_shard, slot, start, end, weight)
+            for pool, start, end in self.__shards]
+
+    def mean(self, total_weight):
+        """Divide the accumulated vector by total weight.
+
+        The shared memory and worker processes are released after this call.
+
+        Returns:
+            The weighted mean of weights, FlatWeights format.
+        """
+        try:
+            for futures in self.__slot_futures:
+                self.__wait_done(futures)
+            self.__wait_done([
+                pool.submit(_divide_shard, start, end, total_weight)
+                for pool, start, end in self.__shards])
+            return FlatWeights(self.__buffers.accumulated.copy(),
+                               self.__table)
+        finally:
+            self.close()
+
+    def close(self):
+        """Shutdown the worker processes and release the shared memory."""
+        for pool, _, _ in self.__shards:
+            pool.shutdown()
+        self.__shards = []
+        if self.__buffers is not None:
+            self.__buffers.release()
+            self.__buffers = None
+
+    def __initialize(self, weights):
+        flat_weights = weights if isinstance(weights, FlatWeights) \
+            else FlatWeights.flatten(weights)
+        self.__table = flat_weights.table
+        size, dtype = flat_weights.vector.size, flat_weights.vector.dtype
+
+        self.__buffers = _SharedBuffers(size, dtype, self.__slot_num)
+        self.__slot_futures = [[] for _ in range(self.__slot_num)]
+
+        initargs = (self.__buffers.names, size, dtype)
+        self.__shards = [(ProcessPoolExecutor(1, initializer=_attach_buffers,
+                                              initargs=initargs), start, end)
+                         for start, end in _split_shards(size,
+                                                         self.__workers)]
+
+    def __copy_into(self, weights, slot):
+        if isinstance(weights, FlatWeights):
+            if weights.table != self.__table:
+                raise ValueError("FlatWeights layers not match the "
+                                 "accumulated layers.")
+            np.copyto(slot, weights.vector, casting="same_kind")
+            return
+
+        flat_weights = FlatWeights.flatten(weights, out=slot)
+        if flat_weights.table != self.__table:
+            raise ValueError("Weights layers not match the accumulated "
+                             "layers.")
+
+    @staticmethod
+    def __wait_done(futures):
+        for future in futures:
+            future.result()
+
+
+class ParallelWeightAggregator(WeightAggregator):
+    """Weight Aggregator accumulate weights by multiple processes.
+
+    Same as WeightAggregator, except the weights are split into shards and
+    accumulated by one worker process per shard, for the big models whose
+    aggregation is bound by one cpu core. The aggregated weights are
+    FlatWeights format.
+
+    Args:
+        ssa_server: secure aggregate server, if set, the weights are
+                    ciphertext and accumulated by the ssa server.
+        workers: the number of worker processes, default is cpu count.
+    """
+    def __init__(self, ssa_server=None, workers=None):
+        super().__init__(ssa_server,
+                         accumulator=ParallelWeightsAccumulator(workers))
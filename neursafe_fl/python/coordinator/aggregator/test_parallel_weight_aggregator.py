@@ -0,0 +1,86 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring, protected-access
+"""Parallel Weight Aggregator UnitTest."""
+import asyncio
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+
+from neursafe_fl.python.coordinator.aggregator.aggregator import \
+    create_aggregator
+from neursafe_fl.python.coordinator.aggregator.parallel_weight_aggregator \
+    import ParallelWeightAggregator, ParallelWeightsAccumulator, _split_shards
+from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
+    WeightAggregator
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+
+def fake_weights(index):
+    return OrderedDict([("conv", np.full((20, 30), index, dtype=np.float32)),
+                        ("bias", np.arange(300, dtype=np.float32) * index)])
+
+
+class TestParallelWeightAggregator(unittest.TestCase):
+    """Test class."""
+
+    def test_should_split_shards_cover_all_parameters(self):
+        shards = _split_shards(1000, 3)
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], 1000)
+        for (_, end), (start, _) in zip(shards[:-1], shards[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(end % 64, 0)
+
+        self.assertEqual(_split_shards(10, 4), [(0, 10)])
+
+    def test_should_aggregate_equal_weight_aggregator(self):
+        aggregator = ParallelWeightAggregator(workers=3)
+        expected_aggregator = WeightAggregator()
+        for index in range(1, 6):
+            aggregator.accumulate({"weights": fake_weights(index),
+                                   "metrics": {"loss": index}}, weight=index)
+            expected_aggregator.accumulate({"weights": fake_weights(index)},
+                                           weight=index)
+
+        result = asyncio.run(aggregator.aggregate())
+        expected = asyncio.run(expected_aggregator.aggregate())["weights"]
+
+        self.assertAlmostEqual(result["metrics"]["loss"], 55 / 15)
+        weights = result["weights"]
+        self.assertIsInstance(weights, FlatWeights)
+        for name, value in weights.unflatten().items():
+            self.assertTrue(np.allclose(value, expected[name]))
+
+    def test_should_aggregate_flat_weights_success(self):
+        accumulator = ParallelWeightsAccumulator(workers=2)
+        for index in range(1, 4):
+            accumulator.add(FlatWeights.flatten(fake_weights(index)), index)
+        self.assertEqual(accumulator.peak_nbytes, 900 * 4 * 3)
+
+        result = accumulator.mean(6)
+        self.assertTrue(np.allclose(result.unflatten()["conv"], 14 / 6))
+        self.assertIsNone(accumulator.buffers)
+
+    def test_should_raise_exception_when_layers_not_match(self):
+        accumulator = ParallelWeightsAccumulator(workers=2)
+        accumulator.add(fake_weights(1))
+        with self.assertRaises(ValueError):
+            accumulator.add(FlatWeights.flatten([np.ones(900)]))
+        accumulator.close()
+
+    def test_should_create_aggregator_by_config(self):
+        aggregator = create_aggregator()
+        self.assertIsInstance(aggregator, WeightAggregator)
+        self.assertNotIsInstance(aggregator, ParallelWeightAggregator)
+
+        aggregator = create_aggregator(
+            {"name": "parallel_weight_aggregator", "params": {"workers": 2}},
+            ssa_server=None)
+        self.assertIsInstance(aggregator, ParallelWeightAggregator)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,10 +5,19 @@
 """Weight Aggregator UnitTest."""
 import asyncio
 import unittest
+from collections import OrderedDict
+
 import numpy as np
 
 from neursafe_fl.python.coordinator.aggregator.weight_aggregator import WeightAggregator
 from neursafe_fl.python.coordinator.errors import AggregationFailedError
+from neursafe_fl.python.libs.compression.selective_masking import \
+    SelectiveMasking
+from neursafe_fl.python.libs.compression.subsampling import \
+    SubsamplingCompression
+from neursafe_fl.python.runtime.weights import FlatWeights, SPARSE
+from neursafe_fl.python.runtime.tensorflow.weights import \
+    TensorflowWeightsConverter
 
 
 def fake_weights():
@@ -97,6 +106,98 @@ class TestWeightAggregator(unittest.TestCase):
         res = self.aggregator.aggregate()
         self.assertIsNotNone(res)
 
+    def test_should_in_place_aggregate_equal_legacy_when_dict_weights(self):
+        legacy = WeightAggregator(in_place=False)
+        for index in range(1, 4):
+            weights = OrderedDict(
+                [("conv", np.full((2, 3), index, dtype=np.float32)),
+                 ("bias", np.arange(3, dtype=np.float32) * index)])
+            self.aggregator.accumulate({"weights": weights}, weight=index)
+            legacy.accumulate({"weights": weights}, weight=index)
+
+        res = asyncio.run(self.aggregator.aggregate())["weights"]
+        expected = asyncio.run(legacy.aggregate())["weights"]
+        self.assertEqual(list(res.keys()), ["conv", "bias"])
+        for name, value in expected.items():
+            self.assertEqual(res[name].dtype, np.float32)
+            self.assertTrue(np.allclose(res[name], value))
+
+    def test_should_in_place_aggregate_success_when_list_weights_ragged(self):
+        for index in range(1, 3):
+            weights = [np.full((2, 2), index, dtype=np.float32),
+                       np.full((3,), index, dtype=np.int64)]
+            self.aggregator.accumulate({"weights": weights}, weight=index)
+
+        accumulator = self.aggregator._WeightAggregator__accumulator
+        # one buffer and one scratch for each of float32 and float64 layers.
+        self.assertEqual(accumulator.peak_nbytes, 2 * (2 * 2 * 4 + 3 * 8))
+
+        res = asyncio.run(self.aggregator.aggregate())["weights"]
+        self.assertTrue(np.allclose(res[0], np.full((2, 2), 5 / 3)))
+        self.assertEqual(res[1].dtype, np.float64)
+        self.assertTrue(np.allclose(res[1], np.full((3,), 5 / 3)))
+
+    def test_should_aggregate_flat_weights_success(self):
+        legacy = WeightAggregator(in_place=False)
+        for index in range(1, 4):
+            weights = FlatWeights.flatten(OrderedDict(
+                [("conv", np.full((2, 3), index, dtype=np.float32)),
+                 ("bias", np.arange(3, dtype=np.float32) * index)]))
+            self.aggregator.accumulate({"weights": weights}, weight=index)
+            legacy.accumulate({"weights": weights}, weight=index)
+
+        res = asyncio.run(self.aggregator.aggregate())["weights"]
+        expected = asyncio.run(legacy.aggregate())["weights"]
+        self.assertIsInstance(res, FlatWeights)
+        self.assertTrue(res.same_layout(expected))
+        self.assertTrue(np.allclose(res.vector, expected.vector))
+        self.assertTrue(np.allclose(res.unflatten()["conv"],
+                                    np.full((2, 3), 14 / 6)))
+
+    def test_should_sparse_aggregate_equal_dense_when_compressed(self):
+        self.assertTrue(self.aggregator.support_sparse)
+        self.assertFalse(WeightAggregator(in_place=False).support_sparse)
+
+        converter = TensorflowWeightsConverter()
+        dense = WeightAggregator()
+        for compression in [SelectiveMasking(0.2),
+                            SubsamplingCompression(0.3)]:
+            for index in range(1, 4):
+                weights = [np.random.rand(4, 5).astype(np.float32),
+                           np.random.rand(7).astype(np.float32)]
+                encoded = converter.encode(weights, compression)
+                sparse = converter.decode_sparse(encoded, compression)
+                self.assertIsInstance(sparse[0], SPARSE)
+                self.assertEqual(sparse[0].shape, (4, 5))
+
+                self.aggregator.accumulate({"weights": sparse}, weight=index)
+                dense.accumulate({"weights": converter.decode(
+                    encoded, compression)}, weight=index)
+
+        res = asyncio.run(self.aggregator.aggregate())["weights"]
+        expected = asyncio.run(dense.aggregate())["weights"]
+        for layer, expected_layer in zip(res, expected):
+            self.assertEqual(layer.dtype, np.float32)
+            self.assertTrue(np.allclose(layer, expected_layer))
+
+    def test_should_sparse_aggregate_flat_weights_success(self):
+        converter = TensorflowWeightsConverter()
+        weights = FlatWeights.flatten([np.arange(1, 7, dtype=np.float32)])
+        encoded = converter.encode(weights, SelectiveMasking(0.5))
+        sparse = converter.decode_sparse(encoded, SelectiveMasking(0.5))
+        self.assertEqual(sparse.vector.shape, (6,))
+
+        self.aggregator.accumulate({"weights": sparse}, weight=2)
+        self.aggregator.accumulate({"weights": weights}, weight=2)
+        res = asyncio.run(self.aggregator.aggregate())["weights"]
+        self.assertTrue(res.same_layout(weights))
+        self.assertEqual(res.vector.tolist(), [0.5, 1, 1.5, 4, 5, 6])
+
+    def test_should_in_place_accumulate_failed_when_layer_shape_changed(self):
+        self.aggregator.accumulate({"weights": [np.ones((2, 2))]}, weight=1)
+        with self.assertRaises(ValueError):
+            self.aggregator.accumulate({"weights": [np.ones((3,))]}, weight=1)
+
     def test_should_aggregator_aggregate_failed_when_no_accumulated_data(self):
         with self.assertRaises(AggregationFailedError):
             asyncio.run(self.aggregator.aggregate())
@@ -6,9 +6,13 @@
 from collections import OrderedDict
 
 import numpy as np
+from absl import logging
 
 from neursafe_fl.python.coordinator.aggregator.aggregator import Aggregator
+from neursafe_fl.python.coordinator.aggregator.weights_accumulator import \
+    WeightsAccumulator
 from neursafe_fl.python.coordinator.errors import AggregationFailedError
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 
 class WeightAggregator(Aggregator):
@@ -16,12 +20,31 @@ class WeightAggregator(Aggregator):
 
     Explanation:
         c = val1 * weight1 + val2 * weight2 / (weight1 + weight2)
+
+    Args:
+        ssa_server: secure aggregate server, if set, the weights are
+                    ciphertext and accumulated by the ssa server.
+        in_place: if True, weights are accumulated into buffers preallocated
+                  for each layer, otherwise each accumulation creates new
+                  arrays.
+        accumulator: accumulate the weights in place, default is
+                     WeightsAccumulator.
     """
-    def __init__(self, ssa_server=None):
+    def __init__(self, ssa_server=None, in_place=True, accumulator=None):
         self.__total_values = {}
         self.__total_weight = 0
         self.__count = 0
         self.__ssa_server = ssa_server
+        if in_place and not accumulator:
+            accumulator = WeightsAccumulator()
+        self.__accumulator = accumulator
+
+    @property
+    def support_sparse(self):
+        """The sparse layers are scattered into the buffers of
+        WeightsAccumulator, not supported by the others."""
+        return not self.__ssa_server \
+            and isinstance(self.__accumulator, WeightsAccumulator)
 
     def accumulate(self, data, weight=None):
         """Accumulate the metrics and weights.
@@ -49,7 +72,7 @@ class WeightAggregator(Aggregator):
                     self.__ssa_server.ciphertext_accumulate(
                         data["weights"], data["client_id"])
             else:
-                model_weights = data.get("weights")  # dict or list format
+                model_weights = data.get("weights")  # dict, list or FlatWeights
                 self.__add_weights(model_weights, weight)
 
         self.__total_weight += weight
@@ -68,8 +91,18 @@ class WeightAggregator(Aggregator):
         self.__total_values["metrics"] = accumulated
 
     def __add_weights(self, model_weights, weight):
+        if self.__accumulator:
+            self.__accumulator.add(model_weights, weight)
+            self.__total_values["weights"] = self.__accumulator.buffers
+            return
+
         accumulated = self.__total_values.get("weights", 0)
-        if isinstance(model_weights, list):
+        if isinstance(model_weights, FlatWeights):
+            vector = np.multiply(model_weights.vector, weight)
+            if isinstance(accumulated, FlatWeights):
+                vector = np.add(accumulated.vector, vector)
+            accumulated = model_weights.like(vector)
+        elif isinstance(model_weights, list):
             accumulated = np.add(accumulated,
                                  np.multiply(model_weights, weight))
         else:
@@ -104,7 +137,15 @@ class WeightAggregator(Aggregator):
         return mean
 
     def __aggregate_weights(self):
+        if self.__accumulator and not self.__ssa_server:
+            logging.info("Weights accumulator peak memory: %.2fMB",
+                         self.__accumulator.peak_nbytes / 1024 / 1024)
+            return self.__accumulator.mean(self.__total_weight)
+
         accumulated_weights = self.__total_values["weights"]
+        if isinstance(accumulated_weights, FlatWeights):
+            return accumulated_weights.like(np.true_divide(
+                accumulated_weights.vector, self.__total_weight))
         if isinstance(accumulated_weights, dict):
             mean = OrderedDict()
             for name, delta_w in accumulated_weights.items():
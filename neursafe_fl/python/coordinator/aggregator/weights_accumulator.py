@@ -0,0 +1,192 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Streaming accumulator of weighted model weights."""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from neursafe_fl.python.runtime.weights import FlatWeights, SPARSE
+
+
+def _buffer_dtype(dtype):
+    """Accumulate floating layers in their own precision(at least float32),
+    the others, such as integer counters, in float64."""
+    if np.issubdtype(dtype, np.floating):
+        return np.promote_types(dtype, np.float32)
+    return np.dtype(np.float64)
+
+
+class WeightsAccumulator:
+    """Accumulate weighted weights into preallocated buffers in place.
+
+    The first time a layer is seen, one buffer with the layer's shape is
+    allocated for it, every later update of the layer is folded into this
+    buffer in place. The products of update and weight are written into a
+    scratch buffer which is shared by all the layers, so accumulating one
+    update allocates no new full-size array.
+
+    Both weights layout are supported:
+        list: tensorflow weights, layer is identified by index.
+        OrderedDict: pytorch weights, layer is identified by name.
+    FlatWeights is accumulated as one layer, the vector.
+
+    A layer may be SPARSE, decoded from the compressed weights, its values are
+    scattered into the buffer at its indices, so the cost is proportional to
+    the number of transmitted values instead of the size of layer.
+
+    Attributes:
+        __buffers: the accumulated value of each layer, same layout as the
+                   accumulated weights.
+        __wrappers: recover the layer's original type(such as torch.Tensor)
+                    from the accumulated ndarray.
+        __scratch: scratch buffers for weighted updates, one for each dtype.
+    """
+
+    def __init__(self):
+        self.__buffers = None
+        self.__wrappers = {}
+        self.__scratch = {}
+        self.__peak_nbytes = 0
+        self.__flat_weights = None
+
+    @property
+    def buffers(self):
+        """The accumulated(not averaged) value of each layer."""
+        return self.__buffers
+
+    @property
+    def peak_nbytes(self):
+        """The peak memory used by the accumulator, unit is byte."""
+        return self.__peak_nbytes
+
+    def add(self, weights, weight=1):
+        """Fold weights * weight into the accumulated buffers.
+
+        Args:
+            weights: model weights, list, OrderedDict or FlatWeights format.
+            weight: the weight value of this weights.
+        """
+        if isinstance(weights, FlatWeights):
+            weights = self.__check_flat_weights(weights)
+
+        if self.__buffers is None:
+            self.__buffers = [] if isinstance(weights, list) else OrderedDict()
+
+        items = enumerate(weights) if isinstance(weights, list) \
+            else weights.items()
+        for key, value in items:
+            self.__fold(key, value, weight)
+
+        self.__peak_nbytes = max(self.__peak_nbytes, self.__nbytes())
+
+    def mean(self, total_weight):
+        """Divide the accumulated buffers by total weight in place.
+
+        The accumulator is exhausted after this call.
+
+        Returns:
+            The weighted mean of weights, with the same layout and layer types
+            as the accumulated weights.
+        """
+        items = enumerate(self.__buffers) if isinstance(self.__buffers, list) \
+            else self.__buffers.items()
+        mean = [] if isinstance(self.__buffers, list) else OrderedDict()
+        for key, buffer in items:
+            np.true_divide(buffer, total_weight, out=buffer)
+            value = self.__wrap(key, buffer)
+            if isinstance(mean, list):
+                mean.append(value)
+            else:
+                mean[key] = value
+
+        self.__scratch = {}
+        if self.__flat_weights:
+            return self.__flat_weights.like(mean[0])
+        return mean
+
+    def __check_flat_weights(self, weights):
+        if self.__flat_weights is None:
+            self.__flat_weights = weights
+        elif not self.__flat_weights.same_layout(weights):
+            raise ValueError("FlatWeights layers not match the accumulated "
+                             "layers.")
+        return [weights.vector]
+
+    def __fold(self, key, value, weight):
+        if isinstance(value, SPARSE):
+            self.__fold_sparse(key, value, weight)
+            return
+
+        array = np.asarray(value)
+        buffer = self.__get_buffer(key, value, array.shape, array.dtype)
+
+        if weight == 1:
+            np.add(buffer, array, out=buffer)
+            return
+
+        scratch = self.__get_scratch(array.size, buffer.dtype)
+        scratch = scratch.reshape(array.shape)
+        np.multiply(array, weight, out=scratch)
+        np.add(buffer, scratch, out=buffer)
+
+    def __fold_sparse(self, key, value, weight):
+        values = np.asarray(value.values)
+        shape = tuple(value.shape)
+        buffer = self.__get_buffer(key, value.values, shape, values.dtype)
+        if values.shape != np.shape(value.indices):
+            raise ValueError("Layer %s has %s indices but %s values."
+                             % (key, np.shape(value.indices), values.shape))
+
+        if weight != 1:
+            scratch = self.__get_scratch(values.size, buffer.dtype)
+            values = np.multiply(values, weight, out=scratch)
+
+        # the indices are unique, same as np.add.at but much faster.
+        buffer.reshape(-1)[value.indices] += values
+
+    def __get_buffer(self, key, value, shape, dtype):
+        if isinstance(self.__buffers, list):
+            if key < len(self.__buffers):
+                buffer = self.__buffers[key]
+            else:
+                buffer = self.__create_buffer(key, value, shape, dtype)
+                self.__buffers.append(buffer)
+        else:
+            buffer = self.__buffers.get(key)
+            if buffer is None:
+                buffer = self.__create_buffer(key, value, shape, dtype)
+                self.__buffers[key] = buffer
+
+        if buffer.shape != shape:
+            raise ValueError("Layer %s shape %s not match the accumulated "
+                             "shape %s." % (key, shape, buffer.shape))
+        return buffer
+
+    def __create_buffer(self, key, value, shape, dtype):
+        if not isinstance(value, np.ndarray) and hasattr(value,
+                                                         "__array_wrap__"):
+            # such as torch.Tensor, recover the type after aggregated.
+            self.__wrappers[key] = value.__array_wrap__
+        return np.zeros(shape, dtype=_buffer_dtype(dtype))
+
+    def __get_scratch(self, size, dtype):
+        scratch = self.__scratch.get(dtype)
+        if scratch is None or scratch.size < size:
+            scratch = np.empty(size, dtype=dtype)
+            self.__scratch[dtype] = scratch
+        return scratch[:size]
+
+    def __wrap(self, key, buffer):
+        wrapper = self.__wrappers.get(key)
+        if wrapper:
+            return wrapper(buffer)
+        return buffer
+
+    def __nbytes(self):
+        values = self.__buffers if isinstance(self.__buffers, list) \
+            else self.__buffers.values()
+        nbytes = sum(buffer.nbytes for buffer in values)
+        return nbytes + sum(scratch.nbytes
+                            for scratch in self.__scratch.values())
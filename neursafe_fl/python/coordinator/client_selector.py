@@ -44,6 +44,8 @@ class ClientSelector:
                                  some strategy by sorted. Default is False.
                 "conditions": the condition that the client must meet. such as
                               runtime, os etc.
+                "exclude": optional, the clients should not be selected, such
+                           as the clients still training.
             }
 
         Args:
@@ -70,17 +72,33 @@ class ClientSelector:
 
         if result.state == "success":
             logging.debug("Selector return clients %s", result.client_list)
-            return self.__parse_ips(result.client_list)
+            return self.__exclude(self.__parse_ips(result.client_list),
+                                  demands)
         raise DeviceNotEnoughError(result.reason)
 
+    def __exclude(self, clients, demands):
+        """Remove the excluded clients from the selected clients."""
+        exclude = demands.get("exclude")
+        if not exclude:
+            return clients
+
+        clients = [client for client in clients if client not in exclude]
+        if len(clients) < demands["client_num"]:
+            raise DeviceNotEnoughError("Left clients: %s not enough client for "
+                                       "requirement: %s."
+                                       % (len(clients), demands["client_num"]))
+        return clients[:demands["client_num"]]
+
     def __construct_message(self, demands):
         task_info = Metadata(job_name=self.__config["job_name"])
         conditions = {"runtime": self.__config["runtime"]}
         if self.__config.get("datasets"):
             conditions["data"] = self.__config["datasets"]
 
+        # the selector does not know the excluded clients, require more.
+        number = demands["client_num"] + len(demands.get("exclude", []))
         return ClientRequirement(task=task_info,
-                                 number=demands["client_num"],
+                                 number=number,
                                  random_client=self.__config.get(
                                      "random_client", False),
                                  untrained_first=self.__config.get(
@@ -106,12 +124,14 @@ class ClientSelector:
             return self.__clients
 
         client_num = demands["client_num"]
-        if len(self.__clients) < client_num:
+        clients = [client for client in self.__clients
+                   if client not in demands.get("exclude", [])]
+        if len(clients) < client_num:
             raise DeviceNotEnoughError("Left clients: %s not enough client for "
                                        "requirement: %s."
-                                       % (len(self.__clients), client_num))
+                                       % (len(clients), client_num))
         # random pick client from all clients
-        return random.sample(self.__clients, client_num)
+        return random.sample(clients, client_num)
 
     async def release(self):
         """Release the clients of current task.
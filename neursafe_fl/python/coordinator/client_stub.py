@@ -12,7 +12,7 @@ from neursafe_fl.python.coordinator.errors import RemoteCallFailedError
 from neursafe_fl.python.trans.grpc_call import stream_call, unary_call
 
 
-async def train(client, job_id, task, file, ssl=None):
+async def train(client, job_id, task, files, ssl=None):
     """Client gRPC Service: Train function.
 
     Call the the remote train function provided by the device.
@@ -20,8 +20,11 @@ async def train(client, job_id, task, file, ssl=None):
     Args:
         client: the service address provided by device
         job_id: the id of job
-        task: task which will broadcat to client
-        file: file which will broadcat to client
+        task: task which will broadcat to client, or SerializedMessages of
+              the task and its file, serialized once for all the clients.
+        files: list of the files which will broadcat to client, the file
+               of task if the task is not SerializedMessages, and the static
+               bundle files not cached by client.
         ssl: grpcs's ssl.
     Raises:
         RemoteCallFailedError, when call function failed.
@@ -31,7 +34,7 @@ async def train(client, job_id, task, file, ssl=None):
 
     try:
         await stream_call(TrainServiceStub, "Train", Task, client, config=task,
-                          file_like_objs=[file],
+                          file_like_objs=files,
                           certificate_path=ssl, metadata=grpc_metadata)
     except Exception as err:
         logging.exception(str(err))
@@ -39,7 +42,7 @@ async def train(client, job_id, task, file, ssl=None):
                                     (client, str(err))) from err
 
 
-async def evaluate(client, job_id, task, file, ssl=None):
+async def evaluate(client, job_id, task, files, ssl=None):
     """Client Grpc Service: Evaluate function
     """
     grpc_metadata = {"module-id": str(job_id),
@@ -47,7 +50,8 @@ async def evaluate(client, job_id, task, file, ssl=None):
 
     try:
         await stream_call(EvaluateServiceStub, "Evaluate", Task, client,
-                          config=task, file_like_objs=[file],
+                          config=task,
+                          file_like_objs=files,
                           certificate_path=ssl, metadata=grpc_metadata)
     except Exception as err:
         logging.exception(str(err))
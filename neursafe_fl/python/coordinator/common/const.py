@@ -27,3 +27,13 @@ S3_ENDPOINT = os.getenv("S3_ENDPOINT")
 S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
 S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
 WORKSPACE_BUCKET = os.getenv("WORKSPACE_BUCKET")
+
+# Client updates decode and accumulate, mode is one of inline, thread, process
+UPDATE_EXECUTOR_MODE = os.getenv("UPDATE_EXECUTOR_MODE", "thread")
+UPDATE_EXECUTOR_WORKERS = int(os.getenv("UPDATE_EXECUTOR_WORKERS", "4"))
+UPDATE_EXECUTOR_MAX_PENDING = int(os.getenv("UPDATE_EXECUTOR_MAX_PENDING",
+                                            str(UPDATE_EXECUTOR_WORKERS)))
+
+# The maximum size of an uploaded file kept in memory, unit is byte, the
+# larger ones are spilled to the round dir.
+UPLOAD_SPOOL_SIZE = int(os.getenv("UPLOAD_SPOOL_SIZE", str(8 << 20)))
@@ -3,12 +3,14 @@
 
 # pylint:disable=missing-function-docstring
 """Workspace UnitTest."""
+import hashlib
 import os
 import shutil
 import unittest
 import tempfile
 
 from neursafe_fl.python.coordinator.common.workspace import Workspace, Files
+from neursafe_fl.python.utils.file_io import bundle_file_name
 
 
 class TestWorkspace(unittest.TestCase):
@@ -84,6 +86,64 @@ class TestWorkspace(unittest.TestCase):
                                    "fl_%s_output_V1" % self.job_name)
         self.assertEqual(job_dir_2, correct_dir)
 
+    def test_should_cache_bundle_by_content_digest(self):
+        workspace = Workspace(self.output, self.job_name)
+        self._temp_dir = workspace.get_tmp_dir()
+        scripts = os.path.join(self.output, "scripts")
+        os.makedirs(os.path.join(scripts, "lib"))
+        with open(os.path.join(scripts, "lib", "train.py"), "w") as file:
+            file.write("print('train')")
+
+        cache = workspace.get_package_cache()
+        digest = cache.bundle([("scripts/mnist", scripts)])
+        self.assertTrue(os.path.exists(cache.path(digest)))
+        modify_time = os.path.getmtime(cache.path(digest))
+
+        # unchanged files reuse the bundle.
+        self.assertEqual(cache.bundle([("scripts/mnist", scripts)]), digest)
+        self.assertEqual(os.path.getmtime(cache.path(digest)), modify_time)
+
+        with open(os.path.join(scripts, "lib", "train.py"), "w") as file:
+            file.write("print('changed')")
+        self.assertNotEqual(cache.bundle([("scripts/mnist", scripts)]),
+                            digest)
+
+    def test_should_compute_bundle_md5_once(self):
+        workspace = Workspace(self.output, self.job_name)
+        self._temp_dir = workspace.get_tmp_dir()
+        script = os.path.join(self.output, "train.py")
+        with open(script, "w") as file:
+            file.write("print('train')")
+
+        cache = workspace.get_package_cache()
+        digest = cache.bundle([("scripts/train.py", script)])
+        with open(cache.path(digest), "rb") as file:
+            content = file.read()
+
+        file_info = cache.file_info(digest)
+        self.assertEqual(file_info.name, bundle_file_name(digest))
+        self.assertEqual(file_info.size, len(content))
+        self.assertEqual(file_info.md5, hashlib.md5(content).hexdigest())
+        self.assertIs(cache.file_info(digest), file_info)
+
+        # recomputed if the bundle file is zipped again.
+        os.remove(cache.path(digest))
+        cache.bundle([("scripts/train.py", script)])
+        self.assertIsNot(cache.file_info(digest), file_info)
+
+    def test_should_record_clients_cached_bundles(self):
+        workspace = Workspace(self.output, self.job_name)
+        self._temp_dir = workspace.get_tmp_dir()
+        cache = workspace.get_package_cache()
+
+        self.assertEqual(cache.missing(["a", "b"], "client1"), ["a", "b"])
+        cache.add_receiver(["a"], "client1")
+        self.assertEqual(cache.missing(["a", "b"], "client1"), ["b"])
+        self.assertEqual(cache.missing(["a"], "client2"), ["a"])
+
+        cache.remove_receiver("client1")
+        self.assertEqual(cache.missing(["a"], "client1"), ["a"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,7 @@
 
 """Workspace(File and Directory) Manage Module."""
 
+import hashlib
 import os
 import re
 import random
@@ -11,12 +12,17 @@ import json
 
 from absl import logging
 
+from neursafe_fl.proto.message_pb2 import File
 from neursafe_fl.python.coordinator.common.utils import runtime_suffix
+from neursafe_fl.python.trans.grpc_call import fill_integrity
+from neursafe_fl.python.utils.file_io import zip_files, bundle_file_name
 from neursafe_fl.python.coordinator.common.const import CKPT_ROOT_PATH,\
     COORDINATOR_WORKSPACE_PATH, DEPLOYMENT_WAY
 
 
 CHECKPOINT_FILE_PREFIX = "checkpoint_v"
+PACKAGE_CACHE_DIR = "package_cache"
+READ_BLOCK_SIZE = 1 << 20
 
 
 class Files:  # pylint:disable=too-few-public-methods
@@ -25,6 +31,7 @@ class Files:  # pylint:disable=too-few-public-methods
     RoundUpdates = "round_updates"
     AggregatedWeights = "aggregated_weights"
     Checkpoint = "checkpoint"
+    ServerOptimizer = "server_optimizer.npz"
     FinalModel = "final_model"
     ZipPackage = "fed_files.zip"
 
@@ -54,6 +61,7 @@ class Workspace:
         self.__tmp_dir = None
         self.__job_v = 0
         self.__ckpt_root_dir = None
+        self.__package_cache = None
 
     def get_checkpoints(self):
         """Return all checkpoints info"""
@@ -196,6 +204,15 @@ class Workspace:
         os.mkdir(tmp_work_dir)
         return tmp_work_dir
 
+    def get_package_cache(self):
+        """Get the package cache of this job, under the tmp dir."""
+        if not self.__package_cache:
+            cache_dir = os.path.join(self.get_tmp_dir(), PACKAGE_CACHE_DIR)
+            if not os.path.exists(cache_dir):
+                os.mkdir(cache_dir)
+            self.__package_cache = PackageCache(cache_dir)
+        return self.__package_cache
+
     def get_client_upload_dir(self, round_id, client_id):
         """Dir for client upload updates.
 
@@ -231,3 +248,111 @@ class Workspace:
             return ''.join([filename, suffix])
         full_name = '%s_%s' % (filename, number)
         return ''.join([full_name, suffix])
+
+
+def _walk_files(files):
+    """Yield (filename_in_zip, file_path) of all the files, the directories
+    are walked in order."""
+    for filename_in_zip, file_path in files:
+        if not os.path.isdir(file_path):
+            yield filename_in_zip, file_path
+            continue
+
+        for dirpath, dirnames, filenames in os.walk(file_path):
+            dirnames.sort()
+            relative_path = os.path.relpath(dirpath, file_path)
+            for filename in sorted(filenames):
+                yield (os.path.normpath(os.path.join(
+                    filename_in_zip, relative_path, filename)),
+                    os.path.join(dirpath, filename))
+
+
+class PackageCache:
+    """Cache the static bundles of the broadcast package by content digest.
+
+    The scripts and prepared files are the same in most rounds, only the
+    weights change. They are zipped once as a bundle file, named by the
+    digest of their content, and reused by the following rounds. The clients
+    cache the bundles too, so a bundle is only sent to a client once.
+
+    The digest is memorized by the stat(size, mtime) of the files, so the
+    unchanged files are not read again. The size and md5 of each bundle file
+    are computed once too, not every time the bundle is sent.
+
+    Args:
+        cache_dir: the directory to save the bundle files.
+    """
+
+    def __init__(self, cache_dir):
+        self.__cache_dir = cache_dir
+        self.__digests = {}  # stat signature of the files: digest
+        self.__receivers = {}  # digest: the clients cached the bundle
+        self.__file_infos = {}  # digest: File with the size and md5
+
+    def bundle(self, files):
+        """Zip the files as a bundle if not cached.
+
+        Args:
+            files: [(filename_in_zip, file_path),], same as zip_files.
+        Returns:
+            The digest of the bundle.
+        """
+        signature = tuple((filename_in_zip, stat.st_size, stat.st_mtime_ns)
+                          for filename_in_zip, stat in
+                          ((name, os.stat(path))
+                           for name, path in _walk_files(files)))
+        digest = self.__digests.get(signature)
+        if not digest:
+            digest = self.__content_digest(files)
+            self.__digests[signature] = digest
+
+        path = self.path(digest)
+        if not os.path.exists(path):
+            tmp_path = "%s.tmp" % path
+            zip_files(files, tmp_path)
+            os.replace(tmp_path, path)
+            self.__file_infos.pop(digest, None)
+            logging.info("Cache bundle %s of files %s", digest, files)
+        return digest
+
+    @staticmethod
+    def __content_digest(files):
+        sha256 = hashlib.sha256()
+        for filename_in_zip, file_path in _walk_files(files):
+            sha256.update(filename_in_zip.encode())
+            sha256.update(b"\0")
+            with open(file_path, "rb") as file:
+                for block in iter(lambda file=file: file.read(READ_BLOCK_SIZE),
+                                  b""):
+                    sha256.update(block)
+            sha256.update(b"\0")
+        return sha256.hexdigest()
+
+    def path(self, digest):
+        """The path of the bundle file."""
+        return os.path.join(self.__cache_dir, bundle_file_name(digest))
+
+    def file_info(self, digest):
+        """The File message to send the bundle, with its size and md5."""
+        file_info = self.__file_infos.get(digest)
+        if file_info is None:
+            with open(self.path(digest), "rb") as file:
+                file_info = fill_integrity(
+                    File(name=bundle_file_name(digest), compress=True), file)
+            self.__file_infos[digest] = file_info
+        return file_info
+
+    def missing(self, digests, client):
+        """The digests of the bundles not cached by the client."""
+        return [digest for digest in digests
+                if client not in self.__receivers.get(digest, ())]
+
+    def add_receiver(self, digests, client):
+        """Record the client has cached the bundles."""
+        for digest in digests:
+            self.__receivers.setdefault(digest, set()).add(client)
+
+    def remove_receiver(self, client):
+        """The client lost its cache, such as restarted."""
+        for receivers in self.__receivers.values():
+            receivers.discard(client)
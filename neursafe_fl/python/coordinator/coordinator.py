@@ -40,8 +40,10 @@ class Coordinator:
         self.__trainer = Trainer(self.__config)
 
         # all the grpc services
-        train_svc = TrainReplyService(self.__trainer.msg_mux)
-        eval_svc = EvaluateReplyService(self.__trainer.msg_mux)
+        train_svc = TrainReplyService(self.__trainer.msg_mux,
+                                      self.__trainer.upload_writer)
+        eval_svc = EvaluateReplyService(self.__trainer.msg_mux,
+                                        self.__trainer.upload_writer)
         stop_svc = StopService(self.__trainer.msg_mux)
         grpc_services = [train_svc, eval_svc, stop_svc]
 
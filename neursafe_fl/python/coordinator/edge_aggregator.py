@@ -0,0 +1,384 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=too-few-public-methods, broad-except
+"""Edge aggregator, the intermediate node of hierarchical aggregation."""
+
+import asyncio
+
+from absl import logging
+from grpclib.server import Stream
+
+from neursafe_fl.proto.message_pb2 import Task, TaskResult, Response, \
+    Metadata, File, Status
+from neursafe_fl.proto.train_service_grpc import TrainServiceBase
+from neursafe_fl.proto.evaluate_service_grpc import EvaluateServiceBase
+from neursafe_fl.proto.reply_service_grpc import TrainReplyServiceStub, \
+    EvaluateReplyServiceStub
+from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
+    WeightAggregator
+from neursafe_fl.python.coordinator.client_stub import train, evaluate, stop
+from neursafe_fl.python.coordinator.errors import RemoteCallFailedError
+from neursafe_fl.python.coordinator.grpc_services import Message, \
+    TrainReplyService, EvaluateReplyService
+from neursafe_fl.python.coordinator.rounds.train_round import decode_update
+from neursafe_fl.python.coordinator.update_executor import update_executor
+from neursafe_fl.python.trans.grpc import GRPCServer
+from neursafe_fl.python.trans.grpc_call import stream_call, \
+    unpackage_stream, extract_metadata, SerializedMessages
+from neursafe_fl.python.trans.ssl_helper import SSLContext
+from neursafe_fl.python.trans import weights_format
+from neursafe_fl.python.utils.file_io import bundle_digest, \
+    PACKAGE_CACHE_MISS
+
+DEFAULT_TIMEOUT = 3600
+
+TRAIN = "train"
+EVALUATE = "evaluate"
+
+
+def _sample_num(metrics):
+    try:
+        return metrics["sample_num"]
+    except (ValueError, KeyError):
+        return 1
+
+
+def _assert_task_supported(task):
+    """The updates forwarded must be plaintext of the whole model."""
+    if task.spec.compression:
+        raise ValueError("Edge aggregator not support compression.")
+
+    secure_algorithm = task.spec.secure_algorithm
+    if secure_algorithm and secure_algorithm["type"].lower() == "ssa":
+        raise ValueError("Edge aggregator not support ssa.")
+
+    if task.spec.custom_params:
+        raise ValueError("Edge aggregator not support extenders.")
+
+
+class _EdgeTask:  # pylint:disable=too-many-instance-attributes
+    """One train or evaluate task forwarded to the edge's clients.
+
+    A plain record of the task's state, shared by the forwarding, the
+    accumulating of results and the reporting, which update it in place.
+    """
+
+    def __init__(self, task_type, task, files, grpc_metadata, clients):
+        self.task_type = task_type
+        self.task = task
+        self.files = files
+        self.grpc_metadata = grpc_metadata
+        self.aggregator = WeightAggregator()
+        self.pending = set(clients)
+        self.accumulating_num = 0
+        self.success = 0
+        self.sample_num = 0
+        self.replied = asyncio.Event()
+        self.bundles = []
+        self.runner = None
+
+    def check_replied(self):
+        """All the clients replied and their results accumulated."""
+        if not self.pending and not self.accumulating_num:
+            self.replied.set()
+
+
+class EdgeAggregator:
+    """Edge aggregator, pre-aggregate the updates of a subset of clients.
+
+    To the coordinator, the edge aggregator is a client: it is configured in
+    the coordinator's clients(or selected by the selector) like a client,
+    receives train and evaluate tasks, and reports one result of each task.
+    To its own clients, it is the server: the clients configured with the
+    edge's address as server report their results to it.
+
+    For each task, the edge aggregator:
+        1. forwards the task and its package to all its clients
+        2. accumulates the clients' results by WeightAggregator, weighted by
+           the sample number of each client
+        3. reports the weighted mean, with the total sample number as its
+           sample number, to the server
+    The server weights the edge's result by the total sample number, so the
+    global result equals the flat FedAvg over all the clients. The server
+    could also be another edge aggregator, to build a deeper tree.
+
+    Compression, ssa and extenders are not supported, which need the
+    server to process each client's update.
+
+    The static bundles(scripts, prepared files) of the package are sent by
+    the server only once, the edge aggregator keeps the bundles of the latest
+    task in memory, and forwards them with each task, the clients skip the
+    bundles already cached.
+
+    Args:
+        config: the configuration of edge aggregator:
+            host, port: the address to serve gRPC API.
+            server: the address of upstream coordinator or edge aggregator.
+            clients: the addresses of the edge's clients, split by ",".
+            threshold_client_num: the minimum success clients to report a
+                                  success result, default is all clients.
+            timeout: the timeout waiting for clients' results, unit is
+                     second.
+            ssl: ssl path, if use gRPCs.
+    """
+
+    def __init__(self, config):
+        self.__config = config
+        self.__clients = [client.strip() for client in
+                          config["clients"].split(",") if client.strip()]
+        self.__threshold = (config.get("threshold_client_num")
+                            or len(self.__clients))
+        self.__timeout = config.get("timeout") or DEFAULT_TIMEOUT
+        self.__ssl = config.get("ssl")
+
+        # running tasks, index by (job_name, round, type)
+        self.__tasks = {}
+        # the static bundles of package, index by digest
+        self.__bundles = {}
+
+    def grpc_services(self):
+        """The services to the server and to the clients."""
+        return [EdgeTrainService(self), EdgeEvaluateService(self),
+                TrainReplyService(self.msg_mux),
+                EvaluateReplyService(self.msg_mux)]
+
+    async def start(self):
+        """Start the gRPC services, serve until closed."""
+        ssl_context = SSLContext.instance(self.__ssl)
+        server = GRPCServer(self.__config["host"], self.__config["port"],
+                            self.grpc_services(), ssl_certificate=ssl_context)
+        await server.start()
+        logging.info("Start edge aggregator at port %s, clients %s",
+                     self.__config["port"], self.__clients)
+        await server.wait_closed()
+
+    def create(self, task_type, task, files, grpc_metadata):
+        """Create a task from server, forward it to the clients.
+
+        Args:
+            task_type: train or evaluate.
+            task: the task proto message.
+            files: the package files of task.
+            grpc_metadata: the grpc metadata from server, reported back with
+                           the result.
+        """
+        _assert_task_supported(task)
+
+        key = (task.metadata.job_name, task.metadata.round, task_type)
+        if key in self.__tasks:
+            raise ValueError("The job of name: %s, round: %s, type: %s "
+                             "already exists." % key)
+
+        files = self.__cache_bundles(task, files)
+        edge_task = _EdgeTask(task_type, task, files, grpc_metadata,
+                              self.__clients)
+        edge_task.bundles = [self.__bundles[digest]
+                             for digest in task.spec.bundles]
+        edge_task.runner = asyncio.create_task(self.__run(key, edge_task))
+        self.__tasks[key] = edge_task
+
+    def __cache_bundles(self, task, files):
+        others = []
+        for file_info, file_like_obj in files:
+            digest = bundle_digest(file_info.name)
+            if digest is None:
+                others.append((file_info, file_like_obj))
+            else:
+                self.__bundles[digest] = (file_info, file_like_obj)
+
+        missing = [digest for digest in task.spec.bundles
+                   if digest not in self.__bundles]
+        if missing:
+            raise ValueError("%s: %s" % (PACKAGE_CACHE_MISS, missing))
+
+        # only keep the bundles of the latest task.
+        self.__bundles = {digest: self.__bundles[digest]
+                          for digest in task.spec.bundles}
+        return others
+
+    async def stop(self, task_type, metadata):
+        """Stop a task from server, and stop it in the clients."""
+        key = (metadata.job_name, metadata.round, task_type)
+        edge_task = self.__tasks.pop(key, None)
+        if not edge_task:
+            logging.warning("The job of name: %s, round: %s, type: %s not "
+                            "exists.", *key)
+            return
+
+        edge_task.runner.cancel()
+        stop_tasks = [stop(client, metadata, task_type, self.__ssl)
+                      for client in edge_task.pending]
+        for result in await asyncio.gather(*stop_tasks,
+                                           return_exceptions=True):
+            if isinstance(result, RemoteCallFailedError):
+                logging.warning("Broadcast stop client failed %s",
+                                str(result))
+
+    async def msg_mux(self, msg_type, msg):
+        """Process the results from clients."""
+        params, files = msg
+        task_type = TRAIN if msg_type == Message.TRAIN else EVALUATE
+        key = (params.metadata.job_name, params.metadata.round, task_type)
+        edge_task = self.__tasks.get(key)
+        if not edge_task or params.client_id not in edge_task.pending:
+            logging.error("Result of client %s is not belong to any task.",
+                          params.client_id)
+            raise ValueError("Msg not matched!")
+
+        edge_task.pending.discard(params.client_id)
+        edge_task.accumulating_num += 1
+        try:
+            if params.status == Status.success:
+                await self.__accumulate(edge_task, params, files)
+            else:
+                logging.warning("Received %s message: %s", params.status,
+                                params)
+        except Exception as err:
+            logging.exception("Accumulate result of client %s failed, "
+                              "reason: %s", params.client_id, str(err))
+        finally:
+            edge_task.accumulating_num -= 1
+            edge_task.check_replied()
+
+    async def __accumulate(self, edge_task, params, files):
+        data = {"metrics": params.spec.metrics,
+                "client_id": params.client_id}
+        if edge_task.task_type == TRAIN:
+            data["weights"] = await update_executor.decode(
+                decode_update, files[:1], None, None)
+
+        sample_num = _sample_num(params.spec.metrics)
+        await update_executor.accumulate(edge_task.aggregator.accumulate,
+                                         data, sample_num)
+        edge_task.sample_num += sample_num
+        edge_task.success += 1
+
+    async def __run(self, key, edge_task):
+        try:
+            await self.__broadcast(edge_task)
+            try:
+                await asyncio.wait_for(edge_task.replied.wait(),
+                                       self.__timeout)
+            except asyncio.TimeoutError:
+                logging.error("Clients %s timeout.", edge_task.pending)
+            await self.__report(edge_task)
+        except Exception as err:
+            logging.exception("Edge task %s failed, reason: %s", key,
+                              str(err))
+        finally:
+            self.__tasks.pop(key, None)
+
+    async def __broadcast(self, edge_task):
+        send = train if edge_task.task_type == TRAIN else evaluate
+        job_id = edge_task.grpc_metadata.get("module-id")
+        # serialize once, shared by the sends to all the clients.
+        package = SerializedMessages(Task, edge_task.task,
+                                     edge_task.files[:1] + edge_task.bundles)
+
+        clients = list(edge_task.pending)
+        results = await asyncio.gather(
+            *[send(client, job_id, package, [], self.__ssl)
+              for client in clients], return_exceptions=True)
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
+                logging.warning(str(result))
+                edge_task.pending.discard(client)
+
+        edge_task.check_replied()
+
+    async def __report(self, edge_task):
+        result = TaskResult(metadata=edge_task.task.metadata,
+                            client_id=edge_task.grpc_metadata.get(
+                                "client_id"),
+                            status=Status.failed)
+        file_like_objs = []
+        if edge_task.success >= self.__threshold:
+            values = await edge_task.aggregator.aggregate()
+            metrics = {key: float(value)
+                       for key, value in values.get("metrics", {}).items()}
+            metrics["sample_num"] = edge_task.sample_num
+            result.spec.metrics.update(metrics)
+            if "weights" in values:
+                file_like_objs.append((File(name="delta_weights"),
+                                       weights_format.encode(
+                                           values["weights"])))
+            result.status = Status.success
+        else:
+            logging.error("Success clients %s less than the threshold %s",
+                          edge_task.success, self.__threshold)
+
+        if edge_task.task_type == TRAIN:
+            stub, method = TrainReplyServiceStub, "TrainReply"
+        else:
+            stub, method = EvaluateReplyServiceStub, "EvaluateReply"
+        await stream_call(stub, method, TaskResult, self.__config["server"],
+                          config=result, file_like_objs=file_like_objs,
+                          certificate_path=self.__ssl,
+                          metadata=edge_task.grpc_metadata)
+        logging.info("Report %s result of %s clients to %s.",
+                     edge_task.task_type, edge_task.success,
+                     self.__config["server"])
+
+
+class EdgeTrainService(TrainServiceBase):
+    """Receive train task from server."""
+
+    def __init__(self, edge_aggregator):
+        self.__edge_aggregator = edge_aggregator
+
+    async def Train(self, stream: Stream[Task, Response]):
+        try:
+            task, files = await unpackage_stream(stream)
+            grpc_metadata = extract_metadata(stream,
+                                             keys=["module-id", "client_id"])
+            self.__edge_aggregator.create(TRAIN, task, files, grpc_metadata)
+            await stream.send_message(Response(state='success'))
+        except Exception as err:
+            logging.exception(str(err))
+            await stream.send_message(
+                Response(state='failed', reason=str(err)))
+            await stream.cancel()
+
+    async def Stop(self, stream: Stream[Metadata, Response]):
+        try:
+            metadata = await stream.recv_message()
+            await self.__edge_aggregator.stop(TRAIN, metadata)
+            await stream.send_message(Response(state='success'))
+        except Exception as err:
+            logging.exception(str(err))
+            await stream.send_message(
+                Response(state='failed', reason=str(err)))
+            await stream.cancel()
+
+
+class EdgeEvaluateService(EvaluateServiceBase):
+    """Receive evaluate task from server."""
+
+    def __init__(self, edge_aggregator):
+        self.__edge_aggregator = edge_aggregator
+
+    async def Evaluate(self, stream: Stream[Task, Response]):
+        try:
+            task, files = await unpackage_stream(stream)
+            grpc_metadata = extract_metadata(stream,
+                                             keys=["module-id", "client_id"])
+            self.__edge_aggregator.create(EVALUATE, task, files,
+                                          grpc_metadata)
+            await stream.send_message(Response(state='success'))
+        except Exception as err:
+            logging.exception(str(err))
+            await stream.send_message(
+                Response(state='failed', reason=str(err)))
+            await stream.cancel()
+
+    async def Stop(self, stream: Stream[Metadata, Response]):
+        try:
+            metadata = await stream.recv_message()
+            await self.__edge_aggregator.stop(EVALUATE, metadata)
+            await stream.send_message(Response(state='success'))
+        except Exception as err:
+            logging.exception(str(err))
+            await stream.send_message(
+                Response(state='failed', reason=str(err)))
+            await stream.cancel()
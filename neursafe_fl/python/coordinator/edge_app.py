@@ -0,0 +1,63 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Edge Aggregator Entry Point."""
+import asyncio
+
+from absl import app
+from absl import flags
+from absl import logging
+from neursafe_fl.python.utils.log import set_log
+
+from neursafe_fl.python.coordinator.edge_aggregator import EdgeAggregator, \
+    DEFAULT_TIMEOUT
+
+
+FLAGS = flags.FLAGS
+
+flags.DEFINE_string('host', '0.0.0.0', 'IP address to serve for gRPC API.')
+flags.DEFINE_integer('port', 50061, 'Port to listen on for gRPC API, the range '
+                                    'is 1024~65535. Default port is 50061.',
+                     lower_bound=1024, upper_bound=65535)
+flags.DEFINE_string('server', None,
+                    'The address of the server, where the aggregated results '
+                    'are reported, the format is ip:port. The server is the '
+                    'coordinator or another edge aggregator.')
+flags.DEFINE_string('clients', None,
+                    'The clients of this edge aggregator. Using ip:port '
+                    'to represent one client service address, split by ",". '
+                    'The clients should report to this edge aggregator, '
+                    'that is, configured with this address as server.')
+flags.DEFINE_integer('threshold_client_num', None,
+                     'The minimum number of success clients to report a '
+                     'success result. Default is all the clients.')
+flags.DEFINE_integer('timeout', DEFAULT_TIMEOUT,
+                     'The timeout waiting for the results of clients, unit '
+                     'is seconds.')
+flags.DEFINE_string('log_level', 'INFO',
+                    'Log level, support [DEBUG, INFO, WARNING, ERROR].')
+flags.DEFINE_string('ssl', None,
+                    'If use gRPCs, you must set the ssl path, This is a path '
+                    'where should have 3 files:\n'
+                    '  cert.pem: saved certificate\n'
+                    '  private.key: saved private key\n'
+                    '  trusted.pem: saved trusted certificate.')
+
+flags.mark_flags_as_required(['server', 'clients'])
+
+
+def main(argv):
+    """The Entry of edge aggregator process."""
+    del argv  # Unused
+
+    config_dic = FLAGS.flag_values_dict()
+    set_log(config_dic["log_level"])
+    logging.debug("Load configuration: %s", config_dic)
+
+    edge_aggregator = EdgeAggregator(config_dic)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(edge_aggregator.start())
+
+
+if __name__ == '__main__':
+    app.run(main)
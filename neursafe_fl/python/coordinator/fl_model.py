@@ -3,6 +3,7 @@
 
 """Federate Learning Model Manage Module."""
 
+import copy
 
 from neursafe_fl.python.runtime.runtime_factory import RuntimeFactory
 
@@ -16,17 +17,23 @@ class FlModel:
     Notices:
         pytorch: only support operates on weights, model is None.
 
+    Args:
+        model_path: the path of init server model.
+        runtime: tensorflow or pytorch.
+        model: the runtime model, default is created by load.
+        calculator: the weights calculator, default is created by load.
+
     Attributes:
         __model: global model(aggregated model) in server
         __weights: global weights(aggregated weights) of the model
     """
 
-    def __init__(self, model_path, runtime):
+    def __init__(self, model_path, runtime, model=None, calculator=None):
         self.__model_path = model_path
         self.__runtime = runtime
-        self.__model = None  # global model
+        self.__model = model  # global model
         self.__weights = None  # global weights
-        self.__calculator = None
+        self.__calculator = calculator
 
     def load(self):
         """Load init server model from model_path."""
@@ -44,6 +51,14 @@ class FlModel:
         """Set global(server) model weights."""
         self.__weights = weights
 
+    def snapshot(self):
+        """Return a model with a copy of the current global weights, which is
+        not changed by the following updates of this model."""
+        model = FlModel(self.__model_path, self.__runtime, self.__model,
+                        self.__calculator)
+        model.set_weights(copy.deepcopy(self.__weights))
+        return model
+
     def load_model(self, path):
         """Load model from path."""
         return self.__model.load(path)
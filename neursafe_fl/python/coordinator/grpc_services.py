@@ -21,15 +21,23 @@ class Message:
 
 
 class TrainReplyService(TrainReplyServiceBase):
-    """Receive train result service."""
+    """Receive train result service.
 
-    def __init__(self, msg_mux):
+    Args:
+        msg_mux: dispatch the received result.
+        writer_factory: create the writer of received files, see
+            unpackage_stream, default the files are received in memory.
+    """
+
+    def __init__(self, msg_mux, writer_factory=None):
         self.__msg_mux = msg_mux
+        self.__writer_factory = writer_factory
 
     async def TrainReply(self, stream: Stream[TaskResult, Response]):
         try:
             # parse params and files from stream
-            params, files = await unpackage_stream(stream)
+            params, files = await unpackage_stream(
+                stream, writer_factory=self.__writer_factory)
             await self.__msg_mux(Message.TRAIN, (params, files))
             await stream.send_message(Response(state='success'))
         except ValueError as err:
@@ -42,14 +50,22 @@ class TrainReplyService(TrainReplyServiceBase):
 
 
 class EvaluateReplyService(EvaluateReplyServiceBase):
-    """Receive evaluate result service."""
+    """Receive evaluate result service.
 
-    def __init__(self, msg_mux):
+    Args:
+        msg_mux: dispatch the received result.
+        writer_factory: create the writer of received files, see
+            unpackage_stream, default the files are received in memory.
+    """
+
+    def __init__(self, msg_mux, writer_factory=None):
         self.__msg_mux = msg_mux
+        self.__writer_factory = writer_factory
 
     async def EvaluateReply(self, stream: Stream[TaskResult, Response]):
         try:
-            params, files = await unpackage_stream(stream)
+            params, files = await unpackage_stream(
+                stream, writer_factory=self.__writer_factory)
             await self.__msg_mux(Message.EVALUATE, (params, files))
             await stream.send_message(Response(state='success'))
         except ValueError as err:
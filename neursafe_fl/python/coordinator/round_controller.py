@@ -9,11 +9,14 @@ from datetime import datetime
 
 from absl import logging
 
+from neursafe_fl.python.coordinator.aggregator.aggregator import \
+    create_aggregator
 from neursafe_fl.python.coordinator.client_selector import ClientSelector
 from neursafe_fl.python.coordinator.common.types import RoundResult, \
     Statistics, ErrorCode
 from neursafe_fl.python.coordinator.common.const import RETRY_TIMEOUT, \
     MAX_RETRY_TIMES
+from neursafe_fl.python.coordinator.update_executor import update_executor
 from neursafe_fl.python.coordinator.errors import (RoundFailedError,
                                                    RoundStoppedError,
                                                    DeviceNotEnoughError,
@@ -22,6 +25,8 @@ from neursafe_fl.python.coordinator.errors import (RoundFailedError,
                                                    ExtendExecutionFailed)
 from neursafe_fl.proto.message_pb2 import Status
 
+DEFAULT_STALENESS_EXPONENT = 0.5
+
 
 class RoundController:
     """Round Controller controls the round process of federate learning.
@@ -53,6 +58,11 @@ class RoundController:
         self.__success_reply = 0
         self.__failed_reply = 0
 
+        # updates are decoded concurrently, number them when dispatched.
+        self.__dispatched_num = 0
+        self.__aggregating_num = 0
+        self.__aggregated_event = asyncio.Event()
+
         self.__accept_updates = True
         self.__stopped = False
         self.__error_code = 0
@@ -164,6 +174,8 @@ class RoundController:
     async def __finish(self):
         """Process all the clients' updates.
         """
+        await self.__wait_aggregating()
+
         if self.__stopped:
             await self.__stop_clients(self.__clients)
             raise RoundStoppedError(self.__error_msg)
@@ -245,8 +257,16 @@ class RoundController:
                      self.__received_reply)
         self.__event.set()
 
+    async def __wait_aggregating(self):
+        """Wait the updates accepted before finished to be aggregated."""
+        while self.__aggregating_num:
+            await self.__aggregated_event.wait()
+            self.__aggregated_event.clear()
+
     async def __try_to_aggregate(self, msg):
-        message_number = self.__success_reply + self.__failed_reply
+        message_number = self.__dispatched_num
+        self.__dispatched_num += 1
+        self.__aggregating_num += 1
         try:
             await self.__round.on_aggregate(msg, number=message_number)
             self.__success_reply += 1
@@ -257,6 +277,9 @@ class RoundController:
             self.__failed_reply += 1
             logging.exception("Aggregate msg number %s failed, reason: %s",
                               message_number, str(err))
+        finally:
+            self.__aggregating_num -= 1
+            self.__aggregated_event.set()
 
     def __calculate_statistics(self, total_time):
         stats = Statistics()
@@ -264,3 +287,380 @@ class RoundController:
         stats.failed = self.__failed_reply
         stats.spend_time = total_time
         return stats
+
+
+def staleness_weight(sample_num, staleness, exponent):
+    """The weight of an update trained from a stale model.
+
+    Polynomial decay, the update trained from the latest model(staleness 0)
+    keeps its sample number.
+
+    Args:
+        sample_num: the sample number of the update.
+        staleness: the number of server steps since the model version the
+                   update trained from.
+        exponent: the decay exponent, 0 means no decay.
+    """
+    return sample_num / (1 + staleness) ** exponent
+
+
+def _sample_num(metrics):
+    try:
+        return metrics["sample_num"]
+    except (ValueError, KeyError, TypeError):
+        return 1
+
+
+class _UpdateBuffer:  # pylint:disable=too-few-public-methods
+    """The updates buffered for one server step."""
+
+    def __init__(self, aggregator):
+        self.aggregator = aggregator
+        self.success = 0
+        self.failed = 0
+        self.aggregating_num = 0
+        self.aggregated_event = asyncio.Event()
+        self.start_time = time.time()
+        self.timer = None
+
+
+class AsyncRoundController:
+    """Async Round Controller controls the buffered asynchronous training.
+
+    RoundController runs the rounds one by one, each round waits for its
+    slowest clients. Instead, AsyncRoundController keeps `concurrency` clients
+    training all the time, the main process including:
+        1. select clients, broadcast the latest model to them
+        2. buffer the update of a client as soon as it is received, and
+           broadcast the latest model to another free client at once
+        3. every `buffer_size` updates, aggregate the buffer as one server
+           step, then the model version increases
+    The model version is the number of the successful server step, the round
+    id of the TrainRound broadcasting it. An update trained from an old
+    version is weighted down by its staleness, the number of server steps
+    since then:
+        weight = sample_num / (1 + staleness) ** staleness_exponent
+
+    A client not replying in round_timeout is released. If the buffer is not
+    full in round_timeout, the updates buffered are aggregated as the step
+    anyway, the step fails only if no update buffered, and the version is
+    not advanced by a failed step. The training finishes after
+    max_round_num server steps, including the failed ones.
+
+    Args:
+        hyper: the hyper parameters of the job.
+        config: the configuration of the job.
+        create_round: function(version), create the TrainRound to broadcast
+                      the model of this version.
+        on_step: coroutine function(version, result), apply the RoundResult
+                 of the server step to the model.
+        clean_round: function(version), clean the files of the version when
+                     no more client trains it.
+    """
+
+    def __init__(self, hyper, config, create_round, on_step, clean_round):
+        self.__timeout = hyper["round_timeout"]
+        self.__max_steps = hyper["max_round_num"]
+        self.__concurrency = hyper.get("concurrency") or hyper["client_num"]
+        self.__buffer_size = (hyper.get("buffer_size")
+                              or hyper["threshold_client_num"])
+        self.__staleness_exponent = hyper.get("staleness_exponent",
+                                              DEFAULT_STALENESS_EXPONENT)
+
+        self.__config = config
+        self.__create_round = create_round
+        self.__on_step = on_step
+        self.__clean_round = clean_round
+        self.__client_selector = ClientSelector(config)
+
+        self.__version = 1
+        self.__step_num = 0
+        self.__rounds = {}  # version: round broadcasting the version
+        self.__training = {}  # client: (version, timeout timer)
+        self.__extracting = {}  # version: number of updates extracting
+        self.__update_num = 0
+        self.__buffer = None
+
+        self.__select_lock = asyncio.Lock()
+        self.__step_lock = asyncio.Lock()
+        self.__retry_times = 0
+        self.__tasks = set()
+
+        self.__finished = asyncio.Event()
+        self.__stopped = False
+
+    @property
+    def version(self):
+        """The current version of the model broadcast to clients."""
+        return self.__version
+
+    def is_running(self, version):
+        """Whether the round of the version is running, its clients may still
+        upload the updates."""
+        return version in self.__rounds
+
+    async def run(self):
+        """Run the asynchronous training until max_round_num server steps
+        applied or stopped."""
+        start_time = time.time()
+        self.__rounds[self.__version] = self.__prepare_round(self.__version)
+        self.__buffer = self.__new_buffer()
+        await self.__fill()
+
+        await self.__finished.wait()
+        async with self.__step_lock:
+            # wait the step in progress to be applied.
+            self.__buffer.timer.cancel()
+
+        await self.__stop_clients()
+        for task in list(self.__tasks):
+            task.cancel()
+        for version in list(self.__rounds):
+            self.__release_round(version)
+        await self.__client_selector.release()
+        logging.info("Async training finished, model version %s, using "
+                     "time: %.2fs", self.__version, time.time() - start_time)
+
+    async def stop(self):
+        """Stop the asynchronous training.
+
+        The stop command will force the training clients to stop.
+        """
+        self.__stopped = True
+        self.__finished.set()
+
+    async def process_msg(self, msg):
+        """Process the update of a client.
+
+        Args:
+            msg: client's uploaded message. Format is proto.
+        """
+        params = msg[0]
+        client, version = params.client_id, params.metadata.round
+        if self.__training.get(client, (None,))[0] != version:
+            logging.warning("Received timeout message of client %s, version "
+                            "%s", client, version)
+            return
+
+        self.__extracting[version] = self.__extracting.get(version, 0) + 1
+        self.__release_client(client)
+        # broadcast the latest model to the free client at once.
+        self.__spawn(self.__fill())
+
+        try:
+            if params.status == Status.success and not self.__stopped:
+                await self.__buffer_update(msg, version)
+            else:
+                logging.warning("Received %s message: %s", params.status, msg)
+                self.__buffer.failed += 1
+        finally:
+            self.__extracting[version] -= 1
+            self.__release_rounds()
+
+    async def __buffer_update(self, msg, version):
+        buffer = self.__buffer
+        staleness = self.__version - version
+        message_number = self.__update_num
+        self.__update_num += 1
+
+        buffer.aggregating_num += 1
+        try:
+            data = await self.__rounds[version].extract_update(msg,
+                                                               message_number)
+            weight = staleness_weight(_sample_num(data["metrics"]),
+                                      staleness, self.__staleness_exponent)
+            await update_executor.accumulate(buffer.aggregator.accumulate,
+                                             data, weight)
+            buffer.success += 1
+            logging.info("Buffer msg number %s success, staleness %s, "
+                         "weight %s.", message_number, staleness, weight)
+        except Exception as err:  # pylint:disable=broad-except
+            buffer.failed += 1
+            logging.exception("Buffer msg number %s failed, reason: %s",
+                              message_number, str(err))
+        finally:
+            buffer.aggregating_num -= 1
+            buffer.aggregated_event.set()
+
+        if buffer is self.__buffer and buffer.success == self.__buffer_size:
+            self.__start_step()
+
+    def __new_buffer(self):
+        buffer = _UpdateBuffer(create_aggregator(self.__config.get(
+            "aggregator")))
+        loop = asyncio.get_running_loop()
+        buffer.timer = loop.call_later(self.__timeout, self.__start_step)
+        return buffer
+
+    def __start_step(self):
+        """Aggregate the current buffer as a server step, the following
+        updates are buffered into a new buffer."""
+        buffer = self.__buffer
+        buffer.timer.cancel()
+        self.__buffer = self.__new_buffer()
+        self.__spawn(self.__step(buffer))
+
+    async def __step(self, buffer):
+        async with self.__step_lock:
+            if self.__finished.is_set():
+                return
+
+            while buffer.aggregating_num:
+                await buffer.aggregated_event.wait()
+                buffer.aggregated_event.clear()
+
+            version = self.__version
+            result = await self.__aggregate(buffer)
+            logging.info("Server step %s execute status: %s, using time: "
+                         "%.2fs", version, result.status,
+                         result.statistics.spend_time)
+            await self.__on_step(version, result)
+
+            self.__step_num += 1
+            if self.__step_num >= self.__max_steps or self.__stopped:
+                self.__finished.set()
+                return
+
+            if not result.status:
+                return
+
+            self.__version += 1
+            self.__rounds[self.__version] = self.__prepare_round(
+                self.__version)
+            self.__release_rounds()
+
+    async def __aggregate(self, buffer):
+        result = RoundResult()
+        if not buffer.success:
+            result.status = False
+            result.reason = "No update buffered in timeout."
+            logging.error("Server step failed, reason: %s", result.reason)
+        else:
+            if buffer.success < self.__buffer_size:
+                logging.warning("Buffered updates %s less than buffer size %s "
+                                "in timeout, aggregate them.", buffer.success,
+                                self.__buffer_size)
+            try:
+                values = await buffer.aggregator.aggregate()
+                result.status = True
+                result.delta_weights = values.get("weights")
+                result.metrics = values.get("metrics")
+            except AggregationFailedError as err:
+                logging.exception(str(err))
+                result.status = False
+                result.reason = str(err)
+
+        stats = Statistics()
+        stats.success = buffer.success
+        stats.failed = buffer.failed
+        stats.spend_time = time.time() - buffer.start_time
+        result.statistics = stats
+        return result
+
+    def __prepare_round(self, version):
+        round_ins = self.__create_round(version)
+        round_ins.on_prepare()
+        return round_ins
+
+    async def __fill(self):
+        """Select clients to keep `concurrency` clients training."""
+        async with self.__select_lock:
+            lacking = self.__concurrency - len(self.__training)
+            if lacking <= 0 or self.__finished.is_set():
+                return
+
+            demands = {"client_num": lacking,
+                       "exclude": list(self.__training)}
+            try:
+                clients = await self.__client_selector.select(demands)
+            except DeviceNotEnoughError as err:
+                logging.warning(str(err))
+                if not self.__training:
+                    self.__retry_fill()
+                return
+
+            self.__retry_times = 0
+            logging.info("Select clients success, %s", clients)
+            for client in clients:
+                self.__dispatch(client)
+
+    def __retry_fill(self):
+        """No client is training, retry to select later."""
+        if self.__retry_times >= MAX_RETRY_TIMES:
+            logging.error("Async training failed, reason: no clients "
+                          "available.")
+            self.__finished.set()
+            return
+
+        self.__retry_times += 1
+        loop = asyncio.get_running_loop()
+        loop.call_later(RETRY_TIMEOUT, lambda: self.__spawn(self.__fill()))
+
+    def __dispatch(self, client):
+        version = self.__version
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(self.__timeout, self.__timeout_handler,
+                                client, version)
+        self.__training[client] = (version, timer)
+        self.__spawn(self.__broadcast(client, version))
+
+    async def __broadcast(self, client, version):
+        try:
+            await self.__rounds[version].on_broadcast(client)
+        except RemoteCallFailedError as err:
+            logging.warning(str(err))
+            if self.__training.get(client, (None,))[0] == version:
+                self.__release_client(client)
+                self.__release_rounds()
+                self.__buffer.failed += 1
+            if not self.__training:
+                self.__retry_fill()
+
+    def __timeout_handler(self, client, version):
+        logging.error("Client %s training version %s failed, reason: "
+                      "timeout.", client, version)
+        round_ins = self.__rounds[version]
+        self.__release_client(client)
+        self.__release_rounds()
+        self.__buffer.failed += 1
+        self.__spawn(self.__stop_client(round_ins, client))
+        self.__spawn(self.__fill())
+
+    def __release_client(self, client):
+        _, timer = self.__training.pop(client)
+        timer.cancel()
+
+    def __release_rounds(self):
+        """Release the rounds of old versions no more used."""
+        in_use = {version for version, _ in self.__training.values()}
+        in_use.update(version for version, num in self.__extracting.items()
+                      if num)
+        for version in list(self.__rounds):
+            if version != self.__version and version not in in_use:
+                self.__release_round(version)
+
+    def __release_round(self, version):
+        del self.__rounds[version]
+        self.__extracting.pop(version, None)
+        self.__clean_round(version)
+
+    async def __stop_clients(self):
+        stop_tasks = []
+        for client, (version, timer) in self.__training.items():
+            timer.cancel()
+            stop_tasks.append(self.__stop_client(self.__rounds[version],
+                                                 client))
+        await asyncio.gather(*stop_tasks)
+        self.__training = {}
+
+    @staticmethod
+    async def __stop_client(round_ins, client):
+        try:
+            await round_ins.on_stop(client)
+        except RemoteCallFailedError as err:
+            logging.warning("Broadcast stop client failed %s", str(err))
+
+    def __spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
@@ -5,6 +5,7 @@
 """Base Round Module."""
 
 import abc
+from contextlib import ExitStack
 from os.path import basename
 
 from absl import logging
@@ -12,8 +13,10 @@ from absl import logging
 from neursafe_fl.proto.message_pb2 import Loss
 from neursafe_fl.python.coordinator.common.utils import join
 from neursafe_fl.python.coordinator.common.workspace import Files
+from neursafe_fl.python.coordinator.errors import RemoteCallFailedError
 from neursafe_fl.python.coordinator.round_controller import RoundController
 from neursafe_fl.python.libs.compression.factory import create_compression
+from neursafe_fl.python.utils.file_io import PACKAGE_CACHE_MISS
 
 
 PACKAGE_IO_NAME = "package.zip"
@@ -99,20 +102,68 @@ class BaseRound:
         """
 
     def _extract_file(self, custom):
-        files = []
+        """The files changed every round, zipped into the package."""
+        del custom
         weight_file = self._create_weights_file()
-        files.append((basename(weight_file), weight_file))
+        return [(basename(weight_file), weight_file)]
 
+    def _extract_bundles(self, custom, task):
+        """Cache the static files as bundles, and set the digests of the
+        bundles to the task.
+
+        The prepared files and the scripts are cached separately, so the
+        scripts are not sent again when the prepared files changed.
+        """
+        bundles = []
         if custom.get("files"):
-            custom_files = custom["files"]
-            for filename, path in custom_files.items():
-                files.append(("prepared/%s" % filename, path))
+            bundles.append([("prepared/%s" % filename, path)
+                            for filename, path in custom["files"].items()])
 
         if self._config.get("scripts"):
             script_path = self._config["scripts"]["path"]
-            files.append(("scripts/%s" % basename(script_path), script_path))
+            bundles.append([("scripts/%s" % basename(script_path),
+                             script_path)])
+
+        package_cache = self._workspace.get_package_cache()
+        del task.spec.bundles[:]
+        task.spec.bundles.extend(package_cache.bundle(files)
+                                 for files in bundles)
+
+    async def _send_task(self, send, client, task, package):
+        """Send the task with the bundles not cached by the client.
 
-        return files
+        Args:
+            send: the function of client_stub to send task, train or evaluate.
+            client: client service address to be called.
+            task: the task to send.
+            package: SerializedMessages of the task and its package file,
+                     serialized once for all the clients.
+        """
+        package_cache = self._workspace.get_package_cache()
+        digests = list(task.spec.bundles)
+        missing = package_cache.missing(digests, client)
+        try:
+            await self.__send_task(send, client, package, missing)
+        except RemoteCallFailedError as err:
+            if len(missing) == len(digests) \
+                    or PACKAGE_CACHE_MISS not in str(err):
+                raise
+            logging.warning("Client %s lost the cached bundles, resend them.",
+                            client)
+            package_cache.remove_receiver(client)
+            await self.__send_task(send, client, package, digests)
+
+        package_cache.add_receiver(digests, client)
+
+    async def __send_task(self, send, client, package, digests):
+        package_cache = self._workspace.get_package_cache()
+        with ExitStack() as stack:
+            bundles = [(package_cache.file_info(digest),
+                        stack.enter_context(
+                            open(package_cache.path(digest), "rb")))
+                       for digest in digests]
+            await send(client, self._config.get("job-id"), package, bundles,
+                       self._config.get("ssl"))
 
     def _create_weights_file(self):
         """Save the server aggregated model's weights to file."""
@@ -16,6 +16,7 @@ from neursafe_fl.python.coordinator.client_stub import evaluate, stop
 from neursafe_fl.python.coordinator.extenders import broadcast_extender
 from neursafe_fl.python.coordinator.rounds.base_round import BaseRound, \
     PACKAGE_IO_NAME
+from neursafe_fl.python.trans.grpc_call import SerializedMessages
 
 
 class EvaluateRound(BaseRound):
@@ -35,7 +36,7 @@ class EvaluateRound(BaseRound):
         #  also support the user's custom aggregator.
         self.__aggregator = WeightAggregator()
         self.__broadcast_task = None
-        self.__broadcast_file = None
+        self.__broadcast_package = None
 
     def on_prepare(self):
         if not self.__broadcast_task:
@@ -47,14 +48,16 @@ class EvaluateRound(BaseRound):
             self.__broadcast_task.spec.custom_params.update(custom["params"])
 
         files = self._extract_file(custom)
+        self._extract_bundles(custom, self.__broadcast_task)
         file_io = zip_files(files)
         file_info = File(name=PACKAGE_IO_NAME, compress=True)
-        self.__broadcast_file = (file_info, file_io)
+        # serialize once, shared by the sends to all the clients.
+        self.__broadcast_package = SerializedMessages(
+            Task, self.__broadcast_task, [(file_info, file_io)])
 
     async def on_broadcast(self, client):
-        await evaluate(client, self._config.get("job-id"),
-                       self.__broadcast_task, self.__broadcast_file,
-                       self._config.get("ssl"))
+        await self._send_task(evaluate, client, self.__broadcast_task,
+                              self.__broadcast_package)
         logging.info("Broadcast to client %s success.", client)
 
     def __construct_broadcast_task(self):
@@ -4,7 +4,6 @@
 # pylint:disable=too-many-arguments, no-member
 """Train Round Module."""
 from os.path import basename
-import pickle
 
 from absl import logging
 from neursafe_fl.python.utils.file_io import unzip, zip_files
@@ -12,15 +11,50 @@ from neursafe_fl.python.utils.file_io import unzip, zip_files
 from neursafe_fl.proto.message_pb2 import Task, TaskSpec, Metadata, File, \
     Scripts, Optimizer
 from neursafe_fl.python.coordinator.common.utils import join
-from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
-    WeightAggregator
+from neursafe_fl.python.coordinator.aggregator.aggregator import \
+    create_aggregator
 from neursafe_fl.python.coordinator.client_stub import train, stop
 from neursafe_fl.python.coordinator.extenders import (broadcast_extender,
                                                       aggregate_extender,
                                                       finish_extender)
 from neursafe_fl.python.coordinator.rounds.base_round import BaseRound, \
     PACKAGE_IO_NAME
+from neursafe_fl.python.coordinator.update_executor import update_executor
 from neursafe_fl.python.runtime.runtime_factory import RuntimeFactory
+from neursafe_fl.python.runtime.weights import FlatWeights
+from neursafe_fl.python.trans.grpc_call import SerializedMessages
+from neursafe_fl.python.trans import weights_format
+
+
+def decode_update(files, unzip_path, runtime, compression=None,
+                  sparse=False):
+    """Decode the weights and extract the custom files of client's update.
+
+    Executed by the update executor, maybe in other thread or process.
+
+    Args:
+        files: the files uploaded by client, the first one is weights, the
+               second one is optional custom files.
+        unzip_path: where to extract the custom files.
+        runtime: the runtime of the model.
+        compression: the compression algorithm of weights if used.
+        sparse: decode the weights into sparse layers if the compression
+                supports, the values are not scattered into dense arrays.
+    Returns:
+        The weights decoded.
+    """
+    if len(files) > 1:
+        unzip(files[1][1], unzip_path)
+
+    weights = weights_format.decode(files[0][1])
+
+    if compression:
+        weights_converter = RuntimeFactory.create_weights_converter(runtime)
+        if sparse and compression.sparse:
+            return weights_converter.decode_sparse(weights, compression)
+        return weights_converter.decode(weights, compression)
+
+    return weights
 
 
 class TrainRound(BaseRound):
@@ -43,12 +77,11 @@ class TrainRound(BaseRound):
         self.__extender_process = bool(self.__extenders)
 
         # aggregator default use the libs' weight_aggregator
-        # TODO later aggregator will be created by configuration
-        #  also support the user's custom aggregator.
-        self.__aggregator = WeightAggregator(ssa_server)
+        self.__aggregator = create_aggregator(config.get("aggregator"),
+                                              ssa_server=ssa_server)
 
         self.__broadcast_task = None  # params broadcast to client
-        self.__broadcast_file = None  # file broadcast to client
+        self.__broadcast_package = None  # task and file broadcast to client
         self.__extend_params = None  # user custom params for extender func
 
     def on_prepare(self):
@@ -63,16 +96,18 @@ class TrainRound(BaseRound):
             self.__broadcast_task.spec.custom_params.update(custom["params"])
 
         files = self._extract_file(custom)
+        self._extract_bundles(custom, self.__broadcast_task)
         logging.info(files)
         file_io = zip_files(files)
         file_info = File(name=PACKAGE_IO_NAME, compress=True)
-        self.__broadcast_file = (file_info, file_io)
+        # serialize once, shared by the sends to all the clients.
+        self.__broadcast_package = SerializedMessages(
+            Task, self.__broadcast_task, [(file_info, file_io)])
 
     async def on_broadcast(self, client):
         """Broadcast callback."""
-        await train(client, self._config.get("job-id"),
-                    self.__broadcast_task, self.__broadcast_file,
-                    self._config.get("ssl"))
+        await self._send_task(train, client, self.__broadcast_task,
+                              self.__broadcast_package)
         logging.info("Broadcast to client %s success.", client)
 
     def __construct_broadcast_task(self):
@@ -144,12 +179,13 @@ class TrainRound(BaseRound):
 
     async def on_aggregate(self, msg, number):
         """Aggregate callback."""
-        data = self.__extract_training_result(msg, number)
+        data = await self.extract_update(msg, number)
 
-        self.__aggregator.accumulate(data)
+        await update_executor.accumulate(self.__aggregator.accumulate, data)
 
         # extender process: user's extend functions
         if self.__extender_process:
+            data = dict(data, weights=self.__unflatten(data["weights"]))
             result = {}
             for extender in self.__extenders:
                 func = extender.get("aggregate")
@@ -157,32 +193,25 @@ class TrainRound(BaseRound):
                 result.update(tmp)
             self.__extend_params = result
 
-    def __extract_training_result(self, msg, number):
+    async def extract_update(self, msg, number):
+        """Decode the weights and extract the custom files of the update.
+
+        Args:
+            msg: client's upload data, including training metrics, weights .etc
+            number: the serial number of the uploaded client update.
+        Returns:
+            The update data to be accumulated by aggregator.
+        """
         params, files = msg[0], msg[1]
         unzip_path = self._workspace.get_client_upload_dir(self._round_id,
                                                            number)
 
-        def parse_weights(weights_io):
-            weights_io.seek(0)
-            return pickle.loads(files[0][1].read())
-
-        def parse_custom_configuration():
-            if len(files) > 1:
-                files_io = files[1][1]
-                unzip(files_io, unzip_path)
-
-        def decode_weights_if_needed():
-            if self._compression:
-                weights_converter = RuntimeFactory.create_weights_converter(
-                    self._config["runtime"])
-
-                return weights_converter.decode(weights, self._compression)
-
-            return weights
-
-        parse_custom_configuration()
-        weights = parse_weights(files[0][1])
-        raw_weights = decode_weights_if_needed()
+        # the extenders process the dense weights.
+        sparse = self.__aggregator.support_sparse \
+            and not self.__extender_process
+        raw_weights = await update_executor.decode(
+            decode_update, files, unzip_path, self._config["runtime"],
+            self._compression, sparse)
 
         return {"weights": raw_weights,
                 "custom_files": join(unzip_path, "custom/"),
@@ -195,12 +224,22 @@ class TrainRound(BaseRound):
         result = await self.__aggregator.aggregate()
 
         if self.__extender_process:
+            if "weights" in result:
+                result["weights"] = self.__unflatten(result["weights"])
             for extender in self.__extenders:
                 func = extender.get("finish")
                 finish_extender(func, self.__extend_params, result)
 
         return result
 
+    def __unflatten(self, weights):
+        # the extenders always process the weights layer by layer.
+        if isinstance(weights, FlatWeights):
+            weights_converter = RuntimeFactory.create_weights_converter(
+                self._config["runtime"])
+            return weights_converter.unflatten(weights)
+        return weights
+
     async def on_stop(self, client):
         """Stop callback."""
         metadata = Metadata(job_name=self._config["job_name"],
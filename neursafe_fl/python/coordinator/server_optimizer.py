@@ -0,0 +1,222 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Server optimizers, apply the aggregated delta weights adaptively.
+
+Reference: Adaptive Federated Optimization, https://arxiv.org/abs/2003.00295
+"""
+
+import abc
+
+import numpy as np
+
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+STEP_KEY = "step"
+FIRST_MOMENT_PREFIX = "m/"
+SECOND_MOMENT_PREFIX = "v/"
+
+
+def _is_floating(dtype):
+    return np.issubdtype(np.dtype(dtype), np.floating)
+
+
+class ServerOptimizer(abc.ABC):
+    """Adaptive server optimizer, the aggregated delta weights are treated as
+    the pseudo gradient, and converted to the update of server model:
+
+        m = beta1 * m + (1 - beta1) * delta
+        v = second moment of delta, different among the optimizers
+        update = learning_rate * m / (sqrt(v) + tau)
+
+    The moments are allocated in the layout of weights at the first step,
+    each step updates them in place, and the update is written into the delta
+    weights in place, so stepping allocates no new full-size array. The non
+    floating layers, such as counters, are not changed.
+
+    Args:
+        learning_rate: the server learning rate.
+        beta1: the decay rate of the first moment.
+        beta2: the decay rate of the second moment, not used by FedAdagrad.
+        tau: the adaptivity degree, the second moment is initialized with
+             tau ** 2.
+    """
+
+    def __init__(self, learning_rate=0.01, beta1=0.9, beta2=0.99, tau=1e-3):
+        self._learning_rate = learning_rate
+        self._beta1 = beta1
+        self._beta2 = beta2
+        self._tau = tau
+
+        self.__step = 0
+        # (first moment, second moment) of each layer.
+        self.__moments = {}
+        self.__scratch = {}
+
+    @property
+    def step_num(self):
+        """The number of steps applied."""
+        return self.__step
+
+    def step(self, delta_weights):
+        """Convert the aggregated delta weights to the update of server
+        model in place.
+
+        Args:
+            delta_weights: the aggregated delta weights, list, OrderedDict or
+                           FlatWeights format, overwritten by the update.
+        Returns:
+            The update, the same object as delta_weights.
+        """
+        if isinstance(delta_weights, FlatWeights):
+            self.__step_flat(delta_weights)
+        else:
+            items = enumerate(delta_weights) \
+                if isinstance(delta_weights, list) else delta_weights.items()
+            for key, value in items:
+                delta = np.asarray(value)
+                if _is_floating(delta.dtype):
+                    self.__step_layer(str(key), delta)
+
+        self.__step += 1
+        return delta_weights
+
+    def __step_flat(self, delta_weights):
+        vector = delta_weights.vector
+        # the non floating layers are cast into the vector, keep them.
+        kept = [(layer, delta_weights.layer(layer).copy())
+                for layer in delta_weights.layers
+                if not _is_floating(layer.dtype)]
+
+        self.__step_layer("vector", vector)
+
+        for layer, value in kept:
+            size = value.size
+            vector[layer.offset:layer.offset + size] = value.reshape(-1)
+
+    def __step_layer(self, key, delta):
+        first_moment, second_moment = self.__get_moments(key, delta)
+        scratch, square = self.__get_scratch(delta)
+
+        # m = beta1 * m + (1 - beta1) * delta
+        np.multiply(first_moment, self._beta1, out=first_moment)
+        np.multiply(delta, 1 - self._beta1, out=scratch)
+        np.add(first_moment, scratch, out=first_moment)
+
+        np.square(delta, out=square)
+        self._update_second_moment(second_moment, square, scratch)
+
+        # update = learning_rate * m / (sqrt(v) + tau)
+        np.sqrt(second_moment, out=scratch)
+        np.add(scratch, self._tau, out=scratch)
+        np.divide(first_moment, scratch, out=scratch)
+        np.multiply(scratch, self._learning_rate, out=delta,
+                    casting="same_kind")
+
+    @abc.abstractmethod
+    def _update_second_moment(self, second_moment, square, scratch):
+        """Update the second moment in place.
+
+        Args:
+            second_moment: the second moment v to be updated.
+            square: the square of delta, could be overwritten.
+            scratch: a scratch buffer with the same shape.
+        """
+
+    def __get_moments(self, key, delta):
+        moments = self.__moments.get(key)
+        if moments is None:
+            dtype = np.promote_types(delta.dtype, np.float32)
+            moments = (np.zeros(delta.shape, dtype=dtype),
+                       np.full(delta.shape, self._tau ** 2, dtype=dtype))
+            self.__moments[key] = moments
+
+        if moments[0].shape != delta.shape:
+            raise ValueError("Layer %s shape %s not match the moment shape "
+                             "%s." % (key, delta.shape, moments[0].shape))
+        return moments
+
+    def __get_scratch(self, delta):
+        dtype = np.promote_types(delta.dtype, np.float32)
+        scratch = self.__scratch.get(dtype)
+        if scratch is None or scratch[0].size < delta.size:
+            scratch = (np.empty(delta.size, dtype=dtype),
+                       np.empty(delta.size, dtype=dtype))
+            self.__scratch[dtype] = scratch
+        return [buffer[:delta.size].reshape(delta.shape) for buffer in scratch]
+
+    def state_dict(self):
+        """The state to be checkpointed, a dict of ndarray."""
+        state = {STEP_KEY: np.array(self.__step)}
+        for key, (first_moment, second_moment) in self.__moments.items():
+            state[FIRST_MOMENT_PREFIX + key] = first_moment
+            state[SECOND_MOMENT_PREFIX + key] = second_moment
+        return state
+
+    def load_state_dict(self, state):
+        """Restore the state from state_dict."""
+        self.__step = int(state[STEP_KEY])
+        self.__moments = {}
+        for key, value in state.items():
+            if key.startswith(FIRST_MOMENT_PREFIX):
+                name = key[len(FIRST_MOMENT_PREFIX):]
+                self.__moments[name] = (
+                    np.array(value),
+                    np.array(state[SECOND_MOMENT_PREFIX + name]))
+
+    def save(self, path):
+        """Save the state to a npz file."""
+        with open(path, "wb") as state_file:
+            np.savez(state_file, **self.state_dict())
+
+    def load(self, path):
+        """Load the state from a npz file saved by save."""
+        with np.load(path) as state:
+            self.load_state_dict(dict(state.items()))
+
+
+class FedAdagrad(ServerOptimizer):
+    """v = v + delta ** 2"""
+
+    def _update_second_moment(self, second_moment, square, scratch):
+        np.add(second_moment, square, out=second_moment)
+
+
+class FedAdam(ServerOptimizer):
+    """v = beta2 * v + (1 - beta2) * delta ** 2"""
+
+    def _update_second_moment(self, second_moment, square, scratch):
+        np.multiply(second_moment, self._beta2, out=second_moment)
+        np.multiply(square, 1 - self._beta2, out=square)
+        np.add(second_moment, square, out=second_moment)
+
+
+class FedYogi(ServerOptimizer):
+    """v = v - (1 - beta2) * delta ** 2 * sign(v - delta ** 2)"""
+
+    def _update_second_moment(self, second_moment, square, scratch):
+        np.subtract(second_moment, square, out=scratch)
+        np.sign(scratch, out=scratch)
+        np.multiply(scratch, square, out=scratch)
+        np.multiply(scratch, 1 - self._beta2, out=scratch)
+        np.subtract(second_moment, scratch, out=second_moment)
+
+
+SERVER_OPTIMIZERS = {"fedadagrad": FedAdagrad,
+                     "fedadam": FedAdam,
+                     "fedyogi": FedYogi}
+
+
+def create_server_optimizer(config=None):
+    """Create server optimizer from configuration.
+
+    Args:
+        config: {"name": name, "params": {}}, the params are the arguments of
+                the optimizer. If not configured, returns None, the delta
+                weights are added to server model directly.
+    """
+    if not config:
+        return None
+
+    return SERVER_OPTIMIZERS[config["name"].lower()](
+        **config.get("params", {}))
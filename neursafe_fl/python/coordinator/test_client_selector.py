@@ -42,6 +42,16 @@ class TestClientSelector(unittest.TestCase):
             loop = asyncio.get_event_loop()
             loop.run_until_complete(self.client_selector.select(policy))
 
+    def test_should_not_select_excluded_clients(self):
+        policy = {"client_num": 2, "exclude": ["0.0.0.1:77981"]}
+        loop = asyncio.get_event_loop()
+        result = loop.run_until_complete(self.client_selector.select(policy))
+        self.assertCountEqual(result, ["0.0.0.1:77982", "0.0.0.1:77983"])
+
+        policy = {"client_num": 3, "exclude": ["0.0.0.1:77981"]}
+        with self.assertRaises(DeviceNotEnoughError):
+            loop.run_until_complete(self.client_selector.select(policy))
+
     def test_should_selector_init_failed_when_config_format_error(self):
         error_config = ["1", "2"]
         with self.assertRaises(Exception):
@@ -0,0 +1,191 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring, invalid-name
+"""Edge Aggregator UnitTest.
+
+The edge aggregators run in their own processes, the clients and coordinator
+are faked by gRPC services in the test process.
+"""
+import asyncio
+import multiprocessing
+import socket
+import unittest
+from io import BytesIO
+
+import numpy as np
+from grpclib.server import Stream
+
+from neursafe_fl.proto.message_pb2 import Task, TaskResult, Response, \
+    Metadata, File, Status
+from neursafe_fl.proto.reply_service_grpc import TrainReplyServiceStub
+from neursafe_fl.proto.train_service_grpc import TrainServiceBase
+from neursafe_fl.python.coordinator.aggregator.weight_aggregator import \
+    WeightAggregator
+from neursafe_fl.python.coordinator.client_stub import train
+from neursafe_fl.python.coordinator.edge_aggregator import EdgeAggregator
+from neursafe_fl.python.coordinator.grpc_services import TrainReplyService
+from neursafe_fl.python.trans.grpc import GRPCServer
+from neursafe_fl.python.trans.grpc_call import stream_call, \
+    unpackage_stream, extract_metadata
+from neursafe_fl.python.trans.grpc_pool import GRPCPool
+from neursafe_fl.python.trans import weights_format
+
+HOST = "127.0.0.1"
+
+# client: (delta weights, sample number)
+UPDATES = {index: ([np.full((2, 3), index, dtype=np.float32),
+                    np.arange(4, dtype=np.float32) * index],
+                   10 * index)
+           for index in range(1, 6)}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _run_edge(config):
+    asyncio.run(EdgeAggregator(config).start())
+
+
+class FakeClient(TrainServiceBase):
+    """Report a fixed update to its server when received train task."""
+
+    def __init__(self, index, server):
+        self.__index = index
+        self.__server = server
+        self.__tasks = set()
+
+    async def Train(self, stream: Stream[Task, Response]):
+        task, _ = await unpackage_stream(stream)
+        grpc_metadata = extract_metadata(stream, keys=["module-id",
+                                                       "client_id"])
+        await stream.send_message(Response(state='success'))
+        report = asyncio.create_task(self.__report(task, grpc_metadata))
+        self.__tasks.add(report)
+
+    async def Stop(self, stream: Stream[Metadata, Response]):
+        await stream.recv_message()
+        await stream.send_message(Response(state='success'))
+
+    async def __report(self, task, grpc_metadata):
+        weights, sample_num = UPDATES[self.__index]
+        result = TaskResult(metadata=task.metadata,
+                            client_id=grpc_metadata["client_id"],
+                            status=Status.success)
+        result.spec.metrics.update({"sample_num": sample_num,
+                                    "accuracy": self.__index / 10})
+        await stream_call(TrainReplyServiceStub, "TrainReply", TaskResult,
+                          self.__server, config=result,
+                          file_like_objs=[(File(name="delta_weights"),
+                                           weights_format.encode(weights))],
+                          metadata=grpc_metadata)
+
+
+class TestEdgeAggregator(unittest.TestCase):
+    """Test class."""
+
+    def setUp(self):
+        self.coordinator = "%s:%s" % (HOST, _free_port())
+        self.clients = {index: "%s:%s" % (HOST, _free_port())
+                        for index in UPDATES}
+        self.edges = ["%s:%s" % (HOST, _free_port()) for _ in range(2)]
+        # edge 0 aggregates client 1, 2, edge 1 aggregates client 3, 4, 5.
+        self.edge_clients = [[1, 2], [3, 4, 5]]
+
+        context = multiprocessing.get_context("spawn")
+        self.processes = []
+        for edge, clients in zip(self.edges, self.edge_clients):
+            host, port = edge.split(":")
+            config = {"host": host, "port": int(port),
+                      "server": self.coordinator,
+                      "clients": ",".join(self.clients[index]
+                                          for index in clients),
+                      "timeout": 10}
+            process = context.Process(target=_run_edge, args=(config,),
+                                      daemon=True)
+            process.start()
+            self.processes.append(process)
+
+    def tearDown(self):
+        for process in self.processes:
+            process.terminate()
+            process.join()
+
+    def __client_server(self, index):
+        for edge, clients in zip(self.edges, self.edge_clients):
+            if index in clients:
+                return edge
+        return None
+
+    async def __train_by_edges(self):
+        replies = []
+        replied = asyncio.Event()
+
+        async def msg_mux(msg_type, msg):
+            del msg_type
+            replies.append(msg)
+            if len(replies) == len(self.edges):
+                replied.set()
+
+        servers = [GRPCServer(HOST, int(self.coordinator.split(":")[1]),
+                              [TrainReplyService(msg_mux)])]
+        for index, address in self.clients.items():
+            servers.append(GRPCServer(
+                HOST, int(address.split(":")[1]),
+                [FakeClient(index, self.__client_server(index))]))
+        for server in servers:
+            await server.start()
+
+        task = Task(metadata=Metadata(job_name="test", round=1))
+        package = (File(name="package.zip"), BytesIO(b"package"))
+        for edge in self.edges:
+            for _ in range(50):
+                try:
+                    await train(edge, "job-id", task, [package])
+                    break
+                except Exception:  # pylint:disable=broad-except
+                    # wait the edge process started.
+                    await asyncio.sleep(0.2)
+
+        await asyncio.wait_for(replied.wait(), 30)
+        GRPCPool.instance().close_all()
+        for server in servers:
+            server.close()
+        return replies
+
+    def test_should_edge_aggregation_equal_flat_fedavg(self):
+        replies = asyncio.run(self.__train_by_edges())
+
+        self.assertCountEqual([params.client_id for params, _ in replies],
+                              self.edges)
+        aggregator = WeightAggregator()
+        for params, files in replies:
+            self.assertEqual(params.status, Status.success)
+            weights = weights_format.decode(files[0][1])
+            aggregator.accumulate({"weights": weights,
+                                   "metrics": params.spec.metrics})
+        result = asyncio.run(aggregator.aggregate())
+
+        flat_aggregator = WeightAggregator()
+        for index, (weights, sample_num) in UPDATES.items():
+            flat_aggregator.accumulate({"weights": weights,
+                                        "metrics": {
+                                            "sample_num": sample_num,
+                                            "accuracy": index / 10}})
+        expected = asyncio.run(flat_aggregator.aggregate())
+
+        for layer, expected_layer in zip(result["weights"],
+                                         expected["weights"]):
+            np.testing.assert_allclose(layer, expected_layer, rtol=1e-6)
+        self.assertAlmostEqual(result["metrics"]["accuracy"],
+                               expected["metrics"]["accuracy"])
+        self.assertEqual(sum(params.spec.metrics["sample_num"]
+                             for params, _ in replies),
+                         sum(sample_num for _, sample_num in UPDATES.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
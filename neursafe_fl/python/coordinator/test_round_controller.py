@@ -0,0 +1,178 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""Async Round Controller UnitTest."""
+import asyncio
+import unittest
+
+import numpy as np
+
+from neursafe_fl.proto.message_pb2 import TaskResult, Metadata, Status
+from neursafe_fl.python.coordinator.round_controller import \
+    AsyncRoundController, staleness_weight
+
+
+class FakeRound:
+    """Record the broadcast, return the updates of the clients."""
+
+    def __init__(self, version, updates, broadcasts, stops):
+        self.version = version
+        self.__updates = updates
+        self.__broadcasts = broadcasts
+        self.__stops = stops
+
+    def on_prepare(self):
+        pass
+
+    async def on_broadcast(self, client):
+        self.__broadcasts.append((client, self.version))
+
+    async def extract_update(self, msg, number):
+        del number
+        value = self.__updates[msg[0].client_id]
+        return {"weights": [np.array([value])],
+                "metrics": {"sample_num": 10},
+                "client_id": msg[0].client_id}
+
+    async def on_stop(self, client):
+        self.__stops.append(client)
+
+
+def _reply(client, version):
+    return (TaskResult(metadata=Metadata(job_name="test", round=version),
+                       client_id=client, status=Status.success), None)
+
+
+class TestAsyncRoundController(unittest.TestCase):
+    """Test class."""
+
+    def setUp(self):
+        self.updates = {}
+        self.broadcasts = []
+        self.stops = []
+        self.steps = []
+        self.cleaned = []
+        self.config = {"job_name": "test", "clients": "a, b, c"}
+        self.hyper = {"max_round_num": 2, "client_num": 3,
+                      "threshold_client_num": 2, "round_timeout": 10,
+                      "staleness_exponent": 1.0}
+
+    def __create_controller(self):
+        def create_round(version):
+            return FakeRound(version, self.updates, self.broadcasts,
+                             self.stops)
+
+        async def on_step(version, result):
+            self.steps.append((version, result))
+
+        return AsyncRoundController(self.hyper, self.config, create_round,
+                                    on_step, self.cleaned.append)
+
+    def __training_version(self, client):
+        return [version for name, version in self.broadcasts
+                if name == client][-1]
+
+    def test_should_weight_stale_updates_when_buffer_full(self):
+        async def run():
+            controller = self.__create_controller()
+            task = asyncio.create_task(controller.run())
+            await asyncio.sleep(0.1)
+            self.assertCountEqual(self.broadcasts,
+                                  [("a", 1), ("b", 1), ("c", 1)])
+
+            self.updates.update({"a": 1.0, "b": 4.0})
+            await controller.process_msg(_reply("a", 1))
+            await controller.process_msg(_reply("b", 1))
+            await asyncio.sleep(0.1)
+            self.assertEqual(controller.version, 2)
+            # the free clients are dispatched again at once.
+            self.assertEqual(len(self.broadcasts), 5)
+
+            self.updates.update({"c": 0.0, "a": 3.0})
+            await controller.process_msg(_reply("c", 1))
+            await controller.process_msg(
+                _reply("a", self.__training_version("a")))
+            await asyncio.wait_for(task, 1)
+            return 2 - self.broadcasts[3][1]
+
+        a_staleness = asyncio.run(run())
+
+        self.assertEqual([version for version, _ in self.steps], [1, 2])
+        np.testing.assert_allclose(self.steps[0][1].delta_weights[0], [2.5])
+
+        c_weight = staleness_weight(10, 1, 1.0)
+        a_weight = staleness_weight(10, a_staleness, 1.0)
+        np.testing.assert_allclose(self.steps[1][1].delta_weights[0],
+                                   [3.0 * a_weight / (c_weight + a_weight)])
+        self.assertTrue(self.steps[1][1].status)
+        self.assertEqual(self.steps[1][1].statistics.success, 2)
+        # the clients still training are stopped when finished.
+        self.assertIn("b", self.stops)
+        self.assertCountEqual(self.cleaned, [1, 2])
+
+    def test_should_ignore_update_when_client_not_training(self):
+        async def run():
+            controller = self.__create_controller()
+            task = asyncio.create_task(controller.run())
+            await asyncio.sleep(0.1)
+
+            self.updates.update({"a": 1.0})
+            await controller.process_msg(_reply("a", 1))
+            # repeated message, a is training version 1 again.
+            await controller.process_msg(_reply("a", 2))
+            await controller.stop()
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(run())
+
+        self.assertEqual(self.steps, [])
+        self.assertCountEqual(self.stops, ["a", "b", "c"])
+
+    def test_should_aggregate_buffered_updates_in_timeout(self):
+        self.hyper.update({"round_timeout": 0.2, "max_round_num": 1})
+
+        async def run():
+            controller = self.__create_controller()
+            task = asyncio.create_task(controller.run())
+            await asyncio.sleep(0.1)
+            self.updates.update({"a": 1.0})
+            await controller.process_msg(_reply("a", 1))
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(run())
+
+        self.assertEqual(len(self.steps), 1)
+        self.assertTrue(self.steps[0][1].status)
+        self.assertEqual(self.steps[0][1].statistics.success, 1)
+        np.testing.assert_allclose(self.steps[0][1].delta_weights[0], [1.0])
+
+    def test_should_not_advance_version_when_step_failed(self):
+        self.hyper.update({"round_timeout": 0.2, "max_round_num": 2})
+
+        async def run():
+            controller = self.__create_controller()
+            task = asyncio.create_task(controller.run())
+            # no update in the first step, the clients time out.
+            await asyncio.sleep(0.3)
+            self.assertEqual(controller.version, 1)
+            self.updates.update({"a": 1.0})
+            await controller.process_msg(
+                _reply("a", self.__training_version("a")))
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(run())
+
+        self.assertEqual([(version, result.status)
+                          for version, result in self.steps],
+                         [(1, False), (1, True)])
+        self.assertEqual(self.steps[1][1].statistics.success, 1)
+
+    def test_staleness_weight(self):
+        self.assertEqual(staleness_weight(10, 0, 0.5), 10)
+        self.assertEqual(staleness_weight(10, 3, 0.5), 5)
+        self.assertEqual(staleness_weight(10, 3, 0), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""Server Optimizer UnitTest."""
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+from neursafe_fl.python.coordinator.server_optimizer import \
+    create_server_optimizer, ServerOptimizer, FedAdam, FedYogi, FedAdagrad
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+LEARNING_RATE, BETA1, BETA2, TAU = 0.1, 0.9, 0.99, 1e-3
+
+
+def _reference(name, deltas):
+    """The updates computed without in place operations."""
+    first_moment = np.zeros_like(deltas[0])
+    second_moment = np.full_like(deltas[0], TAU ** 2)
+    updates = []
+    for delta in deltas:
+        first_moment = BETA1 * first_moment + (1 - BETA1) * delta
+        square = delta ** 2
+        if name == "fedadagrad":
+            second_moment = second_moment + square
+        elif name == "fedadam":
+            second_moment = BETA2 * second_moment + (1 - BETA2) * square
+        else:
+            second_moment = second_moment - (1 - BETA2) * square * np.sign(
+                second_moment - square)
+        updates.append(LEARNING_RATE * first_moment
+                       / (np.sqrt(second_moment) + TAU))
+    return updates
+
+
+def _create(name):
+    return create_server_optimizer({
+        "name": name, "params": {"learning_rate": LEARNING_RATE,
+                                 "beta1": BETA1, "beta2": BETA2,
+                                 "tau": TAU}})
+
+
+class TestServerOptimizer(unittest.TestCase):
+    """Test class."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.deltas = [rng.normal(size=(3, 4)) for _ in range(3)]
+
+    def test_should_create_server_optimizer_by_config(self):
+        self.assertIsNone(create_server_optimizer(None))
+        self.assertIsInstance(_create("FedAdam"), FedAdam)
+        self.assertIsInstance(_create("fedyogi"), FedYogi)
+        self.assertIsInstance(_create("fedadagrad"), FedAdagrad)
+        with self.assertRaises(TypeError):
+            ServerOptimizer()  # pylint:disable=abstract-class-instantiated
+
+    def test_should_update_equal_reference_in_place(self):
+        for name in ["fedadagrad", "fedadam", "fedyogi"]:
+            optimizer = _create(name)
+            for delta, expected in zip(self.deltas,
+                                       _reference(name, self.deltas)):
+                weights = [delta.copy(), np.array([3, 4])]
+                update = optimizer.step(weights)
+                self.assertIs(update, weights)
+                np.testing.assert_allclose(weights[0], expected, rtol=1e-10)
+                # the non floating layers are not changed.
+                np.testing.assert_array_equal(weights[1], [3, 4])
+            self.assertEqual(optimizer.step_num, 3)
+
+    def test_should_update_torch_and_flat_weights(self):
+        expected = _reference("fedadam", self.deltas)
+        optimizer = _create("fedadam")
+        flat_optimizer = _create("fedadam")
+        for delta, expected_update in zip(self.deltas, expected):
+            weights = OrderedDict(
+                [("w", torch.tensor(delta, dtype=torch.float32)),
+                 ("num_batches_tracked", torch.tensor(2))])
+            tensor = weights["w"]
+            optimizer.step(weights)
+            self.assertIs(weights["w"], tensor)
+            np.testing.assert_allclose(tensor.numpy(), expected_update,
+                                       rtol=1e-4, atol=1e-6)
+            self.assertEqual(weights["num_batches_tracked"].item(), 2)
+
+            flat = FlatWeights.flatten(
+                [delta.astype(np.float32), np.array([2], dtype=np.int64)])
+            flat_optimizer.step(flat)
+            layers = flat.unflatten()
+            np.testing.assert_allclose(layers[0], expected_update,
+                                       rtol=1e-4, atol=1e-6)
+            np.testing.assert_array_equal(layers[1], [2])
+
+    def test_should_restore_moments_from_saved_state(self):
+        optimizer = _create("fedyogi")
+        optimizer.step([self.deltas[0].copy()])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "server_optimizer.npz")
+            optimizer.save(path)
+            restored = _create("fedyogi")
+            restored.load(path)
+
+        self.assertEqual(restored.step_num, 1)
+        for delta in self.deltas[1:]:
+            np.testing.assert_array_equal(optimizer.step([delta.copy()])[0],
+                                          restored.step([delta.copy()])[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
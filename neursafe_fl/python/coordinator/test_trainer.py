@@ -2,9 +2,13 @@
 #  SPDX-License-Identifier: Apache-2.0
 
 # pylint:disable=missing-function-docstring, too-many-arguments
+# pylint:disable=protected-access, invalid-name
 """Trainer UnitTest."""
+import os
+import shutil
 import unittest
 import asyncio
+from io import BytesIO
 import mock
 
 from neursafe_fl.python.coordinator.trainer import Trainer, Message
@@ -45,6 +49,10 @@ async def fake_failed_run():
     return result
 
 
+async def fake_async_run():
+    return
+
+
 async def fake_process(msg):
     del msg
     return
@@ -86,6 +94,51 @@ class TestTrainer(unittest.TestCase):
         loop = asyncio.get_event_loop()
         loop.run_until_complete(trainer.start())
 
+    @mock.patch("neursafe_fl.python.coordinator.trainer.delete")
+    @mock.patch("neursafe_fl.python.coordinator.rounds.train_round.TrainRound.run")
+    @mock.patch("neursafe_fl.python.coordinator.rounds.evaluate_round.EvaluateRound.run")
+    @mock.patch("neursafe_fl.python.coordinator.fl_model.FlModel.add_delta_weights")
+    @mock.patch("neursafe_fl.python.coordinator.fl_model.FlModel.save_model")
+    @mock.patch("neursafe_fl.python.coordinator.fl_model.FlModel.load")
+    def test_should_evaluate_concurrently_with_next_round_when_pipelined(
+            self, load, save, add, e_run, t_run, delete):
+        events = []
+        delete.side_effect = events.append
+
+        async def fake_train_run():
+            await asyncio.sleep(0.01)
+            events.append("train_end")
+            return await fake_success_run()
+
+        async def fake_evaluate_run():
+            events.append("evaluate_start")
+            await asyncio.sleep(0.05)
+            events.append("evaluate_end")
+            return await fake_success_run()
+
+        load.return_value = None
+        save.return_value = None
+        add.return_value = None
+        e_run.side_effect = fake_evaluate_run
+        t_run.side_effect = fake_train_run
+        config = trainer_config()
+        config["hyper_parameters"].update({"max_round_num": 2,
+                                           "evaluate_interval": 1,
+                                           "pipeline_evaluation": True})
+        trainer = Trainer(config)
+
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(trainer.start())
+
+        # the round is cleaned after its evaluation, not when training ends.
+        workspace = trainer._Trainer__workspace
+        round_dirs = [workspace.get_round_dir(1), workspace.get_round_dir(2)]
+        self.assertEqual(events, ["train_end", "evaluate_start", "train_end",
+                                  "evaluate_end", round_dirs[0],
+                                  "evaluate_start", "evaluate_end",
+                                  round_dirs[1], workspace.get_tmp_dir()])
+        save.assert_called_once()
+
     @mock.patch("neursafe_fl.python.coordinator.rounds.train_round.TrainRound.run")
     @mock.patch("neursafe_fl.python.coordinator.fl_model.FlModel.load")
     def test_should_trainer_run_train_round_failed(self, load, run):
@@ -161,6 +214,78 @@ class TestTrainer(unittest.TestCase):
             loop.run_until_complete(trainer.msg_mux(Message.TRAIN,
                                                     (message, None)))
 
+    @mock.patch("neursafe_fl.python.coordinator.round_controller."
+                "AsyncRoundController.run")
+    @mock.patch("neursafe_fl.python.coordinator.round_controller."
+                "AsyncRoundController.process_msg")
+    @mock.patch("neursafe_fl.python.coordinator.fl_model.FlModel.load")
+    def test_should_trainer_dispatch_stale_message_when_async_mode(
+            self, load, process, run):
+        load.return_value = None
+        process.side_effect = fake_process
+        run.side_effect = fake_async_run
+
+        config = trainer_config()
+        config["hyper_parameters"].update({"mode": "async",
+                                           "round_timeout": 10})
+        trainer = Trainer(config)
+        loop = asyncio.get_event_loop()
+        loop.run_until_complete(trainer.start())
+
+        message = _construct_message(config["job_name"])
+        message.metadata.round = 5
+        loop.run_until_complete(trainer.msg_mux(Message.TRAIN,
+                                                (message, None)))
+        process.assert_called_once()
+
+        message.metadata.job_name = "other"
+        with self.assertRaises(ValueError):
+            loop.run_until_complete(trainer.msg_mux(Message.TRAIN,
+                                                    (message, None)))
+
+    def test_should_spill_upload_to_client_dir_of_running_round(self):
+        config = trainer_config()
+        trainer = Trainer(config)
+        trainer._Trainer__round_id = 1
+        params = mock.Mock(client_id="client-1")
+        params.metadata = _construct_message(config["job_name"]).metadata
+
+        writer = trainer.upload_writer(params, mock.Mock(name="../../evil"))
+        writer.rollover()
+        upload_dir = os.path.dirname(writer.path)
+        try:
+            self.assertEqual(os.path.basename(upload_dir), "client_client-1")
+            self.assertTrue(os.path.basename(writer.path).startswith(
+                "upload-"))
+        finally:
+            shutil.rmtree(trainer._Trainer__workspace.get_tmp_dir())
+
+        params.client_id = "../client-1"
+        self.assertIsInstance(trainer.upload_writer(params, mock.Mock()),
+                              BytesIO)
+        params.client_id = "client-1"
+        params.metadata.round = 2
+        self.assertIsInstance(trainer.upload_writer(params, mock.Mock()),
+                              BytesIO)
+
+    def test_should_refuse_upload_of_not_running_round_in_async_mode(self):
+        config = trainer_config()
+        config["hyper_parameters"].update({"mode": "async",
+                                           "round_timeout": 10})
+        trainer = Trainer(config)
+        controller = mock.Mock()
+        controller.is_running.side_effect = lambda version: version == 3
+        trainer._Trainer__async_controller = controller
+        params = mock.Mock(client_id="client-1")
+        params.metadata = _construct_message(config["job_name"]).metadata
+
+        params.metadata.round = 5
+        self.assertIsInstance(trainer.upload_writer(params, mock.Mock()),
+                              BytesIO)
+        params.metadata.round = 3
+        self.assertNotIsInstance(trainer.upload_writer(params, mock.Mock()),
+                                 BytesIO)
+
     @mock.patch("neursafe_fl.python.coordinator.fl_model.FlModel.load")
     def test_should_trainer_start_failed_when_load_model_failed(self, load):
         def fake_load():
@@ -0,0 +1,100 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""Update executor UnitTest."""
+import asyncio
+import threading
+import time
+import unittest
+
+from neursafe_fl.python.coordinator.update_executor import UpdateExecutor
+
+
+def slow_square(value):
+    time.sleep(0.05)
+    return value * value
+
+
+class TestUpdateExecutor(unittest.TestCase):
+    """Test class."""
+
+    def test_should_raise_exception_when_mode_not_supported(self):
+        with self.assertRaises(ValueError):
+            UpdateExecutor("gpu")
+
+    def test_should_decode_in_event_loop_when_inline_mode(self):
+        executor = UpdateExecutor()
+        result = asyncio.run(executor.decode(threading.get_ident))
+        self.assertEqual(result, threading.get_ident())
+
+    def test_should_event_loop_responsive_when_thread_mode(self):
+        executor = UpdateExecutor("thread", workers=2, max_pending=2)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(executor.queue_depth)
+                await asyncio.sleep(0.01)
+
+        async def run():
+            decodes = [executor.decode(slow_square, i) for i in range(4)]
+            return await asyncio.gather(*decodes, ticker())
+
+        result = asyncio.run(run())
+        executor.shutdown()
+        self.assertEqual(result[:4], [0, 1, 4, 9])
+        self.assertEqual(len(ticks), 5)
+        self.assertEqual(ticks[0], 4)
+        self.assertEqual(executor.queue_depth, 0)
+        self.assertGreaterEqual(executor.decode_latency, 0.05)
+        self.assertGreaterEqual(executor.average_decode_latency, 0.05)
+
+    def test_should_bound_concurrency_by_max_pending(self):
+        executor = UpdateExecutor("thread", workers=4, max_pending=1)
+        running = []
+
+        def decode(value):
+            running.append(value)
+            concurrency = len(running)
+            time.sleep(0.01)
+            running.remove(value)
+            return concurrency
+
+        async def run():
+            return await asyncio.gather(
+                *[executor.decode(decode, i) for i in range(4)])
+
+        self.assertEqual(asyncio.run(run()), [1, 1, 1, 1])
+        executor.shutdown()
+
+    def test_should_accumulate_one_by_one_when_thread_mode(self):
+        executor = UpdateExecutor("thread", workers=4, max_pending=4)
+        total = {"value": 0}
+
+        def accumulate(value):
+            current = total["value"]
+            time.sleep(0.001)
+            total["value"] = current + value
+
+        async def run():
+            await asyncio.gather(
+                *[executor.accumulate(accumulate, i) for i in range(20)])
+
+        asyncio.run(run())
+        executor.shutdown()
+        self.assertEqual(total["value"], sum(range(20)))
+
+    def test_should_decode_success_when_process_mode(self):
+        executor = UpdateExecutor("process", workers=2, max_pending=2)
+
+        async def run():
+            return await asyncio.gather(
+                *[executor.decode(slow_square, i) for i in range(3)])
+
+        self.assertEqual(asyncio.run(run()), [0, 1, 4])
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -305,6 +305,196 @@ class TestValidation(unittest.TestCase):
         'test_validate_secure_algorithm_if_noise_multiplier_not_given')
 
 
+class TestSSAValidation(unittest.TestCase):
+    """unittest class of the SSA fixed point and neighbor validation
+    """
+
+    def test_validate_ssa_fixed_point(self):
+        config = job_config()
+        config["hyper_parameters"]["client_num"] = 2
+        config["hyper_parameters"]["threshold_client_num"] = 2
+
+        config["secure_algorithm"] = {"type": "SSA", "fraction_bits": 16}
+        validate_config(config)
+        config["secure_algorithm"] = {"type": "SSA", "fraction_bits": 40,
+                                      "ring_bits": 64}
+        validate_config(config)
+
+        for secure_algorithm in [{"fraction_bits": 31},
+                                 {"fraction_bits": 16, "ring_bits": 16},
+                                 {"ring_bits": 64}]:
+            config["secure_algorithm"] = {"type": "SSA", **secure_algorithm}
+            with self.assertRaises(ValueError):
+                validate_config(config)
+
+        config["secure_algorithm"] = {"type": "SSA", "fraction_bits": 16.5}
+        with self.assertRaises(TypeError):
+            validate_config(config)
+
+    def test_validate_ssa_neighbor_num(self):
+        config = job_config()
+        config["hyper_parameters"]["client_num"] = 2
+        config["hyper_parameters"]["threshold_client_num"] = 2
+
+        config["secure_algorithm"] = {"type": "SSA", "neighbor_num": 4}
+        validate_config(config)
+
+        for secure_algorithm in [{"neighbor_num": 3},
+                                 {"neighbor_num": 0},
+                                 {"neighbor_num": 4, "mode": "onemask"}]:
+            config["secure_algorithm"] = {"type": "SSA", **secure_algorithm}
+            with self.assertRaises(ValueError):
+                validate_config(config)
+
+
+class TestCompressionValidation(unittest.TestCase):
+    """unittest class of the compression validation
+    """
+
+    def test_should_raise_exception_if_block_quantization_not_correct(self):
+        config = job_config()
+
+        # Quantization bits not exist
+        config["compression"] = {"type": "block_quantization"}
+
+        with self.assertRaises(ValueError):
+            validate_config(config)
+
+        # Block size not correct
+        config["compression"] = {"type": "block_quantization",
+                                 "quantization_bits": 4,
+                                 "block_size": 100}
+
+        with self.assertRaises(ValueError):
+            validate_config(config)
+
+        # Stochastic rounding not correct
+        config["compression"] = {"type": "block_quantization",
+                                 "quantization_bits": 4,
+                                 "stochastic_rounding": "yes"}
+
+        with self.assertRaises(TypeError):
+            validate_config(config)
+
+        # Check successfully
+        config["compression"] = {"type": "block_quantization",
+                                 "quantization_bits": 4,
+                                 "block_size": 128,
+                                 "stochastic_rounding": True}
+        validate_config(config)
+
+    def test_should_raise_exception_if_error_feedback_not_correct(self):
+        config = job_config()
+        config["compression"] = {"type": "selective_masking",
+                                 "top_k_ratio": 0.1,
+                                 "error_feedback": "true"}
+
+        with self.assertRaises(TypeError):
+            validate_config(config)
+
+        config["compression"]["error_feedback"] = True
+        validate_config(config)
+
+    def test_should_raise_exception_if_pipeline_not_correct(self):
+        config = job_config()
+
+        # Stages not exist
+        config["compression"] = {"type": "pipeline"}
+
+        with self.assertRaises(ValueError):
+            validate_config(config)
+
+        # Stages not in order
+        config["compression"] = {
+            "type": "pipeline",
+            "stages": [{"type": "entropy"},
+                       {"type": "selective_masking", "top_k_ratio": 0.1}]}
+
+        with self.assertRaises(ValueError):
+            validate_config(config)
+
+        # Stage parameters not correct
+        config["compression"] = {
+            "type": "pipeline",
+            "stages": [{"type": "selective_masking", "top_k_ratio": 0.1},
+                       {"type": "entropy", "codec": "gzip"}]}
+
+        with self.assertRaises(ValueError):
+            validate_config(config)
+
+        # Check successfully
+        config["compression"] = {
+            "type": "pipeline",
+            "stages": [{"type": "selective_masking", "top_k_ratio": 0.1},
+                       {"type": "quantization", "quantization_bits": 8},
+                       {"type": "entropy", "codec": "zstd", "level": 3}]}
+        validate_config(config)
+
+
+class TestServerOptimizerValidation(unittest.TestCase):
+    """unittest class of the server optimizer validation
+    """
+
+    def test_should_raise_exception_if_server_optimizer_not_correct(self):
+        config = job_config()
+        config["server_optimizer"] = {"name": "fedsgd"}
+        with self.assertRaises(ValueError):
+            validate_config(config)
+
+        config = job_config()
+        config["server_optimizer"] = {"name": "fedadam", "params": 0.1}
+        with self.assertRaises(TypeError):
+            validate_config(config)
+
+        config = job_config()
+        config["server_optimizer"] = {"name": "FedYogi",
+                                      "params": {"learning_rate": 0.1}}
+        validate_config(config)
+
+
+class TestAsyncModeValidation(unittest.TestCase):
+    """unittest class of the async mode validation
+    """
+
+    def test_should_raise_exception_if_async_mode_not_correct(self):
+        try:
+            config = job_config()
+            config["hyper_parameters"]["mode"] = "semi-sync"
+            with self.assertRaises(ValueError):
+                validate_config(config)
+
+            config = job_config()
+            config["hyper_parameters"].update({"mode": "async",
+                                               "buffer_size": 0})
+            with self.assertRaises(ValueError):
+                validate_config(config)
+
+            config = job_config()
+            config["hyper_parameters"].update({"mode": "async",
+                                               "staleness_exponent": -1.0})
+            with self.assertRaises(ValueError):
+                validate_config(config)
+
+            config = job_config()
+            config["hyper_parameters"]["mode"] = "async"
+            config["optimizer"] = {"name": "scaffold"}
+            with self.assertRaises(ValueError):
+                validate_config(config)
+
+            config = job_config()
+            config["hyper_parameters"].update({"mode": "async",
+                                               "concurrency": 4,
+                                               "buffer_size": 2,
+                                               "staleness_exponent": 0.5})
+            validate_config(config)
+        finally:
+            # the default hyper config is updated by the validated config.
+            DEFAULT_HYPER_CONFIG.update({"mode": "sync",
+                                         "staleness_exponent": 0.5})
+            DEFAULT_HYPER_CONFIG.pop("concurrency", None)
+            DEFAULT_HYPER_CONFIG.pop("buffer_size", None)
+
+
 def job_config():
     return {
         "job_name": "test",
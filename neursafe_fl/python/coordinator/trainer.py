@@ -5,11 +5,15 @@
 """Trainer Module."""
 import json
 import asyncio
+import os
+from io import BytesIO
 from absl import logging
 
 from tornado.httpclient import AsyncHTTPClient, HTTPRequest, HTTPError
 
 from neursafe_fl.python.coordinator.grpc_services import Message
+from neursafe_fl.python.coordinator.round_controller import \
+    AsyncRoundController
 from neursafe_fl.python.coordinator.rounds.train_round import TrainRound
 from neursafe_fl.python.coordinator.rounds.evaluate_round import EvaluateRound
 from neursafe_fl.python.coordinator.rounds.custom_round import CustomRound
@@ -18,12 +22,17 @@ from neursafe_fl.python.coordinator.common.utils import join, delete, \
     load_module
 from neursafe_fl.python.coordinator.common.types import Statistics, ErrorCode
 from neursafe_fl.python.coordinator.fl_model import FlModel
+from neursafe_fl.python.coordinator.server_optimizer import \
+    create_server_optimizer
 import neursafe_fl.python.coordinator.common.const as const
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    DEFAULT_RING_BITS
 from neursafe_fl.python.libs.secure.secure_aggregate.ssa import \
     create_ssa_server
 from neursafe_fl.python.libs.optimizer import optimizer_config
 from neursafe_fl.python.libs.loss import loss_config
 from neursafe_fl.python.coordinator.extenders import support_extenders
+from neursafe_fl.python.utils.file_io import SpooledFile
 
 
 class State:
@@ -78,8 +87,15 @@ class Trainer:
         self.__max_rounds = self.__hyper_params["max_round_num"]
         self.__evaluate_interval = self.__hyper_params["evaluate_interval"]
         self.__save_interval = self.__hyper_params["save_interval"]
+        self.__async_mode = self.__hyper_params.get("mode") == "async"
+        self.__pipeline_evaluation = self.__hyper_params.get(
+            "pipeline_evaluation", False)
 
         self.__round = None
+        self.__async_controller = None
+        self.__evaluate_rounds = {}  # running evaluate rounds, index by round
+        # (round id, task) of the evaluation running in background
+        self.__evaluation = None
         self.__round_id = 0
         self.__stats = Statistics()
 
@@ -89,6 +105,8 @@ class Trainer:
         self.__next_ckpt_id = 0
 
         self.__fl_model = FlModel(config["model_path"], config["runtime"])
+        self.__server_optimizer = create_server_optimizer(
+            config.get("server_optimizer"))
         self.__workspace = Workspace(config["output"], config["job_name"])
 
         self.__http_client = AsyncHTTPClient()
@@ -105,17 +123,22 @@ class Trainer:
         self.__restore_checkpoints()
 
         self.__fl_model.load()  # load init model
+        self.__restore_server_optimizer()
         self.__load_extenders()
         self.__load_extenders_for_optimizer_and_loss()
 
         self.__state = State.RUNNING
-        for round_id in range(1, self.__max_rounds + 1):
-            if self.__is_training_stop():
-                self.stop()
-                break
+        if self.__async_mode:
+            await self.__async_process()
+        else:
+            for round_id in range(1, self.__max_rounds + 1):
+                if self.__is_training_stop():
+                    self.stop()
+                    break
 
-            await self.__run_one_round(round_id)
+                await self.__run_one_round(round_id)
 
+        await self.__wait_evaluation()
         logging.info("Federate job finished, statistics:\n%s", self.__stats)
         self.__state = State.STOPPED if self.__force_stop else State.FINISHED
         if self.__stats.success == 0:
@@ -126,6 +149,18 @@ class Trainer:
     def __restore_checkpoints(self):
         self.__checkpoints, _ = self.__workspace.get_checkpoints()
 
+    def __restore_server_optimizer(self):
+        """If start from a checkpoint, restore the moments of server optimizer
+        saved with the checkpoint."""
+        if not self.__server_optimizer:
+            return
+
+        state_file = join(os.path.dirname(self.__config["model_path"]),
+                          Files.ServerOptimizer)
+        if os.path.exists(state_file):
+            self.__server_optimizer.load(state_file)
+            logging.info("Restore server optimizer from %s", state_file)
+
     def stop(self):
         """Stop the main process of job."""
         self.__save_ckpts()
@@ -259,25 +294,82 @@ class Trainer:
         else:
             await self.__default_process()
 
-        self.__clean_round()
+        self.__clean_round_not_evaluating(round_id)
 
     async def __default_process(self):
         """Default process is train and evaluate."""
-        metrics = None
         result = await self.__run_train_round()
-        self.__process_round_result(result)
+        await self.__process_train_result(result)
 
-        if result.status and self.__is_evaluation_conditions():
-            metrics = await self.__run_evaluate_round()
+    async def __process_train_result(self, result):
+        self.__process_round_result(result)
 
-        if result.status and self.__is_save_conditions():
-            if not metrics:
+        if result.status and self.__pipeline_evaluation:
+            await self.__evaluate_in_pipeline()
+        elif result.status:
+            metrics = None
+            if self.__is_evaluation_conditions():
                 metrics = await self.__run_evaluate_round()
 
-            self.__save_ckpts(metrics)
+            if self.__is_save_conditions():
+                if not metrics:
+                    metrics = await self.__run_evaluate_round()
+
+                self.__save_ckpts(metrics)
 
         self.__calculate_statistics(result.status, result.statistics)
 
+    async def __evaluate_in_pipeline(self):
+        """Evaluate the model of this round concurrently with the next
+        training round.
+
+        The evaluation runs on a snapshot of the model, and the checkpoint is
+        saved at once, its metrics are attached when the evaluation finished.
+        Only one evaluation runs at the same time, if the last evaluation is
+        still running, wait it first.
+        """
+        is_save = self.__is_save_conditions()
+        if not (is_save or self.__is_evaluation_conditions()):
+            return
+
+        await self.__wait_evaluation()
+        ckpt = self.__save_model_ckpt() if is_save else None
+        self.__evaluation = (self.__round_id, asyncio.create_task(
+            self.__run_evaluation(self.__round_id, self.__fl_model.snapshot(),
+                                  ckpt)))
+
+    async def __run_evaluation(self, round_id, model, ckpt):
+        try:
+            metrics = await self.__run_evaluate_round(round_id, model)
+            if ckpt and metrics and metrics.get("accuracy"):
+                self.__add_ckpt_info(metrics, *ckpt)
+        finally:
+            self.__clean_round(round_id)
+
+    async def __wait_evaluation(self):
+        if self.__evaluation:
+            (_, evaluation), self.__evaluation = self.__evaluation, None
+            await evaluation
+
+    async def __async_process(self):
+        """Buffered asynchronous process, the clients train continuously and
+        each server step is processed like a round of the default process."""
+        self.__async_controller = AsyncRoundController(
+            self.__hyper_params, self.__config, self.__create_async_round,
+            self.__process_server_step, self.__clean_round_not_evaluating)
+        await self.__async_controller.run()
+
+        if self.__is_training_stop():
+            self.stop()
+
+    def __create_async_round(self, version):
+        return TrainRound(self.__config, version, self.__workspace,
+                          self.__fl_model)
+
+    async def __process_server_step(self, version, result):
+        self.__round_id = version
+        await self.__process_train_result(result)
+
     async def __custom_process(self):
         self.__round = CustomRound(self.__config, self.__round_id,
                                    self.__workspace)
@@ -306,7 +398,13 @@ class Trainer:
                 min_client_num=self.__config["secure_algorithm"]["threshold"],
                 client_num=self.__hyper_params['client_num'],
                 wait_aggregate_interval=self.__hyper_params["round_timeout"],
-                ssl_key=self.__config['ssl'])
+                ssl_key=self.__config['ssl'],
+                fraction_bits=self.__config["secure_algorithm"].get(
+                    "fraction_bits"),
+                ring_bits=self.__config["secure_algorithm"].get(
+                    "ring_bits", DEFAULT_RING_BITS),
+                neighbor_num=self.__config["secure_algorithm"].get(
+                    "neighbor_num"))
             ssa_server.initialize()
 
         self.__round = TrainRound(self.__config, self.__round_id,
@@ -321,11 +419,21 @@ class Trainer:
                  and self.__round_id % self.__evaluate_interval == 0)
                 or self.__round_id == self.__max_rounds)
 
-    async def __run_evaluate_round(self):
-        self.__round = EvaluateRound(self.__config, self.__round_id,
-                                     self.__workspace, self.__fl_model)
-        logging.info("Start evaluating aggregated model.")
-        result = await self.__round.run()
+    async def __run_evaluate_round(self, round_id=None, model=None):
+        round_id = round_id or self.__round_id
+        evaluate_round = EvaluateRound(self.__config, round_id,
+                                       self.__workspace,
+                                       model or self.__fl_model)
+        self.__evaluate_rounds[round_id] = evaluate_round
+        if not self.__pipeline_evaluation:
+            self.__round = evaluate_round
+
+        logging.info("Start evaluating aggregated model of round %s.",
+                     round_id)
+        try:
+            result = await evaluate_round.run()
+        finally:
+            self.__evaluate_rounds.pop(round_id, None)
         if result.status:
             logging.info("Evaluate result %s", result.metrics)
             # TODO, fl board record metrics
@@ -350,6 +458,8 @@ class Trainer:
         logging.info("Save training metrics at: %s", metrics_file)
 
     def __update_model(self, delta_weights):
+        if self.__server_optimizer:
+            delta_weights = self.__server_optimizer.step(delta_weights)
         self.__fl_model.add_delta_weights(delta_weights)
         logging.info("Update server model success.")
 
@@ -372,6 +482,16 @@ class Trainer:
                                        "accuracy": metrics.get("accuracy")}
 
     def __save_ckpts(self, metrics=None):
+        ckpt = self.__save_model_ckpt()
+        if metrics and metrics.get("accuracy"):
+            self.__add_ckpt_info(metrics, *ckpt)
+
+    def __save_model_ckpt(self):
+        """Save the model to a new checkpoint directory.
+
+        Returns:
+            the name, path of checkpoint directory, and the model file.
+        """
         ckpt_dir_name, ckpt_out_path = self.__workspace.create_ckpt_dir(
             self.__next_ckpt_id)
 
@@ -380,13 +500,42 @@ class Trainer:
         ckpt_file = join(ckpt_out_path, ckpt_filename)
 
         self.__fl_model.save_model(ckpt_file)
-
-        if metrics and metrics.get("accuracy"):
-            self.__add_ckpt_info(metrics, ckpt_dir_name,
-                                 ckpt_out_path, ckpt_file)
+        if self.__server_optimizer:
+            self.__server_optimizer.save(join(ckpt_out_path,
+                                              Files.ServerOptimizer))
 
         self.__next_ckpt_id += 1
         logging.info("Saving checkpoint to %s success", ckpt_file)
+        return ckpt_dir_name, ckpt_out_path, ckpt_file
+
+    def upload_writer(self, params, file_info):
+        """Create the writer of the file uploaded by client.
+
+        The file of running round is spooled into the client's upload dir of
+        the round, spilled to disk if larger than UPLOAD_SPOOL_SIZE, and
+        deleted with the round dir. The others are refused later, received in
+        memory.
+        """
+        # the file name is from client, not used in the path of spilled file.
+        del file_info
+        round_id = params.metadata.round
+        if params.metadata.job_name != self.__job_name \
+                or os.path.basename(params.client_id) != params.client_id \
+                or not self.__is_running_round(round_id):
+            return BytesIO()
+
+        upload_dir = self.__workspace.get_client_upload_dir(round_id,
+                                                            params.client_id)
+        return SpooledFile(upload_dir, const.UPLOAD_SPOOL_SIZE,
+                           prefix="upload-")
+
+    def __is_running_round(self, round_id):
+        if round_id in self.__evaluate_rounds:
+            return True
+        if self.__async_mode:
+            return bool(self.__async_controller) \
+                and self.__async_controller.is_running(round_id)
+        return round_id == self.__round_id
 
     async def msg_mux(self, msg_type, msg):
         """Dispatch the message from clients to round."""
@@ -397,20 +546,39 @@ class Trainer:
         await msg_dispatch[msg_type](msg)
 
     async def __process_train_reply(self, msg):
+        if self.__async_mode:
+            # the updates may be trained from any old model version.
+            self.__assert_msg_belongings(msg[0], check_round=False)
+            await self.__async_controller.process_msg(msg)
+            return
+
         self.__assert_msg_belongings(msg[0])
         await self.__round.process(msg)
 
     async def __process_evaluate_reply(self, msg):
-        self.__assert_msg_belongings(msg[0])
-        await self.__round.process(msg)
+        # the evaluation may be running with the next training round.
+        self.__assert_msg_belongings(msg[0], check_round=False)
+        evaluate_round = self.__evaluate_rounds.get(msg[0].metadata.round)
+        if not evaluate_round:
+            logging.error("Evaluate result is not belong to any running "
+                          "evaluate round")
+            raise ValueError("Msg not matched!")
+
+        await evaluate_round.process(msg)
 
     async def __process_stop_cmd(self, msg):
         del msg
         self.__force_stop = True
         self.__state = State.STOPPING
-        await self.__round.stop()
-
-    def __assert_msg_belongings(self, msg):
+        if self.__async_controller:
+            await self.__async_controller.stop()
+        if self.__round:
+            await self.__round.stop()
+        for evaluate_round in list(self.__evaluate_rounds.values()):
+            if evaluate_round is not self.__round:
+                await evaluate_round.stop()
+
+    def __assert_msg_belongings(self, msg, check_round=True):
         """Assert upload message belong to current job and round.
 
         Only the message has the same job name and round id will be processed,
@@ -421,7 +589,7 @@ class Trainer:
             logging.error("Updates is not belong to current job")
             raise ValueError("Msg not matched!")
 
-        if msg.metadata.round != self.__round_id:
+        if check_round and msg.metadata.round != self.__round_id:
             logging.error("Updates is not belong to current round")
             raise ValueError("Msg not matched!")
 
@@ -447,10 +615,17 @@ class Trainer:
         tmp_dir = self.__workspace.get_tmp_dir()
         delete(tmp_dir)
 
-    def __clean_round(self):
+    def __clean_round_not_evaluating(self, round_id):
+        """Clean the round, unless its evaluation is running in pipeline,
+        which cleans the round when finished."""
+        if self.__evaluation and self.__evaluation[0] == round_id:
+            return
+        self.__clean_round(round_id)
+
+    def __clean_round(self, round_id=None):
         """Do clean job after the each round.
 
         Typically, delete the round dir(saving temporary intermediate file).
         """
-        round_dir = self.__workspace.get_round_dir(self.__round_id)
+        round_dir = self.__workspace.get_round_dir(round_id or self.__round_id)
         delete(round_dir)
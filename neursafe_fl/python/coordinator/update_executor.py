@@ -0,0 +1,197 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Execute the decoding and accumulating of clients' updates."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from absl import logging
+
+from neursafe_fl.python.coordinator.common.const import (
+    UPDATE_EXECUTOR_MODE, UPDATE_EXECUTOR_WORKERS,
+    UPDATE_EXECUTOR_MAX_PENDING)
+
+INLINE_MODE = "inline"
+THREAD_MODE = "thread"
+PROCESS_MODE = "process"
+SUPPORTED_MODES = [INLINE_MODE, THREAD_MODE, PROCESS_MODE]
+
+
+class _DecodeStats:
+    """The latency statistics of decoding, unit is second."""
+
+    def __init__(self):
+        self.last = 0
+        self.count = 0
+        self.total = 0
+
+    def record(self, latency):
+        """Record the latency of one decoding."""
+        self.last = latency
+        self.count += 1
+        self.total += latency
+
+    @property
+    def average(self):
+        """The average latency of all the decoding."""
+        if not self.count:
+            return 0
+        return self.total / self.count
+
+
+class _Pools:
+    """The decode and accumulate pools, created when first used."""
+
+    def __init__(self, mode, workers):
+        self.__mode = mode
+        self.__workers = workers
+        self.__decode_pool = None
+        self.__accumulate_pool = None
+
+    def decode_pool(self):
+        """The pool of threads or processes to decode."""
+        if not self.__decode_pool:
+            if self.__mode == PROCESS_MODE:
+                self.__decode_pool = ProcessPoolExecutor(self.__workers)
+            else:
+                self.__decode_pool = ThreadPoolExecutor(
+                    self.__workers, thread_name_prefix="update_decode")
+        return self.__decode_pool
+
+    def accumulate_pool(self):
+        """The single thread to accumulate."""
+        if not self.__accumulate_pool:
+            self.__accumulate_pool = ThreadPoolExecutor(
+                1, thread_name_prefix="update_accumulate")
+        return self.__accumulate_pool
+
+    def shutdown(self):
+        """Shutdown the pools, they will be recreated if used again."""
+        for pool in [self.__decode_pool, self.__accumulate_pool]:
+            if pool:
+                pool.shutdown(wait=False)
+        self.__decode_pool = None
+        self.__accumulate_pool = None
+
+
+class UpdateExecutor:
+    """Decode and accumulate clients' updates out of the event loop.
+
+    Decoding a large update(deserialize, unzip, decompress) may take seconds,
+    executing it in the event loop blocks the heartbeats, the SSA protocol
+    messages and the other uploads. UpdateExecutor decodes the updates in a
+    pool of threads or processes, and accumulates the decoded updates one by
+    one in a dedicated thread, so the accumulation never races and its result
+    does not depend on which update is decoded first.
+
+    Args:
+        mode: inline: execute in the event loop, same as no executor.
+              thread: decode in a thread pool.
+              process: decode in a process pool, the decode function and its
+                       arguments must be picklable.
+        workers: the number of threads or processes to decode.
+        max_pending: the maximum number of updates decoding concurrently,
+                     the others wait in queue, which bounds the memory used
+                     by the decoded updates.
+    """
+
+    def __init__(self, mode=INLINE_MODE, workers=1, max_pending=1):
+        if mode not in SUPPORTED_MODES:
+            raise ValueError("Update executor mode %s not in %s."
+                             % (mode, SUPPORTED_MODES))
+        self.__mode = mode
+        self.__max_pending = max_pending
+
+        self.__pools = _Pools(mode, workers)
+        self.__semaphore = None
+        self.__lock = threading.Lock()
+
+        self.__queue_depth = 0
+        self.__stats = _DecodeStats()
+
+    @property
+    def mode(self):
+        """The execution mode."""
+        return self.__mode
+
+    @property
+    def queue_depth(self):
+        """The number of updates waiting for or in decoding."""
+        return self.__queue_depth
+
+    @property
+    def decode_latency(self):
+        """The latency of the last decoding, including the time in queue,
+        unit is second."""
+        return self.__stats.last
+
+    @property
+    def average_decode_latency(self):
+        """The average latency of all the decoding, unit is second."""
+        return self.__stats.average
+
+    async def decode(self, func, *args):
+        """Execute decode function in pool.
+
+        Args:
+            func: the decode function.
+            args: the arguments of the decode function.
+        Returns:
+            The return of decode function.
+        """
+        start = time.time()
+        self.__queue_depth += 1
+        try:
+            if self.__mode == INLINE_MODE:
+                return func(*args)
+
+            async with self.__get_semaphore():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.__pools.decode_pool(),
+                                                  func, *args)
+        finally:
+            self.__queue_depth -= 1
+            self.__record_latency(time.time() - start)
+
+    async def accumulate(self, func, *args):
+        """Execute accumulate function one by one.
+
+        Args:
+            func: the accumulate function.
+            args: the arguments of the accumulate function.
+        """
+        if self.__mode == INLINE_MODE:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__pools.accumulate_pool(),
+                                          self.__locked_call, func, *args)
+
+    def shutdown(self):
+        """Shutdown the pools, they will be recreated if used again."""
+        self.__pools.shutdown()
+
+    def __locked_call(self, func, *args):
+        with self.__lock:
+            return func(*args)
+
+    def __record_latency(self, latency):
+        self.__stats.record(latency)
+        logging.info("Decode update spend %.3fs, average %.3fs, queue "
+                     "depth %s.", latency, self.average_decode_latency,
+                     self.__queue_depth)
+
+    def __get_semaphore(self):
+        # semaphore is bound to the event loop it used in.
+        loop = asyncio.get_running_loop()
+        if not self.__semaphore or self.__semaphore[0] is not loop:
+            self.__semaphore = (loop, asyncio.Semaphore(self.__max_pending))
+        return self.__semaphore[1]
+
+
+update_executor = UpdateExecutor(UPDATE_EXECUTOR_MODE,
+                                 UPDATE_EXECUTOR_WORKERS,
+                                 UPDATE_EXECUTOR_MAX_PENDING)
@@ -8,15 +8,29 @@ import re
 from neursafe_fl.python.utils.file_io import read_json_file
 from neursafe_fl.python.libs.secure.const import \
     SUPPORTED_SECURE_ALGORITHM, SecureAlgorithm
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    DEFAULT_RING_BITS, check_fixed_point
+from neursafe_fl.python.libs.secure.secure_aggregate.neighbors import \
+    check_neighbor_num
 from neursafe_fl.python.libs.compression.quantization import \
     check_quantization_bits
+from neursafe_fl.python.libs.compression.block_quantization import \
+    check_block_size
 from neursafe_fl.python.libs.compression.subsampling import check_sampling_rate
 from neursafe_fl.python.libs.compression.selective_masking import \
     check_top_k_ratio
+from neursafe_fl.python.libs.compression.entropy import check_codec
+from neursafe_fl.python.libs.compression.pipeline import check_stages
 from neursafe_fl.python.libs.compression.const import \
     CompressionAlgorithm, SUPPORTED_COMPRESSION_ALGORITHM
+from neursafe_fl.python.libs.optimizer import optimizer_config
+from neursafe_fl.python.libs.loss import loss_config
 
 
+SUPPORTED_AGGREGATORS = ["weight_aggregator", "parallel_weight_aggregator"]
+SUPPORTED_TRAINING_MODES = ["sync", "async"]
+SUPPORTED_SERVER_OPTIMIZERS = ["fedadagrad", "fedadam", "fedyogi"]
+
 DEFAULT_HYPER_CONFIG = {
     "max_round_num": 10,
     "client_num": 1,
@@ -24,7 +38,10 @@ DEFAULT_HYPER_CONFIG = {
     "round_timeout": 3600,
     "evaluate_interval": 2,
     "save_interval": 5,
-    "learning_rate": 1.0
+    "learning_rate": 1.0,
+    "mode": "sync",
+    "staleness_exponent": 0.5,
+    "pipeline_evaluation": False
 }
 
 
@@ -88,6 +105,15 @@ def _validate_params(config):
     if "compression" in config:
         _validate_compression_algorithm(config["compression"])
 
+    if "aggregator" in config:
+        _validate_aggregator(config["aggregator"])
+
+    if "server_optimizer" in config:
+        _validate_server_optimizer(config["server_optimizer"])
+
+    if config["hyper_parameters"].get("mode") == "async":
+        _validate_async_mode(config)
+
 
 def _validate_basic_params(config):
     required_rules = {"job_name": str,
@@ -103,7 +129,9 @@ def _validate_basic_params(config):
                       "extenders": dict,
                       "resource": dict,
                       "secure_algorithm": dict,
-                      "datasets": str}
+                      "datasets": str,
+                      "aggregator": dict,
+                      "server_optimizer": dict}
     _validate_required(required_rules, config)
     _validate_optional(optional_rules, config)
 
@@ -121,9 +149,48 @@ def _validate_hyper_params(config):
                       "round_timeout": int,
                       "evaluate_interval": int,
                       "save_interval": int,
-                      "learning_rate": float}
+                      "learning_rate": float,
+                      "mode": str,
+                      "concurrency": int,
+                      "buffer_size": int,
+                      "staleness_exponent": float,
+                      "pipeline_evaluation": bool}
     _validate_optional(optional_rules, config)
 
+    if config.get("mode", "sync") not in SUPPORTED_TRAINING_MODES:
+        raise ValueError("Training mode: %s is not supported, support mode is "
+                         "%s" % (config["mode"], SUPPORTED_TRAINING_MODES))
+
+    for key in ("concurrency", "buffer_size"):
+        if key in config and config[key] is not None and config[key] < 1:
+            raise ValueError("%s must >= 1, now setted %s" % (key,
+                                                              config[key]))
+
+    if config.get("staleness_exponent", 0) < 0:
+        raise ValueError("staleness_exponent must >= 0, now setted %s"
+                         % config["staleness_exponent"])
+
+
+def _validate_async_mode(config):
+    """The clients of async mode train different model versions, the
+    algorithms requiring the same clients and model in a round are not
+    supported."""
+    if ("secure_algorithm" in config
+            and config["secure_algorithm"]["type"].upper()
+            == SecureAlgorithm.ssa.value):
+        raise ValueError("Not support ssa secure algorithm in async mode.")
+
+    if config.get("extender"):
+        raise ValueError("Not support extender in async mode.")
+
+    for type_, extenders in (("optimizer", optimizer_config),
+                             ("loss", loss_config)):
+        if config.get(type_):
+            name = "%s_%s" % (config["runtime"], config[type_].get("name"))
+            if name in extenders:
+                raise ValueError("Not support %s %s in async mode."
+                                 % (type_, config[type_].get("name")))
+
 
 def __validate_quantization_algorithm(config):
     required_rules = {"quantization_bits": int}
@@ -132,6 +199,18 @@ def __validate_quantization_algorithm(config):
     check_quantization_bits(config["quantization_bits"])
 
 
+def __validate_block_quantization_algorithm(config):
+    required_rules = {"quantization_bits": int}
+    optional_rules = {"block_size": int,
+                      "stochastic_rounding": bool}
+    _validate_required(required_rules, config)
+    _validate_optional(optional_rules, config)
+
+    check_quantization_bits(config["quantization_bits"])
+    if "block_size" in config:
+        check_block_size(config["block_size"])
+
+
 def __validate_subsampling_algorithm(config):
     required_rules = {"sampling_rate": float}
     _validate_required(required_rules, config)
@@ -146,9 +225,34 @@ def __validate_selective_masking_algorithm(config):
     check_top_k_ratio(config["top_k_ratio"])
 
 
+def __validate_entropy_algorithm(config):
+    optional_rules = {"codec": str,
+                      "level": int}
+    _validate_optional(optional_rules, config)
+
+    if "codec" in config:
+        check_codec(config["codec"])
+
+
+def __validate_pipeline_algorithm(config):
+    required_rules = {"stages": list}
+    _validate_required(required_rules, config)
+
+    for stage in config["stages"]:
+        if not isinstance(stage, dict):
+            raise TypeError("Expect stage type: %s, but got: %s"
+                            % (dict, type(stage)))
+    check_stages(config["stages"])
+
+    for stage in config["stages"]:
+        _validate_compression_algorithm(stage)
+
+
 def _validate_compression_algorithm(config):
     required_rules = {"type": str}
+    optional_rules = {"error_feedback": bool}
     _validate_required(required_rules, config)
+    _validate_optional(optional_rules, config)
 
     if config["type"].upper() not in SUPPORTED_COMPRESSION_ALGORITHM:
         raise ValueError("Compression algorithm: %s is not supported, support "
@@ -158,12 +262,45 @@ def _validate_compression_algorithm(config):
     if config["type"].upper() == CompressionAlgorithm.quantization.value:
         __validate_quantization_algorithm(config)
 
+    if config["type"].upper() == CompressionAlgorithm.blockquantization.value:
+        __validate_block_quantization_algorithm(config)
+
     if config["type"].upper() == CompressionAlgorithm.subsampling.value:
         __validate_subsampling_algorithm(config)
 
     if config["type"].upper() == CompressionAlgorithm.selectivemasking.value:
         __validate_selective_masking_algorithm(config)
 
+    if config["type"].upper() == CompressionAlgorithm.entropy.value:
+        __validate_entropy_algorithm(config)
+
+    if config["type"].upper() == CompressionAlgorithm.pipeline.value:
+        __validate_pipeline_algorithm(config)
+
+
+def _validate_aggregator(config):
+    required_rules = {"name": str}
+    optional_rules = {"params": dict}
+    _validate_required(required_rules, config)
+    _validate_optional(optional_rules, config)
+
+    if config["name"] not in SUPPORTED_AGGREGATORS:
+        raise ValueError("Aggregator: %s is not supported, support "
+                         "aggregator is %s" % (config["name"],
+                                               SUPPORTED_AGGREGATORS))
+
+
+def _validate_server_optimizer(config):
+    required_rules = {"name": str}
+    optional_rules = {"params": dict}
+    _validate_required(required_rules, config)
+    _validate_optional(optional_rules, config)
+
+    if config["name"].lower() not in SUPPORTED_SERVER_OPTIMIZERS:
+        raise ValueError("Server optimizer: %s is not supported, support "
+                         "server optimizer is %s" % (
+                             config["name"], SUPPORTED_SERVER_OPTIMIZERS))
+
 
 def _validate_secure_algorithm(config):
     required_rules = {"type": str}
@@ -193,13 +330,28 @@ def __validate_secure_algorithm_with_dp(config):
 def __validate_secure_algorithm_with_ssa(config):
     required_rules = {"type": str}
     optional_rules = {"threshold": int,
-                      "mode": str}
+                      "mode": str,
+                      "fraction_bits": int,
+                      "ring_bits": int,
+                      "neighbor_num": int}
 
     _validate_required(required_rules, config)
     _validate_optional(optional_rules, config)
 
     __set_and_validate_mode_with_ssa(config)
 
+    if "fraction_bits" in config:
+        check_fixed_point(config["fraction_bits"],
+                          config.get("ring_bits", DEFAULT_RING_BITS))
+    elif "ring_bits" in config:
+        raise ValueError("The ring_bits of SSA is used with fraction_bits.")
+
+    if "neighbor_num" in config:
+        check_neighbor_num(config["neighbor_num"])
+        if config["mode"].lower() != "doublemask":
+            raise ValueError("The neighbor_num of SSA is only supported in "
+                             "doublemask mode.")
+
 
 def __set_and_validate_mode_with_ssa(config):
     if "mode" not in config:
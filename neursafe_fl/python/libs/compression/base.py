@@ -10,8 +10,16 @@ import abc
 class Compression:
     """
     Compression algorithm base class.
+
+    Attributes:
+        sparse: whether the algorithm transmits a subset of the values, the
+            sparse algorithm also provides decode_sparse, which decodes data
+            into SPARSE(indices, values, shape) without densifying. Callers
+            check this flag before calling decode_sparse.
     """
 
+    sparse = False
+
     @abc.abstractmethod
     def encode(self, *args, **kwargs):
         """Encode data(compress data).
@@ -0,0 +1,110 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""
+Pack the small unsigned integers into a compact byte stream.
+
+The bits of each value are concatenated from the least significant bit, and
+the bit stream is stored in bytes from the least significant bit too, same
+as np.packbits(bitorder="little") of the bits. Every 8 values of `bits` width
+fill exactly `bits` bytes, so the values are packed group by group with
+shift-and-or on uint64 words, the temporary memory is a few bytes per value,
+instead of one integer per bit.
+"""
+
+import numpy as np
+
+GROUP_SIZE = 8
+MAX_BITS = 16
+
+_WORD_BITS = 64
+
+
+def _check_bits(bits):
+    if not 1 <= bits <= MAX_BITS:
+        raise ValueError("The bits must be in range [1, %s], provided bits: "
+                         "%s" % (MAX_BITS, bits))
+
+
+def packed_size(count, bits):
+    """The bytes of count values packed in bits width."""
+    return (count * bits + 7) // 8
+
+
+def pack_bits(values, bits):
+    """Pack the integers in range [0, 2**bits-1] into uint8 byte stream.
+
+    example:
+        values: [0, 1, 2, 3]
+        bits: 2
+
+        [00, 10, 01, 11] -> [11100100] -> [228]
+
+    Args:
+        values: integer numpy array, the values out of range are truncated.
+        bits: the bit width of each value, in range [1, 16].
+    Returns:
+        One dimension uint8 array, packed_size(values.size, bits) bytes.
+    """
+    _check_bits(bits)
+    values = np.reshape(values, -1)
+    count = values.size
+    groups = -(-count // GROUP_SIZE)
+    words = np.zeros((groups, 2 if GROUP_SIZE * bits > _WORD_BITS else 1),
+                     dtype="<u8")
+    mask = np.uint64((1 << bits) - 1)
+
+    for index in range(GROUP_SIZE):
+        value = values[index::GROUP_SIZE].astype(np.uint64) & mask
+        size, shift = value.size, index * bits
+        if shift < _WORD_BITS:
+            words[:size, 0] |= value << np.uint64(shift)
+            if shift + bits > _WORD_BITS:
+                words[:size, 1] |= value >> np.uint64(_WORD_BITS - shift)
+        else:
+            words[:size, 1] |= value << np.uint64(shift - _WORD_BITS)
+
+    stream = words.view(np.uint8)[:, :bits].reshape(-1)
+    return stream[:packed_size(count, bits)]
+
+
+def unpack_bits(stream, bits, count, dtype=np.int32):
+    """Unpack the byte stream into count integers, the inverse of pack_bits.
+
+    Args:
+        stream: uint8 numpy array, packed by pack_bits.
+        bits: the bit width of each value.
+        count: the number of values.
+        dtype: the dtype of the result.
+    Returns:
+        One dimension array of count values.
+    """
+    _check_bits(bits)
+    stream = np.reshape(stream, -1).view(np.uint8)
+    if stream.size < packed_size(count, bits):
+        raise ValueError("The stream of %s bytes is less than %s values of "
+                         "%s bits." % (stream.size, count, bits))
+
+    groups = -(-count // GROUP_SIZE)
+    word_num = 2 if GROUP_SIZE * bits > _WORD_BITS else 1
+    words = np.zeros((groups, word_num * 8), dtype=np.uint8)
+    size = min(stream.size, groups * bits)
+    full = size // bits
+    words[:full, :bits] = stream[:full * bits].reshape(full, bits)
+    if full < groups:
+        words[full, :size - full * bits] = stream[full * bits:size]
+    words = words.view("<u8")
+
+    mask = np.uint64((1 << bits) - 1)
+    result = np.empty((groups, GROUP_SIZE), dtype=dtype)
+    for index in range(GROUP_SIZE):
+        shift = index * bits
+        if shift < _WORD_BITS:
+            value = words[:, 0] >> np.uint64(shift)
+            if shift + bits > _WORD_BITS:
+                value |= words[:, 1] << np.uint64(_WORD_BITS - shift)
+        else:
+            value = words[:, 1] >> np.uint64(shift - _WORD_BITS)
+        result[:, index] = value & mask
+
+    return result.reshape(-1)[:count]
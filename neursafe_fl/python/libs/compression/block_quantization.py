@@ -0,0 +1,221 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+# pylint:disable=unused-argument, arguments-differ
+
+"""
+Block-wise quantization compression algorithm class
+"""
+import numpy as np
+
+from neursafe_fl.python.libs.compression.base import Compression
+from neursafe_fl.python.libs.compression.bit_packing import GROUP_SIZE, \
+    pack_bits, packed_size, unpack_bits
+from neursafe_fl.python.libs.compression.quantization import \
+    check_quantization_bits
+
+DEFAULT_BLOCK_SIZE = 256
+
+# the element number processed at a time, the temporary memory is a few
+# float32 arrays of this size, whatever the size of the layer.
+CHUNK_SIZE = 1 << 20
+
+
+def check_block_size(block_size):
+    """Check block size parameter valid.
+    """
+    if not isinstance(block_size, int) or isinstance(block_size, bool):
+        raise ValueError("The block_size must be integer, provided "
+                         "block_size is: %s" % block_size)
+
+    if block_size <= 0 or block_size % GROUP_SIZE:
+        raise ValueError("The block_size must be positive multiple of %s. "
+                         "Provided block_size: %s" % (GROUP_SIZE, block_size))
+
+
+def _chunks(count, block_size):
+    """Split the blocks of count elements into chunks of about CHUNK_SIZE
+    elements, yield the first and last(exclusive) block of each chunk, and
+    the start and stop element."""
+    block_num = -(-count // block_size)
+    chunk_blocks = max(CHUNK_SIZE // block_size, 1)
+    for first in range(0, block_num, chunk_blocks):
+        last = min(first + chunk_blocks, block_num)
+        yield first, last, first * block_size, min(last * block_size, count)
+
+
+def _round_down(value):
+    """Convert float32 to float16 not greater than value."""
+    with np.errstate(over="ignore"):
+        result = value.astype(np.float16)
+    greater = result.astype(np.float32) > value
+    result[greater] = np.nextafter(result[greater], np.float16(-np.inf))
+    return result
+
+
+def _round_up(value):
+    """Convert float32 to float16 not less than value."""
+    with np.errstate(over="ignore"):
+        result = value.astype(np.float16)
+    less = result.astype(np.float32) < value
+    result[less] = np.nextafter(result[less], np.float16(np.inf))
+    return result
+
+
+def _dequantify(chunk, mins, scales, block_size):
+    """Recover the quantified values of the blocks in place."""
+    chunk *= np.repeat(np.asarray(scales, dtype=np.float32),
+                       block_size)[:chunk.size]
+    chunk += np.repeat(np.asarray(mins, dtype=np.float32),
+                       block_size)[:chunk.size]
+    return chunk
+
+
+class BlockQuantization(Compression):
+    """Block-wise quantization compression algorithm class definition.
+
+    The flattened value is split into blocks of `block_size` elements, each
+    block is quantified with its own min and scale:
+
+        q = round((t - min(block)) / scale), scale = (max(block) -
+            min(block)) / (2**quantization_bits - 1)
+
+    so an outlier only affects the precision of its block. The min and scale
+    of blocks are stored in float16, the min is rounded down and the scale is
+    rounded up, so the quantified values always cover the block. The value is
+    processed chunk by chunk with float32 temporaries, and the quantified
+    values are packed by bit_packing into a uint8 byte stream.
+    """
+
+    def __init__(self, quantization_bits, block_size=DEFAULT_BLOCK_SIZE,
+                 stochastic_rounding=False, **kwargs):
+        """
+        Args:
+            quantization_bits: A integer specifying the quantization bitwidth.
+            block_size: The element number of each block, must be multiple
+                of 8, so every block is packed into whole bytes.
+            stochastic_rounding: Round the quantified values up or down
+                randomly, with the probability of the distance to the other
+                bound, the decoded value is unbiased.
+        """
+        check_quantization_bits(int(quantization_bits))
+        # the numbers in task spec struct are float.
+        if isinstance(block_size, float) and block_size.is_integer():
+            block_size = int(block_size)
+        check_block_size(block_size)
+
+        self.quantization_bits = int(quantization_bits)
+        self.block_size = block_size
+        self.stochastic_rounding = bool(stochastic_rounding)
+        self.__rng = np.random.default_rng()
+
+    @property
+    def levels(self):
+        """The max quantified value."""
+        return 2 ** self.quantization_bits - 1
+
+    def quantify_blocks(self, blocks: np.ndarray):
+        """Quantify the float32 blocks of shape [n, block_size] in place.
+
+        Returns:
+            The quantified blocks, and the min and scale of blocks in float16.
+        """
+        mins = _round_down(np.min(blocks, axis=1))
+        maxs = np.max(blocks, axis=1)
+        if not (np.all(np.isfinite(mins)) and np.all(np.isfinite(maxs))):
+            raise ValueError("Can not quantify the value not finite or out "
+                             "of float16 range.")
+
+        scales = _round_up((maxs - mins.astype(np.float32)) / self.levels)
+        if not np.all(np.isfinite(scales)):
+            raise ValueError("Can not quantify the value range out of "
+                             "float16 range.")
+
+        scales32 = scales.astype(np.float32)
+        inverse = np.divide(1, scales32, out=np.zeros_like(scales32),
+                            where=scales32 > 0)
+        blocks -= mins.astype(np.float32)[:, np.newaxis]
+        blocks *= inverse[:, np.newaxis]
+
+        if self.stochastic_rounding:
+            blocks += self.__rng.random(blocks.shape, dtype=np.float32)
+            np.floor(blocks, out=blocks)
+        else:
+            np.rint(blocks, out=blocks)
+        np.clip(blocks, 0, self.levels, out=blocks)
+        return blocks, mins, scales
+
+    def encode(self, value: np.ndarray):
+        """Compress value.
+
+        Args:
+            value: float numpy array.
+        """
+        flat = np.reshape(value, -1)
+        block_num = -(-flat.size // self.block_size)
+
+        stream = np.empty(packed_size(flat.size, self.quantization_bits),
+                          dtype=np.uint8)
+        mins = np.empty(block_num, dtype=np.float16)
+        scales = np.empty(block_num, dtype=np.float16)
+
+        for first, last, start, stop in _chunks(flat.size, self.block_size):
+            packed, mins[first:last], scales[first:last] = \
+                self.__encode_chunk(flat[start:stop], last - first)
+            offset = start * self.quantization_bits // 8
+            stream[offset:offset + packed.size] = packed
+
+        params = {"shape": np.shape(value),
+                  "mins": mins,
+                  "scales": scales,
+                  "block_size": self.block_size}
+
+        return stream, params
+
+    def __encode_chunk(self, values, block_num):
+        """Quantify and pack the values of block_num blocks."""
+        # pad the last block with its first element, not change its range.
+        blocks = np.empty(block_num * self.block_size, dtype=np.float32)
+        blocks[:values.size] = values
+        blocks[values.size:] = blocks[(block_num - 1) * self.block_size]
+
+        blocks, mins, scales = self.quantify_blocks(
+            blocks.reshape(-1, self.block_size))
+        return (pack_bits(blocks.reshape(-1)[:values.size],
+                          self.quantization_bits), mins, scales)
+
+    def decode(self, quantified_value: np.ndarray, shape: np.shape,
+               mins: np.ndarray, scales: np.ndarray, block_size: int):
+        """Recover value from compressed value.
+
+        Args:
+            quantified_value: uint8 byte stream packed.
+            shape: the shape of raw numpy array(uncompressed array).
+            mins: the float16 min of blocks.
+            scales: the float16 scale of blocks.
+            block_size: the element number of each block.
+        Returns:
+            float32 numpy array of shape.
+        """
+        count = int(np.prod(shape, dtype=np.int64))
+        block_num = -(-count // block_size)
+        if len(mins) != block_num or len(scales) != block_num:
+            raise ValueError("Expect %s blocks, but got %s mins and %s scales"
+                             % (block_num, len(mins), len(scales)))
+
+        stream = np.reshape(quantified_value, -1).view(np.uint8)
+        result = np.empty(count, dtype=np.float32)
+
+        for first, last, start, stop in _chunks(count, block_size):
+            result[start:stop] = _dequantify(
+                self.__unpack_chunk(stream, start, stop),
+                mins[first:last], scales[first:last], block_size)
+
+        return np.reshape(result, shape)
+
+    def __unpack_chunk(self, stream, start, stop):
+        """Unpack the quantified values from start to stop in float32."""
+        offset = start * self.quantization_bits // 8
+        size = packed_size(stop - start, self.quantization_bits)
+        return unpack_bits(stream[offset:offset + size],
+                           self.quantization_bits, stop - start,
+                           dtype=np.float32)
@@ -11,8 +11,11 @@ class CompressionAlgorithm(Enum):
     """Suppport compress algorithms"""
 
     quantization = "QUANTIZATION"
+    blockquantization = "BLOCK_QUANTIZATION"
     subsampling = "SUBSAMPLING"
     selectivemasking = "SELECTIVE_MASKING"
+    entropy = "ENTROPY"
+    pipeline = "PIPELINE"
 
 
 SUPPORTED_COMPRESSION_ALGORITHM = [
@@ -0,0 +1,177 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+# pylint:disable=unused-argument, arguments-differ
+
+"""
+Entropy coding compression algorithm class
+"""
+import importlib
+import zlib
+
+import numpy as np
+from absl import logging
+
+from neursafe_fl.python.libs.compression.base import Compression
+
+ZSTD = "zstd"
+LZ4 = "lz4"
+ZLIB = "zlib"
+SUPPORTED_CODECS = (ZSTD, LZ4, ZLIB)
+
+# the bytes fed to the compressor or decompressor at a time.
+CHUNK_SIZE = 1 << 20
+
+
+def check_codec(codec):
+    """Check entropy codec parameter valid.
+    """
+    if codec not in SUPPORTED_CODECS:
+        raise ValueError("The codec must be one of %s, provided codec is: %s"
+                         % (SUPPORTED_CODECS, codec))
+
+
+def _zlib_compressor(level):
+    return zlib.compressobj(6 if level is None else level)
+
+
+def _zlib_decompressor():
+    return zlib.decompressobj()
+
+
+def _zstd_compressor(level):
+    zstd = importlib.import_module("zstandard")
+    return zstd.ZstdCompressor(level=3 if level is None else level) \
+        .compressobj()
+
+
+def _zstd_decompressor():
+    zstd = importlib.import_module("zstandard")
+    return zstd.ZstdDecompressor().decompressobj()
+
+
+class _Lz4Compressor:
+    """Adapt lz4 frame compressor to the interface of compressobj."""
+
+    def __init__(self, level):
+        frame = importlib.import_module("lz4.frame")
+        self.__compressor = frame.LZ4FrameCompressor(
+            compression_level=0 if level is None else level)
+        self.__begin = self.__compressor.begin()
+
+    def compress(self, data):
+        """Compress a chunk of data."""
+        begin, self.__begin = self.__begin, b""
+        return begin + self.__compressor.compress(data)
+
+    def flush(self):
+        """Finish the frame."""
+        begin, self.__begin = self.__begin, b""
+        return begin + self.__compressor.flush()
+
+
+def _lz4_compressor(level):
+    return _Lz4Compressor(level)
+
+
+def _lz4_decompressor():
+    frame = importlib.import_module("lz4.frame")
+    return frame.LZ4FrameDecompressor()
+
+
+_COMPRESSORS = {ZSTD: _zstd_compressor, LZ4: _lz4_compressor,
+                ZLIB: _zlib_compressor}
+_DECOMPRESSORS = {ZSTD: _zstd_decompressor, LZ4: _lz4_decompressor,
+                  ZLIB: _zlib_decompressor}
+
+
+class EntropyCompression(Compression):
+    """Entropy coding compression algorithm class definition.
+
+    Compress the bytes of value losslessly by zstd, lz4 or zlib, usually the
+    last stage of compression pipeline, after the values are sparsified and
+    quantified. zstd and lz4 are optional dependencies, if not installed,
+    zlib of python standard library is used, the codec actually used is
+    recorded in params.
+
+    The bytes of value are fed to the compressor chunk by chunk without
+    copying the value, and decoded into a preallocated array.
+    """
+
+    def __init__(self, codec=ZSTD, level=None, **kwargs):
+        """
+        Args:
+            codec: The entropy codec, zstd, lz4 or zlib.
+            level: The compression level of the codec, default is the
+                default level of codec.
+        """
+        check_codec(codec)
+
+        self.codec = codec
+        self.level = None if level is None else int(level)
+
+    def __compressor(self):
+        try:
+            return self.codec, _COMPRESSORS[self.codec](self.level)
+        except ImportError:
+            logging.warning("Codec %s not installed, compress with zlib.",
+                            self.codec)
+            return ZLIB, _zlib_compressor(None)
+
+    def encode(self, value: np.ndarray):
+        """Compress value.
+
+        Args:
+            value: numpy array.
+        Returns:
+            The compressed bytes as uint8 numpy array, and params.
+        """
+        array = np.asarray(value)
+        if not array.flags.c_contiguous:
+            array = array.copy(order="C")
+        data = memoryview(array.reshape(-1).view(np.uint8))
+
+        codec, compressor = self.__compressor()
+        pieces = [compressor.compress(data[start:start + CHUNK_SIZE])
+                  for start in range(0, data.nbytes, CHUNK_SIZE)]
+        pieces.append(compressor.flush())
+
+        params = {"shape": array.shape,
+                  "dtype": array.dtype.str,
+                  "codec": codec}
+
+        return np.frombuffer(b"".join(pieces), dtype=np.uint8), params
+
+    def decode(self, compressed_value: np.ndarray, shape: np.shape,
+               dtype: str, codec: str):
+        """Recover value from compressed value.
+
+        Args:
+            compressed_value: uint8 numpy array compressed.
+            shape: the shape of raw numpy array(uncompressed array).
+            dtype: the dtype of raw numpy array.
+            codec: the codec compressed with.
+        """
+        check_codec(codec)
+        dtype = np.dtype(dtype)
+        if dtype.hasobject:
+            raise ValueError("Not support dtype %s." % dtype)
+
+        result = np.empty(shape, dtype=dtype)
+        output = result.reshape(-1).view(np.uint8)
+        data = memoryview(np.reshape(compressed_value, -1).view(np.uint8))
+
+        decompressor = _DECOMPRESSORS[codec]()
+        position = 0
+        for start in range(0, data.nbytes, CHUNK_SIZE):
+            piece = decompressor.decompress(data[start:start + CHUNK_SIZE])
+            if position + len(piece) > output.size:
+                raise ValueError("The decompressed data exceeds %s bytes."
+                                 % output.size)
+            output[position:position + len(piece)] = np.frombuffer(
+                piece, dtype=np.uint8)
+            position += len(piece)
+
+        if position != output.size:
+            raise ValueError("The decompressed data is %s bytes, expect %s."
+                             % (position, output.size))
+        return result
@@ -0,0 +1,98 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""
+Error feedback of the lossy compression algorithms.
+"""
+import os
+
+import numpy as np
+
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+
+def load_residual(file_name, size, dtype):
+    """Open the residual file memory-mapped.
+
+    Create a zero residual if the file not exists, or its size or dtype not
+    match the weights, such as the model is changed.
+
+    Args:
+        file_name: the .npy file of residual.
+        size: the element number of the weights vector.
+        dtype: the dtype of the weights vector.
+    Returns:
+        The residual, np.memmap of one dimension.
+    """
+    if os.path.exists(file_name):
+        try:
+            residual = np.load(file_name, mmap_mode="r+")
+            if residual.shape == (size,) and residual.dtype == dtype:
+                return residual
+            del residual
+        except ValueError:
+            pass
+
+    os.makedirs(os.path.dirname(file_name) or ".", exist_ok=True)
+    return np.lib.format.open_memmap(file_name, mode="w+", dtype=dtype,
+                                     shape=(size,))
+
+
+class ErrorFeedback:  # pylint: disable=too-few-public-methods
+    """Error feedback(residual memory) of the lossy compression.
+
+    The values dropped or rounded by compression are lost every round,
+    error feedback keeps them as the residual, and adds the residual to the
+    delta weights of the next round before encoding:
+
+        corrected = delta + residual
+        encoded = encode(corrected)
+        residual = corrected - decode(encoded)
+
+    The residual is a .npy file kept across rounds, it is memory-mapped, so
+    the client holds no second copy of the weights in memory. The residual of
+    sparse compression is updated at the transmitted indices only.
+
+    Args:
+        compression: the compression algorithm.
+        weights_converter: the weights converter of the runtime.
+        residual_file: the .npy file of residual.
+    """
+
+    def __init__(self, compression, weights_converter, residual_file):
+        self.__compression = compression
+        self.__weights_converter = weights_converter
+        self.__residual_file = residual_file
+
+    def encode(self, weights):
+        """Encode the delta weights with the residual of last round.
+
+        Args:
+            weights: the delta weights, the vector of FlatWeights is corrected
+                in place.
+        Returns:
+            The encoded weights.
+        """
+        if not isinstance(weights, FlatWeights):
+            weights = self.__weights_converter.flatten(weights)
+        vector = weights.vector
+
+        residual = load_residual(self.__residual_file, vector.size,
+                                 vector.dtype)
+        np.add(vector, residual, out=vector)
+
+        encoded = self.__weights_converter.encode(weights, self.__compression)
+
+        residual[:] = vector
+        if self.__compression.sparse:
+            sparse = self.__weights_converter.decode_sparse(
+                encoded, self.__compression).vector
+            residual[sparse.indices] -= sparse.values
+        else:
+            decoded = self.__weights_converter.decode(encoded,
+                                                      self.__compression)
+            np.subtract(residual, decoded.vector, out=residual,
+                        casting="same_kind")
+        residual.flush()
+
+        return encoded
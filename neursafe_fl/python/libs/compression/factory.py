@@ -6,10 +6,28 @@ Creation factory of different compression algorithm instance.
 
 from neursafe_fl.python.libs.compression.quantization import \
     QuantizationCompression
+from neursafe_fl.python.libs.compression.block_quantization import \
+    BlockQuantization
 from neursafe_fl.python.libs.compression.subsampling import \
     SubsamplingCompression
 from neursafe_fl.python.libs.compression.selective_masking import \
     SelectiveMasking
+from neursafe_fl.python.libs.compression.entropy import EntropyCompression
+from neursafe_fl.python.libs.compression.pipeline import \
+    PipelineCompression, check_stages
+
+
+def _stage_config(stage):
+    # the stage of task spec is protobuf Struct, convert it to dict.
+    return {key: stage[key] for key in stage.keys()}
+
+
+def _create_pipeline(stages, **kwargs):
+    stages = [_stage_config(stage) for stage in stages]
+    check_stages(stages)
+    return PipelineCompression([create_compression(stage["type"].lower(),
+                                                   **stage)
+                                for stage in stages], **kwargs)
 
 
 def create_compression(name, **kwargs):
@@ -17,7 +35,10 @@ def create_compression(name, **kwargs):
     Create specified compression algorithm instance.
     """
     compression_map = {"quantization": QuantizationCompression,
+                       "block_quantization": BlockQuantization,
                        "subsampling": SubsamplingCompression,
-                       "selective_masking": SelectiveMasking}
+                       "selective_masking": SelectiveMasking,
+                       "entropy": EntropyCompression,
+                       "pipeline": _create_pipeline}
 
     return compression_map[name](**kwargs)
@@ -0,0 +1,108 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+# pylint:disable=unused-argument, arguments-differ
+
+"""
+Pipeline compression algorithm class
+"""
+import numpy as np
+
+from neursafe_fl.python.libs.compression.base import Compression
+
+PIPELINE = "pipeline"
+ENTROPY = "entropy"
+SPARSIFY_STAGES = ("selective_masking", "subsampling")
+QUANTIZE_STAGES = ("quantization", "block_quantization")
+
+
+def check_stages(stages):
+    """Check the stages of pipeline valid.
+
+    The stages are in order of sparsify, quantize and entropy coding, each
+    kind at most once, and the pipeline has at least one stage.
+    """
+    if not stages:
+        raise ValueError("The stages of pipeline must not be empty.")
+
+    order = [SPARSIFY_STAGES, QUANTIZE_STAGES, (ENTROPY,)]
+    last = -1
+    for stage in stages:
+        type_ = str(stage.get("type", "")).lower()
+        kinds = [index for index, types in enumerate(order) if type_ in types]
+        if not kinds:
+            raise ValueError("The stage type must be one of %s, provided "
+                             "type is: %s"
+                             % ([type_ for types in order for type_ in types],
+                                type_))
+        if kinds[0] <= last:
+            raise ValueError("The stages must be in order of sparsify, "
+                             "quantize and entropy, each at most once, "
+                             "provided stages: %s"
+                             % [stage.get("type") for stage in stages])
+        last = kinds[0]
+
+
+class PipelineCompression(Compression):
+    """Pipeline compression algorithm class definition.
+
+    Chain the compression algorithms as stages, each stage encodes the
+    encoded value of the previous stage, for example:
+
+        selective_masking -> block_quantization -> entropy
+
+    selects the top k values, quantifies the selected values, and compresses
+    the quantified byte stream by zstd. Decoding runs the stages in reverse
+    order. Each stage only processes the output of the previous one, which is
+    already compressed, so no stage copies the full-size value but the first.
+
+    If the first stage is sparse, the pipeline is sparse too, the aggregator
+    scatters the values into the accumulator without densifying.
+    """
+
+    def __init__(self, stages, **kwargs):
+        """
+        Args:
+            stages: The list of stage instances, created from the stage
+                configs by create_compression, which checks their order.
+        """
+        self.stages = stages
+        self.sparse = self.stages[0].sparse
+
+    def encode(self, value: np.ndarray):
+        """Compress value stage by stage.
+
+        Args:
+            value: numpy array.
+        """
+        stage_params = []
+        for stage in self.stages:
+            value, params = stage.encode(value)
+            stage_params.append(params)
+
+        return value, {"stages": stage_params}
+
+    def __decode_tail(self, value, stages):
+        if len(stages) != len(self.stages):
+            raise ValueError("Expect params of %s stages, but got %s."
+                             % (len(self.stages), len(stages)))
+
+        for stage, params in zip(self.stages[:0:-1], stages[:0:-1]):
+            value = stage.decode(value, **params)
+        return value
+
+    def decode(self, value: np.ndarray, stages: list):
+        """Recover value stage by stage in reverse order.
+
+        Args:
+            value: the value encoded by the last stage.
+            stages: the params of each stage.
+        """
+        value = self.__decode_tail(value, stages)
+        return self.stages[0].decode(value, **stages[0])
+
+    def decode_sparse(self, value: np.ndarray, stages: list):
+        """Recover the values of the first stage, then decode them into
+        SPARSE by the first stage, not scatter them.
+        """
+        value = self.__decode_tail(value, stages)
+        return self.stages[0].decode_sparse(value, **stages[0])
@@ -8,7 +8,8 @@ Quantization compression algorithm class
 import numpy as np
 
 from neursafe_fl.python.libs.compression.base import Compression
-import neursafe_fl.python.runtime.operation as op
+from neursafe_fl.python.libs.compression.bit_packing import pack_bits, \
+    unpack_bits
 
 DEFAULT_TARGET_BITS = 31
 
@@ -34,8 +35,8 @@ class QuantizationCompression(Compression):
         """
         Args:
             quantization_bits: A integer specifying the quantization bitwidth
-            target_bits: Compress integer numpy array by bit form into a integer
-                value, the integer value bit width.
+            target_bits: The integer value bit width of the legacy packing
+                format, which is still decoded.
         """
         check_quantization_bits(int(quantization_bits))
 
@@ -43,54 +44,43 @@ class QuantizationCompression(Compression):
         self.target_bits = DEFAULT_TARGET_BITS
 
     def pack_into_int(self, value: np.ndarray):
-        """Pack integers in range [0, 2**`self.quantization_bits`-1] into
-        integer values, concatenates the relevant bits of the input values into
-        a sequence of integer values.
+        """Pack integers in range [0, 2**`self.quantization_bits`-1] into a
+        compact uint8 byte stream, concatenates the relevant bits of the input
+        values from the least significant bit.
 
         example:
             value: [0, 1, 2, 3]
             self.quantization_bits: 2
 
-            [00, 10, 01, 11] -> [[11100100]] -> [[228]]
+            [00, 10, 01, 11] -> [11100100] -> [228]
 
         Args:
             value: integer numpy array
         """
-        value = np.reshape(value, [-1, 1])
-        value = self._expand_to_binary_form(value, self.quantization_bits)
-
-        return self._pack_binary_form(value, self.target_bits).astype(np.int32)
+        return pack_bits(value, self.quantization_bits)
 
     def unpack_into_int(self, value, shape: np.shape):
         """Unpack integers into the range of [0, 2**`self.quantization_bits`-1],
         to be used as the inverse of `pack_into_int` function.
-        """
-        value = self._expand_to_binary_form(value, self.target_bits)
-        value = value[:np.product(shape) * self.quantization_bits]
-
-        return np.reshape(self._pack_binary_form(
-            value, self.quantization_bits), shape)
-
-    def _expand_to_binary_form(self, value: np.ndarray, bits: np.ndarray):
-        expand_array = np.array(
-            [2 ** i for i in range(bits)], dtype=np.int32)
-
-        bits_array = op.mod(op.floor_div(value, expand_array), 2)
-
-        return np.reshape(bits_array, [-1])
 
-    def _pack_binary_form(self, value: np.ndarray, bits: int):
-        packing_array = np.array([[2 ** i] for i in range(bits)],
-                                 dtype=np.int32)
-
-        extra_zeros = np.zeros(np.mod(-value.size, bits),
-                               dtype=np.int32)
-
-        concatenated = op.concatenate(value, extra_zeros)
-
-        reshaped = np.reshape(concatenated, [-1, bits])
-
-        return np.matmul(reshaped, packing_array)
+        The legacy format, which packs the bits into int32 values of
+        `self.target_bits` bits, is decoded too.
+        """
+        count = int(np.prod(shape, dtype=np.int64))
+        value = np.asarray(value)
+        if value.dtype != np.uint8:
+            value = self._legacy_to_stream(value)
+
+        return np.reshape(unpack_bits(value, self.quantization_bits, count),
+                          shape)
+
+    def _legacy_to_stream(self, value: np.ndarray):
+        """Convert the int32 values of `self.target_bits` bits to the byte
+        stream, the bit stream in them is the same."""
+        words = np.reshape(value, [-1, 1]).astype("<u4").view(np.uint8)
+        bits = np.unpackbits(words, axis=1, bitorder="little")
+        return np.packbits(bits[:, :self.target_bits].reshape(-1),
+                           bitorder="little")
 
     def quantify(self, value: np.ndarray):
         """Quantify float numpy array into numpy integer array which value in
@@ -9,6 +9,9 @@ Selective masking compression algorithm.
 import numpy as np
 
 from neursafe_fl.python.libs.compression.base import Compression
+from neursafe_fl.python.libs.compression.sparse_index import \
+    encode_indices, decode_indices
+from neursafe_fl.python.runtime.weights import SPARSE
 
 
 def check_top_k_ratio(top_k_ratio):
@@ -30,7 +33,12 @@ class SelectiveMasking(Compression):
     which need to be compressed. We will set sampling ratio(top_k_ratio), it
     means that the value k equals sampling ratio multiplied with the number of
     elements of the data.
+
+    The indexes of selected values are sorted and encoded by sparse_index,
+    in delta varint or bitmap format, whichever is smaller.
     """
+    sparse = True
+
     def __init__(self, top_k_ratio, **kwargs):
         """
         Args:
@@ -48,33 +56,62 @@ class SelectiveMasking(Compression):
             value: numpy array.
 
         Returns:
-            masked_value: Selected top k values.
-            params: A dict include the shape of raw array and the indexes of
-                masked_value.
+            masked_value: Selected top k values, in the order of indexes.
+            params: A dict include the shape of raw array, the encoded
+                indexes of masked_value and the format of them.
         """
-        value_ = value.flatten()
-        abs_value_ = np.abs(value_)
+        value_ = np.reshape(value, -1)
         top_k_length = int(self.top_k_ratio * value_.size)
 
-        top_k_ind = np.argpartition(abs_value_, -top_k_length)[-top_k_length:]
+        top_k_ind = np.sort(np.argpartition(np.abs(value_), -top_k_length)[
+            -top_k_length:])
 
         masked_value = value_[top_k_ind]
 
+        ind, index_format = encode_indices(top_k_ind, value_.size)
         params = {"shape": value.shape,
-                  "ind": top_k_ind.astype(np.int32).tolist()}
+                  "ind": ind,
+                  "index_format": index_format}
 
         return masked_value, params
 
-    def decode(self, masked_value: np.ndarray, ind: list, shape: np.shape):
+    def decode(self, masked_value: np.ndarray, ind, shape: np.shape,
+               index_format=None):
         """Reconstruct data from compressed data.
 
         Args:
             masked_value: masked value(compressed value).
-            ind: the indexes of masked value in raw array(uncompressed array).
+            ind: the encoded indexes of masked value in raw array(uncompressed
+                array), or the list of indexes if index_format is None.
             shape: the shape of raw numpy array(uncompressed array).
+            index_format: the format of encoded indexes.
+        Returns:
+            numpy array of shape, the dtype is the same as masked value.
         """
-        raw_value = np.zeros(np.prod(shape))
+        indices, masked_value, _ = self.decode_sparse(
+            masked_value, ind, shape, index_format)
 
-        np.put(raw_value, ind, masked_value)
+        raw_value = np.zeros(int(np.prod(shape, dtype=np.int64)),
+                             dtype=masked_value.dtype)
+        raw_value[indices] = masked_value
 
         return np.reshape(raw_value, shape)
+
+    def decode_sparse(self, masked_value: np.ndarray, ind, shape: np.shape,
+                      index_format=None):
+        """Decode the indexes of masked value, not scatter them.
+
+        Returns:
+            SPARSE(indices, values, shape), indices are int64 flat indexes.
+        """
+        masked_value = np.reshape(masked_value, -1)
+        if index_format is None:
+            indices = np.asarray(ind, dtype=np.int64)
+        else:
+            indices = decode_indices(ind, index_format,
+                                     int(np.prod(shape, dtype=np.int64)))
+        if indices.size != masked_value.size:
+            raise ValueError("The %s indexes not match %s values."
+                             % (indices.size, masked_value.size))
+
+        return SPARSE(indices, masked_value, tuple(shape))
@@ -0,0 +1,114 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""
+Encode the sorted indices of sparse values into a compact byte stream.
+
+Two formats are supported, the smaller one is chosen by the density:
+
+    varint: the deltas of sorted indices, the first delta is the first index,
+        each delta is encoded in LEB128, 7 bits per byte from the least
+        significant bits, the highest bit of byte marks more bytes follow.
+    bitmap: one bit per element of the dense array, from the least
+        significant bit, same as np.packbits(bitorder="little").
+
+Both formats are encoded and decoded by vectorized numpy operations.
+"""
+
+import numpy as np
+
+VARINT = "varint"
+BITMAP = "bitmap"
+
+_VARINT_BITS = 7
+_VARINT_MASK = (1 << _VARINT_BITS) - 1
+_VARINT_MORE = 1 << _VARINT_BITS
+# the max bytes of uint64 in LEB128.
+_VARINT_MAX_BYTES = 10
+
+
+def _varint_lengths(deltas):
+    lengths = np.ones(deltas.size, dtype=np.int64)
+    for index in range(1, _VARINT_MAX_BYTES):
+        lengths += deltas >= np.uint64(1 << (_VARINT_BITS * index))
+    return lengths
+
+
+def _encode_varint(deltas, lengths):
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    stream = np.empty(int(ends[-1]) if ends.size else 0, dtype=np.uint8)
+
+    for index in range(int(lengths.max()) if lengths.size else 0):
+        selected = lengths > index
+        value = deltas[selected] >> np.uint64(_VARINT_BITS * index)
+        byte = (value & np.uint64(_VARINT_MASK)).astype(np.uint8)
+        byte[lengths[selected] > index + 1] |= _VARINT_MORE
+        stream[starts[selected] + index] = byte
+    return stream
+
+
+def _decode_varint(stream):
+    ends = np.flatnonzero((stream & _VARINT_MORE) == 0)
+    if ends.size and ends[-1] != stream.size - 1 or \
+            not ends.size and stream.size:
+        raise ValueError("The varint stream is truncated.")
+    if not ends.size:
+        return np.empty(0, dtype=np.int64)
+
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    lengths = ends - starts + 1
+    if lengths.max() > _VARINT_MAX_BYTES:
+        raise ValueError("The varint in stream is too long.")
+
+    shifts = np.arange(stream.size) - np.repeat(starts, lengths)
+    values = (stream & _VARINT_MASK).astype(np.uint64) \
+        << (shifts * _VARINT_BITS).astype(np.uint64)
+    # the bits of bytes are disjoint, adding them is same as or.
+    return np.add.reduceat(values, starts).astype(np.int64)
+
+
+def encode_indices(indices, size):
+    """Encode the unique indices into the smaller format.
+
+    Args:
+        indices: the sorted unique indices, integer numpy array.
+        size: the element number of the dense array.
+    Returns:
+        uint8 numpy array, and the format, VARINT or BITMAP.
+    """
+    indices = np.asarray(indices, dtype=np.int64).reshape(-1)
+    deltas = np.diff(indices, prepend=0).astype(np.uint64)
+    lengths = _varint_lengths(deltas)
+
+    if int(lengths.sum()) <= (size + 7) // 8:
+        return _encode_varint(deltas, lengths), VARINT
+
+    bitmap = np.zeros(size, dtype=bool)
+    bitmap[indices] = True
+    return np.packbits(bitmap, bitorder="little"), BITMAP
+
+
+def decode_indices(stream, index_format, size):
+    """Decode the sorted indices, the inverse of encode_indices.
+
+    Args:
+        stream: uint8 numpy array encoded.
+        index_format: VARINT or BITMAP.
+        size: the element number of the dense array.
+    Returns:
+        int64 numpy array of sorted indices.
+    """
+    stream = np.reshape(stream, -1).view(np.uint8)
+    if index_format == VARINT:
+        indices = np.cumsum(_decode_varint(stream))
+    elif index_format == BITMAP:
+        indices = np.flatnonzero(np.unpackbits(stream, count=size,
+                                               bitorder="little"))
+    else:
+        raise ValueError("Not support index format: %s" % index_format)
+
+    if indices.size and not 0 <= indices[-1] < size:
+        raise ValueError("The index %s out of range %s."
+                         % (indices[-1], size))
+    return indices
@@ -10,6 +10,7 @@ import random
 import numpy as np
 
 from neursafe_fl.python.libs.compression.base import Compression
+from neursafe_fl.python.runtime.weights import SPARSE
 
 
 def check_sampling_rate(sampling_rate):
@@ -24,32 +25,72 @@ def check_sampling_rate(sampling_rate):
                          "Provided sampling_rate: %s" % sampling_rate)
 
 
+# the element number of the mask generated at a time, encoding and decoding
+# must generate the mask in the same chunks.
+CHUNK_SIZE = 1 << 20
+
+PHILOX = "philox"
+
+
 def gen_seed():
     """Generate random seed.
     """
     return random.randint(0, 999999)
 
 
+def kept_indices(size, sampling_rate, seed):
+    """Generate the flat indexes of the sampled elements.
+
+    Each element is sampled if a uniform random number in [0, 1) drawn from
+    the Philox generator of seed is less than sampling_rate. Philox is a
+    counter-based generator, the stream of a seed is the same on all the
+    platforms, and it is local, the global random state is not changed.
+
+    Returns:
+        int64 numpy array of sorted indexes.
+    """
+    generator = np.random.Generator(np.random.Philox(seed))
+    indices = []
+    for start in range(0, size, CHUNK_SIZE):
+        uniform = generator.random(min(CHUNK_SIZE, size - start))
+        index = np.flatnonzero(uniform < sampling_rate)
+        index += start
+        indices.append(index)
+
+    if not indices:
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(indices)
+
+
+def legacy_kept_indices(shape, sampling_rate, seed):
+    """Generate the flat indexes sampled by the legacy np.random.choice mask,
+    for the updates without generator in params."""
+    mask = np.random.RandomState(seed).choice(
+        [0, 1], shape, p=[sampling_rate, 1 - sampling_rate])
+    return np.flatnonzero(mask == 0)
+
+
 class SubsamplingCompression(Compression):
     """Subsampling compression algorithm class definition.
 
     Compress data by sampling. It will extract subset of data, steps as follows:
 
-    1. Generate a seed and generate a random 0,1 mask matrix, in which the
-       proportion of 0 is the same as the set parameter sampling_rate, because 0
-       means to be reserved, 1 means it will be deleted.
+    1. Generate a seed and the flat indexes of sampled elements from the seed,
+       the proportion of sampled elements is the same as the set parameter
+       sampling_rate.
 
         original data: [[1, 2], [3, 4]]
-        mask matrix: [[0, 1], [1, 0]]
+        sampled indexes: [0, 2]
         masked data: [1, 3]
 
     2. According to the shape of original data and the same seed generated in
-       step 1, then we reconstruct data.
+       step 1, then we regenerate the indexes and reconstruct data.
 
        masked weight: [1, 3]
-       mask matrix: [[0, 1], [1, 0]]
+       sampled indexes: [0, 2]
        reconstructed data: [[1, 0], [3, 0]]
     """
+    sparse = True
 
     def __init__(self, sampling_rate, **kwargs):
         """
@@ -69,30 +110,56 @@ class SubsamplingCompression(Compression):
             value: numpy array.
         """
         seed = gen_seed()
-        np.random.seed(seed=seed)
-        mask = np.random.choice([0, 1], value.shape,
-                                p=[self.sampling_rate, 1 - self.sampling_rate])
+        value_ = np.reshape(value, -1)
 
-        masked = np.ma.masked_array(value, mask=mask).compressed()
+        masked = value_[kept_indices(value_.size, self.sampling_rate, seed)]
 
         params = {"shape": value.shape,
-                  "seed": seed}
+                  "seed": seed,
+                  "generator": PHILOX}
 
         return masked, params
 
-    def decode(self, masked_value: np.ndarray, shape: np.shape, seed: int):
+    def decode(self, masked_value: np.ndarray, shape: np.shape, seed: int,
+               generator=None):
         """Reconstruct data from compressed data.
 
         Args:
             masked_value: masked value(subsampled value).
             shape: the shape of raw numpy array(uncompressed array).
             seed: the random seed, must be same with the seed in encoding.
+            generator: the generator of sampled indexes, None is the legacy
+                np.random.choice mask.
+        Returns:
+            numpy array of shape, the dtype is the same as masked value.
         """
-        np.random.seed(seed=seed)
-        mask = np.random.choice(
-            [np.inf, 0.0], shape,
-            p=[self.sampling_rate, 1 - self.sampling_rate]).flatten()
+        indices, masked_value, _ = self.decode_sparse(masked_value, shape,
+                                                      seed, generator)
 
-        np.place(mask, mask == np.inf, masked_value)
+        raw_value = np.zeros(int(np.prod(shape, dtype=np.int64)),
+                             dtype=masked_value.dtype)
+        raw_value[indices] = masked_value
 
-        return np.reshape(mask, shape)
+        return np.reshape(raw_value, shape)
+
+    def decode_sparse(self, masked_value: np.ndarray, shape: np.shape,
+                      seed: int, generator=None):
+        """Regenerate the positions of masked value, not scatter them.
+
+        Returns:
+            SPARSE(indices, values, shape), indices are int64 flat indexes.
+        """
+        if generator == PHILOX:
+            indices = kept_indices(int(np.prod(shape, dtype=np.int64)),
+                                   self.sampling_rate, seed)
+        elif generator is None:
+            indices = legacy_kept_indices(shape, self.sampling_rate, seed)
+        else:
+            raise ValueError("Not support generator: %s" % generator)
+
+        masked_value = np.reshape(masked_value, -1)
+        if indices.size != masked_value.size:
+            raise ValueError("The %s sampled positions not match %s values."
+                             % (indices.size, masked_value.size))
+
+        return SPARSE(indices, masked_value, tuple(shape))
@@ -0,0 +1,114 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-class-docstring, missing-function-docstring
+"""Test block quantization compress algorithm.
+"""
+
+import unittest
+import numpy as np
+
+from neursafe_fl.python.libs.compression import block_quantization
+from neursafe_fl.python.libs.compression.block_quantization import \
+    BlockQuantization
+from neursafe_fl.python.libs.compression.quantization import \
+    QuantizationCompression
+
+
+class TestBlockQuantization(unittest.TestCase):
+
+    def test_raise_exception_if_parameters_not_correct(self):
+        self.assertRaises(ValueError, BlockQuantization, 1)
+        self.assertRaises(ValueError, BlockQuantization, 17)
+        self.assertRaises(ValueError, BlockQuantization, 4, block_size=12)
+        self.assertRaises(ValueError, BlockQuantization, 4, block_size=0)
+        self.assertRaises(ValueError, BlockQuantization, 4, block_size=8.5)
+
+    def test_accept_integral_float_parameters_of_task_spec(self):
+        compression = BlockQuantization(4.0, block_size=64.0)
+
+        self.assertEqual(compression.quantization_bits, 4)
+        self.assertEqual(compression.block_size, 64)
+
+    def test_encode_and_decode_blocks_successfully(self):
+        compression = BlockQuantization(3, block_size=8)
+        value = np.array([[0] * 8, list(range(1, 9)), [-1, 0, 0, 0] + [0] * 4,
+                          [2.5] * 8]).reshape(-1)[:-4].astype(np.float32)
+
+        encoded, params = compression.encode(value)
+        self.assertEqual(encoded.dtype, np.uint8)
+        self.assertEqual(encoded.size, (value.size * 3 + 7) // 8)
+        self.assertEqual(params["mins"].dtype, np.float16)
+        self.assertEqual(params["mins"].tolist(), [0, 1, -1, 2.5])
+        self.assertEqual(params["scales"].tolist()[:2] + [0],
+                         [0, 1, params["scales"][3]])
+        # the scale is rounded up to float16, covers the block.
+        self.assertGreaterEqual(params["scales"][2] * 7, 1)
+        self.assertAlmostEqual(params["scales"][2], 1 / 7, places=3)
+
+        decoded = compression.decode(encoded, **params)
+        self.assertEqual(decoded.dtype, np.float32)
+        np.testing.assert_allclose(decoded, value, atol=1 / 14 + 1e-6)
+        np.testing.assert_array_equal(decoded[:16], value[:16])
+
+    def test_outlier_only_affects_its_block(self):
+        value = np.random.default_rng(0).normal(
+            0, 1e-3, size=100000).astype(np.float32)
+        value[10] = 1.0
+
+        encoded, params = BlockQuantization(4).encode(value)
+        decoded = BlockQuantization(4).decode(encoded, **params)
+        self.assertEqual(decoded.shape, value.shape)
+        # the error of block min and max is bounded by half a scale.
+        bound = np.repeat(params["scales"].astype(np.float32), 256)[:value.size] / 2
+        self.assertTrue(np.all(np.abs(decoded - value) <= bound * 1.001))
+
+        quantization = QuantizationCompression(8)
+        global_encoded, global_params = quantization.encode(value)
+        global_decoded = quantization.decode(global_encoded, **global_params)
+        self.assertLess(np.abs(decoded - value)[256:].max(),
+                        np.abs(global_decoded - value)[256:].max() / 4)
+
+    def test_process_value_chunk_by_chunk(self):
+        origin_chunk_size = block_quantization.CHUNK_SIZE
+        block_quantization.CHUNK_SIZE = 64
+        try:
+            value = np.random.rand(5, 61)
+            compression = BlockQuantization(5, block_size=16)
+            encoded, params = compression.encode(value)
+        finally:
+            block_quantization.CHUNK_SIZE = origin_chunk_size
+
+        self.assertEqual(params["shape"], (5, 61))
+        expected_encoded, expected_params = compression.encode(value)
+        np.testing.assert_array_equal(encoded, expected_encoded)
+        np.testing.assert_array_equal(params["scales"],
+                                      expected_params["scales"])
+        decoded = compression.decode(encoded, **params)
+        np.testing.assert_allclose(decoded, value, atol=1 / 31 / 2 + 1e-3)
+
+    def test_stochastic_rounding_is_unbiased(self):
+        value = np.full(80000, 0.3, dtype=np.float32)
+        value[::8] = 0
+        value[1::8] = 1
+
+        compression = BlockQuantization(2, block_size=8,
+                                        stochastic_rounding=True)
+        encoded, params = compression.encode(value)
+        decoded = compression.decode(encoded, **params)
+        # rounded to the lower or upper bound only.
+        scale = params["scales"][0].astype(np.float32)
+        self.assertEqual(set(np.unique(decoded[2::8]).tolist()),
+                         {0, scale})
+        self.assertAlmostEqual(float(np.mean(decoded[2::8])), 0.3, places=2)
+
+    def test_raise_exception_if_value_not_finite(self):
+        compression = BlockQuantization(4, block_size=8)
+        self.assertRaises(ValueError, compression.encode,
+                          np.array([1, np.nan] * 8))
+        self.assertRaises(ValueError, compression.encode,
+                          np.array([1, 1e6] * 8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-class-docstring, missing-function-docstring
+"""Test entropy coding compression algorithm.
+"""
+import importlib
+import unittest
+
+import numpy as np
+
+from neursafe_fl.python.libs.compression import entropy
+from neursafe_fl.python.libs.compression.entropy import EntropyCompression
+
+
+def _installed(module):
+    try:
+        importlib.import_module(module)
+        return True
+    except ImportError:
+        return False
+
+
+class TestEntropy(unittest.TestCase):
+
+    def setUp(self):
+        self.value = np.repeat(np.arange(100, dtype=np.int32), 1000).reshape(
+            100, 1000)
+
+    def test_raise_exception_if_codec_not_correct(self):
+        self.assertRaises(ValueError, EntropyCompression, "gzip")
+
+    def test_encode_and_decode_in_chunks(self):
+        origin_chunk_size = entropy.CHUNK_SIZE
+        entropy.CHUNK_SIZE = 1000
+        try:
+            compression = EntropyCompression("zlib", level=9)
+            encoded, params = compression.encode(self.value[:, ::2])
+            decoded = compression.decode(encoded, **params)
+        finally:
+            entropy.CHUNK_SIZE = origin_chunk_size
+
+        self.assertEqual(encoded.dtype, np.uint8)
+        self.assertLess(encoded.size, self.value.nbytes / 100)
+        self.assertEqual(params["codec"], "zlib")
+        self.assertEqual(decoded.dtype, np.int32)
+        np.testing.assert_array_equal(decoded, self.value[:, ::2])
+
+    def test_fallback_to_zlib_if_codec_not_installed(self):
+        for codec, module in [("zstd", "zstandard"), ("lz4", "lz4.frame")]:
+            compression = EntropyCompression(codec)
+            encoded, params = compression.encode(self.value)
+
+            self.assertEqual(params["codec"],
+                             codec if _installed(module) else "zlib")
+            np.testing.assert_array_equal(
+                compression.decode(encoded, **params), self.value)
+
+    def test_raise_exception_if_size_not_match(self):
+        compression = EntropyCompression("zlib")
+        encoded, params = compression.encode(self.value)
+
+        params["shape"] = (10,)
+        self.assertRaises(ValueError, compression.decode, encoded, **params)
+        params["shape"] = (100, 1001)
+        self.assertRaises(ValueError, compression.decode, encoded, **params)
+
+
+if __name__ == '__main__':
+    unittest.main()
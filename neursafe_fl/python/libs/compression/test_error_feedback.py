@@ -0,0 +1,85 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-class-docstring, missing-function-docstring
+"""Test error feedback of compression.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from neursafe_fl.python.libs.compression.error_feedback import \
+    ErrorFeedback, load_residual
+from neursafe_fl.python.libs.compression.quantization import \
+    QuantizationCompression
+from neursafe_fl.python.libs.compression.selective_masking import \
+    SelectiveMasking
+from neursafe_fl.python.runtime.tensorflow.weights import \
+    TensorflowWeightsConverter
+from neursafe_fl.python.runtime.weights import FlatWeights
+
+
+class TestErrorFeedback(unittest.TestCase):
+
+    def setUp(self):
+        self.workspace = tempfile.mkdtemp()
+        self.residual_file = os.path.join(self.workspace, "residual",
+                                          "job.npy")
+        self.converter = TensorflowWeightsConverter()
+
+    def tearDown(self):
+        shutil.rmtree(self.workspace)
+
+    def __round(self, compression, delta):
+        weights = FlatWeights.flatten([delta.copy()])
+        error_feedback = ErrorFeedback(compression, self.converter,
+                                       self.residual_file)
+        encoded = error_feedback.encode(weights)
+        return self.converter.decode(encoded, compression).vector
+
+    def test_dropped_values_are_sent_in_next_rounds(self):
+        compression = SelectiveMasking(0.25)
+        delta = np.array([4, 3, 2, 1], dtype=np.float32)
+
+        sent = [self.__round(compression, delta) for _ in range(4)]
+
+        self.assertEqual(sent[0].tolist(), [4, 0, 0, 0])
+        self.assertEqual(sent[1].tolist(), [0, 6, 0, 0])
+        # the residual is the difference of the total delta and total sent.
+        residual = np.load(self.residual_file)
+        np.testing.assert_allclose(np.sum(sent, axis=0) + residual,
+                                   delta * 4)
+
+    def test_quantization_error_not_accumulated(self):
+        compression = QuantizationCompression(2)
+        rng = np.random.default_rng(0)
+        delta = rng.random(100).astype(np.float32)
+
+        total = np.zeros(100)
+        for _ in range(20):
+            total += self.__round(compression, delta)
+
+        residual = load_residual(self.residual_file, 100, np.float32)
+        self.assertIsInstance(residual, np.memmap)
+        np.testing.assert_allclose(total + residual, delta * 20, rtol=1e-4)
+        self.assertLess(np.abs(total / 20 - delta).max(), 0.1)
+
+    def test_reset_residual_if_weights_changed(self):
+        residual = load_residual(self.residual_file, 4, np.float32)
+        residual[:] = 1
+        residual.flush()
+        del residual
+
+        self.assertEqual(load_residual(self.residual_file, 4,
+                                       np.float32).tolist(), [1] * 4)
+        self.assertEqual(load_residual(self.residual_file, 5,
+                                       np.float32).tolist(), [0] * 5)
+        self.assertEqual(load_residual(self.residual_file, 5,
+                                       np.float64).dtype, np.float64)
+
+
+if __name__ == '__main__':
+    unittest.main()
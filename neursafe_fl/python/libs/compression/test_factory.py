@@ -9,6 +9,8 @@ Test compression algorithm creation.
 import unittest
 from neursafe_fl.python.libs.compression.quantization import \
     QuantizationCompression
+from neursafe_fl.python.libs.compression.block_quantization import \
+    BlockQuantization
 from neursafe_fl.python.libs.compression.subsampling import \
     SubsamplingCompression
 from neursafe_fl.python.libs.compression.selective_masking import \
@@ -24,6 +26,14 @@ class TestFactory(unittest.TestCase):
 
         self.assertTrue(isinstance(compression, QuantizationCompression))
 
+    def test_create_block_quantization_compression_successfully(self):
+        compression = create_compression("block_quantization",
+                                         **{"quantization_bits": 4,
+                                            "block_size": 64})
+
+        self.assertTrue(isinstance(compression, BlockQuantization))
+        self.assertEqual(compression.block_size, 64)
+
     def test_create_subsampling_compression_successfully(self):
         compression = create_compression("subsampling",
                                          **{"sampling_rate": 0.5})
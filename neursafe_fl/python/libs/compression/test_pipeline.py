@@ -0,0 +1,74 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-class-docstring, missing-function-docstring
+"""Test pipeline compression algorithm.
+"""
+import unittest
+
+import numpy as np
+from google.protobuf.struct_pb2 import Struct
+
+from neursafe_fl.python.libs.compression.factory import create_compression
+from neursafe_fl.python.libs.compression.selective_masking import \
+    SelectiveMasking
+from neursafe_fl.python.runtime.weights import SPARSE
+
+STAGES = [{"type": "selective_masking", "top_k_ratio": 0.1},
+          {"type": "block_quantization", "quantization_bits": 8,
+           "block_size": 64},
+          {"type": "entropy", "codec": "zlib"}]
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.value = np.random.default_rng(0).normal(
+            size=(100, 50)).astype(np.float32)
+
+    def test_raise_exception_if_stages_not_correct(self):
+        for stages in ([], [{"type": "pipeline", "stages": STAGES}],
+                       list(reversed(STAGES)), [STAGES[0], STAGES[0]]):
+            self.assertRaises(ValueError, create_compression, "pipeline",
+                              type="pipeline", stages=stages)
+
+    def test_encode_and_decode_stage_by_stage(self):
+        compression = create_compression("pipeline", type="pipeline",
+                                         stages=STAGES)
+        self.assertTrue(compression.sparse)
+
+        encoded, params = compression.encode(self.value)
+        self.assertEqual(len(params["stages"]), 3)
+        self.assertEqual(encoded.dtype, np.uint8)
+        self.assertLess(encoded.size, 500)
+
+        decoded = compression.decode(encoded, **params)
+        self.assertEqual(decoded.shape, self.value.shape)
+        self.assertEqual(decoded.dtype, np.float32)
+
+        masked, masked_params = SelectiveMasking(0.1).encode(self.value)
+        expected = SelectiveMasking(0.1).decode(masked, **masked_params)
+        np.testing.assert_allclose(decoded, expected, atol=0.02)
+        np.testing.assert_array_equal(decoded != 0, expected != 0)
+
+        sparse = compression.decode_sparse(encoded, **params)
+        self.assertIsInstance(sparse, SPARSE)
+        self.assertEqual(sparse.indices.size, 500)
+        np.testing.assert_array_equal(decoded.reshape(-1)[sparse.indices],
+                                      sparse.values)
+
+    def test_create_from_task_spec_struct(self):
+        spec = Struct()
+        spec.update({"type": "pipeline", "stages": STAGES[1:]})
+
+        compression = create_compression(spec["type"], **spec)
+        self.assertFalse(compression.sparse)
+        self.assertEqual(compression.stages[0].block_size, 64)
+
+        encoded, params = compression.encode(self.value)
+        np.testing.assert_allclose(compression.decode(encoded, **params),
+                                   self.value, atol=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
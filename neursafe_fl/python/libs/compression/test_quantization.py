@@ -42,8 +42,8 @@ class TestQuantization(unittest.TestCase):
 
         # Pack successfully
         res = compression.pack_into_int(res)
-        self.assertEqual(res.dtype, np.int32)
-        self.assertEqual(res.tolist(), [[2125092160], [1]])
+        self.assertEqual(res.dtype, np.uint8)
+        self.assertEqual(res.tolist(), [64, 85, 170, 254])
 
         # Unpack successfully
         res = compression.unpack_into_int(res,
@@ -69,8 +69,9 @@ class TestQuantization(unittest.TestCase):
 
         # Pack successfully
         res = compression.pack_into_int(res)
-        self.assertEqual(res.dtype, np.int32)
-        self.assertEqual(res.tolist(), [[1985229328], [2109306160], [3]])
+        self.assertEqual(res.dtype, np.uint8)
+        self.assertEqual(res.tolist(),
+                         [16, 50, 84, 118, 152, 186, 220, 254])
 
         # Unpack successfully
         res = compression.unpack_into_int(res,
@@ -97,9 +98,10 @@ class TestQuantization(unittest.TestCase):
 
         # Pack successfully
         res = compression.pack_into_int(res)
-        self.assertEqual(res.dtype, np.int32)
+        self.assertEqual(res.dtype, np.uint8)
         self.assertEqual(res.tolist(),
-                         [[857870592], [1858906760], [1856661025], [2138500709], [15]])
+                         [0, 17, 34, 51, 68, 85, 102, 119,
+                          136, 153, 170, 187, 204, 221, 238, 255])
 
         # Unpack successfully
         res = compression.unpack_into_int(res,
@@ -123,10 +125,10 @@ class TestQuantization(unittest.TestCase):
         self.assertEqual(params, {"max_value": 15.0,
                                   "min_value": 0.0,
                                   "shape": (2, 2, 4)})
-        self.assertEqual(res.dtype, np.int32)
-        self.assertEqual(res.tolist(), [[2125092160], [1]])
+        self.assertEqual(res.dtype, np.uint8)
+        self.assertEqual(res.tolist(), [64, 85, 170, 254])
 
-        # Encode
+        # Decode
         res = compression.decode(res, **params)
         self.assertEqual(res.dtype, np.float64)
         self.assertEqual(res.tolist(),
@@ -141,8 +143,9 @@ class TestQuantization(unittest.TestCase):
         self.assertEqual(params, {"max_value": 15.0,
                                   "min_value": 0.0,
                                   "shape": (2, 2, 4)})
-        self.assertEqual(res.dtype, np.int32)
-        self.assertEqual(res.tolist(), [[1985229328], [2109306160], [3]])
+        self.assertEqual(res.dtype, np.uint8)
+        self.assertEqual(res.tolist(),
+                         [16, 50, 84, 118, 152, 186, 220, 254])
 
         # Decode
         res = compression.decode(res, **params)
@@ -151,6 +154,33 @@ class TestQuantization(unittest.TestCase):
                          [[[0.0, 1.0, 2.0, 3.0], [4.0, 5.0, 6.0, 7.0]],
                           [[8.0, 9.0, 10.0, 11.0], [12.0, 13.0, 14.0, 15.0]]])
 
+    def test_decode_legacy_packing_format(self):
+        # the int32 values of 31 bits packed by the legacy version.
+        legacy = {2: [[2125092160], [1]],
+                  4: [[1985229328], [2109306160], [3]],
+                  8: [[857870592], [1858906760], [1856661025],
+                      [2138500709], [15]]}
+        for bits, packed in legacy.items():
+            compression = QuantizationCompression(bits)
+            expected = compression.quantify(self.value)
+            res = compression.unpack_into_int(
+                np.array(packed, dtype=np.int32), self.value.shape)
+            self.assertEqual(res.tolist(), expected.tolist())
+
+            res = compression.decode(np.array(packed, dtype=np.int32),
+                                     self.max, self.min, self.value.shape)
+            self.assertEqual(res.tolist(), compression.unquantify(
+                expected, self.max, self.min).tolist())
+
+    def test_pack_and_unpack_all_bits(self):
+        for bits in range(2, 17):
+            compression = QuantizationCompression(bits)
+            value = np.random.randint(0, 2 ** bits, size=(3, 37))
+            res = compression.pack_into_int(value)
+            self.assertEqual(res.size, (value.size * bits + 7) // 8)
+            self.assertEqual(compression.unpack_into_int(
+                res, value.shape).tolist(), value.tolist())
+
     def test_quantify_and_unquantify_successfully_if_array_all_zeros(self):
         value = np.array([0.0 for _ in range(16)]).reshape(2, 2, 4)
         compression = QuantizationCompression(2)
@@ -11,6 +11,12 @@ import numpy as np
 
 from neursafe_fl.python.libs.compression.selective_masking import \
     SelectiveMasking
+from neursafe_fl.python.libs.compression.sparse_index import decode_indices
+
+
+def _indexes(params):
+    return decode_indices(params["ind"], params["index_format"],
+                          int(np.prod(params["shape"]))).tolist()
 
 
 class TestSelectiveMasking(unittest.TestCase):
@@ -40,15 +46,14 @@ class TestSelectiveMasking(unittest.TestCase):
                          np.sort(self.value.flatten())[::-1][:6].tolist())
 
         self.assertEqual(params["shape"], self.value.shape)
-        self.assertEqual(params["ind"].sort(),
-                         self.value.flatten().argsort()[-6:].tolist().sort())
-        self.assertEqual(len(params["ind"]), 6)
+        self.assertEqual(_indexes(params),
+                         sorted(self.value.flatten().argsort()[-6:].tolist()))
 
         self.assertEqual(np.sort(value.flatten())[::-1][:6].tolist(),
                          np.sort(self.value.flatten())[::-1][:6].tolist())
         self.assertEqual(self.value.shape, value.shape)
 
-        for ind in params["ind"]:
+        for ind in _indexes(params):
             self.assertEqual(self.value.flatten()[ind],
                              value.flatten()[ind])
 
@@ -60,14 +65,14 @@ class TestSelectiveMasking(unittest.TestCase):
 
         self.assertEqual(params["shape"], value.shape)
         self.assertEqual(masked_value.tolist(), np.ones(5).tolist())
-        self.assertEqual(len(params["ind"]), 5)
+        self.assertEqual(len(_indexes(params)), 5)
 
         value_ = compression.decode(masked_value, **params)
 
         self.assertEqual(np.sum(value_), 5)
         self.assertEqual(value_.shape, value.shape)
 
-        for ind in params["ind"]:
+        for ind in _indexes(params):
             self.assertEqual(value_.flatten()[ind],
                              value.flatten()[ind])
 
@@ -79,7 +84,7 @@ class TestSelectiveMasking(unittest.TestCase):
 
         self.assertEqual(params["shape"], value.shape)
         self.assertEqual(masked_value.tolist(), np.zeros(16).tolist())
-        self.assertEqual(len(params["ind"]), 16)
+        self.assertEqual(len(_indexes(params)), 16)
 
         value_ = compression.decode(masked_value, **params)
 
@@ -92,13 +97,33 @@ class TestSelectiveMasking(unittest.TestCase):
         masked_value, params = compression.encode(value)
 
         self.assertEqual(params["shape"], value.shape)
-        self.assertEqual(len(params["ind"]), 27)
+        self.assertEqual(len(_indexes(params)), 27)
         self.assertEqual(masked_value.tolist(), np.zeros(27).tolist())
 
         value_ = compression.decode(masked_value, **params)
 
         self.assertEqual(value_.tolist(), value.tolist())
 
+    def test_decode_in_dtype_of_values(self):
+        value = np.random.rand(1000).astype(np.float32)
+        compression = SelectiveMasking(0.3)
+
+        masked_value, params = compression.encode(value)
+        self.assertEqual(params["ind"].dtype, np.uint8)
+
+        value_ = compression.decode(masked_value, **params)
+        self.assertEqual(value_.dtype, np.float32)
+        self.assertEqual(np.count_nonzero(value_), 300)
+        np.testing.assert_array_equal(value_[value_ != 0],
+                                      value[value_ != 0])
+
+    def test_decode_legacy_index_list(self):
+        compression = SelectiveMasking(0.5)
+
+        value_ = compression.decode(np.array([3.0, 1.0]), [2, 0], (2, 2))
+
+        self.assertEqual(value_.tolist(), [[1.0, 0.0], [3.0, 0.0]])
+
 
 if __name__ == '__main__':
     unittest.main()
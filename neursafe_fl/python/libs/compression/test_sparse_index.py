@@ -0,0 +1,69 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-class-docstring, missing-function-docstring
+"""Test sparse index encoding.
+"""
+import unittest
+
+import numpy as np
+
+from neursafe_fl.python.libs.compression.sparse_index import \
+    encode_indices, decode_indices, VARINT, BITMAP
+
+
+class TestSparseIndex(unittest.TestCase):
+
+    def test_encode_sparse_indices_in_varint(self):
+        indices = np.array([0, 1, 129, 129 + 2 ** 14, 2 ** 40])
+
+        stream, index_format = encode_indices(indices, 2 ** 41)
+
+        self.assertEqual(index_format, VARINT)
+        self.assertEqual(stream.dtype, np.uint8)
+        self.assertEqual(stream[:4].tolist(), [0, 1, 0x80, 0x01])
+        self.assertEqual(stream.size, 1 + 1 + 2 + 3 + 6)
+        self.assertEqual(decode_indices(stream, index_format,
+                                        2 ** 41).tolist(), indices.tolist())
+
+    def test_encode_dense_indices_in_bitmap(self):
+        indices = np.arange(0, 100, 3)
+
+        stream, index_format = encode_indices(indices, 100)
+
+        self.assertEqual(index_format, BITMAP)
+        self.assertEqual(stream.size, 13)
+        self.assertEqual(stream[0], 0b01001001)
+        self.assertEqual(decode_indices(stream, index_format, 100).tolist(),
+                         indices.tolist())
+
+    def test_choose_smaller_format_by_density(self):
+        rng = np.random.default_rng(0)
+        size = 10 ** 6
+        for density in [0.001, 0.01, 0.1, 0.5]:
+            indices = np.sort(rng.choice(size, int(size * density),
+                                         replace=False))
+            stream, index_format = encode_indices(indices, size)
+            self.assertLessEqual(stream.size, (size + 7) // 8)
+            self.assertLess(stream.size, indices.size * 4)
+            np.testing.assert_array_equal(
+                decode_indices(stream, index_format, size), indices)
+
+    def test_encode_empty_indices(self):
+        stream, index_format = encode_indices(np.array([], dtype=np.int64),
+                                              10)
+
+        self.assertEqual(stream.size, 0)
+        self.assertEqual(decode_indices(stream, index_format, 10).size, 0)
+
+    def test_raise_exception_if_stream_invalid(self):
+        self.assertRaises(ValueError, decode_indices,
+                          np.array([0x81], dtype=np.uint8), VARINT, 10)
+        self.assertRaises(ValueError, decode_indices,
+                          np.array([11], dtype=np.uint8), VARINT, 10)
+        self.assertRaises(ValueError, decode_indices,
+                          np.array([1], dtype=np.uint8), "unknown", 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@ import unittest
 
 import numpy as np
 
+from neursafe_fl.python.libs.compression import subsampling
 from neursafe_fl.python.libs.compression.subsampling import \
     SubsamplingCompression
 
@@ -55,6 +56,48 @@ class TestSubsampling(unittest.TestCase):
 
         self.assert_result_correct(compression)
 
+    def test_sampled_indexes_are_deterministic(self):
+        indices = subsampling.kept_indices(20, 0.5, 12)
+
+        # the Philox stream of a seed is the same on all the platforms.
+        self.assertEqual(indices.tolist(),
+                         subsampling.kept_indices(20, 0.5, 12).tolist())
+        self.assertEqual(indices.tolist(),
+                         [0, 5, 6, 11, 12, 14, 15, 16, 17, 19])
+
+    def test_sample_in_chunks_without_global_random_state(self):
+        origin_chunk_size = subsampling.CHUNK_SIZE
+        subsampling.CHUNK_SIZE = 64
+        try:
+            value = np.random.rand(1000).astype(np.float32)
+            compression = SubsamplingCompression(0.3)
+
+            state = np.random.get_state()
+            encoded, params = compression.encode(value)
+            decoded = compression.decode(encoded, **params)
+            self.assertEqual(np.random.get_state()[1].tolist(),
+                             state[1].tolist())
+        finally:
+            subsampling.CHUNK_SIZE = origin_chunk_size
+
+        self.assertEqual(params["generator"], subsampling.PHILOX)
+        self.assertEqual(decoded.dtype, np.float32)
+        self.assertTrue(200 < encoded.size < 400)
+        kept = decoded != 0
+        np.testing.assert_array_equal(decoded[kept], value[kept])
+        self.assertEqual(np.count_nonzero(kept), encoded.size)
+
+    def test_decode_legacy_mask(self):
+        compression = SubsamplingCompression(0.5)
+        seed = 7
+        np.random.seed(seed=seed)
+        mask = np.random.choice([0, 1], self.shape, p=[0.5, 0.5])
+        masked = np.ma.masked_array(self.value, mask=mask).compressed()
+
+        decoded = compression.decode(masked, self.shape, seed)
+
+        np.testing.assert_array_equal(decoded, np.where(mask, 0, self.value))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -90,6 +90,28 @@ class DeltaWeightsDP:
             delta_weights,
             adding_same_noise=adding_same_noise)
 
+    def add_noise_to_flat_weights(self, flat_weights, adding_same_noise=True):
+        """Add noise to delta weights in FlatWeights format.
+
+        The noise is added layer by layer, same as add_noise_to_all_layers.
+
+        Args:
+            flat_weights: delta weights of all layers, FlatWeights format.
+            adding_same_noise: whether add same noise to every weight of layer
+            weights.
+
+        Returns:
+            noised delta weights, FlatWeights format.
+        """
+        vector = np.empty_like(flat_weights.vector)
+        for layer in flat_weights.layers:
+            noised = self.add_noise_to_one_layer(
+                np.asarray(flat_weights.layer(layer)), adding_same_noise)
+            vector[layer.offset:layer.offset + noised.size] = \
+                np.reshape(noised, -1)
+
+        return flat_weights.like(vector)
+
     def get_privacy_spent(self, steps):
         """Compute privacy spent based on moment accounts
 
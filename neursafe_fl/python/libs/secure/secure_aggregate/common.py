@@ -39,7 +39,13 @@ def get_shape(data):
 
 
 class PseudorandomGenerator:
-    """A pseudorandom generator."""
+    """A pseudorandom generator.
+
+    The float values are drawn from PCG64, one 64-bit output per value, so
+    the stream is counter-based: generating n values and skipping n values
+    by advance lead to the same state, the mask can be generated chunk by
+    chunk, or from any offset of the stream.
+    """
     def __init__(self, seed, return_type='float'):
         self.__random = np.random.default_rng(seed)
         self.__return_type = return_type
@@ -58,3 +64,36 @@ class PseudorandomGenerator:
             return self.__random.random(shape)
 
         return self.__random.integers(-1000, 1000, shape)
+
+    def fill(self, out):
+        """
+        Fill the array with the next pseudorandom values in place. The
+        float64 array is filled with the values of next_value(out.shape),
+        the unsigned integer array is filled with the 64-bit outputs
+        truncated to its bits, which are uniform in the ring of its dtype.
+        Both consume one 64-bit output per value.
+
+        Args:
+            out: the float64 or unsigned integer numpy array to be filled.
+        """
+        if out.dtype.kind == 'u':
+            # truncating to the low bits of uint64 wraps around.
+            out[...] = self.__random.bit_generator.random_raw(
+                out.size).reshape(out.shape)
+        elif self.__return_type == 'float':
+            self.__random.random(out=out)
+        else:
+            out[...] = self.__random.integers(-1000, 1000, out.shape)
+
+    def advance(self, count):
+        """
+        Skip the next count pseudorandom values without generating them,
+        the float or unsigned integer values filled.
+
+        Args:
+            count: the number of values to skip.
+        """
+        if self.__return_type != 'float':
+            raise ValueError("Only the float generator can advance.")
+
+        self.__random.bit_generator.advance(count)
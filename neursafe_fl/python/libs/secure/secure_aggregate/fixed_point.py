@@ -0,0 +1,83 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Encode the weights into the fixed point of the uint32 or uint64 ring.
+
+The value v is encoded as round(v * 2**fraction_bits) modulo 2**ring_bits,
+the negative value is in two's complement. The masks and the accumulation
+wrap around in the ring, so the masks cancel exactly, and the accumulated
+value is decoded once after unmasking, as long as the sum of values is in
+[-2**(ring_bits - 1), 2**(ring_bits - 1)) / 2**fraction_bits.
+"""
+
+import numpy as np
+
+DEFAULT_RING_BITS = 32
+SUPPORTED_RING_BITS = (32, 64)
+
+# the element number encoded at a time, bound the float64 temporaries.
+CHUNK_SIZE = 1 << 20
+
+_UNSIGNED = {32: np.uint32, 64: np.uint64}
+_SIGNED = {32: np.int32, 64: np.int64}
+
+
+def check_fixed_point(fraction_bits, ring_bits):
+    """Check fixed point parameters valid.
+    """
+    if ring_bits not in SUPPORTED_RING_BITS:
+        raise ValueError("The ring_bits must be one of %s, provided "
+                         "ring_bits is: %s" % (SUPPORTED_RING_BITS, ring_bits))
+
+    if not 0 <= fraction_bits < ring_bits - 1:
+        raise ValueError("The fraction_bits must be in [0, %s), provided "
+                         "fraction_bits is: %s" % (ring_bits - 1,
+                                                   fraction_bits))
+
+
+def ring_dtype(ring_bits):
+    """The unsigned dtype of the ring."""
+    return np.dtype(_UNSIGNED[ring_bits])
+
+
+def encode_fixed_point(value, fraction_bits, ring_bits=DEFAULT_RING_BITS,
+                       weight=1):
+    """Encode the weighted value into the ring.
+
+    Args:
+        value: number or float numpy array.
+        fraction_bits: the bits of fraction.
+        ring_bits: the bits of ring, 32 or 64.
+        weight: the value is multiplied by weight while encoding, without
+            the temporary of the weighted value.
+    Returns:
+        unsigned numpy array of the same shape.
+    """
+    array = np.asarray(value)
+    flat = np.reshape(array, -1)
+    result = np.empty(flat.size, dtype=_UNSIGNED[ring_bits])
+    scale = float(weight) * 2 ** fraction_bits
+    bound = float(2 ** (ring_bits - 1))
+
+    for start in range(0, flat.size, CHUNK_SIZE):
+        chunk = np.multiply(flat[start:start + CHUNK_SIZE], scale,
+                            dtype=np.float64)
+        np.rint(chunk, out=chunk)
+        if not np.all(np.abs(chunk) < bound):
+            raise ValueError("The value is not finite or out of the range "
+                             "of %s bits fixed point with %s fraction bits."
+                             % (ring_bits, fraction_bits))
+        # int64 to unsigned wraps around, the two's complement.
+        result[start:start + CHUNK_SIZE] = chunk.astype(np.int64)
+
+    return np.reshape(result, array.shape)
+
+
+def decode_fixed_point(value, fraction_bits, ring_bits=DEFAULT_RING_BITS):
+    """Decode the value of ring, the inverse of encode_fixed_point.
+
+    Returns:
+        float64 numpy array of the same shape.
+    """
+    signed = np.asarray(value).astype(_SIGNED[ring_bits])
+    return np.true_divide(signed, float(2 ** fraction_bits))
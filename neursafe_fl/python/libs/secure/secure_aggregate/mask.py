@@ -0,0 +1,154 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Generate the combined mask of secure aggregation.
+
+The mask of all the layers is generated in one flattened buffer, which is
+the concatenation of the masks of layers, because the pseudorandom streams
+are consumed layer by layer in order. The buffer is filled chunk by
+chunk, the stream of each peer is drawn into one reused chunk scratch and
+accumulated into the buffer in place, so the temporary memory is bounded by
+the chunk, whatever the number of peers and the size of model.
+
+The mask could also be generated by shards of parameters in parallel, the
+streams are advanced to the start of the shard, and each shard is added to
+the data in place once generated, without the buffer of the whole mask.
+"""
+
+import numpy as np
+
+from neursafe_fl.python.libs.secure.secure_aggregate.common import \
+    PseudorandomGenerator
+
+# the element number generated at a time, the scratch is one float64 array
+# of this size, small enough to stay in cache while the peers accumulate.
+CHUNK_SIZE = 1 << 16
+
+ADD = 1
+SUBTRACT = -1
+
+
+def mask_size(shapes):
+    """Return the total element number of shapes."""
+    return sum(int(np.prod(shape, dtype=np.int64)) for shape in shapes)
+
+
+def mask_dtype(values):
+    """The dtype of the masks of values.
+
+    The values encoded in fixed point are masked in the ring of their
+    unsigned dtype, the others are masked by float64.
+    """
+    dtypes = [getattr(value, "dtype", None) for value in values]
+    if not any(isinstance(dtype, np.dtype) and dtype.kind == 'u'
+               for dtype in dtypes):
+        return np.dtype(np.float64)
+
+    if len(set(dtypes)) > 1:
+        raise ValueError("The values in fixed point must be in the same "
+                         "ring, provided dtypes: %s" % set(dtypes))
+    return dtypes[0]
+
+
+def generate_mask(size, terms, chunk_size=CHUNK_SIZE, dtype=np.float64):
+    """Generate the combined mask of the pseudorandom streams.
+
+    Args:
+        size: the element number of mask.
+        terms: list of (sign, prg), sign is ADD or SUBTRACT, the next size
+            values of each prg are added to or subtracted from the mask in
+            order.
+        chunk_size: the element number generated at a time.
+        dtype: float64, or the unsigned dtype of the fixed point ring, the
+            mask wraps around in the ring.
+    Returns:
+        numpy array of size and dtype.
+    """
+    mask = np.zeros(size, dtype=dtype)
+    scratch = np.empty(min(chunk_size, size), dtype=dtype)
+
+    for start in range(0, size, chunk_size):
+        chunk = mask[start:start + chunk_size]
+        random = scratch[:chunk.size]
+        for sign, prg in terms:
+            prg.fill(random)
+            if sign == ADD:
+                np.add(chunk, random, out=chunk)
+            else:
+                np.subtract(chunk, random, out=chunk)
+
+    return mask
+
+
+def split_shards(size, shard_num, alignment=CHUNK_SIZE):
+    """Split [0, size) into at most shard_num ranges, the bounds are aligned
+    to alignment, so no shard is smaller than a chunk but the last one.
+
+    Returns:
+        list of (start, end).
+    """
+    if not size:
+        return []
+
+    shard_size = -(-size // shard_num)
+    shard_size = -(-shard_size // alignment) * alignment
+    return [(start, min(start + shard_size, size))
+            for start in range(0, size, shard_size)]
+
+
+def generate_mask_shard(start, size, seeds, dtype=np.float64):
+    """Generate the shard [start, start + size) of the combined mask.
+
+    Args:
+        start: the offset of shard in the flattened mask.
+        size: the element number of shard.
+        seeds: list of (sign, seed), the seed of the float generator of each
+            pseudorandom stream, picklable to generate in other process.
+        dtype: float64, or the unsigned dtype of the fixed point ring.
+    Returns:
+        numpy array of size and dtype, same as the slice of the mask
+        generated by generate_mask.
+    """
+    terms = []
+    for sign, seed in seeds:
+        prg = PseudorandomGenerator(seed)
+        prg.advance(start)
+        terms.append((sign, prg))
+
+    return generate_mask(size, terms, dtype=dtype)
+
+
+def add_mask_shard(targets, start, shard):
+    """Add the shard of mask to the flattened targets in place.
+
+    Args:
+        targets: list of 1-D arrays, their concatenation is masked by the
+            flattened mask.
+        start: the offset of shard in the flattened mask.
+        shard: the shard of mask.
+    """
+    end = start + shard.size
+    offset = 0
+    for target in targets:
+        low, high = max(start, offset), min(end, offset + target.size)
+        if low < high:
+            part = target[low - offset:high - offset]
+            np.add(part, shard[low - start:high - start], out=part)
+        offset += target.size
+
+
+def split_mask(mask, shapes):
+    """Split the flattened mask into the masks of shapes.
+
+    The masks are views of the flattened mask, the mask of shape (1,) is a
+    scalar, same as the mask of a number.
+    """
+    masks = []
+    start = 0
+    for shape in shapes:
+        size = int(np.prod(shape, dtype=np.int64))
+        layer = mask[start:start + size].reshape(shape)
+        masks.append(layer if shape != (1,) else layer[0])
+        start += size
+
+    return masks
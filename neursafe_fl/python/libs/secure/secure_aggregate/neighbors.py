@@ -0,0 +1,81 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""The sparse neighbor graph of SSA, as SecAgg+.
+
+Each client only agrees the pairwise mask with, and shares its secrets to,
+its neighbors, instead of all the other clients. The graph is a k-regular
+circulant graph: the clients are shuffled into a ring by the public seed
+derived from the handle, and each client's neighbors are the k / 2 clients
+on each side of it in the ring. The client and the server derive the same
+graph from the client ids broadcast by the server with the public keys, the
+clients refuse the ids of less than min_client_num distinct clients, or not
+containing themselves.
+
+The secrets are split into k + 1 shares, k for the neighbors and one for
+the client itself, the threshold is scaled from the threshold of all the
+clients, and always more than half of the shares, so the server could not
+recover both the b and s_sk of a client.
+"""
+
+import hashlib
+import math
+
+import numpy as np
+
+
+def check_neighbor_num(neighbor_num):
+    """Check neighbor number parameter valid.
+    """
+    if not isinstance(neighbor_num, int) or isinstance(neighbor_num, bool) \
+            or neighbor_num < 2 or neighbor_num % 2:
+        raise ValueError("The neighbor_num must be positive even integer, "
+                         "provided neighbor_num is: %s" % neighbor_num)
+
+
+def graph_seed(handle):
+    """The public seed of the neighbor graph of the handle."""
+    return int.from_bytes(hashlib.sha256(handle.encode()).digest()[:8], "big")
+
+
+def neighbor_graph(client_ids, neighbor_num, seed):
+    """Generate the neighbor graph of clients.
+
+    Args:
+        client_ids: the ids of clients.
+        neighbor_num: the number of neighbors of each client, even number,
+            if not less than the number of other clients, the graph is
+            complete.
+        seed: the public seed to shuffle the clients.
+    Returns:
+        dict, the key is client id, the value is the list of its neighbors.
+    """
+    ring = sorted(client_ids)
+    size = len(ring)
+    if neighbor_num >= size - 1:
+        return {client_id: [other for other in ring if other != client_id]
+                for client_id in ring}
+
+    ring = [ring[index]
+            for index in np.random.default_rng(seed).permutation(size)]
+    graph = {}
+    for position, client_id in enumerate(ring):
+        graph[client_id] = []
+        for offset in range(1, neighbor_num // 2 + 1):
+            graph[client_id].append(ring[(position + offset) % size])
+            graph[client_id].append(ring[(position - offset) % size])
+
+    return graph
+
+
+def neighbor_threshold(threshold, client_num, share_num):
+    """The threshold of the shares split to the neighbors.
+
+    Args:
+        threshold: the threshold of all the clients.
+        client_num: the number of all the clients.
+        share_num: the number of shares, the neighbor number plus one.
+    """
+    return min(share_num,
+               max(math.ceil(threshold * share_num / client_num),
+                   share_num // 2 + 1))
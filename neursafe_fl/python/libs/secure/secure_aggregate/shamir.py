@@ -0,0 +1,127 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Shamir secret sharing over the prime field of 2**1279 - 1.
+
+The secret is the constant term of a random polynomial of degree threshold
+- 1, the share of x is the point (x, f(x)), any threshold shares recover
+the secret by Lagrange interpolation at 0. The field is large enough for
+the 1024-bit DH private keys, and the Mersenne prime keeps the modular
+reduction cheap.
+
+The share is encoded in bytes, 4 bytes of x and 160 bytes of y in big
+endian. The secrets of all the clients are recovered in one call, the
+Lagrange coefficients are only computed once for the shares of the same
+x coordinates, which is the usual case, as the shares are reported by the
+same alive clients.
+"""
+
+import secrets
+
+PRIME = 2 ** 1279 - 1
+
+_X_BYTES = 4
+_Y_BYTES = (PRIME.bit_length() + 7) // 8
+SHARE_BYTES = _X_BYTES + _Y_BYTES
+
+
+def encode_share(x, y):
+    """Encode the point (x, y) into bytes."""
+    return x.to_bytes(_X_BYTES, "big") + y.to_bytes(_Y_BYTES, "big")
+
+
+def decode_share(share):
+    """Decode the bytes into the point (x, y)."""
+    if len(share) != SHARE_BYTES:
+        raise ValueError("The share must be %s bytes, but got %s."
+                         % (SHARE_BYTES, len(share)))
+
+    return (int.from_bytes(share[:_X_BYTES], "big"),
+            int.from_bytes(share[_X_BYTES:], "big"))
+
+
+def split_secret(secret, threshold, share_num):
+    """Split secret into share_num shares, any threshold shares recover it.
+
+    Args:
+        secret: non-negative integer less than PRIME.
+        threshold: the minimum number of shares to recover the secret.
+        share_num: the number of shares, the x of shares is 1 to share_num.
+    Returns:
+        list of shares in bytes.
+    """
+    if not 0 <= secret < PRIME:
+        raise ValueError("The secret must be in [0, 2**1279 - 1).")
+    if not 0 < threshold <= share_num:
+        raise ValueError("The threshold must be in [1, %s], provided "
+                         "threshold is: %s" % (share_num, threshold))
+
+    coefficients = [secret] + [secrets.randbelow(PRIME)
+                               for _ in range(threshold - 1)]
+    shares = []
+    for x in range(1, share_num + 1):
+        y = 0
+        for coefficient in reversed(coefficients):
+            y = (y * x + coefficient) % PRIME
+        shares.append(encode_share(x, y))
+
+    return shares
+
+
+def _lagrange_coefficients(xs):
+    """The coefficients of Lagrange interpolation at 0 of xs, with one
+    modular inverse for all the denominators."""
+    numerators, denominators = [], []
+    for i, x_i in enumerate(xs):
+        numerator, denominator = 1, 1
+        for j, x_j in enumerate(xs):
+            if i != j:
+                numerator = numerator * x_j % PRIME
+                denominator = denominator * (x_j - x_i) % PRIME
+        numerators.append(numerator)
+        denominators.append(denominator)
+
+    # the inverses of all the denominators by the inverse of their product.
+    prefixes = [1]
+    for denominator in denominators:
+        prefixes.append(prefixes[-1] * denominator % PRIME)
+    inverse = pow(prefixes[-1], -1, PRIME)
+
+    coefficients = [0] * len(xs)
+    for i in reversed(range(len(xs))):
+        coefficients[i] = numerators[i] * inverse % PRIME * prefixes[i] \
+            % PRIME
+        inverse = inverse * denominators[i] % PRIME
+    return coefficients
+
+
+def recover_secrets(shares_s, threshold):
+    """Recover the secrets from their shares in one batch.
+
+    Args:
+        shares_s: dict, the key is the owner of secret, the value is the list
+            of shares in bytes, at least threshold shares.
+        threshold: the threshold of splitting the secrets, the threshold
+            shares of the smallest x are used.
+    Returns:
+        dict of the owner and the recovered secret.
+    """
+    coefficients_s = {}
+    result = {}
+    for owner, shares in shares_s.items():
+        points = dict(decode_share(share) for share in shares)
+        if len(points) != len(shares):
+            raise ValueError("The shares of %s have duplicated x." % owner)
+        if len(points) < threshold:
+            raise ValueError("The number of shares of %s is less than "
+                             "threshold, %s/%s."
+                             % (owner, len(points), threshold))
+
+        xs = tuple(sorted(points)[:threshold])
+        if xs not in coefficients_s:
+            coefficients_s[xs] = _lagrange_coefficients(xs)
+
+        result[owner] = sum(coefficient * points[x] for coefficient, x
+                            in zip(coefficients_s[xs], xs)) % PRIME
+
+    return result
@@ -13,7 +13,6 @@ import fcntl
 import os
 
 from absl import logging
-from secretsharing import SecretSharer
 
 from neursafe_fl.python.utils.timer import Timer
 from neursafe_fl.proto.secure_aggregate_grpc import SSAServiceStub
@@ -24,6 +23,10 @@ from neursafe_fl.python.libs.secure.secure_aggregate.aes import \
 from neursafe_fl.python.libs.secure.secure_aggregate.common import \
     ProtocolStage, PseudorandomGenerator
 from neursafe_fl.python.libs.secure.secure_aggregate.dh import DiffieHellman
+from neursafe_fl.python.libs.secure.secure_aggregate.neighbors import \
+    graph_seed, neighbor_graph, neighbor_threshold
+from neursafe_fl.python.libs.secure.secure_aggregate.shamir import \
+    split_secret
 from neursafe_fl.python.libs.secure.secure_aggregate.ssa_controller import \
     ssa_controller
 from neursafe_fl.python.libs.secure.secure_aggregate.ssa_server import SERVER
@@ -117,6 +120,8 @@ class SSAClient(SSABaseClient):
         server_aggregate_interval:  the time to wait for server to use decrypt.
         kwargs:
             stage_time_interval: the time to wait a stage timeout.
+            neighbor_num: if set, only agree the masks with and share the
+                secrets to the neighbors in the neighbor graph, as SecAgg+.
     """
     def __init__(self, handle, server_addr, ssl_key, client_id,
                  min_client_num, client_num, workspace,
@@ -148,6 +153,10 @@ class SSAClient(SSABaseClient):
         self.__my_b_share = None
         self.__encrypted_shares = None
 
+        self.__neighbor_num = kwargs.get("neighbor_num")
+        self.__share_threshold = min_client_num
+        self.__share_num = client_num
+
     def initialize(self):
         """Initialize client.
         """
@@ -256,7 +265,10 @@ class SSAClient(SSABaseClient):
     async def __handle_public_keys(self, msg):
         try:
             self.__assert_stage(ProtocolStage.ExchangePublicKey)
-            self.__assert_number(len(msg.public_keys_bcst.public_key))
+            if self.__neighbor_num:
+                self.__assert_number(len(set(msg.public_keys_bcst.client_id)))
+            else:
+                self.__assert_number(len(msg.public_keys_bcst.public_key))
             self.__stop_stage_timer()
 
             self.__save_public_keys(msg.public_keys_bcst)
@@ -278,12 +290,39 @@ class SSAClient(SSABaseClient):
                              'less than threshold, %s/%s.' % (
                                  number, self._min_client_num))
 
+    def __assert_share_number(self, number):
+        if number < self.__share_threshold:
+            raise ValueError('The number of shares is less than threshold, '
+                             '%s/%s.' % (number, self.__share_threshold))
+
     def __save_public_keys(self, public_keys):
         for public_key in public_keys.public_key:
             if public_key.client_id == self._my_id:
                 continue
             self.__dh_public_keys[public_key.client_id] = public_key
 
+        if self.__neighbor_num:
+            self.__select_neighbors(public_keys.client_id)
+
+    def __select_neighbors(self, client_ids):
+        # derive the neighbors from the public seed, not trust the public keys
+        # sent by server.
+        if self._my_id not in client_ids:
+            raise ValueError("The client %s is not in the clients of the "
+                             "neighbor graph." % self._my_id)
+        neighbors = neighbor_graph(set(client_ids), self.__neighbor_num,
+                                   graph_seed(self._handle))[self._my_id]
+        missing = set(neighbors) - set(self.__dh_public_keys)
+        if missing:
+            raise ValueError("The public keys of neighbors %s are missing."
+                             % missing)
+
+        self.__dh_public_keys = {client_id: self.__dh_public_keys[client_id]
+                                 for client_id in neighbors}
+        self.__share_num = len(neighbors) + 1
+        self.__share_threshold = neighbor_threshold(
+            self._min_client_num, self._client_num, self.__share_num)
+
     async def __exchange_encrypted_share(self):
         self.__stage = ProtocolStage.ExchangeEncryptedShare
         self.__start_stage_timer()
@@ -308,13 +347,12 @@ class SSAClient(SSABaseClient):
         self._b = random.randint(MIN_B_MASK, MAX_B_MASK)
 
     def __split_b_mask(self):
-        return SecretSharer.split_secret(
-            str(self._b), self._min_client_num, self._client_num)
+        return split_secret(self._b, self.__share_threshold,
+                            self.__share_num)
 
     def __split_s_mask(self):
-        return SecretSharer.split_secret(
-            str(self.__my_dh_keys['s_sk']), self._min_client_num,
-            self._client_num)
+        return split_secret(self.__my_dh_keys['s_sk'],
+                            self.__share_threshold, self.__share_num)
 
     def __save_my_b_share(self, b_shares):
         self.__my_b_share = b_shares[-1]
@@ -327,8 +365,8 @@ class SSAClient(SSABaseClient):
                                       int(public_key.c_pk))
             msg = ''.join([
                 str(self._my_id), ENCRYPTED_SHARE_DELIMITER, str(client_id),
-                ENCRYPTED_SHARE_DELIMITER, s_sk_shares[index],
-                ENCRYPTED_SHARE_DELIMITER, b_shares[index]])
+                ENCRYPTED_SHARE_DELIMITER, s_sk_shares[index].hex(),
+                ENCRYPTED_SHARE_DELIMITER, b_shares[index].hex()])
 
             encrypted_share = encrypt_with_gcm(aes_key, msg,
                                                self._handle, self._my_id)
@@ -345,7 +383,7 @@ class SSAClient(SSABaseClient):
     async def __handle_encrypted_shares(self, msg):
         try:
             self.__assert_stage(ProtocolStage.ExchangeEncryptedShare)
-            self.__assert_number(
+            self.__assert_share_number(
                 len(msg.encrypted_shares_bcst.encrypted_share) + 1)
             self.__stop_stage_timer()
 
@@ -414,7 +452,9 @@ class SSAClient(SSABaseClient):
         secret_shares = SecretShares()
         for encrypted_share in self.__encrypted_shares.encrypted_share:
             shares = self.__decrypt_shares(encrypted_share)
-            _, _, s_sk_share, b_share = shares.split('$$')
+            s_sk_share, b_share = [
+                bytes.fromhex(share) for share in
+                shares.split(ENCRYPTED_SHARE_DELIMITER)[2:]]
 
             if encrypted_share.client_id in alive_clients.client_id:
                 secret_shares.b_share.append(SecretShare(
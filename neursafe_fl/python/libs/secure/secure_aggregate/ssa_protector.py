@@ -17,7 +17,10 @@ import numpy as np
 from neursafe_fl.python.libs.secure.secure_aggregate.common import \
     PseudorandomGenerator, can_be_added, get_shape
 from neursafe_fl.python.libs.secure.secure_aggregate.aes import decrypt_with_gcm
+from neursafe_fl.python.libs.secure.secure_aggregate.mask import ADD, \
+    SUBTRACT, generate_mask, mask_dtype, mask_size, split_mask
 from neursafe_fl.python.client.executor.errors import FLError
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 WAIT_INTERNAL = 1
 WAIT_TIMEOUT = 3600
@@ -35,18 +38,18 @@ class SSAProtector:
         self.s_uv_s = []
         self.id_ = None
 
-    def __generate_mask(self, shape, b_prg=None):
-        mask = np.zeros(shape)
-        for (v_id, s_uv_prg) in self.s_uv_s:
-            if self.id_ > v_id:
-                mask = np.add(mask, s_uv_prg.next_value(shape))
-            else:
-                mask = np.subtract(mask, s_uv_prg.next_value(shape))
-
+    def __generate_masks(self, values, b_prg=None):
+        # the masks of all the layers are generated in one pass, in the ring
+        # of the values encoded in fixed point.
+        shapes = [get_shape(value) for value in values]
+        terms = [(ADD if self.id_ > v_id else SUBTRACT, s_uv_prg)
+                 for (v_id, s_uv_prg) in self.s_uv_s]
         if b_prg:
-            mask = np.add(mask, b_prg.next_value(shape))
+            terms.append((ADD, b_prg))
 
-        return mask if shape != (1,) else mask[0]
+        mask = generate_mask(mask_size(shapes), terms,
+                             dtype=mask_dtype(values))
+        return split_mask(mask, shapes)
 
     def __gen_b_prg(self):
         if self.b:
@@ -57,11 +60,9 @@ class SSAProtector:
     def __encrypt_list(self, data):
         new_data = []
 
-        b_prg = self.__gen_b_prg()
+        masks = self.__generate_masks(data, self.__gen_b_prg())
 
-        for item in data:
-            shape = get_shape(item)
-            mask = self.__generate_mask(shape, b_prg)
+        for item, mask in zip(data, masks):
             new_data.append(item + mask)
 
         return new_data
@@ -69,11 +70,10 @@ class SSAProtector:
     def __encrypt_ordered_dict(self, data):
         new_data = OrderedDict()
 
-        b_prg = self.__gen_b_prg()
+        masks = self.__generate_masks(list(data.values()),
+                                      self.__gen_b_prg())
 
-        for name, value in data.items():
-            shape = get_shape(value)
-            mask = self.__generate_mask(shape, b_prg)
+        for (name, value), mask in zip(data.items(), masks):
             new_data[name] = np.add(value, mask)
 
         return new_data
@@ -112,16 +112,18 @@ class SSAProtector:
         Args:
             data: data which need to be protect
         """
-        if isinstance(data, list):
+        if isinstance(data, FlatWeights):
+            # all the layers are masked in one call
+            mask = self.__generate_masks([data.vector], self.__gen_b_prg())[0]
+            new_data = data.like(np.add(data.vector, mask))
+        elif isinstance(data, list):
             # tf's weights is list, the value is ndarray
             new_data = self.__encrypt_list(data)
         elif isinstance(data, OrderedDict):
             # pytorch's value in OrderedDict, the value is torch.Tensor
             new_data = self.__encrypt_ordered_dict(data)
         elif can_be_added(data):
-            shape = get_shape(data)
-            b_prg = self.__gen_b_prg()
-            mask = self.__generate_mask(shape, b_prg)
+            mask = self.__generate_masks([data], self.__gen_b_prg())[0]
             new_data = np.add(data, mask)
         else:
             raise TypeError('Not support data type %s' % type(data))
@@ -8,16 +8,25 @@
 import abc
 import asyncio
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 from absl import logging
-from secretsharing import SecretSharer
 
 from neursafe_fl.python.libs.secure.secure_aggregate.common import \
-    ProtocolStage, can_be_added, PseudorandomGenerator, get_shape
+    ProtocolStage, can_be_added
 from neursafe_fl.python.libs.secure.secure_aggregate.dh import DiffieHellman
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    DEFAULT_RING_BITS, decode_fixed_point, ring_dtype
+from neursafe_fl.python.libs.secure.secure_aggregate.mask import ADD, \
+    SUBTRACT, add_mask_shard, generate_mask_shard, split_shards
+from neursafe_fl.python.libs.secure.secure_aggregate.neighbors import \
+    graph_seed, neighbor_graph, neighbor_threshold
+from neursafe_fl.python.libs.secure.secure_aggregate.shamir import \
+    recover_secrets
 from neursafe_fl.python.libs.secure.secure_aggregate.ssa_controller import \
     ssa_controller
+from neursafe_fl.python.runtime.weights import FlatWeights
 from neursafe_fl.python.utils.timer import Timer
 from neursafe_fl.proto.secure_aggregate_grpc import SSAServiceStub
 from neursafe_fl.proto.secure_aggregate_pb2 import PublicKeys, SSAMessage, \
@@ -25,16 +34,37 @@ from neursafe_fl.proto.secure_aggregate_pb2 import PublicKeys, SSAMessage, \
 from neursafe_fl.python.trans.grpc_call import unary_call
 
 STAGE_TIME_INTERVAL = 60
+UNMASK_WORKERS = 4
 SERVER = 'server'
 
 
+def _agree_keys(key_pairs):
+    """Agree the shared keys of (sk, pk) pairs, executed in unmask pool."""
+    diffie_hellman = DiffieHellman()
+    return [diffie_hellman.agree(sk, pk) for sk, pk in key_pairs]
+
+
+def _split_items(items, shard_num):
+    """Split the items into at most shard_num interleaved shards."""
+    return [items[index::shard_num] for index in range(shard_num)
+            if items[index::shard_num]]
+
+
 class SSABaseServer:
-    """Secret Share Aggregate, base server"""
-    def __init__(self, handle, min_client_num, client_num, ssl_key):
+    """Secret Share Aggregate, base server.
+
+    If fraction_bits is set, the clients encode the weights into the fixed
+    point of the ring of ring_bits, the data is accumulated and unmasked in
+    the ring, then decoded into float64 once.
+    """
+    def __init__(self, handle, min_client_num, client_num, ssl_key,
+                 fraction_bits=None, ring_bits=DEFAULT_RING_BITS):
         self._handle = handle
         self._min_client_num = min_client_num
         self._client_num = client_num
         self._ssl_key = ssl_key
+        self._fraction_bits = fraction_bits
+        self._ring_bits = ring_bits
 
         self._total_data = 0
         self._b_masks = []
@@ -56,7 +86,9 @@ class SSABaseServer:
         """Process the ssa protocol message."""
 
     def _accumulate_data(self, data):
-        if isinstance(data, list):
+        if isinstance(data, FlatWeights):
+            self._accumulate_flat_weights(data)
+        elif isinstance(data, list):
             # tf's weights is a list/numpy.ndarray
             self._accumulate_list(data)
         elif isinstance(data, OrderedDict):
@@ -67,6 +99,23 @@ class SSABaseServer:
         else:
             raise TypeError('Not support data type %s' % type(data))
 
+    def _decode_data(self, data):
+        if self._fraction_bits is None:
+            return data
+
+        def decode(value):
+            return decode_fixed_point(value, self._fraction_bits,
+                                      self._ring_bits)
+
+        if isinstance(data, FlatWeights):
+            return data.like(decode(data.vector))
+        if isinstance(data, list):
+            return [decode(value) for value in data]
+        if isinstance(data, OrderedDict):
+            return OrderedDict((name, decode(value))
+                               for name, value in data.items())
+        return decode(data)
+
     def _accumulate_list(self, data):
         if not self._total_data:
             self._total_data = data
@@ -76,6 +125,14 @@ class SSABaseServer:
             self._total_data[index] = np.add(
                 self._total_data[index], value)
 
+    def _accumulate_flat_weights(self, data):
+        if not isinstance(self._total_data, FlatWeights):
+            self._total_data = data
+            return
+
+        self._total_data = self._total_data.like(
+            np.add(self._total_data.vector, data.vector))
+
     def _accumulate_ordereddict(self, data):
         if not self._total_data:
             self._total_data = data
@@ -96,12 +153,28 @@ class SSAServer(SSABaseServer):
         ssl_key: the ssl path to use GRPCS.
         kwargs:
             stage_time_interval: the time to wait a stage timeout.
+            fraction_bits: the fraction bits of fixed point, if set, the
+                data is in the fixed point ring.
+            ring_bits: the bits of the fixed point ring, 32 or 64.
+            neighbor_num: if set, each client only agrees the masks with and
+                shares the secrets to its neighbors, as SecAgg+.
+            unmask_workers: the number of processes to recover the secrets
+                and generate the masks, split by clients pairs and shards of
+                parameters, the event loop keeps serving meanwhile.
     """
     def __init__(self, handle, min_client_num, client_num,
                  wait_aggregate_interval,
                  ssl_key=None, **kwargs):
-        super().__init__(handle, min_client_num, client_num,
-                         ssl_key)
+        super().__init__(handle, min_client_num, client_num, ssl_key,
+                         kwargs.get("fraction_bits"),
+                         kwargs.get("ring_bits", DEFAULT_RING_BITS))
+
+        self.__neighbor_num = kwargs.get("neighbor_num")
+        self.__graph = None
+
+        self.__unmask_workers = kwargs.get("unmask_workers", UNMASK_WORKERS)
+        self.__unmask_pool = None
+        self.__recover_task = None
 
         self.__stage_time_interval = kwargs.get("stage_time_interval",
                                                 STAGE_TIME_INTERVAL)
@@ -173,6 +246,22 @@ class SSAServer(SSABaseServer):
             self.__error = error
             self.__set_initialize_finished_ready()
             self.__clear()
+            self.__shutdown_unmask_pool()
+
+    def __get_unmask_pool(self):
+        if not self.__unmask_pool:
+            self.__unmask_pool = ProcessPoolExecutor(self.__unmask_workers)
+        return self.__unmask_pool
+
+    def __shutdown_unmask_pool(self):
+        if self.__unmask_pool:
+            self.__unmask_pool.shutdown(wait=False)
+        self.__unmask_pool = None
+
+    async def __run_in_unmask_pool(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__get_unmask_pool(), func,
+                                          *args)
 
     async def __handle_public_key(self, msg):
         self.__assert_stage(ProtocolStage.ExchangePublicKey)
@@ -191,9 +280,12 @@ class SSAServer(SSABaseServer):
             self.__stop_stage_timer()
             self.__stage = ProtocolStage.ExchangeEncryptedShare
 
-            msg = self.__encode_public_keys_msg()
-            self.__broadcast_pks_to_clients(
-                self.__public_keys, msg)
+            if self.__neighbor_num:
+                self.__send_neighbor_pks_to_clients()
+            else:
+                msg = self.__encode_public_keys_msg()
+                self.__broadcast_pks_to_clients(
+                    self.__public_keys, msg)
 
             self.__start_stage_timer(self.__exchange_encrypted_shares)
         except Exception as err:
@@ -209,6 +301,21 @@ class SSAServer(SSABaseServer):
             handle=self._handle,
             public_keys_bcst=public_keys)
 
+    def __send_neighbor_pks_to_clients(self):
+        # each client only receives the public keys of its neighbors, and the
+        # clients to derive the neighbor graph.
+        self.__graph = neighbor_graph(list(self.__public_keys),
+                                      self.__neighbor_num,
+                                      graph_seed(self._handle))
+        for client_id, neighbors in self.__graph.items():
+            public_keys = PublicKeys(client_id=list(self.__public_keys))
+            for neighbor in neighbors:
+                public_keys.public_key.append(self.__public_keys[neighbor])
+
+            msg = SSAMessage(handle=self._handle,
+                             public_keys_bcst=public_keys)
+            asyncio.create_task(self.__send_pks(client_id, msg))
+
     def __broadcast_pks_to_clients(self, client_list, msg):
         for alive_client_id in client_list:
             asyncio.create_task(
@@ -320,20 +427,23 @@ class SSAServer(SSABaseServer):
         Return:
             The unmask accumulated data.
         """
-        await self.__wait_initialize_finished_ready()
-        self.__assert_stage(ProtocolStage.CiphertextAggregate)
-        self.__stop_wait_aggregate_timer()
-        self.__raise_exception_if_error()
+        try:
+            await self.__wait_initialize_finished_ready()
+            self.__assert_stage(ProtocolStage.CiphertextAggregate)
+            self.__stop_wait_aggregate_timer()
+            self.__raise_exception_if_error()
 
-        self.__stage = ProtocolStage.DecryptResult
-        self.__start_stage_timer(self.__generate_double_mask)
+            self.__stage = ProtocolStage.DecryptResult
+            self.__start_stage_timer(self.__generate_double_mask)
 
-        self.__broadcast_alive_clients()
+            self.__broadcast_alive_clients()
 
-        await self.__wait_mask_ready()
-        self.__raise_exception_if_error()
+            await self.__wait_mask_ready()
+            self.__raise_exception_if_error()
 
-        return self.__do_decrypt()
+            return self._decode_data(await self.__do_decrypt())
+        finally:
+            self.__shutdown_unmask_pool()
 
     def __broadcast_alive_clients(self):
         msg = self.__encode_alive_clients_msg()
@@ -359,49 +469,80 @@ class SSAServer(SSABaseServer):
     async def __wait_mask_ready(self):
         await self.__mask_ready_event.wait()
 
-    def __do_decrypt(self):
-        if isinstance(self._total_data, list):
-            self.__decrypt_list()
+    async def __do_decrypt(self):
+        if isinstance(self._total_data, FlatWeights):
+            vector = self.__unmask_target(self._total_data.vector)
+            await self.__unmask([vector])
+            self._total_data = self._total_data.like(vector)
+        elif isinstance(self._total_data, list):
+            await self.__decrypt_list()
         elif isinstance(self._total_data, OrderedDict):
-            self.__decrypt_ordered_dict()
+            await self.__decrypt_ordered_dict()
         elif can_be_added(self._total_data):
-            shape = get_shape(self._total_data)
-            mask = self.__generate_mask(shape)
-            self._total_data = np.add(self._total_data, mask)
+            target = self.__unmask_target(self._total_data)
+            await self.__unmask([target])
+            self._total_data = self.__unmasked_value(self._total_data,
+                                                     target)
         else:
             raise TypeError('Not support data type %s' %
                             type(self._total_data))
         return self._total_data
 
-    def __decrypt_list(self):
-        for index, value in enumerate(self._total_data):
-            shape = get_shape(value)
-            mask = self.__generate_mask(shape)
-            self._total_data[index] = np.add(value, mask)
-
-    def __decrypt_ordered_dict(self):
-        for name, value in self._total_data.items():
-            shape = get_shape(value)
-            mask = self.__generate_mask(shape)
-            self._total_data[name] = np.add(value, mask)
-
-    def __generate_mask(self, shape):
-        s_total = np.zeros(shape)
-
-        for (drop_id, alive_id, s_uv_prg) in self._s_uv_masks:
-            if drop_id > alive_id:
-                s_total = np.add(s_total, s_uv_prg.next_value(shape))
-            else:
-                s_total = np.subtract(s_total, s_uv_prg.next_value(shape))
-
-        b_total = np.zeros(shape)
-
-        for b_prg in self._b_masks:
-            b_total = np.add(b_total, b_prg.next_value(shape))
-
-        mask = np.subtract(s_total, b_total)
-
-        return mask if shape != (1,) else mask[0]
+    async def __decrypt_list(self):
+        targets = [self.__unmask_target(value) for value in self._total_data]
+        await self.__unmask(targets)
+        for index, (value, target) in enumerate(zip(self._total_data,
+                                                    targets)):
+            self._total_data[index] = self.__unmasked_value(value, target)
+
+    async def __decrypt_ordered_dict(self):
+        targets = [self.__unmask_target(value)
+                   for value in self._total_data.values()]
+        await self.__unmask(targets)
+        for (name, value), target in zip(list(self._total_data.items()),
+                                         targets):
+            self._total_data[name] = self.__unmasked_value(value, target)
+
+    def __mask_dtype(self):
+        return np.dtype(np.float64) if self._fraction_bits is None \
+            else ring_dtype(self._ring_bits)
+
+    def __unmask_target(self, value):
+        # the accumulated array is unmasked in place if it is writable and of
+        # the mask dtype, else in a flattened copy of the promoted dtype, the
+        # same as np.add(value, mask).
+        dtype = self.__mask_dtype()
+        if isinstance(value, np.ndarray) and value.dtype == dtype \
+                and value.flags.writeable and value.flags.c_contiguous:
+            return value.reshape(-1)
+
+        return np.array(value, dtype=np.result_type(value, dtype)).reshape(-1)
+
+    @staticmethod
+    def __unmasked_value(value, target):
+        if hasattr(value, "shape"):
+            return target.reshape(value.shape)
+        return target[0]
+
+    async def __unmask(self, targets):
+        # the masks of all the layers are generated by shards of parameters
+        # in the unmask pool, the s_uv masks of the dropped clients are
+        # restored, and the b masks of the alive clients are removed, each
+        # shard is added to the targets in place once generated.
+        seeds = [(ADD if drop_id > alive_id else SUBTRACT, s_uv)
+                 for (drop_id, alive_id, s_uv) in self._s_uv_masks]
+        seeds.extend((SUBTRACT, b) for b in self._b_masks)
+        size = sum(target.size for target in targets)
+
+        async def unmask_shard(start, end):
+            shard = await self.__run_in_unmask_pool(
+                generate_mask_shard, start, end - start, seeds,
+                self.__mask_dtype())
+            add_mask_shard(targets, start, shard)
+
+        await asyncio.gather(*[
+            unmask_shard(start, end)
+            for start, end in split_shards(size, self.__unmask_workers)])
 
     async def __handle_secret_shares(self, msg):
         self.__assert_stage(ProtocolStage.DecryptResult)
@@ -416,14 +557,23 @@ class SSAServer(SSABaseServer):
         self.__secret_shares.append(secret_shares)
 
     def __generate_double_mask(self):
+        self.__stop_stage_timer()
+        # the secrets are recovered out of the event loop, only once, even
+        # if the stage timer and the last secret shares both trigger.
+        if not self.__recover_task:
+            self.__recover_task = asyncio.create_task(
+                self.__recover_double_mask())
+
+    async def __recover_double_mask(self):
         try:
-            self.__stop_stage_timer()
             self.__assert_secret_shares()
             # to put the shares of the same client in one list.
             all_s_shares, all_b_shares = self.__reconstruct_secret_shares()
+            s_sk_s, b_s = await self.__recover_secrets(all_s_shares,
+                                                       all_b_shares)
 
-            self.__generate_s_uv_masks(all_s_shares)
-            self.__generate_b_masks(all_b_shares)
+            await self.__generate_s_uv_masks(s_sk_s)
+            self.__generate_b_masks(b_s)
 
         except Exception as err:
             logging.exception(str(err))
@@ -453,38 +603,81 @@ class SSAServer(SSABaseServer):
 
         return all_s_shares, all_b_shares
 
-    def __generate_s_uv_masks(self, all_s_shares):
+    def __is_pair(self, client_id_u, client_id_v):
+        return not self.__graph or client_id_v in self.__graph[client_id_u]
+
+    def __drop_clients(self):
+        # the dropped clients, which have pairwise masks with the alive
+        # clients, only the neighbors of them in neighbor graph.
         drop_clients = set(self.__rpt_encrypted_share_clients)\
             - set(self.__rpt_masked_result_clients)
-        s_sk_s = {}
+        return [drop_id for drop_id in drop_clients
+                if any(self.__is_pair(drop_id, alive_id)
+                       for alive_id in self.__rpt_masked_result_clients)]
+
+    def __share_threshold(self):
+        if not self.__graph:
+            return self._min_client_num
+
+        # the graph is regular, all the clients have the same share number.
+        share_num = len(next(iter(self.__graph.values()))) + 1
+        return neighbor_threshold(self._min_client_num, self._client_num,
+                                  share_num)
+
+    def __assert_share_number(self, name, shares):
+        if len(shares) < self.__share_threshold():
+            raise RuntimeError(
+                "The number of %s shares report by client is less than "
+                "threshold, %s/%s." % (name, len(shares),
+                                       self.__share_threshold()))
+
+    async def __recover_secrets(self, all_s_shares, all_b_shares):
+        # the s_sk of the dropped clients and the b of the alive clients are
+        # recovered in batches of clients in the unmask pool.
+        drop_clients = self.__drop_clients()
+        shares_s = {}
         for client_id in drop_clients:
-            if len(all_s_shares[client_id]) < self._min_client_num:
-                raise RuntimeError(
-                    "The number of s_sk shares report by client is less than "
-                    "threshold, %s/%s." % (len(all_s_shares[client_id]),
-                                           self._min_client_num))
-            s_sk_s[client_id] = int(SecretSharer.recover_secret(
-                all_s_shares[client_id]))
-
-        diffie_hellman = DiffieHellman()
-        for alive_client_id in self.__rpt_masked_result_clients:
-            for drop_client_id in drop_clients:
-                s_uv = diffie_hellman.agree(
-                    s_sk_s[drop_client_id],
-                    int(self.__public_keys[alive_client_id].s_pk))
-                self._s_uv_masks.append((drop_client_id,
-                                         alive_client_id,
-                                         PseudorandomGenerator(s_uv)))
-
-    def __generate_b_masks(self, all_b_shares):
+            self.__assert_share_number("s_sk", all_s_shares[client_id])
+            shares_s[("s_sk", client_id)] = all_s_shares[client_id]
         for client_id in self.__rpt_masked_result_clients:
-            if len(all_b_shares[client_id]) < self._min_client_num:
-                raise RuntimeError(
-                    "The number of b shares report by client is less than "
-                    "threshold, %s/%s." % (len(all_b_shares[client_id]),
-                                           self._min_client_num))
-            b_mask = int(SecretSharer.recover_secret(all_b_shares[client_id]))
-            self._b_masks.append(PseudorandomGenerator(b_mask))
+            self.__assert_share_number("b", all_b_shares[client_id])
+            shares_s[("b", client_id)] = all_b_shares[client_id]
+
+        secrets = {}
+        for result in await asyncio.gather(*[
+                self.__run_in_unmask_pool(recover_secrets, dict(items),
+                                          self.__share_threshold())
+                for items in _split_items(list(shares_s.items()),
+                                          self.__unmask_workers)]):
+            secrets.update(result)
+        s_sk_s = {client_id: secrets[("s_sk", client_id)]
+                  for client_id in drop_clients}
+        b_s = [secrets[("b", client_id)]
+               for client_id in self.__rpt_masked_result_clients]
+        return s_sk_s, b_s
+
+    async def __generate_s_uv_masks(self, s_sk_s):
+        # the seeds of the s_uv masks, agreed in batches of client pairs in
+        # the unmask pool.
+        pairs = [(drop_client_id, alive_client_id)
+                 for alive_client_id in self.__rpt_masked_result_clients
+                 for drop_client_id in s_sk_s
+                 if self.__is_pair(drop_client_id, alive_client_id)]
+        key_pairs = [(s_sk_s[drop_client_id],
+                      int(self.__public_keys[alive_client_id].s_pk))
+                     for drop_client_id, alive_client_id in pairs]
+
+        shards = _split_items(list(range(len(pairs))), self.__unmask_workers)
+        results = await asyncio.gather(*[
+            self.__run_in_unmask_pool(_agree_keys,
+                                      [key_pairs[index] for index in shard])
+            for shard in shards])
+        for shard, s_uv_s in zip(shards, results):
+            for index, s_uv in zip(shard, s_uv_s):
+                self._s_uv_masks.append(pairs[index] + (s_uv,))
+
+    def __generate_b_masks(self, b_s):
+        self._b_masks.extend(b_s)
 
     def __assert_stage(self, stage):
         if self.__stage is not stage:
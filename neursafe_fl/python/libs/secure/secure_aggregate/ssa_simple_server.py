@@ -13,6 +13,8 @@ from neursafe_fl.python.utils.timer import Timer
 from neursafe_fl.proto.secure_aggregate_grpc import SSAServiceStub
 from neursafe_fl.proto.secure_aggregate_pb2 import PublicKeys, SSAMessage
 from neursafe_fl.python.libs.secure.secure_aggregate.common import ProtocolStage
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    DEFAULT_RING_BITS
 from neursafe_fl.python.libs.secure.secure_aggregate.ssa_controller import \
     ssa_controller
 from neursafe_fl.python.trans.grpc_call import unary_call
@@ -31,11 +33,16 @@ class SSASimpleServer(SSABaseServer):
         ssl_key:
         kwargs:
             stage_time_interval: the time to wait a stage timeout.
+            fraction_bits: the fraction bits of fixed point, if set, the
+                data is in the fixed point ring.
+            ring_bits: the bits of the fixed point ring, 32 or 64.
     """
     def __init__(self, handle, min_client_num, client_num,
                  wait_aggregate_interval,
                  ssl_key=None, **kwargs):
-        super().__init__(handle, min_client_num, client_num, ssl_key)
+        super().__init__(handle, min_client_num, client_num, ssl_key,
+                         kwargs.get("fraction_bits"),
+                         kwargs.get("ring_bits", DEFAULT_RING_BITS))
 
         self.__stage_time_interval = kwargs.get("stage_time_interval",
                                                 STAGE_TIME_INTERVAL)
@@ -170,7 +177,7 @@ class SSASimpleServer(SSABaseServer):
 
         self.__stage = ProtocolStage.DecryptResult
 
-        return self._total_data
+        return self._decode_data(self._total_data)
 
     def __assert_client_not_drop(self):
         same_values = set(self.__rpt_public_key_clients) \
@@ -7,6 +7,8 @@ UnitTest of DiffieHellman key exchange algorithm.
 """
 import unittest
 
+import numpy as np
+
 from neursafe_fl.python.libs.secure.secure_aggregate.common import \
     PseudorandomGenerator
 
@@ -42,6 +44,21 @@ class TestCommon(unittest.TestCase):
         self.assertEqual(prg.next_value((2, 2)).tolist(),
                          [[-961, -85], [-964, 402]])
 
+    def test_prg_fill_and_advance_same_as_next_value(self):
+        expected = PseudorandomGenerator(1234).next_value(10)
+
+        prg = PseudorandomGenerator(1234)
+        out = np.empty(4)
+        prg.fill(out)
+        self.assertTrue(np.array_equal(out, expected[:4]))
+        prg.advance(3)
+        self.assertTrue(np.array_equal(prg.next_value(3), expected[7:]))
+
+    def test_int_prg_can_not_advance(self):
+        prg = PseudorandomGenerator(1234, return_type="int")
+        with self.assertRaises(ValueError):
+            prg.advance(1)
+
 
 if __name__ == "__main__":
     unittest.main()
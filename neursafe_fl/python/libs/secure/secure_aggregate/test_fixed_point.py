@@ -0,0 +1,72 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""
+UnitTest of fixed point encoding.
+"""
+import unittest
+
+import numpy as np
+
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    decode_fixed_point, encode_fixed_point, check_fixed_point
+
+
+class TestFixedPoint(unittest.TestCase):
+    """Test fixed point encoding.
+    """
+    def test_encode_and_decode(self):
+        value = np.array([[0.5, -0.25], [-3.0, 1 / 3]], dtype=np.float32)
+        for ring_bits, dtype in [(32, np.uint32), (64, np.uint64)]:
+            encoded = encode_fixed_point(value, 16, ring_bits)
+            self.assertEqual(encoded.dtype, dtype)
+            self.assertEqual(encoded.shape, (2, 2))
+
+            decoded = decode_fixed_point(encoded, 16, ring_bits)
+            self.assertEqual(decoded.dtype, np.float64)
+            self.assertTrue(np.all(np.abs(decoded - value) <= 2 ** -17))
+
+    def test_encode_weighted_value(self):
+        encoded = encode_fixed_point([1.5, -2.0], 8, weight=3)
+        self.assertEqual(decode_fixed_point(encoded, 8).tolist(),
+                         [4.5, -6.0])
+
+    def test_sum_wraps_around_in_ring(self):
+        values = [np.array([-1.0, 2.5]), np.array([0.25, -4.0])]
+        total = np.zeros(2, dtype=np.uint32)
+        for value in values:
+            total += encode_fixed_point(value, 16)
+            # masks cancel exactly in the ring.
+            mask = np.array([4000000000, 123], dtype=np.uint32)
+            total += mask
+            total -= mask
+
+        self.assertEqual(decode_fixed_point(total, 16).tolist(),
+                         [-0.75, -1.5])
+
+    def test_encode_scalar(self):
+        encoded = encode_fixed_point(-0.5, 4)
+        self.assertEqual(encoded.shape, ())
+        self.assertEqual(decode_fixed_point(encoded, 4), -0.5)
+
+    def test_raise_if_out_of_range(self):
+        with self.assertRaises(ValueError):
+            encode_fixed_point([2.0 ** 15], 16)
+        with self.assertRaises(ValueError):
+            encode_fixed_point([np.nan], 16)
+        encode_fixed_point([2.0 ** 15 - 1], 16)
+
+    def test_check_fixed_point(self):
+        check_fixed_point(0, 32)
+        check_fixed_point(62, 64)
+        with self.assertRaises(ValueError):
+            check_fixed_point(31, 32)
+        with self.assertRaises(ValueError):
+            check_fixed_point(-1, 32)
+        with self.assertRaises(ValueError):
+            check_fixed_point(8, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
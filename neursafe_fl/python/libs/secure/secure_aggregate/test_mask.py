@@ -0,0 +1,98 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""
+UnitTest of mask generation.
+"""
+import unittest
+
+import numpy as np
+
+from neursafe_fl.python.libs.secure.secure_aggregate.common import \
+    PseudorandomGenerator
+from neursafe_fl.python.libs.secure.secure_aggregate.mask import ADD, \
+    SUBTRACT, add_mask_shard, generate_mask, generate_mask_shard, \
+    mask_dtype, mask_size, split_mask, split_shards
+
+
+class TestMask(unittest.TestCase):
+    """Test mask generation.
+    """
+    def test_generate_mask_same_as_layer_by_layer(self):
+        seeds = [(ADD, 1), (SUBTRACT, 2), (ADD, 3)]
+        shapes = [(2, 3), (1,), (5, 1, 2), (0,), (7,)]
+
+        masks = split_mask(
+            generate_mask(mask_size(shapes),
+                          [(sign, PseudorandomGenerator(seed))
+                           for sign, seed in seeds], chunk_size=4), shapes)
+
+        prgs = [(sign, PseudorandomGenerator(seed)) for sign, seed in seeds]
+        for shape, mask in zip(shapes, masks):
+            expected = np.zeros(shape)
+            for sign, prg in prgs:
+                expected = expected + sign * prg.next_value(shape)
+            self.assertTrue(np.allclose(mask, expected))
+
+        self.assertTrue(np.isscalar(masks[1]))
+        self.assertEqual(masks[0].shape, (2, 3))
+
+    def test_masks_of_peers_cancel(self):
+        seed = 1234
+        mask = generate_mask(100, [(ADD, PseudorandomGenerator(seed)),
+                                   (SUBTRACT, PseudorandomGenerator(seed))],
+                             chunk_size=30)
+        self.assertTrue(np.array_equal(mask, np.zeros(100)))
+
+    def test_generate_mask_in_ring(self):
+        mask = generate_mask(10, [(ADD, PseudorandomGenerator(1)),
+                                  (SUBTRACT, PseudorandomGenerator(2))],
+                             chunk_size=4, dtype=np.uint32)
+        self.assertEqual(mask.dtype, np.uint32)
+
+        prg = PseudorandomGenerator(1)
+        prg.advance(3)
+        out = np.empty(7, dtype=np.uint32)
+        prg.fill(out)
+        # the same stream as the first peer from offset 3.
+        self.assertTrue(np.array_equal(
+            mask[3:] + generate_mask(10, [(ADD, PseudorandomGenerator(2))],
+                                     dtype=np.uint32)[3:], out))
+
+    def test_mask_dtype(self):
+        self.assertEqual(mask_dtype([1.0, np.ones(2)]), np.float64)
+        self.assertEqual(mask_dtype([np.ones(2, dtype=np.uint32),
+                                     np.uint32(1)]), np.uint32)
+        with self.assertRaises(ValueError):
+            mask_dtype([np.ones(2, dtype=np.uint32), np.ones(2)])
+
+    def test_generate_mask_without_terms(self):
+        self.assertTrue(np.array_equal(generate_mask(3, []), np.zeros(3)))
+        self.assertEqual(generate_mask(0, [(ADD, PseudorandomGenerator(1))])
+                         .size, 0)
+
+    def test_split_shards(self):
+        self.assertEqual(split_shards(10, 3, alignment=4),
+                         [(0, 4), (4, 8), (8, 10)])
+        self.assertEqual(split_shards(10, 4, alignment=8), [(0, 8), (8, 10)])
+        self.assertEqual(split_shards(3, 4), [(0, 3)])
+        self.assertEqual(split_shards(0, 4), [])
+
+    def test_shards_same_as_whole_mask(self):
+        seeds = [(ADD, 1), (SUBTRACT, 2), (ADD, 3)]
+        for dtype in [np.float64, np.uint32]:
+            expected = generate_mask(
+                23, [(sign, PseudorandomGenerator(seed))
+                     for sign, seed in seeds], dtype=dtype)
+
+            targets = [np.zeros(size, dtype=dtype) for size in [5, 0, 11, 7]]
+            for start, end in split_shards(23, 4, alignment=2):
+                add_mask_shard(targets, start, generate_mask_shard(
+                    start, end - start, seeds, dtype))
+            self.assertTrue(np.array_equal(np.concatenate(targets),
+                                           expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""
+UnitTest of the neighbor graph.
+"""
+import unittest
+
+from neursafe_fl.python.libs.secure.secure_aggregate.neighbors import \
+    check_neighbor_num, graph_seed, neighbor_graph, neighbor_threshold
+
+
+class TestNeighbors(unittest.TestCase):
+    """Test the neighbor graph.
+    """
+    def test_graph_is_regular_and_symmetric(self):
+        client_ids = ["client-%s" % index for index in range(50)]
+        graph = neighbor_graph(client_ids, 8, graph_seed("job-1"))
+
+        self.assertEqual(set(graph), set(client_ids))
+        for client_id, neighbors in graph.items():
+            self.assertEqual(len(set(neighbors)), 8)
+            self.assertNotIn(client_id, neighbors)
+            for neighbor in neighbors:
+                self.assertIn(client_id, graph[neighbor])
+
+    def test_graph_derived_from_seed(self):
+        client_ids = [str(index) for index in range(20)]
+        graph = neighbor_graph(client_ids, 4, graph_seed("job-1"))
+
+        self.assertEqual(graph, neighbor_graph(client_ids[::-1], 4,
+                                               graph_seed("job-1")))
+        self.assertNotEqual(graph, neighbor_graph(client_ids, 4,
+                                                  graph_seed("job-2")))
+
+    def test_complete_graph_if_neighbors_not_less_than_clients(self):
+        graph = neighbor_graph(["1", "2", "3", "4"], 4, 1)
+        self.assertEqual(graph["2"], ["1", "3", "4"])
+        self.assertEqual(graph["4"], ["1", "2", "3"])
+
+    def test_neighbor_threshold(self):
+        self.assertEqual(neighbor_threshold(500, 1000, 21), 11)
+        self.assertEqual(neighbor_threshold(800, 1000, 21), 17)
+        self.assertEqual(neighbor_threshold(3, 3, 3), 3)
+        self.assertEqual(neighbor_threshold(2, 4, 4), 3)
+
+    def test_check_neighbor_num(self):
+        check_neighbor_num(2)
+        for neighbor_num in [0, 3, -2, 4.0, True]:
+            with self.assertRaises(ValueError):
+                check_neighbor_num(neighbor_num)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""
+UnitTest of shamir secret sharing.
+"""
+import itertools
+import os
+import unittest
+
+from neursafe_fl.python.libs.secure.secure_aggregate.shamir import PRIME, \
+    SHARE_BYTES, decode_share, encode_share, recover_secrets, split_secret
+
+
+class TestShamir(unittest.TestCase):
+    """Test shamir secret sharing.
+    """
+    def test_any_threshold_shares_recover_secret(self):
+        secret = int.from_bytes(os.urandom(128), 'big')
+        shares = split_secret(secret, 3, 5)
+        self.assertEqual(len(shares), 5)
+        self.assertTrue(all(len(share) == SHARE_BYTES for share in shares))
+
+        for subset in itertools.combinations(shares, 3):
+            self.assertEqual(recover_secrets({"a": list(subset)}, 3),
+                             {"a": secret})
+        self.assertEqual(recover_secrets({"a": shares}, 3), {"a": secret})
+
+    def test_recover_secrets_in_batch(self):
+        secrets = {"b-1": 10000000000, "b-2": 9999999999999999,
+                   "s-3": PRIME - 1, "s-4": 0}
+        shares_s = {owner: split_secret(secret, 2, 4)
+                    for owner, secret in secrets.items()}
+        # the shares of different x for some secrets.
+        shares_s["s-3"] = shares_s["s-3"][2:]
+        shares_s["s-4"] = shares_s["s-4"][::-1]
+
+        self.assertEqual(recover_secrets(shares_s, 2), secrets)
+
+    def test_raise_if_shares_not_enough(self):
+        shares = split_secret(123, 3, 4)
+        with self.assertRaises(ValueError):
+            recover_secrets({"a": shares[:2]}, 3)
+        with self.assertRaises(ValueError):
+            recover_secrets({"a": shares[:2] + shares[:1]}, 3)
+
+    def test_raise_if_parameters_invalid(self):
+        with self.assertRaises(ValueError):
+            split_secret(PRIME, 2, 3)
+        with self.assertRaises(ValueError):
+            split_secret(1, 4, 3)
+        with self.assertRaises(ValueError):
+            decode_share(b"123")
+
+    def test_encode_share(self):
+        self.assertEqual(decode_share(encode_share(3, PRIME - 1)),
+                         (3, PRIME - 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,7 @@ from neursafe_fl.python.libs.secure.secure_aggregate.ssa_protector import \
     SSAProtector
 from neursafe_fl.python.libs.secure.secure_aggregate.common import \
     PseudorandomGenerator
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 
 class TestSSAProtector(unittest.TestCase):
@@ -72,6 +73,16 @@ class TestSSAProtector(unittest.TestCase):
             new_dict['array'],
             np.full_like(new_dict['array'], 1 + self.prg.next_value((1, 2, 3)))))
 
+    def test_should_success_encrypt_flat_weights(self):
+        flat_weights = FlatWeights.flatten([np.ones((2, 2, 3)),
+                                            np.full((3, 1, 3), 2.0)])
+        new_weights = self.protector.encrypt(flat_weights).unflatten()
+
+        self.assertTrue(self.__equal(
+            new_weights[0], 1 + self.prg.next_value((2, 2, 3))))
+        self.assertTrue(self.__equal(
+            new_weights[1], 2 + self.prg.next_value((3, 1, 3))))
+
     def __equal(self, array1, array2):
         for index, value in enumerate(array1):
             result = abs(value - array2[index]) < 0.000001
@@ -11,10 +11,19 @@ import numpy as np
 
 from neursafe_fl.python.libs.secure.secure_aggregate.common import ProtocolStage, \
     PseudorandomGenerator
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    encode_fixed_point
+from neursafe_fl.python.libs.secure.secure_aggregate.neighbors import \
+    graph_seed, neighbor_graph
+from neursafe_fl.python.libs.secure.secure_aggregate.shamir import \
+    split_secret
+from neursafe_fl.python.libs.secure.secure_aggregate.ssa_protector import \
+    SSAProtector
 from neursafe_fl.python.libs.secure.secure_aggregate.ssa_server import SSAServer
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 from neursafe_fl.proto.secure_aggregate_pb2 import EncryptedShares, EncryptedShare, \
-    SecretShares, SecretShare
+    SecretShares, SecretShare, PublicKey
 from neursafe_fl.python.utils.log import set_log
 
 set_log()
@@ -36,9 +45,8 @@ class TestSSAServer(unittest.TestCase):
 
     def test_should_success_accumulate_and_decrypt_with_int(self):
         prg = PseudorandomGenerator(1234)
-        self.__server._b_masks = [PseudorandomGenerator(1234)]
-        self.__server._s_uv_masks = [("1", "2", PseudorandomGenerator(1234)),
-                                     ("2", "1", PseudorandomGenerator(1234))]
+        self.__server._b_masks = [1234]
+        self.__server._s_uv_masks = [("1", "2", 1234), ("2", "1", 1234)]
         self.__server._SSAServer__stage = ProtocolStage.CiphertextAggregate
         self.__server.ciphertext_accumulate(2, '1')
         result = self.__server.ciphertext_accumulate(4, '2')
@@ -46,14 +54,13 @@ class TestSSAServer(unittest.TestCase):
         self.assertEqual(self.__server._SSAServer__rpt_masked_result_clients,
                          ['1', '2'])
 
-        result = self.__server._SSAServer__do_decrypt()
+        result = self.__decrypt(self.__server)
         self.assertEqual(result, 6 - prg.next_value())
 
     def test_should_success_accumulate_and_decrypt_with_array(self):
         prg = PseudorandomGenerator(1234)
-        self.__server._b_masks = [PseudorandomGenerator(1234)]
-        self.__server._s_uv_masks = [("1", "2", PseudorandomGenerator(1234)),
-                                     ("2", "1", PseudorandomGenerator(1234))]
+        self.__server._b_masks = [1234]
+        self.__server._s_uv_masks = [("1", "2", 1234), ("2", "1", 1234)]
         self.__server._SSAServer__stage = ProtocolStage.CiphertextAggregate
 
         self.__server.ciphertext_accumulate(np.full((1, 2, 3), 2),
@@ -65,14 +72,13 @@ class TestSSAServer(unittest.TestCase):
         self.assertEqual(self.__server._SSAServer__rpt_masked_result_clients,
                          ['1', '2'])
 
-        result = self.__server._SSAServer__do_decrypt()
+        result = self.__decrypt(self.__server)
         self.assertTrue(self.__equal(result, np.full((1, 2, 3), 5 - prg.next_value((1, 2, 3)))))
 
     def test_should_success_accumulate_and_decrypt_with_dict(self):
         prg = PseudorandomGenerator(1234)
-        self.__server._b_masks = [PseudorandomGenerator(1234)]
-        self.__server._s_uv_masks = [("1", "2", PseudorandomGenerator(1234)),
-                                     ("2", "1", PseudorandomGenerator(1234))]
+        self.__server._b_masks = [1234]
+        self.__server._s_uv_masks = [("1", "2", 1234), ("2", "1", 1234)]
         self.__server._SSAServer__stage = ProtocolStage.CiphertextAggregate
         np_array = np.ones((1, 2, 3), dtype=np.int16)
         ordered_dict1 = OrderedDict()
@@ -90,12 +96,74 @@ class TestSSAServer(unittest.TestCase):
         self.assertEqual(result['float'], 3.2)
         self.assertTrue(self.__equal(result['array'], np.full((1, 2, 3), 3)))
 
-        result = self.__server._SSAServer__do_decrypt()
+        result = self.__decrypt(self.__server)
         self.assertEqual(result['int'], 3 - prg.next_value())
         self.assertEqual(result['float'], 3.2 - prg.next_value())
         self.assertTrue(self.__equal(result['array'],
                                      np.full((1, 2, 3), 3 - prg.next_value((1, 2, 3)))))
 
+    def test_should_success_accumulate_and_decrypt_with_flat_weights(self):
+        prg = PseudorandomGenerator(1234)
+        self.__server._b_masks = [1234]
+        self.__server._s_uv_masks = [("1", "2", 1234), ("2", "1", 1234)]
+        self.__server._SSAServer__stage = ProtocolStage.CiphertextAggregate
+
+        self.__server.ciphertext_accumulate(
+            FlatWeights.flatten([np.full((2, 3), 2.0), np.full(4, 1.0)]), '1')
+        result = self.__server.ciphertext_accumulate(
+            FlatWeights.flatten([np.full((2, 3), 3.0), np.full(4, 2.0)]), '2')
+        self.assertTrue(self.__equal(result.vector, [5.0] * 6 + [3.0] * 4))
+
+        result = self.__decrypt(self.__server).unflatten()
+        # the mask of flatten vector is same as the masks of layers.
+        self.assertTrue(self.__equal(result[0],
+                                     5 - prg.next_value((2, 3))))
+        self.assertTrue(self.__equal(result[1], 3 - prg.next_value(4)))
+
+    def test_should_decrypt_exactly_in_fixed_point_ring(self):
+        server = SSAServer("jobname-1", 2, 2, 10, None, fraction_bits=16)
+        server._b_masks = [11, 22]
+        server._SSAServer__stage = ProtocolStage.CiphertextAggregate
+
+        protectors = []
+        for id_, v_id, b in [("1", "2", 11), ("2", "1", 22)]:
+            protector = SSAProtector("test", False)
+            protector.id_, protector.b = id_, b
+            protector.s_uv_s = [(v_id, PseudorandomGenerator(99))]
+            protectors.append(protector)
+
+        layers = [[np.full((2, 3), 0.5), np.full(4, -1.25)],
+                  [np.full((2, 3), 0.25), np.full(4, 3.0)]]
+        for index, protector in enumerate(protectors):
+            weights = FlatWeights.flatten(layers[index])
+            encrypted = protector.encrypt(
+                weights.like(encode_fixed_point(weights.vector, 16)))
+            self.assertEqual(encrypted.vector.dtype, np.uint32)
+            server.ciphertext_accumulate(encrypted, protector.id_)
+
+        result = server._decode_data(self.__decrypt(server))
+        self.assertEqual(result.vector.tolist(), [0.75] * 6 + [1.75] * 4)
+
+    def test_should_unmask_in_place_out_of_event_loop(self):
+        prg = PseudorandomGenerator(1234)
+        self.__server._b_masks = [1234]
+        self.__server._SSAServer__stage = ProtocolStage.CiphertextAggregate
+        weights = FlatWeights.flatten([np.full(100000, 5.0)])
+        self.__server.ciphertext_accumulate(weights, '1')
+
+        async def decrypt():
+            task = asyncio.create_task(
+                self.__server._SSAServer__do_decrypt())
+            await asyncio.sleep(0)
+            # the event loop is not blocked by unmasking.
+            self.assertFalse(task.done())
+            return await task
+
+        result = self.__run(self.__server, decrypt())
+        self.assertTrue(np.shares_memory(result.vector, weights.vector))
+        self.assertTrue(np.allclose(result.vector,
+                                    5.0 - prg.next_value(100000)))
+
     def test_reconstruct_encrypted_shares(self):
         # no drop client
         encrypted_shares_s = {}
@@ -139,31 +207,95 @@ class TestSSAServer(unittest.TestCase):
         # alive client 1 and 3, drop client 2 and 4
         secret_shares1 = SecretShares()
         secret_shares1.b_share.append(SecretShare(client_id='1',
-                                                  data='1_1'))
+                                                  data=b'1_1'))
         secret_shares1.b_share.append(SecretShare(client_id='3',
-                                                  data='3_1'))
+                                                  data=b'3_1'))
         secret_shares1.s_sk_share.append(SecretShare(client_id='2',
-                                                     data='2_1'))
+                                                     data=b'2_1'))
         secret_shares1.s_sk_share.append(SecretShare(client_id='4',
-                                                     data='4_1'))
+                                                     data=b'4_1'))
         secret_shares3 = SecretShares()
         secret_shares3.b_share.append(SecretShare(client_id='1',
-                                                  data='1_3'))
+                                                  data=b'1_3'))
         secret_shares3.b_share.append(SecretShare(client_id='3',
-                                                  data='3_3'))
+                                                  data=b'3_3'))
         secret_shares3.s_sk_share.append(SecretShare(client_id='2',
-                                                     data='2_3'))
+                                                     data=b'2_3'))
         secret_shares3.s_sk_share.append(SecretShare(client_id='4',
-                                                     data='4_3'))
+                                                     data=b'4_3'))
         secret_shares_s = [secret_shares1, secret_shares3]
 
         self.__server._SSAServer__secret_shares = secret_shares_s
         (s_sk_shares,
          b_shares) = self.__server._SSAServer__reconstruct_secret_shares()
-        self.assertEqual(s_sk_shares["2"], ["2_1", "2_3"])
-        self.assertEqual(s_sk_shares["4"], ["4_1", "4_3"])
-        self.assertEqual(b_shares["1"], ["1_1", "1_3"])
-        self.assertEqual(b_shares["3"], ["3_1", "3_3"])
+        self.assertEqual(s_sk_shares["2"], [b"2_1", b"2_3"])
+        self.assertEqual(s_sk_shares["4"], [b"4_1", b"4_3"])
+        self.assertEqual(b_shares["1"], [b"1_1", b"1_3"])
+        self.assertEqual(b_shares["3"], [b"3_1", b"3_3"])
+
+    def test_recover_secrets_of_drop_and_alive_clients(self):
+        # alive client 1 and 3, drop client 2
+        b_s = {"1": 10000000001, "3": 10000000003}
+        s_sk = 2 ** 1000 + 2
+        shares = {("b", client_id): split_secret(b, 3, 3)
+                  for client_id, b in b_s.items()}
+        shares[("s_sk", "2")] = split_secret(s_sk, 3, 3)
+
+        self.__server._SSAServer__rpt_encrypted_share_clients = ["1", "2",
+                                                                 "3"]
+        self.__server._SSAServer__rpt_masked_result_clients = ["1", "3"]
+        s_sk_s, b_masks = self.__run(
+            self.__server, self.__server._SSAServer__recover_secrets(
+                {"2": shares[("s_sk", "2")]},
+                {client_id: shares[("b", client_id)] for client_id in b_s}))
+        self.assertEqual(s_sk_s, {"2": s_sk})
+        self.assertEqual(b_masks, [b_s["1"], b_s["3"]])
+
+        with self.assertRaises(RuntimeError):
+            self.__run(
+                self.__server, self.__server._SSAServer__recover_secrets(
+                    {"2": shares[("s_sk", "2")][:2]},
+                    {client_id: shares[("b", client_id)]
+                     for client_id in b_s}))
+
+    def test_recover_secrets_of_neighbors(self):
+        # 6 clients, 2 neighbors each, client 2 dropped.
+        server = SSAServer("jobname-1", 4, 6, 10, None, neighbor_num=2)
+        client_ids = [str(index) for index in range(1, 7)]
+        graph = neighbor_graph(client_ids, 2, graph_seed("jobname-1"))
+        server._SSAServer__graph = graph
+        server._SSAServer__rpt_encrypted_share_clients = client_ids
+        alive = [client_id for client_id in client_ids if client_id != "2"]
+        server._SSAServer__rpt_masked_result_clients = alive
+
+        # 3 shares of each secret, threshold 2 of the neighbors.
+        s_sk = 2 ** 1000 + 2
+        s_sk_s, b_masks = self.__run(
+            server, server._SSAServer__recover_secrets(
+                {"2": split_secret(s_sk, 2, 3)[:2]},
+                {client_id: split_secret(int(client_id), 2, 3)[1:]
+                 for client_id in alive}))
+        self.assertEqual(s_sk_s, {"2": s_sk})
+        self.assertEqual(b_masks, [int(client_id) for client_id in alive])
+
+        server._SSAServer__public_keys = {
+            client_id: PublicKey(client_id=client_id, s_pk="3")
+            for client_id in client_ids}
+        self.__run(server, server._SSAServer__generate_s_uv_masks(s_sk_s))
+        # only the masks of the neighbors of dropped client are removed.
+        self.assertEqual(
+            sorted(alive_id for _, alive_id, _ in server._s_uv_masks),
+            sorted(graph["2"]))
+
+    def __decrypt(self, server):
+        return self.__run(server, server._SSAServer__do_decrypt())
+
+    @staticmethod
+    def __run(server, coroutine):
+        try:
+            return asyncio.get_event_loop().run_until_complete(coroutine)
+        finally:
+            server._SSAServer__shutdown_unmask_pool()
 
     def __equal(self, array1, array2):
         for index, value in enumerate(array1):
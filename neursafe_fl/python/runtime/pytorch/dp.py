@@ -9,6 +9,7 @@ import collections
 import torch
 
 from neursafe_fl.python.runtime.security_algorithm import SecurityAlgorithm
+from neursafe_fl.python.runtime.weights import FlatWeights
 from neursafe_fl.python.libs.secure.differential_privacy.dp_delta_weights \
     import DeltaWeightsDP
 
@@ -31,6 +32,11 @@ class PytorchDP(SecurityAlgorithm):
         Returns:
             noised weights: weights which added noise by dp
         """
+        if isinstance(weights, FlatWeights):
+            return self.__delta_weights_dp.add_noise_to_flat_weights(
+                weights,
+                self.__secure_algorithm.get("adding_same_noise", False))
+
         noised_weights = collections.OrderedDict()
         for name, weight in weights.items():
             noised_weight = \
@@ -7,7 +7,10 @@
 import collections
 import numpy as np
 
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    DEFAULT_RING_BITS, encode_fixed_point
 from neursafe_fl.python.runtime.security_algorithm import SecurityAlgorithm
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 
 class PytorchSSA(SecurityAlgorithm):
@@ -17,6 +20,23 @@ class PytorchSSA(SecurityAlgorithm):
         super().__init__()
         self.__ssa_protector = kwargs['ssa_protector']
 
+        # the numbers in task spec struct are float.
+        secure_algorithm = kwargs.get('secure_algorithm', {})
+        self.__fraction_bits = None
+        if secure_algorithm.get('fraction_bits') is not None:
+            self.__fraction_bits = int(secure_algorithm['fraction_bits'])
+        self.__ring_bits = int(secure_algorithm.get('ring_bits',
+                                                    DEFAULT_RING_BITS))
+
+    def __weighted(self, value, sample_num):
+        # encode the weighted value into the fixed point ring if configured,
+        # then masked and accumulated in the ring.
+        if self.__fraction_bits is None:
+            return np.multiply(value, sample_num)
+
+        return encode_fixed_point(value, self.__fraction_bits,
+                                  self.__ring_bits, weight=sample_num)
+
     async def protect_weights(self, weights, **kwargs):
         """Protect weights by secret share aggregate.
 
@@ -28,9 +48,13 @@ class PytorchSSA(SecurityAlgorithm):
             masked weights: weights which added mask by ssa.
         """
         sample_num = kwargs.get('sample_num', 1)
-        new_weights = collections.OrderedDict()
         await self.__ssa_protector.wait_ready()
+        if isinstance(weights, FlatWeights):
+            return self.__ssa_protector.encrypt(
+                weights.like(self.__weighted(weights.vector, sample_num)))
+
+        new_weights = collections.OrderedDict()
         for name, weight in weights.items():
-            new_weights[name] = np.multiply(weight, sample_num)
+            new_weights[name] = self.__weighted(weight, sample_num)
 
         return self.__ssa_protector.encrypt(new_weights)
@@ -5,11 +5,20 @@
 """UnitTest of Pytroch weights calculator.
 """
 import unittest
+import warnings
 from collections import OrderedDict
 
+import mock
+import numpy as np
 import torch
 
-from neursafe_fl.python.runtime.pytorch.weights import PytorchWeightsCalculator
+from neursafe_fl.python.libs.compression.quantization import \
+    QuantizationCompression
+from neursafe_fl.python.runtime.pytorch.weights import (
+    PytorchWeightsCalculator, PytorchWeightsConverter)
+from neursafe_fl.python.libs.compression.selective_masking import \
+    SelectiveMasking
+from neursafe_fl.python.runtime.weights import FlatWeights, SPARSE
 
 
 class TestTfWeights(unittest.TestCase):
@@ -76,6 +85,113 @@ class TestTfWeights(unittest.TestCase):
         result = self.__pytorch_cw.subtract(data2, data1)
         self.assertTrue(self.__pytorch_cw.equal(result, data1))
 
+    def test_flatten_and_unflatten_without_copy(self):
+        converter = PytorchWeightsConverter()
+        data = OrderedDict()
+        data["name1"] = torch.full((2, 2, 3), 1.1)
+        data["name2"] = torch.full((2, 1, 2), 2.2)
+        data["counter"] = torch.tensor(3, dtype=torch.int64)
+
+        flat = converter.flatten(data)
+        self.assertEqual(flat.vector.shape, (17,))
+        self.assertEqual(flat.vector.dtype, np.float32)
+
+        layers = converter.unflatten(flat)
+        self.assertEqual(list(layers.keys()), ["name1", "name2", "counter"])
+        self.assertEqual(layers["counter"].dtype, torch.int64)
+        self.__assert_tensor_equal(layers["name2"], data["name2"])
+
+        del layers["counter"]
+        self.assertTrue(np.shares_memory(converter.flatten(layers).vector,
+                                         flat.vector))
+
+    def test_flatten_without_copy_by_typed_storage(self):
+        converter = PytorchWeightsConverter()
+        data = OrderedDict()
+        data["name1"] = torch.full((2, 3), 1.1)
+        data["name2"] = torch.full((4,), 2.2)
+        flat = converter.flatten(data)
+
+        # the torch versions before 2.0 have no untyped_storage.
+        with mock.patch("neursafe_fl.python.runtime.pytorch.weights."
+                        "UNTYPED_STORAGE", False), warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            vector = converter.flatten(converter.unflatten(flat)).vector
+
+        self.assertTrue(np.shares_memory(vector, flat.vector))
+        np.testing.assert_array_equal(vector, flat.vector)
+
+    def test_add_flat_weights_to_weights_success(self):
+        converter = PytorchWeightsConverter()
+        data1 = OrderedDict()
+        data1["name1"] = torch.full((2, 2, 3), 1.1)
+        data1["name2"] = torch.full((2, 1, 2), 2.2)
+        data2 = converter.flatten(self.__pytorch_cw.multiply(data1, 2))
+
+        result = self.__pytorch_cw.add(data1, data2)
+        self.assertIsInstance(result, OrderedDict)
+        self.__assert_tensor_equal(result["name1"], torch.full((2, 2, 3), 3.3))
+        self.__assert_tensor_equal(result["name2"], torch.full((2, 1, 2), 6.6))
+
+        flat = self.__pytorch_cw.true_divide(data2, torch.tensor(2))
+        self.assertIsInstance(flat, FlatWeights)
+        self.assertTrue(self.__pytorch_cw.equal(flat, data1))
+
+    def test_encode_and_decode_flat_weights_success(self):
+        converter = PytorchWeightsConverter()
+        data = OrderedDict()
+        data["name1"] = torch.full((2, 2, 3), 1.1)
+        data["name2"] = torch.full((2, 1, 2), 2.2)
+        compression = QuantizationCompression(quantization_bits=8)
+
+        encoded = converter.encode(converter.flatten(data), compression)
+        self.assertEqual(len(encoded), 1)
+
+        decoded = converter.unflatten(converter.decode(encoded, compression))
+        self.__assert_tensor_equal(decoded["name1"], data["name1"])
+        self.__assert_tensor_equal(decoded["name2"], data["name2"])
+
+    def test_encode_flat_weights_layer_by_layer(self):
+        converter = PytorchWeightsConverter()
+        data = OrderedDict()
+        data["small"] = torch.linspace(-1e-3, 1e-3, 100)
+        data["large"] = torch.linspace(-10, 10, 100)
+        flat = converter.flatten(data)
+
+        compression = QuantizationCompression(quantization_bits=8)
+        decoded = converter.unflatten(converter.decode(
+            converter.encode(flat, compression), compression))
+        # each layer is quantized in its own range.
+        error = torch.max(torch.abs(decoded["small"] - data["small"]))
+        self.assertLess(error.item(), 1e-5)
+
+        compression = SelectiveMasking(0.1)
+        sparse = converter.decode_sparse(converter.encode(flat, compression),
+                                         compression).vector
+        self.assertEqual(sparse.shape, (200,))
+        # the top-k of each layer, not of the whole vector.
+        self.assertEqual(int(np.sum(sparse.indices < 100)), 10)
+        self.assertEqual(int(np.sum(sparse.indices >= 100)), 10)
+        decoded = converter.unflatten(converter.decode(
+            converter.encode(flat, compression), compression))
+        self.assertEqual(int(torch.count_nonzero(decoded["small"])), 10)
+
+    def test_decode_sparse_layers_as_tensors(self):
+        converter = PytorchWeightsConverter()
+        data = OrderedDict()
+        data["name1"] = torch.arange(12, dtype=torch.float32).reshape(3, 4)
+        compression = SelectiveMasking(0.25)
+
+        encoded = converter.encode(data, compression)
+        decoded = converter.decode_sparse(encoded, compression)
+
+        sparse = decoded["name1"]
+        self.assertIsInstance(sparse, SPARSE)
+        self.assertEqual(sparse.shape, (3, 4))
+        self.assertEqual(sparse.indices.tolist(), [9, 10, 11])
+        self.assertIsInstance(sparse.values, torch.Tensor)
+        self.__assert_tensor_equal(sparse.values, torch.tensor([9., 10, 11]))
+
     def __assert_tensor_equal(self, array1, array2):
         result = abs(array1 - array2) < 0.000001
         self.assertTrue(result.all())
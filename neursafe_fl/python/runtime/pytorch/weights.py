@@ -10,10 +10,70 @@ import numpy as np
 import torch
 
 from neursafe_fl.python.runtime.weights import (WeightsCalculator,
-                                                WeightsConverter, WEIGHT)
+                                                WeightsConverter, WEIGHT,
+                                                FlatWeights, flat_operands)
 
 ENOUGH_MIN_FLOAT = 0.000001
 
+# Tensor.untyped_storage is added in torch 2.0, the older versions only have
+# Tensor.storage, which is deprecated since then.
+UNTYPED_STORAGE = hasattr(torch.Tensor, "untyped_storage")
+
+
+def _storage(tensor):
+    if UNTYPED_STORAGE:
+        return tensor.untyped_storage()
+    return tensor.storage()
+
+
+def _shared_vector(tensors):
+    """Return the vector if the tensors are views of one storage and lie
+    back to back, as they do after unflatten, otherwise None."""
+    storage = _storage(tensors[0])
+    start = offset = tensors[0].storage_offset()
+    for tensor in tensors:
+        if _storage(tensor).data_ptr() != storage.data_ptr() \
+                or tensor.dtype != tensors[0].dtype \
+                or not tensor.is_contiguous() \
+                or tensor.storage_offset() != offset:
+            return None
+        offset += tensor.numel()
+
+    vector = torch.tensor([], dtype=tensors[0].dtype)
+    return vector.set_(storage, start, (offset - start,)).numpy()
+
+
+def flatten(raw_weights):
+    """Convert pytorch weights(state dict) to FlatWeights, no data is copied
+    if the weights are unflatten from FlatWeights."""
+    tensors = [value.detach().cpu() for value in raw_weights.values()]
+    vector = _shared_vector(tensors) if tensors else None
+    return FlatWeights.flatten(
+        OrderedDict(zip(raw_weights.keys(),
+                        [tensor.numpy() for tensor in tensors])), vector)
+
+
+def unflatten(flat_weights):
+    """Convert FlatWeights to pytorch weights, the tensors are views of the
+    vector, except the layers whose dtype differs from the vector."""
+    vector = torch.from_numpy(flat_weights.vector)
+    raw_weights = OrderedDict()
+    for layer in flat_weights.layers:
+        if np.dtype(layer.dtype) != flat_weights.vector.dtype:
+            raw_weights[layer.id] = torch.from_numpy(
+                flat_weights.layer(layer))
+            continue
+        size = int(np.prod(layer.shape, dtype=np.int64))
+        raw_weights[layer.id] = vector[
+            layer.offset:layer.offset + size].view(layer.shape)
+    return raw_weights
+
+
+def _to_numpy(value):
+    if isinstance(value, torch.Tensor):
+        return value.cpu().numpy()
+    return value
+
 
 class PytorchWeightsCalculator(WeightsCalculator):
     """Used to add and subtract for pytorch weights.
@@ -23,6 +83,10 @@ class PytorchWeightsCalculator(WeightsCalculator):
 
         The result will be saved in x_weights, the x_weights will be changed.
         """
+        operands = flat_operands(x_weights, y_weights, flatten)
+        if operands:
+            return self.__in_place(np.add, x_weights, *operands)
+
         for name, y_item in y_weights.items():
             # w1[name1] = w2[name1] + t1
             x_weights[name] = np.add(x_weights[name].cpu(), y_item.cpu())
@@ -33,6 +97,10 @@ class PytorchWeightsCalculator(WeightsCalculator):
 
         The result will be saved in x_weights, the x_weights will be changed.
         """
+        operands = flat_operands(x_weights, y_weights, flatten)
+        if operands:
+            return self.__in_place(np.subtract, x_weights, *operands)
+
         for name, y_item in y_weights.items():
             # w1[name1] = w2[name1] + t1
             x_weights[name] = np.subtract(x_weights[name].cpu(), y_item.cpu())
@@ -42,6 +110,9 @@ class PytorchWeightsCalculator(WeightsCalculator):
     def multiply(self, x_weights, y):  # pylint:disable=invalid-name
         """Compute x_weights * y.
         """
+        if isinstance(x_weights, FlatWeights):
+            return x_weights.like(np.multiply(x_weights.vector, _to_numpy(y)))
+
         result = OrderedDict()
         for name, delta_w in x_weights.items():
             result[name] = np.multiply(delta_w, y)
@@ -50,6 +121,10 @@ class PytorchWeightsCalculator(WeightsCalculator):
     def true_divide(self, x_weights, y):  # pylint:disable=invalid-name
         """Compute x_weights / y.
         """
+        if isinstance(x_weights, FlatWeights):
+            return x_weights.like(np.true_divide(x_weights.vector,
+                                                 _to_numpy(y)))
+
         result = OrderedDict()
         for name, delta_w in x_weights.items():
             result[name] = np.true_divide(delta_w.cpu(), y.cpu())
@@ -58,12 +133,26 @@ class PytorchWeightsCalculator(WeightsCalculator):
     def equal(self, x_weights, y_weights):
         """compare x_weights == y_weights.
         """
+        operands = flat_operands(x_weights, y_weights, flatten)
+        if operands:
+            x_flat, y_flat = operands
+            return bool(np.all(np.abs(x_flat.vector - y_flat.vector)
+                               < ENOUGH_MIN_FLOAT))
+
         for name, y_item in y_weights.items():
             result = abs(x_weights[name] - y_item) < ENOUGH_MIN_FLOAT
             if not result.all():
                 return False
         return True
 
+    @staticmethod
+    def __in_place(func, x_weights, x_flat, y_flat):
+        func(x_flat.vector, y_flat.vector, out=x_flat.vector,
+             casting="same_kind")
+        if isinstance(x_weights, FlatWeights):
+            return x_flat
+        return unflatten(x_flat)
+
 
 class PytorchWeightsConverter(WeightsConverter):
     """Weights converter executing in pytorch runtime.
@@ -72,6 +161,9 @@ class PytorchWeightsConverter(WeightsConverter):
     def encode(self, raw_weights, encoder):
         """Encode weights according to specified encoder.
         """
+        if isinstance(raw_weights, FlatWeights):
+            return self._encode_flat(raw_weights, encoder)
+
         internal_weights = []
 
         for name, weight in raw_weights.items():
@@ -84,6 +176,10 @@ class PytorchWeightsConverter(WeightsConverter):
     def decode(self, internal_weights, decoder):
         """Decode weights according to specified decoder.
         """
+        flat_weights = self._decode_flat(internal_weights, decoder)
+        if flat_weights is not None:
+            return flat_weights
+
         raw_weights = OrderedDict()
 
         for internal_weight in internal_weights:
@@ -92,3 +188,36 @@ class PytorchWeightsConverter(WeightsConverter):
             raw_weights[internal_weight.id] = torch.from_numpy(raw_weight)
 
         return raw_weights
+
+    def decode_sparse(self, internal_weights, decoder):
+        """Decode weights into sparse layers(SPARSE), the values are not
+        scattered into dense arrays, they are tensors to keep the type of
+        layers.
+        """
+        flat_weights = self._decode_flat_sparse(internal_weights, decoder)
+        if flat_weights is not None:
+            return flat_weights
+
+        raw_weights = OrderedDict()
+
+        for internal_weight in internal_weights:
+            sparse = decoder.decode_sparse(internal_weight.weight,
+                                           **internal_weight.params)
+            values = sparse.values
+            if not values.flags.writeable:
+                # torch requires writable memory.
+                values = values.copy()
+            raw_weights[internal_weight.id] = sparse._replace(
+                values=torch.from_numpy(values))
+
+        return raw_weights
+
+    def flatten(self, raw_weights):
+        """Convert pytorch weights to FlatWeights.
+        """
+        return flatten(raw_weights)
+
+    def unflatten(self, flat_weights):
+        """Convert FlatWeights to pytorch weights.
+        """
+        return unflatten(flat_weights)
@@ -5,6 +5,7 @@
 """Used differential privacy to protect tensorflow weights.
 """
 from neursafe_fl.python.runtime.security_algorithm import SecurityAlgorithm
+from neursafe_fl.python.runtime.weights import FlatWeights
 from neursafe_fl.python.libs.secure.differential_privacy.dp_delta_weights \
     import DeltaWeightsDP
 
@@ -27,6 +28,11 @@ class TensorflowDP(SecurityAlgorithm):
         Returns:
             noised weights: weights which added noise by dp.
         """
+        if isinstance(weights, FlatWeights):
+            return self.__delta_weights_dp.add_noise_to_flat_weights(
+                weights,
+                self.__secure_algorithm.get("adding_same_noise", False))
+
         return self.__delta_weights_dp.add_noise_to_all_layers(
             list(weights),
             self.__secure_algorithm.get("adding_same_noise", False))
@@ -6,7 +6,10 @@
 """
 import numpy as np
 
+from neursafe_fl.python.libs.secure.secure_aggregate.fixed_point import \
+    DEFAULT_RING_BITS, encode_fixed_point
 from neursafe_fl.python.runtime.security_algorithm import SecurityAlgorithm
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 
 class TensorflowSSA(SecurityAlgorithm):
@@ -16,6 +19,23 @@ class TensorflowSSA(SecurityAlgorithm):
         super().__init__()
         self.__ssa_protector = kwargs['ssa_protector']
 
+        # the numbers in task spec struct are float.
+        secure_algorithm = kwargs.get('secure_algorithm', {})
+        self.__fraction_bits = None
+        if secure_algorithm.get('fraction_bits') is not None:
+            self.__fraction_bits = int(secure_algorithm['fraction_bits'])
+        self.__ring_bits = int(secure_algorithm.get('ring_bits',
+                                                    DEFAULT_RING_BITS))
+
+    def __weighted(self, value, sample_num):
+        # encode the weighted value into the fixed point ring if configured,
+        # then masked and accumulated in the ring.
+        if self.__fraction_bits is None:
+            return np.multiply(value, sample_num)
+
+        return encode_fixed_point(value, self.__fraction_bits,
+                                  self.__ring_bits, weight=sample_num)
+
     async def protect_weights(self, weights, **kwargs):
         """Protect weights by secret share aggregate.
 
@@ -28,8 +48,12 @@ class TensorflowSSA(SecurityAlgorithm):
         """
         sample_num = kwargs.get('sample_num', 1)
         await self.__ssa_protector.wait_ready()
+        if isinstance(weights, FlatWeights):
+            return self.__ssa_protector.encrypt(
+                weights.like(self.__weighted(weights.vector, sample_num)))
+
         new_weights = []
         for weight in weights:
-            new_weights.append(np.multiply(weight, sample_num))
+            new_weights.append(self.__weighted(weight, sample_num))
 
         return self.__ssa_protector.encrypt(new_weights)
@@ -8,6 +8,7 @@ import unittest
 import numpy as np
 
 from neursafe_fl.python.runtime.tensorflow.weights import TensorflowWeightsCalculator
+from neursafe_fl.python.runtime.weights import FlatWeights
 
 
 class TestTfWeights(unittest.TestCase):
@@ -68,6 +69,36 @@ class TestTfWeights(unittest.TestCase):
         result = self.__tf_wc.subtract(data2, data1)
         self.assertTrue(self.__tf_wc.equal(data1, result))
 
+    def test_flat_weights_calculate_success(self):
+        data1 = [np.full((2, 2, 3), 1.1), np.full((2, 1, 2), 2.2)]
+        data2 = FlatWeights.flatten(self.__tf_wc.multiply(data1, 2))
+        self.assertEqual(data2.vector.shape, (16,))
+
+        result = self.__tf_wc.add(data1, data2)
+        self.assertIsInstance(result, list)
+        self.__assert_ndarray_equal(result[0], np.full((2, 2, 3), 3.3))
+        self.__assert_ndarray_equal(result[1], np.full((2, 1, 2), 6.6))
+
+        result = self.__tf_wc.subtract(data2, data1)
+        self.assertIsInstance(result, FlatWeights)
+        self.assertTrue(self.__tf_wc.equal(result, data1))
+        self.assertTrue(self.__tf_wc.equal(
+            self.__tf_wc.true_divide(data2, 2), data1))
+
+    def test_flatten_unflatten_weights_without_copy(self):
+        flat = FlatWeights.flatten([np.ones((2, 3), dtype=np.float32),
+                                    np.zeros(4, dtype=np.float32)])
+        layers = flat.unflatten()
+        self.assertEqual(layers[0].shape, (2, 3))
+        self.assertTrue(np.shares_memory(layers[1], flat.vector))
+
+        again = FlatWeights.flatten(layers)
+        self.assertTrue(np.shares_memory(again.vector, flat.vector))
+        self.assertTrue(flat.same_layout(again))
+
+        copied = FlatWeights.flatten([layers[1], layers[0]])
+        self.assertFalse(np.shares_memory(copied.vector, flat.vector))
+
     def __assert_ndarray_equal(self, array1, array2):
         result = abs(array1 - array2) < 0.000001
         self.assertTrue(result.all())
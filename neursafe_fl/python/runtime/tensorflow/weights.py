@@ -6,7 +6,8 @@
 
 import numpy as np
 from neursafe_fl.python.runtime.weights import (WeightsCalculator,
-                                                WeightsConverter, WEIGHT)
+                                                WeightsConverter, WEIGHT,
+                                                FlatWeights, flat_operands)
 
 
 ENOUGH_MIN_FLOAT = 0.000001
@@ -18,6 +19,10 @@ class TensorflowWeightsCalculator(WeightsCalculator):
     def add(self, x_weights, y_weights):
         """Compute x_weights + y_weights.
         """
+        operands = flat_operands(x_weights, y_weights)
+        if operands:
+            return self.__compute(np.add, x_weights, *operands)
+
         result = []
         for index, value in enumerate(x_weights):
             result.append(np.add(
@@ -27,6 +32,10 @@ class TensorflowWeightsCalculator(WeightsCalculator):
     def subtract(self, x_weights, y_weights):
         """Compute x_weights - y_weights.
         """
+        operands = flat_operands(x_weights, y_weights)
+        if operands:
+            return self.__compute(np.subtract, x_weights, *operands)
+
         result = []
         for index, value in enumerate(x_weights):
             result.append(np.subtract(
@@ -36,6 +45,9 @@ class TensorflowWeightsCalculator(WeightsCalculator):
     def multiply(self, x_weights, y):  # pylint:disable=invalid-name
         """Compute x_weights * y.
         """
+        if isinstance(x_weights, FlatWeights):
+            return x_weights.like(np.multiply(x_weights.vector, y))
+
         result = []
         for value in x_weights:
             result.append(np.multiply(value, y))
@@ -44,6 +56,9 @@ class TensorflowWeightsCalculator(WeightsCalculator):
     def true_divide(self, x_weights, y):
         """Compute x_weights / y.
         """
+        if isinstance(x_weights, FlatWeights):
+            return x_weights.like(np.true_divide(x_weights.vector, y))
+
         result = []
         for value in x_weights:
             result.append(np.true_divide(value, y))
@@ -52,12 +67,25 @@ class TensorflowWeightsCalculator(WeightsCalculator):
     def equal(self, x_weights, y_weights):
         """compare x_weights == y_weights.
         """
+        operands = flat_operands(x_weights, y_weights)
+        if operands:
+            x_flat, y_flat = operands
+            return bool(np.all(np.abs(x_flat.vector - y_flat.vector)
+                               < ENOUGH_MIN_FLOAT))
+
         for index, value in enumerate(x_weights):
             result = abs(value - y_weights[index]) < ENOUGH_MIN_FLOAT
             if not result.all():
                 return False
         return True
 
+    @staticmethod
+    def __compute(func, x_weights, x_flat, y_flat):
+        result = x_flat.like(func(x_flat.vector, y_flat.vector))
+        if isinstance(x_weights, FlatWeights):
+            return result
+        return result.unflatten()
+
 
 class TensorflowWeightsConverter(WeightsConverter):
     """Weights converter executing in tensorflow runtime.
@@ -66,6 +94,9 @@ class TensorflowWeightsConverter(WeightsConverter):
     def encode(self, raw_weights, encoder):
         """Encode weights according to specified encoder.
         """
+        if isinstance(raw_weights, FlatWeights):
+            return self._encode_flat(raw_weights, encoder)
+
         internal_weights = []
 
         for i, weight in enumerate(raw_weights):
@@ -78,6 +109,10 @@ class TensorflowWeightsConverter(WeightsConverter):
     def decode(self, internal_weights, decoder):
         """Decode weights according to specified decoder.
         """
+        flat_weights = self._decode_flat(internal_weights, decoder)
+        if flat_weights is not None:
+            return flat_weights
+
         raw_weights = []
 
         for internal_weight in internal_weights:
@@ -86,3 +121,25 @@ class TensorflowWeightsConverter(WeightsConverter):
             raw_weights.append(raw_weight)
 
         return raw_weights
+
+    def decode_sparse(self, internal_weights, decoder):
+        """Decode weights into sparse layers(SPARSE), the values are not
+        scattered into dense arrays.
+        """
+        flat_weights = self._decode_flat_sparse(internal_weights, decoder)
+        if flat_weights is not None:
+            return flat_weights
+
+        return [decoder.decode_sparse(internal_weight.weight,
+                                      **internal_weight.params)
+                for internal_weight in internal_weights]
+
+    def flatten(self, raw_weights):
+        """Convert tensorflow weights to FlatWeights.
+        """
+        return FlatWeights.flatten(raw_weights)
+
+    def unflatten(self, flat_weights):
+        """Convert FlatWeights to tensorflow weights.
+        """
+        return flat_weights.unflatten()
@@ -6,10 +6,221 @@ Basic class for different runtime to complete weights.
 """
 
 import abc
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
+
+import numpy as np
 
 WEIGHT = namedtuple("WEIGHT", ["id", "weight", "params"])
 
+# Where a layer lives in the vector of FlatWeights, id is the layer's name
+# in pytorch weights, or the layer's index in tensorflow weights.
+LAYER = namedtuple("LAYER", ["id", "offset", "shape", "dtype"])
+
+# The layer table of FlatWeights, layout is "dict" for pytorch weights and
+# "list" for tensorflow weights.
+LAYER_TABLE = namedtuple(  # pylint:disable=invalid-name
+    "LAYER_TABLE", ["layout", "layers"])
+
+# The sparse layer decoded from the compressed weights, the values at the
+# unique flat indices of a layer in shape, the other elements are zero.
+SPARSE = namedtuple("SPARSE", ["indices", "values", "shape"])
+
+LIST_LAYOUT = "list"
+DICT_LAYOUT = "dict"
+
+
+def _vector_dtype(arrays):
+    """The floating layers are kept in their common precision(at least
+    float32), integer layers, such as the counter of batch norm, are cast
+    to it and cast back when unflatten."""
+    dtypes = [array.dtype for array in arrays
+              if np.issubdtype(array.dtype, np.floating)]
+    return np.result_type(np.float32, *dtypes)
+
+
+def _root(array):
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def _contiguous_view(arrays, dtype):
+    """Return the vector view of the arrays if they are views of one ndarray
+    and lie back to back, as they do after unflatten from the same
+    FlatWeights, otherwise None."""
+    root = _root(arrays[0])
+    if root.dtype != dtype or not root.flags.c_contiguous:
+        return None
+
+    address = None
+    for array in arrays:
+        if _root(array) is not root or not array.flags.c_contiguous:
+            return None
+        start = array.__array_interface__["data"][0]
+        if address is not None and start != address:
+            return None
+        address = start + array.nbytes
+
+    vector = root.reshape(-1)
+    begin = (arrays[0].__array_interface__["data"][0]
+             - root.__array_interface__["data"][0]) // dtype.itemsize
+    return vector[begin:begin + sum(array.size for array in arrays)]
+
+
+def _layer_size(layer):
+    return int(np.prod(layer.shape, dtype=np.int64))
+
+
+def _layer_segment(vector, layer):
+    """The segment of the layer in the vector, in the dtype of vector."""
+    return vector[layer.offset:layer.offset + _layer_size(layer)]
+
+
+def _copy_layers(layers, arrays, vector):
+    for layer, array in zip(layers, arrays):
+        vector[layer.offset:layer.offset + array.size] = array.reshape(-1)
+    return vector
+
+
+class FlatWeights:
+    """Weights of all the layers held in one contiguous vector.
+
+    Each layer is a view of the vector, the layer table records the offset,
+    shape and dtype of each layer. Calculators, aggregators and secure
+    aggregation process the whole vector in one vectorized call instead of
+    one call per layer, which saves the python overhead for the models with
+    hundreds of small layers. Compression still encodes layer by layer, as
+    its params depend on the values of each layer.
+
+    Args:
+        vector: one dimension ndarray, contains all the layers.
+        table: LAYER_TABLE, the layout and layers of the weights.
+    """
+
+    def __init__(self, vector, table):
+        self.__vector = vector
+        self.__table = table
+
+    @classmethod
+    def flatten(cls, weights, vector=None, out=None):
+        """Create FlatWeights from layered weights.
+
+        If the layers already lie in one buffer back to back, no data is
+        copied, otherwise they are copied into a new vector.
+
+        Args:
+            weights: list or OrderedDict, the value is ndarray or any object
+                     can be converted to ndarray without copy.
+            vector: the vector the layers are views of, if known by caller.
+            out: copy the layers into this vector instead of a new one.
+        """
+        if isinstance(weights, list):
+            layout, items = LIST_LAYOUT, enumerate(weights)
+        else:
+            layout, items = DICT_LAYOUT, weights.items()
+
+        ids, arrays = [], []
+        for id_, value in items:
+            ids.append(id_)
+            arrays.append(np.asarray(value))
+
+        dtype = _vector_dtype(arrays)
+        layers, offset = [], 0
+        for id_, array in zip(ids, arrays):
+            layers.append(LAYER(id_, offset, array.shape, array.dtype.str))
+            offset += array.size
+
+        table = LAYER_TABLE(layout, tuple(layers))
+        if out is not None:
+            return cls(_copy_layers(layers, arrays, out[:offset]), table)
+
+        if vector is not None and vector.dtype != dtype:
+            vector = None
+        if vector is None and arrays:
+            vector = _contiguous_view(arrays, dtype)
+        if vector is None:
+            vector = _copy_layers(layers, arrays,
+                                  np.empty(offset, dtype=dtype))
+        return cls(vector, table)
+
+    def unflatten(self, wrap=None):
+        """Return the layered weights, the layers are views of the vector.
+
+        Args:
+            wrap: convert each layer from ndarray to runtime type, such as
+                  torch.from_numpy.
+        """
+        result = [] if self.layout == LIST_LAYOUT else OrderedDict()
+        for layer in self.layers:
+            value = self.layer(layer)
+            if wrap:
+                value = wrap(value)
+            if isinstance(result, list):
+                result.append(value)
+            else:
+                result[layer.id] = value
+        return result
+
+    def layer(self, layer):
+        """Return the value of the layer, a view of the vector if the layer's
+        dtype is same as the vector.
+
+        Args:
+            layer: LAYER, one item of the layer table.
+        """
+        value = _layer_segment(self.__vector, layer)
+        return value.reshape(layer.shape).astype(layer.dtype, copy=False)
+
+    def like(self, vector):
+        """Create FlatWeights with the same layer table and new vector."""
+        return FlatWeights(vector, self.__table)
+
+    def same_layout(self, other):
+        """Whether other FlatWeights has the same layer table."""
+        return self.__table == other.table
+
+    @property
+    def vector(self):
+        """The vector contains all the layers."""
+        return self.__vector
+
+    @property
+    def table(self):
+        """The layer table, LAYER_TABLE format."""
+        return self.__table
+
+    @property
+    def layers(self):
+        """The layers, a tuple of LAYER."""
+        return self.__table.layers
+
+    @property
+    def layout(self):
+        """"dict" for pytorch weights, "list" for tensorflow weights."""
+        return self.__table.layout
+
+
+def flat_operands(x_weights, y_weights, flatten=FlatWeights.flatten):
+    """Flatten the operands if one of them is FlatWeights.
+
+    Args:
+        flatten: the runtime function to convert weights to FlatWeights.
+
+    Returns:
+        Both operands in FlatWeights format, or None if neither of them is
+        FlatWeights.
+    """
+    if not isinstance(x_weights, FlatWeights) \
+            and not isinstance(y_weights, FlatWeights):
+        return None
+    if not isinstance(x_weights, FlatWeights):
+        x_weights = flatten(x_weights)
+    if not isinstance(y_weights, FlatWeights):
+        y_weights = flatten(y_weights)
+    if not x_weights.same_layout(y_weights):
+        raise ValueError("Weights layers not match.")
+    return x_weights, y_weights
+
 
 class WeightsCalculator:
     """Basic weights Calculator, add and subtract weights.
@@ -56,3 +267,69 @@ class WeightsConverter:
     def decode(self, internal_weights, decoder):
         """Decode weight.
         """
+
+    @abc.abstractmethod
+    def flatten(self, raw_weights):
+        """Convert weights to FlatWeights.
+        """
+
+    @abc.abstractmethod
+    def unflatten(self, flat_weights):
+        """Convert FlatWeights to weights.
+        """
+
+    @staticmethod
+    def _encode_flat(flat_weights, encoder):
+        """Encode the vector of FlatWeights layer by layer, each layer keeps
+        its own params as the layered weights do, because the codec, such as
+        the range of quantization and the top-k of selective masking, depends
+        on the values of the layer. The layer table is the id of the only one
+        encoded weight, whose weight and params are the lists of layers."""
+        encoded_weights, params_s = [], []
+        for layer in flat_weights.layers:
+            encoded_weight, params = encoder.encode(
+                _layer_segment(flat_weights.vector, layer))
+            encoded_weights.append(encoded_weight)
+            params_s.append(params)
+        return [WEIGHT(flat_weights.table, encoded_weights, params_s)]
+
+    @staticmethod
+    def _decode_flat(internal_weights, decoder):
+        """Decode the weights encoded from FlatWeights, return None if they
+        are encoded from layered weights."""
+        if len(internal_weights) != 1 \
+                or not isinstance(internal_weights[0].id, LAYER_TABLE):
+            return None
+
+        internal_weight = internal_weights[0]
+        segments = [np.reshape(decoder.decode(encoded_weight, **params), -1)
+                    for encoded_weight, params in zip(internal_weight.weight,
+                                                      internal_weight.params)]
+        vector = np.concatenate(segments) if segments else np.empty(0)
+        return FlatWeights(vector, internal_weight.id)
+
+    @staticmethod
+    def _decode_flat_sparse(internal_weights, decoder):
+        """Decode the weights encoded from FlatWeights into FlatWeights of
+        SPARSE vector, return None if they are encoded from layered weights."""
+        if len(internal_weights) != 1 \
+                or not isinstance(internal_weights[0].id, LAYER_TABLE):
+            return None
+
+        internal_weight = internal_weights[0]
+        indices, values, size = [], [], 0
+        for layer, encoded_weight, params in zip(internal_weight.id.layers,
+                                                 internal_weight.weight,
+                                                 internal_weight.params):
+            sparse = decoder.decode_sparse(encoded_weight, **params)
+            indices.append(np.add(sparse.indices, layer.offset,
+                                  dtype=np.int64))
+            values.append(np.reshape(sparse.values, -1))
+            size = layer.offset + _layer_size(layer)
+
+        if not indices:
+            return FlatWeights(SPARSE(np.empty(0, dtype=np.int64),
+                                      np.empty(0), (0,)), internal_weight.id)
+        return FlatWeights(SPARSE(np.concatenate(indices),
+                                  np.concatenate(values), (size,)),
+                           internal_weight.id)
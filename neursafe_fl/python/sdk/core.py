@@ -15,6 +15,7 @@ import neursafe_fl.python.sdk.utils as utils
 from neursafe_fl.python.utils.file_io import read_json_file
 from neursafe_fl.python.runtime.runtime_factory import RuntimeFactory
 from neursafe_fl.python.libs.compression.factory import create_compression
+from neursafe_fl.python.libs.compression.error_feedback import ErrorFeedback
 
 
 fl_model = None
@@ -47,6 +48,14 @@ def _calc_delta_weights(model):
     return delta_weights
 
 
+def _flatten_weights(weights_):
+    # All the layers in one vector, then compression, protection and
+    # aggregation process the whole vector in one call.
+    weight_converter = RuntimeFactory.create_weights_converter(
+        utils.get_runtime())
+    return weight_converter.flatten(weights_)
+
+
 def _protect_weights_if_needed(weights_, metrics):
     security_algorithm = utils.create_security_algorithm()
 
@@ -69,6 +78,15 @@ def _compress_weights_if_needed(weights_):
                                          **compression_algorithm)
         weight_converter = RuntimeFactory.create_weights_converter(runtime)
 
+        if "error_feedback" in compression_algorithm \
+                and compression_algorithm["error_feedback"]:
+            residual_file = weights.get_residual_file_name(
+                utils.get_task_workspace(),
+                utils.get_task_metadata().job_name)
+            error_feedback = ErrorFeedback(compression, weight_converter,
+                                           residual_file)
+            return error_feedback.encode(weights_)
+
         return weight_converter.encode(weights_, compression)
 
     return weights_
@@ -99,7 +117,7 @@ def _commit_trained_results(metrics, model):
         do_optional_works()
 
         # STEP 2: Calculate delta weights.
-        delta_weights = _calc_delta_weights(fl_model)
+        delta_weights = _flatten_weights(_calc_delta_weights(fl_model))
 
         # STEP 3: Compress delta weights if needed
         delta_weights = _compress_weights_if_needed(delta_weights)
@@ -7,9 +7,7 @@
 Report delta weights, metrics and other info to server.
 """
 import os
-import pickle
 
-from io import BytesIO
 from absl import logging
 
 import neursafe_fl.python.sdk.utils as utils
@@ -20,6 +18,7 @@ from neursafe_fl.python.utils.file_io import zip_files, list_all_files
 from neursafe_fl.proto.reply_service_grpc import TrainReplyServiceStub, \
     EvaluateReplyServiceStub
 from neursafe_fl.python.trans.grpc_call import stream_call
+from neursafe_fl.python.trans import weights_format
 
 
 def _get_custom_parameters(workspace):
@@ -80,7 +79,7 @@ def _submit_trained_result(metrics, weights):
         custom_files_io = _zip_files(workspace, custom_files)
 
         delta_weights_io = (File(name='delta_weights'),
-                            BytesIO(pickle.dumps(weights)))
+                            weights_format.encode(weights))
 
         return task_result, delta_weights_io, custom_files_io
 
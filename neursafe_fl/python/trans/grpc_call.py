@@ -4,6 +4,7 @@
 # pylint:disable=too-many-arguments
 """Process transfer in GRPC.
 """
+import hashlib
 from io import BytesIO
 import os
 
@@ -12,56 +13,190 @@ from absl import logging
 from neursafe_fl.proto.message_pb2 import FilePackage, File
 from neursafe_fl.python.trans.grpc_pool import GRPCPool
 
+# The maximum size of file chunk in one message, unit is byte.
+CHUNK_SIZE = int(os.getenv("GRPC_CHUNK_SIZE", str(4 << 20)))
+
 
 class RemoteServerError(Exception):
     """When GRPC server process error, raise this error.
     """
 
 
+class FileIntegrityError(ValueError):
+    """When the received file not match its size or md5, raise this error.
+    """
+
+
+class SerializedMessages:
+    """A sequence of messages serialized once, to be sent to many servers.
+
+    All the messages are serialized into one immutable buffer, and the file is
+    split into chunk messages, the sequence yields read-only memoryview slices
+    of the buffer, which are sent without serializing again by the channels of
+    GRPCPool. So broadcasting the same task and package to N clients does not
+    copy or serialize the package N times.
+
+    Args:
+        message_type: Task or TaskResult, defined in proto message.
+        config: a object of message_type.
+        file_like_objs: [(file_info, file_like_obj), ], same as stream_call.
+        chunk_size: the maximum size of file chunk in one message, default
+            is CHUNK_SIZE.
+    """
+
+    def __init__(self, message_type, config=None, file_like_objs=None,
+                 chunk_size=None):
+        chunk_size = chunk_size or CHUNK_SIZE
+        messages = [config] if config else []
+        for file_info, file_like_obj in file_like_objs or []:
+            messages.extend(_gen_file_messages(message_type, file_info,
+                                               file_like_obj, chunk_size))
+
+        buffer = bytearray(sum(message.ByteSize() for message in messages))
+        self.__offsets = [0]
+        for message in messages:
+            data = message.SerializeToString()
+            offset = self.__offsets[-1]
+            buffer[offset:offset + len(data)] = data
+            self.__offsets.append(offset + len(data))
+        self.__buffer = memoryview(buffer).toreadonly()
+
+    def __iter__(self):
+        for start, end in zip(self.__offsets, self.__offsets[1:]):
+            yield self.__buffer[start:end]
+
+    def __len__(self):
+        return len(self.__offsets) - 1
+
+    @property
+    def nbytes(self):
+        """The size of the serialized messages."""
+        return self.__buffer.nbytes
+
+
 async def stream_call(stub_class, call_method, message_type, address,
                       config=None, file_paths=None, file_like_objs=None,
-                      certificate_path=None, metadata=None):
+                      certificate_path=None, metadata=None, messages=None,
+                      chunk_size=None):
     """Used server call client or client report result to server.
 
+    The messages are generated lazily and sent one by one, each send waits
+    the flow control of the stream, so a large file is read chunk by chunk
+    while sending, never loaded in memory or in one message.
+
     Args:
         stub_class: TrainServiceStub, etc. defined in proto message.
         call_method: the method defined in stub_class to call.
         message_type: Task or TaskResult, defined in proto message.
         address: The destination server, like host:port.
-        config: a object of message_type,
+        config: a object of message_type, or SerializedMessages serialized
+            once for many calls.
         file_paths: [string, ], element in list is an exist file's path.
         file_like_objs: [(file_info, file_like_obj), ],
             file_info: the object of File, defined in proto message.
-            file_like_obj:Lmaybe BytesIO, StringIO, etc.
+            file_like_obj: maybe BytesIO, opened file, bytes or memoryview.
         certificate_path: Used in grpcs, where the certificate.
         metadata: grpc metadata.
+        messages: an iterable or async iterable of messages of message_type,
+            sent after config and before the files.
+        chunk_size: the maximum size of file chunk in one message, default is
+            CHUNK_SIZE.
     """
-    channel = GRPCPool.instance().get_channel(address, certificate_path)
-
-    stub = stub_class(channel)
-    method = getattr(stub, call_method)
-
-    datas = __gen_data_sequence(message_type,
-                                config, file_paths, file_like_objs)
-    reply = await method(datas, metadata=metadata)
+    method = _get_method(stub_class, call_method, address, certificate_path)
+    async with method.open(metadata=metadata) as stream:
+        async for data in __gen_data_sequence(message_type, config,
+                                              file_paths, file_like_objs,
+                                              messages,
+                                              chunk_size or CHUNK_SIZE):
+            await stream.send_message(data)
+        await stream.end()
+        reply = await stream.recv_message()
     __assert_reply(address, reply)
 
 
-def __gen_data_sequence(message_type,
-                        config, file_paths, file_like_objs):
-    data_sequence = []
-    if config:
-        data_sequence.append(config)
-
-    if file_paths:
-        for file_path in file_paths:
-            __add_file(data_sequence, message_type, file_path)
+def _get_method(stub_class, call_method, address, certificate_path):
+    channel = GRPCPool.instance().get_channel(address, certificate_path)
+    return getattr(stub_class(channel), call_method)
+
+
+async def __gen_data_sequence(message_type, config, file_paths,
+                              file_like_objs, messages, chunk_size):
+    if isinstance(config, SerializedMessages):
+        for data in config:
+            yield data
+    elif config:
+        yield config
+
+    if hasattr(messages, "__aiter__"):
+        async for message in messages:
+            yield message
+    else:
+        for message in messages or []:
+            yield message
+
+    for file_path in file_paths or []:
+        with open(file_path, 'rb') as file_io:
+            for data in _gen_file_messages(message_type,
+                                           _gen_file_info(file_path),
+                                           file_io, chunk_size):
+                yield data
+
+    for file_info, file_like_obj in file_like_objs or []:
+        for data in _gen_file_messages(message_type, file_info,
+                                       file_like_obj, chunk_size):
+            yield data
+
+
+def _gen_file_messages(message_type, file_info, file_like_obj, chunk_size):
+    """Generate the file info message, and the chunk messages of the file,
+    the chunks are read only when generated."""
+    file_info = fill_integrity(file_info, file_like_obj, chunk_size)
+    yield message_type(files=FilePackage(file_info=file_info))
+    for chunk in _read_chunks(file_like_obj, chunk_size):
+        yield message_type(files=FilePackage(chunk=chunk))
+
+
+def fill_integrity(file_info, file_like_obj, chunk_size=None):
+    """Fill the size and md5 of file info if not filled, the file is read
+    chunk by chunk to calculate them.
+
+    The file info filled is returned, the sender of a file sent many times
+    could fill it once and reuse it, the file is not read again.
+    """
+    if file_info.md5:
+        return file_info
+
+    md5 = hashlib.md5()
+    size = 0
+    if isinstance(file_like_obj, (bytes, bytearray, memoryview)):
+        view = memoryview(file_like_obj).cast('B')
+        md5.update(view)
+        size = view.nbytes
+    else:
+        for chunk in _read_chunks(file_like_obj, chunk_size or CHUNK_SIZE):
+            md5.update(chunk)
+            size += len(chunk)
+
+    filled = File()
+    filled.CopyFrom(file_info)
+    filled.size = size
+    filled.md5 = md5.hexdigest()
+    return filled
+
+
+def _read_chunks(file_like_obj, chunk_size):
+    if isinstance(file_like_obj, (bytes, bytearray, memoryview)):
+        view = memoryview(file_like_obj).cast('B')
+        for offset in range(0, view.nbytes, chunk_size):
+            yield bytes(view[offset:offset + chunk_size])
+        return
 
-    if file_like_objs:
-        for file_info, file_like_obj in file_like_objs:
-            __add_file_like_obj(
-                data_sequence, message_type, file_info, file_like_obj)
-    return data_sequence
+    file_like_obj.seek(0)
+    while True:
+        chunk = file_like_obj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
 
 
 def __assert_reply(address, reply):
@@ -71,33 +206,6 @@ def __assert_reply(address, reply):
             'Received from %s error: %s' % (address, reply.reason))
 
 
-def __add_file(data_sequence, message_type, file_path):
-    with open(file_path, 'rb') as file_io:
-        data_sequence.append(message_type(
-            files=FilePackage(
-                file_info=_gen_file_info(file_path))))
-
-        file_io.seek(0)
-        chunk = file_io.read()
-        data_sequence.append(message_type(
-            files=FilePackage(
-                chunk=chunk)))
-
-
-def __add_file_like_obj(data_sequence, message_type,
-                        file_info, file_like_obj):
-    data_sequence.append(message_type(
-        files=FilePackage(
-            file_info=file_info)))
-
-    file_like_obj.seek(0)
-    chunk = file_like_obj.read()
-    data_sequence.append(
-        message_type(
-            files=FilePackage(
-                chunk=chunk)))
-
-
 def _gen_file_info(data):
     filename = os.path.basename(data)
     compress = filename.endswith('.zip')
@@ -116,24 +224,34 @@ def extract_metadata(stream, keys=None):
     return metadata
 
 
-async def unpackage_stream(stream, validate_func=None):
+async def unpackage_stream(stream, validate_func=None, writer_factory=None):
     """
     Unpackage data from GRPC server.
 
+    The file chunks are written into the writer of the file as soon as they
+    are received, the stream is consumed message by message. If the md5 of
+    file is filled by sender, the size and md5 are verified incrementally.
+
     Args:
         stream: The grpc stream, where to unpackage.
         validate_func: Maybe need validate the data from stream.
+        writer_factory: Called with (config, file_info) to create the writer
+            of each received file, such as a SpooledFile, default is BytesIO.
 
     Return:
         return a dict which contain the data unpackaged from stream.
         like: (Task or TaskResult,
                [('file_info': File, defined in proto message
-                 'object': the object of BytesIO
+                 'object': the writer created by writer_factory
                ),]
               )
+    Raises:
+        FileIntegrityError: the received file not match its size or md5.
     """
     config = None
     files = []
+    writer = None
+    verifier = None
     async for data in stream:
         if data.HasField('metadata'):
             config = data
@@ -141,23 +259,60 @@ async def unpackage_stream(stream, validate_func=None):
                 validate_func(config)
         elif data.HasField('files'):
             if data.files.file_info.name != '':
-                memory_writer = BytesIO()
+                if verifier:
+                    verifier.verify()
+                file_info = data.files.file_info
+                writer = writer_factory(config, file_info) \
+                    if writer_factory else BytesIO()
+                verifier = _FileVerifier(file_info)
 
                 files.append((
-                    data.files.file_info,
-                    memory_writer
+                    file_info,
+                    writer
                 ))
             else:
-                memory_writer.write(data.files.chunk)
+                writer.write(data.files.chunk)
+                verifier.update(data.files.chunk)
 
+    if verifier:
+        verifier.verify()
     return config, files
 
 
+class _FileVerifier:
+    """Calculate the size and md5 of received file incrementally."""
+
+    def __init__(self, file_info):
+        self.__file_info = file_info
+        self.__md5 = hashlib.md5() if file_info.md5 else None
+        self.__size = 0
+
+    def update(self, chunk):
+        """Update with the received chunk."""
+        self.__size += len(chunk)
+        if self.__md5:
+            self.__md5.update(chunk)
+
+    def verify(self):
+        """Verify the received file."""
+        if not self.__md5:
+            return
+
+        if self.__size != self.__file_info.size:
+            raise FileIntegrityError(
+                'File %s size %s not match %s.' % (
+                    self.__file_info.name, self.__size,
+                    self.__file_info.size))
+        if self.__md5.hexdigest() != self.__file_info.md5:
+            raise FileIntegrityError(
+                'File %s md5 %s not match %s.' % (
+                    self.__file_info.name, self.__md5.hexdigest(),
+                    self.__file_info.md5))
+
+
 async def unary_call(stub_class, call_method, data, address,
                      certificate_path, metadata=None):
     """Call without stream.
     """
-    channel = GRPCPool.instance().get_channel(address, certificate_path)
-    stub = stub_class(channel)
-    method = getattr(stub, call_method)
+    method = _get_method(stub_class, call_method, address, certificate_path)
     return await method(data, metadata=metadata)
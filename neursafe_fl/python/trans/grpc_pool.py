@@ -7,6 +7,7 @@
 import time
 from grpclib.client import Channel
 from grpclib.config import Configuration
+from grpclib.encoding.proto import ProtoCodec
 
 from neursafe_fl.python.trans.ssl_helper import SSLContext
 from neursafe_fl.python.utils.timer import Timer
@@ -16,6 +17,15 @@ CLEAN_CHANNEL_INTERVAL = 7200
 MONITOR_INTERVAL = 3600
 
 
+class SerializedProtoCodec(ProtoCodec):
+    """Proto codec which sends the serialized message as it is."""
+
+    def encode(self, message, message_type):
+        if isinstance(message, (bytes, memoryview)):
+            return message
+        return super().encode(message, message_type)
+
+
 class GRPCPool:
     """GRPC Poll.
     """
@@ -51,7 +61,7 @@ class GRPCPool:
         )
         channel = Channel(host, int(port),
                           ssl=SSLContext.instance(certificate_path),
-                          config=config)
+                          config=config, codec=SerializedProtoCodec())
         self.__channels[address] = {
             "alive_time": time.time(),
             "channel": channel
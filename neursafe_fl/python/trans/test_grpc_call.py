@@ -0,0 +1,177 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""gRPC Call UnitTest."""
+import asyncio
+import os
+import pickle
+import shutil
+import socket
+import tempfile
+import unittest
+from io import BytesIO
+
+from grpclib.server import Stream
+
+from neursafe_fl.proto.message_pb2 import Task, Metadata, File, Response
+from neursafe_fl.proto.train_service_grpc import TrainServiceBase, \
+    TrainServiceStub
+from neursafe_fl.python.trans.grpc import GRPCServer
+from neursafe_fl.python.trans.grpc_call import SerializedMessages, \
+    stream_call, unpackage_stream, RemoteServerError
+from neursafe_fl.python.trans.grpc_pool import SerializedProtoCodec, GRPCPool
+from neursafe_fl.python.utils.file_io import SpooledFile
+
+HOST = "127.0.0.1"
+
+
+class TestSerializedMessages(unittest.TestCase):
+    """Test class."""
+
+    def test_should_serialize_task_and_chunked_file_once(self):
+        task = Task(metadata=Metadata(job_name="test", round=3))
+        content = bytes(range(256)) * 10
+        serialized = SerializedMessages(
+            Task, task, [(File(name="package.zip"), BytesIO(content))],
+            chunk_size=1000)
+
+        messages = [Task.FromString(data) for data in serialized]
+        self.assertEqual(len(serialized), 5)
+        self.assertEqual(messages[0], task)
+        self.assertEqual(messages[1].files.file_info.name, "package.zip")
+        self.assertEqual(b"".join(message.files.chunk
+                                  for message in messages[2:]), content)
+
+        # the same buffer is shared by all the iterations.
+        first, second = next(iter(serialized)), next(iter(serialized))
+        self.assertTrue(first.readonly)
+        self.assertEqual(first.obj, second.obj)
+
+    def test_should_codec_send_serialized_message_as_it_is(self):
+        codec = SerializedProtoCodec()
+        data = memoryview(b"serialized")
+        self.assertIs(codec.encode(data, Task), data)
+
+        task = Task(metadata=Metadata(job_name="test"))
+        self.assertEqual(codec.encode(task, Task), task.SerializeToString())
+
+
+class ReceiveService(TrainServiceBase):
+    """Record the messages and the unpackaged files received."""
+
+    def __init__(self, writer_factory=None):
+        self.__writer_factory = writer_factory
+        self.chunk_sizes = []
+        self.task = None
+        self.files = None
+
+    async def Train(self, stream: Stream[Task, Response]):
+        async def recording():
+            async for message in stream:
+                if message.HasField("files"):
+                    self.chunk_sizes.append(len(message.files.chunk))
+                yield message
+
+        try:
+            self.task, self.files = await unpackage_stream(
+                recording(), writer_factory=self.__writer_factory)
+            await stream.send_message(Response(state="success"))
+        except ValueError as err:
+            await stream.send_message(Response(state="failed",
+                                               reason=str(err)))
+
+    async def Evaluate(self, stream):  # pylint:disable=invalid-name
+        pass
+
+    async def Stop(self, stream):
+        pass
+
+
+class TestStreamCall(unittest.TestCase):
+    """Test class."""
+
+    def setUp(self):
+        with socket.socket() as sock:
+            sock.bind((HOST, 0))
+            self.port = sock.getsockname()[1]
+
+        self.content = os.urandom(10000)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, "package.zip")
+        with open(self.file_path, "wb") as file:
+            file.write(self.content)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    async def __call(self, service, **kwargs):
+        server = GRPCServer(HOST, self.port, [service])
+        await server.start()
+        try:
+            await stream_call(TrainServiceStub, "Train", Task,
+                              "%s:%s" % (HOST, self.port), chunk_size=4096,
+                              **kwargs)
+        finally:
+            GRPCPool.instance().close_all()
+            server.close()
+
+    def test_should_send_files_chunk_by_chunk(self):
+        async def messages():
+            yield Task(metadata=Metadata(job_name="test", round=2))
+
+        service = ReceiveService()
+        asyncio.run(self.__call(
+            service, messages=messages(), file_paths=[self.file_path],
+            file_like_objs=[(File(name="weights"),
+                             memoryview(self.content[:5000]))]))
+
+        self.assertEqual(service.task.metadata.round, 2)
+        self.assertEqual(service.chunk_sizes,
+                         [0, 4096, 4096, 1808, 0, 4096, 904])
+        (zip_info, zip_io), (weights_info, weights_io) = service.files
+        self.assertEqual(zip_info.name, "package.zip")
+        self.assertTrue(zip_info.compress)
+        self.assertEqual(zip_info.size, len(self.content))
+        self.assertEqual(zip_io.getvalue(), self.content)
+        self.assertEqual(weights_info.name, "weights")
+        self.assertEqual(weights_io.getvalue(), self.content[:5000])
+
+    def test_should_spill_large_file_to_directory(self):
+        spool_dir = os.path.join(self.tmp_dir, "upload")
+        os.mkdir(spool_dir)
+
+        def writer_factory(config, file_info):
+            del config
+            return SpooledFile(spool_dir, 6000, prefix=file_info.name)
+
+        service = ReceiveService(writer_factory)
+        asyncio.run(self.__call(
+            service, config=Task(metadata=Metadata(job_name="test")),
+            file_like_objs=[(File(name="small"), BytesIO(self.content[:10])),
+                            (File(name="large"), BytesIO(self.content))]))
+
+        (_, small), (_, large) = service.files
+        self.assertIsNone(small.path)
+        self.assertEqual(bytes(small.getbuffer()), self.content[:10])
+        self.assertEqual(os.path.dirname(large.path), spool_dir)
+        self.assertEqual(bytes(large.getbuffer()), self.content)
+
+        # the spilled file is opened again after pickled to other process.
+        large.seek(0)
+        restored = pickle.loads(pickle.dumps(large))
+        self.assertEqual(restored.read(), self.content)
+
+    def test_should_refuse_file_not_match_md5(self):
+        service = ReceiveService()
+        with self.assertRaisesRegex(RemoteServerError, "md5"):
+            asyncio.run(self.__call(
+                service, config=Task(metadata=Metadata(job_name="test")),
+                file_like_objs=[(File(name="weights", size=len(self.content),
+                                      md5="0" * 32),
+                                 BytesIO(self.content))]))
+        self.assertIsNone(service.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+# pylint:disable=missing-function-docstring
+"""Weights Format UnitTest."""
+import pickle
+import shutil
+import tempfile
+import unittest
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import torch
+
+from neursafe_fl.python.runtime.weights import FlatWeights, WEIGHT, \
+    LAYER_TABLE
+from neursafe_fl.python.trans import weights_format
+from neursafe_fl.python.trans.weights_format import WeightsFormatError
+from neursafe_fl.python.utils.file_io import SpooledFile
+
+
+def _round_trip(weights):
+    data = BytesIO()
+    weights_format.encode(weights).write_to(data)
+    return weights_format.decode(data), data
+
+
+class TestWeightsFormat(unittest.TestCase):
+    """Test class."""
+
+    def test_should_decode_arrays_as_aligned_views_of_buffer(self):
+        weights = [np.arange(6, dtype=np.float32).reshape(2, 3),
+                   np.array([1, 2, 3], dtype=np.int64),
+                   np.array(0.5),
+                   np.zeros((0, 2), dtype=np.float16)]
+        result, data = _round_trip(weights)
+
+        self.assertIsInstance(result, list)
+        buffer = np.frombuffer(data.getbuffer(), dtype=np.uint8)
+        for layer, expected in zip(result, weights):
+            self.assertEqual(layer.dtype, expected.dtype)
+            np.testing.assert_array_equal(layer, expected)
+            if layer.size:
+                self.assertTrue(np.shares_memory(layer, buffer))
+                self.assertEqual(
+                    layer.__array_interface__["data"][0]
+                    % weights_format.ALIGNMENT,
+                    buffer.__array_interface__["data"][0]
+                    % weights_format.ALIGNMENT)
+
+    def test_should_encode_pytorch_and_flat_weights(self):
+        weights = OrderedDict([("fc.weight", torch.randn(3, 4)),
+                               ("bn.num_batches", torch.tensor(7))])
+        result, _ = _round_trip(weights)
+        self.assertIsInstance(result, OrderedDict)
+        self.assertEqual(list(result), list(weights))
+        for name, value in weights.items():
+            self.assertIsInstance(result[name], torch.Tensor)
+            self.assertTrue(torch.equal(result[name], value))
+
+        flat = FlatWeights.flatten(OrderedDict(
+            (name, value.numpy()) for name, value in weights.items()))
+        result, _ = _round_trip(flat)
+        self.assertTrue(result.same_layout(flat))
+        np.testing.assert_array_equal(result.vector, flat.vector)
+
+    def test_should_encode_compressed_weights(self):
+        table = FlatWeights.flatten([np.ones(4, dtype=np.float32)]).table
+        weights = [WEIGHT(table, np.arange(3, dtype=np.int32),
+                          {"max_value": np.float32(1.5), "min_value": -1.0,
+                           "shape": (4,), "ind": [0, 2, 3], "seed": 12})]
+        result, _ = _round_trip(weights)
+
+        weight = result[0]
+        self.assertIsInstance(weight, WEIGHT)
+        self.assertIsInstance(weight.id, LAYER_TABLE)
+        self.assertEqual(weight.id, table)
+        np.testing.assert_array_equal(weight.weight, weights[0].weight)
+        self.assertEqual(weight.params, weights[0].params)
+        self.assertIsInstance(weight.params["max_value"], np.float32)
+        self.assertIsInstance(weight.params["shape"], tuple)
+
+    def test_should_read_in_chunks_same_as_written(self):
+        encoded = weights_format.encode([np.random.rand(100),
+                                         np.random.rand(3, 7)])
+        data = BytesIO()
+        self.assertEqual(encoded.write_to(data), encoded.nbytes)
+
+        encoded.seek(0)
+        chunks = iter(lambda: encoded.read(100), b"")
+        self.assertEqual(b"".join(chunks), data.getvalue())
+
+    def test_should_decode_from_spilled_file(self):
+        spool_dir = tempfile.mkdtemp()
+        try:
+            weights = [np.random.rand(1000)]
+            spooled = SpooledFile(spool_dir, 1024)
+            weights_format.encode(weights).write_to(spooled)
+            self.assertIsNotNone(spooled.path)
+
+            result = weights_format.decode(spooled)
+            np.testing.assert_array_equal(result[0], weights[0])
+            # the buffer is copy-on-write, the spilled file not changed.
+            result[0][:] = 0
+            with open(spooled.path, "rb") as file:
+                np.testing.assert_array_equal(
+                    weights_format.decode(file.read())[0], weights[0])
+            spooled.close()
+        finally:
+            shutil.rmtree(spool_dir)
+
+    def test_should_refuse_pickle_and_object_arrays(self):
+        with self.assertRaises(WeightsFormatError):
+            weights_format.decode(pickle.dumps([np.ones(3)]))
+
+        with self.assertRaises(TypeError):
+            weights_format.encode([np.array([object()])])
+
+        data = BytesIO()
+        weights_format.encode([np.ones(3)]).write_to(data)
+        forged = data.getvalue().replace(b'"<f8"', b'"|O8"')
+        with self.assertRaises(WeightsFormatError):
+            weights_format.decode(forged)
+
+    def test_should_refuse_buffer_out_of_range(self):
+        data = BytesIO()
+        weights_format.encode([np.ones(16)]).write_to(data)
+        with self.assertRaises(WeightsFormatError):
+            weights_format.decode(data.getvalue()[:-8])
+
+
+if __name__ == "__main__":
+    unittest.main()
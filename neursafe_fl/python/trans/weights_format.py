@@ -0,0 +1,368 @@
+#  Copyright 2022 The Neursafe FL Authors. All Rights Reserved.
+#  SPDX-License-Identifier: Apache-2.0
+
+"""Binary format of the weights transferred between clients and server.
+
+The format is self-describing:
+
+    MAGIC | header size(uint64, little endian) | header(json) |
+    padding | buffer 0 | padding | buffer 1 | ...
+
+The header records the structure of weights, such as list, OrderedDict,
+FlatWeights and the WEIGHT of compression, and the dtype, shape and offset
+of each buffer. Every buffer is aligned to ALIGNMENT bytes, so the arrays are
+decoded by np.frombuffer as views of the received buffer without copying.
+Different from unpickling, decoding never executes any code.
+"""
+
+import bisect
+from collections import OrderedDict
+import importlib
+import json
+import struct
+
+import numpy as np
+
+from neursafe_fl.python.runtime.weights import FlatWeights, WEIGHT, LAYER, \
+    LAYER_TABLE
+
+MAGIC = b"NSFLWT\x00\x01"
+VERSION = 1
+ALIGNMENT = 64
+
+_HEADER_SIZE = struct.Struct("<Q")
+_PREFIX_SIZE = len(MAGIC) + _HEADER_SIZE.size
+
+# the dtype kinds could be transferred: bool, int, uint, float, complex.
+_SUPPORTED_KINDS = "biufc"
+
+_NAMEDTUPLES = {"WEIGHT": WEIGHT, "LAYER": LAYER,
+                "LAYER_TABLE": LAYER_TABLE}
+_NAMEDTUPLE_NAMES = {type_: name for name, type_ in _NAMEDTUPLES.items()}
+
+
+class WeightsFormatError(ValueError):
+    """When the data is not a valid weights format, raise this error."""
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _is_tensor(value):
+    return type(value).__module__.startswith("torch") \
+        and hasattr(value, "numpy")
+
+
+def _check_dtype(dtype):
+    if dtype.hasobject or dtype.kind not in _SUPPORTED_KINDS:
+        raise TypeError("Not support dtype %s in weights." % dtype)
+
+
+class EncodedWeights:
+    """The weights in binary format, a read-only file-like object.
+
+    The header is serialized, but the buffers are not copied, they are read
+    from the arrays of weights when read, so the encoded weights could be
+    sent by stream_call chunk by chunk without another copy in memory.
+    """
+
+    def __init__(self, segments, nbytes):
+        self.__starts = [start for start, _ in segments]
+        self.__segments = segments
+        self.__nbytes = nbytes
+        self.__position = 0
+
+    @property
+    def nbytes(self):
+        """The size of encoded weights."""
+        return self.__nbytes
+
+    def read(self, size=-1):
+        """Read at most size bytes, the padding between buffers is zero."""
+        end = self.__nbytes if size is None or size < 0 \
+            else min(self.__nbytes, self.__position + size)
+        if end <= self.__position:
+            return b""
+
+        pieces, position = [], self.__position
+        index = max(bisect.bisect_right(self.__starts, position) - 1, 0)
+        for start, view in self.__segments[index:]:
+            if start >= end:
+                break
+            stop = min(start + view.nbytes, end)
+            if stop <= position:
+                continue
+            if start > position:
+                pieces.append(bytes(start - position))
+                position = start
+            pieces.append(view[position - start:stop - start])
+            position = stop
+        if position < end:
+            pieces.append(bytes(end - position))
+
+        self.__position = end
+        return b"".join(pieces)
+
+    def seek(self, offset, whence=0):
+        """Change the position, same as file."""
+        base = {0: 0, 1: self.__position, 2: self.__nbytes}[whence]
+        self.__position = max(base + offset, 0)
+        return self.__position
+
+    def tell(self):
+        """The current position."""
+        return self.__position
+
+    def write_to(self, file):
+        """Write the encoded weights to file, return the size written."""
+        position = 0
+        for start, view in self.__segments:
+            if start > position:
+                file.write(bytes(start - position))
+            file.write(view)
+            position = start + view.nbytes
+        if position < self.__nbytes:
+            file.write(bytes(self.__nbytes - position))
+        return self.__nbytes
+
+
+def _same(value):
+    return value
+
+
+class _Encoder:  # pylint: disable=too-few-public-methods
+    def __init__(self):
+        self.buffers = []
+        self.arrays = []
+        # looked up along the MRO of value, numpy scalars may be subclass of
+        # python scalars, np.generic is before them in the MRO.
+        self.__handlers = {type(None): _same, bool: _same, int: _same,
+                           float: _same, str: _same,
+                           np.generic: self.__scalar,
+                           bytes: self.__bytes, bytearray: self.__bytes,
+                           np.ndarray: self.__ndarray,
+                           FlatWeights: self.__flat,
+                           tuple: self.__tuple, list: self.__list,
+                           dict: self.__dict}
+        for type_ in _NAMEDTUPLE_NAMES:
+            self.__handlers[type_] = self.__namedtuple
+
+    def node(self, value):
+        """Convert value to json node, the arrays are added to buffers."""
+        for type_ in type(value).__mro__:
+            if type_ in self.__handlers:
+                return self.__handlers[type_](value)
+        if _is_tensor(value):
+            return {"t": "tensor",
+                    "b": self.__add(value.detach().cpu().numpy())}
+        raise TypeError("Not support type %s in weights." % type(value))
+
+    def __bytes(self, value):
+        return {"t": "bytes",
+                "b": self.__add(np.frombuffer(value, dtype=np.uint8))}
+
+    def __ndarray(self, value):
+        return {"t": "array", "b": self.__add(value)}
+
+    def __flat(self, value):
+        return {"t": "flat",
+                "v": [self.node(value.vector), self.node(value.table)]}
+
+    def __namedtuple(self, value):
+        return {"t": _NAMEDTUPLE_NAMES[type(value)],
+                "v": [self.node(item) for item in value]}
+
+    def __tuple(self, value):
+        return {"t": "tuple", "v": [self.node(item) for item in value]}
+
+    def __list(self, value):
+        return [self.node(item) for item in value]
+
+    def __dict(self, value):
+        return {"t": "odict" if isinstance(value, OrderedDict) else "dict",
+                "k": [self.node(key) for key in value],
+                "v": [self.node(item) for item in value.values()]}
+
+    def __scalar(self, value):
+        _check_dtype(value.dtype)
+        if value.dtype.kind == "c":
+            return {"t": "array", "b": self.__add(np.asarray(value))}
+        return {"t": "scalar", "dtype": value.dtype.str, "v": value.item()}
+
+    def __add(self, array):
+        _check_dtype(array.dtype)
+        if not array.flags.c_contiguous:
+            array = array.copy(order="C")
+        self.buffers.append({"dtype": array.dtype.str,
+                             "shape": list(array.shape)})
+        self.arrays.append(array)
+        return len(self.buffers) - 1
+
+
+def encode(weights):
+    """Encode the weights into binary format.
+
+    Args:
+        weights: list, OrderedDict or FlatWeights of numpy or torch arrays, or
+            the WEIGHT list of compression, the params of WEIGHT could be
+            python or numpy scalars, tuples, lists and dicts of them.
+    Returns:
+        EncodedWeights, a file-like object.
+    Raises:
+        TypeError: the weights contain the type not supported.
+    """
+    encoder = _Encoder()
+    tree = encoder.node(weights)
+
+    # the offsets depend on the header size, which depends on the offsets.
+    offsets = [0] * len(encoder.arrays)
+    while True:
+        for meta, offset in zip(encoder.buffers, offsets):
+            meta["offset"] = offset
+        header = json.dumps({"version": VERSION, "tree": tree,
+                             "buffers": encoder.buffers},
+                            separators=(",", ":")).encode()
+        position = _align(_PREFIX_SIZE + len(header))
+        new_offsets = []
+        for array in encoder.arrays:
+            new_offsets.append(position)
+            position = _align(position + array.nbytes)
+        if new_offsets == offsets:
+            break
+        offsets = new_offsets
+
+    segments = [(0, memoryview(MAGIC + _HEADER_SIZE.pack(len(header))
+                               + header))]
+    nbytes = segments[0][1].nbytes
+    for array, offset in zip(encoder.arrays, offsets):
+        if array.nbytes:
+            view = memoryview(array.reshape(-1).view(np.uint8))
+            segments.append((offset, view))
+            nbytes = offset + array.nbytes
+    return EncodedWeights(segments, nbytes)
+
+
+class _Decoder:  # pylint: disable=too-few-public-methods
+    def __init__(self, buffer, metas):
+        self.__buffer = buffer
+        self.__metas = metas
+        self.__handlers = {"array": lambda node: self.__array(node["b"]),
+                           "tensor": lambda node: self.__tensor(node["b"]),
+                           "bytes": self.__bytes,
+                           "scalar": self.__scalar,
+                           "flat": self.__flat,
+                           "tuple": self.__tuple,
+                           "dict": self.__dict, "odict": self.__dict}
+        for name in _NAMEDTUPLES:
+            self.__handlers[name] = self.__namedtuple
+
+    def node(self, node):
+        """Convert json node to value."""
+        if isinstance(node, list):
+            return [self.node(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        handler = self.__handlers.get(node.get("t"))
+        if handler is None:
+            raise WeightsFormatError("Unknown node type %s." % node.get("t"))
+        return handler(node)
+
+    def __bytes(self, node):
+        return self.__array(node["b"]).tobytes()
+
+    @staticmethod
+    def __scalar(node):
+        dtype = np.dtype(node["dtype"])
+        _check_dtype(dtype)
+        return dtype.type(node["v"])
+
+    def __flat(self, node):
+        vector, table = node["v"]
+        return FlatWeights(self.node(vector), self.node(table))
+
+    def __namedtuple(self, node):
+        return _NAMEDTUPLES[node["t"]](*[self.node(item)
+                                         for item in node["v"]])
+
+    def __tuple(self, node):
+        return tuple(self.node(item) for item in node["v"])
+
+    def __dict(self, node):
+        result = OrderedDict() if node["t"] == "odict" else {}
+        for key, value in zip(node["k"], node["v"]):
+            result[self.node(key)] = self.node(value)
+        return result
+
+    def __array(self, index):
+        meta = self.__metas[index]
+        dtype = np.dtype(meta["dtype"])
+        _check_dtype(dtype)
+        shape = tuple(int(dim) for dim in meta["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        offset = int(meta["offset"])
+        if not count:
+            return np.empty(shape, dtype=dtype)
+        if count < 0 or offset < 0 \
+                or offset + count * dtype.itemsize > self.__buffer.nbytes:
+            raise WeightsFormatError("Buffer %s out of range." % index)
+
+        return np.frombuffer(self.__buffer, dtype=dtype, count=count,
+                             offset=offset).reshape(shape)
+
+    def __tensor(self, index):
+        torch = importlib.import_module("torch")
+        array = self.__array(index)
+        if not array.flags.writeable:
+            # torch requires writable memory.
+            array = array.copy()
+        return torch.from_numpy(array)
+
+
+def _read_buffer(data):
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return memoryview(data).cast("B")
+    if hasattr(data, "getbuffer"):
+        return memoryview(data.getbuffer()).cast("B")
+
+    data.seek(0, 2)
+    buffer = bytearray(data.tell())
+    data.seek(0)
+    data.readinto(buffer)
+    return memoryview(buffer)
+
+
+def decode(data):
+    """Decode the weights from binary format.
+
+    Args:
+        data: bytes-like object, or file-like object. BytesIO and SpooledFile
+            are decoded from their buffers without copying, other files are
+            read into memory.
+    Returns:
+        The weights encoded, the arrays are views of the buffer.
+    Raises:
+        WeightsFormatError: the data is not a valid weights format.
+    """
+    buffer = _read_buffer(data)
+    if buffer.nbytes < _PREFIX_SIZE or bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise WeightsFormatError("Data is not in weights format.")
+
+    header_size = _HEADER_SIZE.unpack_from(buffer, len(MAGIC))[0]
+    if _PREFIX_SIZE + header_size > buffer.nbytes:
+        raise WeightsFormatError("Weights header out of range.")
+    try:
+        header = json.loads(bytes(buffer[_PREFIX_SIZE:
+                                         _PREFIX_SIZE + header_size]))
+    except ValueError as err:
+        raise WeightsFormatError("Invalid weights header: %s" % err) from err
+
+    if header.get("version") != VERSION:
+        raise WeightsFormatError("Not support weights format version %s."
+                                 % header.get("version"))
+
+    try:
+        return _Decoder(buffer, header["buffers"]).node(header["tree"])
+    except (KeyError, IndexError, TypeError) as err:
+        raise WeightsFormatError("Invalid weights header: %s" % err) from err
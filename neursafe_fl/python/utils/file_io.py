@@ -7,8 +7,16 @@
 import os
 from io import BytesIO
 import json
+import mmap
+import tempfile
 import zipfile
 
+# The static bundles of broadcast package are cached by their content digest,
+# a bundle is sent as a file named by its digest.
+BUNDLE_FILE_PREFIX = "bundle-"
+BUNDLE_FILE_SUFFIX = ".zip"
+PACKAGE_CACHE_MISS = "Package cache miss"
+
 
 def read_json_file(filename):
     """Read a file as json.
@@ -68,24 +76,26 @@ def list_all_subpath(path):
     return []
 
 
-def zip_files(files):
+def zip_files(files, target=None):
     """Zip all files to BytesIO.
 
     Args:
         files: [(filename_in_zip, file_path),], all files will be compress
                 in a BytesIO.
+        target: File path or file-like object to write the zip file, default
+                is a new BytesIO.
 
     Return:
-        A BytesIO file in memory, zipped all files.
+        The target, default a BytesIO file in memory, zipped all files.
     """
-    bytes_io = BytesIO()
-    with zipfile.ZipFile(bytes_io, 'w', zipfile.ZIP_STORED) as z_file:
+    target = BytesIO() if target is None else target
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_STORED) as z_file:
         for filename_in_zip, file_path in files:
             if os.path.isdir(file_path):
                 _zip_dir(file_path, filename_in_zip, z_file)
             else:
                 z_file.write(file_path, filename_in_zip)
-    return bytes_io
+    return target
 
 
 def _zip_dir(root, base_in_zip, z_file):
@@ -106,3 +116,114 @@ def unzip(file, path):
         path: The path where will be uncompress.
     """
     zipfile.ZipFile(file).extractall(path)
+
+
+def bundle_file_name(digest):
+    """The file name to send the bundle of digest."""
+    return "%s%s%s" % (BUNDLE_FILE_PREFIX, digest, BUNDLE_FILE_SUFFIX)
+
+
+def bundle_digest(file_name):
+    """The digest of bundle file, None if the file is not a bundle."""
+    if (file_name.startswith(BUNDLE_FILE_PREFIX)
+            and file_name.endswith(BUNDLE_FILE_SUFFIX)):
+        return file_name[len(BUNDLE_FILE_PREFIX):-len(BUNDLE_FILE_SUFFIX)]
+    return None
+
+
+class SpooledFile:
+    """A file buffered in memory until larger than max_size, then spilled to
+    a file in directory.
+
+    Different from tempfile.SpooledTemporaryFile, the spilled file is named
+    and kept until the directory is removed, so the SpooledFile could be
+    pickled to other process, where the spilled file is opened again. The
+    other methods of file, such as read, seek and tell, are delegated to the
+    memory buffer or the spilled file.
+
+    Args:
+        directory: where to spill the file.
+        max_size: the maximum size kept in memory, unit is byte.
+        prefix: the prefix of the spilled file name.
+    """
+
+    def __init__(self, directory, max_size, prefix="spool-"):
+        self.__directory = directory
+        self.__max_size = max_size
+        self.__prefix = prefix
+        self.__file = BytesIO()
+        self.__path = None
+
+    @property
+    def path(self):
+        """The path of the spilled file, None if the file is in memory."""
+        return self.__path
+
+    def write(self, data):
+        """Write data, spill to directory if exceeded max_size."""
+        if self.__path is None \
+                and self.__file.tell() + len(data) > self.__max_size:
+            self.rollover()
+        return self.__file.write(data)
+
+    def rollover(self):
+        """Spill the file in memory to directory."""
+        if self.__path is not None:
+            return
+
+        file_descriptor, path = tempfile.mkstemp(prefix=self.__prefix,
+                                                 dir=self.__directory)
+        spilled = os.fdopen(file_descriptor, "w+b")
+        spilled.write(self.__file.getbuffer())
+        spilled.seek(self.__file.tell())
+        self.__file = spilled
+        self.__path = path
+
+    def getbuffer(self):
+        """A buffer of the whole file without copying, the memory buffer or
+        the copy-on-write mmap of spilled file, writing the buffer never
+        changes the spilled file."""
+        if self.__path is None:
+            return self.__file.getbuffer()
+
+        self.__file.flush()
+        if not os.fstat(self.__file.fileno()).st_size:
+            return memoryview(b"")
+        return memoryview(mmap.mmap(self.__file.fileno(), 0,
+                                    access=mmap.ACCESS_COPY))
+
+    def __getattr__(self, name):
+        if name.startswith("_SpooledFile__"):
+            raise AttributeError(name)
+        return getattr(self.__file, name)
+
+    def __getstate__(self):
+        state = {"directory": self.__directory,
+                 "max_size": self.__max_size,
+                 "prefix": self.__prefix,
+                 "path": self.__path,
+                 "position": self.__file.tell()}
+        if self.__path is None:
+            state["data"] = self.__file.getvalue()
+        else:
+            self.__file.flush()
+        return state
+
+    def __setstate__(self, state):
+        self.__directory = state["directory"]
+        self.__max_size = state["max_size"]
+        self.__prefix = state["prefix"]
+        self.__path = state["path"]
+        if self.__path is None:
+            self.__file = BytesIO(state["data"])
+        else:
+            # kept open as the spilled file, closed by __exit__.
+            self.__file = open(  # pylint:disable=consider-using-with
+                self.__path, "r+b")
+        self.__file.seek(state["position"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.__file.close()